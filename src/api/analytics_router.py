@@ -2,21 +2,45 @@
 Analytics API Router - Reportes y métricas del sistema.
 """
 
+import asyncio
 from datetime import date, datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence
 from fastapi import APIRouter, HTTPException, Depends, Query, Response, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from loguru import logger
-import csv
-import io
 
 from src.application.services.auth_service import AuthService, TokenData, require_role
 from src.infrastructure.mcp.airtable_client import get_airtable_client
+from src.core.config.airtable_ids import BASE_ID, TABLES
+from src.infrastructure.analytics import (
+    BREAKDOWN_COLUMNS,
+    EXPORT_MEDIA_TYPES,
+    AnalyticsEngine,
+    OccupancyEngine,
+    encode_export,
+    get_analytics_engine,
+    get_occupancy_engine,
+    iter_reservation_pages,
+    load_table_catalog,
+)
+from src.infrastructure.read_model import (
+    GROUP_COLUMNS,
+    UNKNOWN_HOUR,
+    aggregate,
+    get_read_model,
+)
 from src.api.middleware.rate_limiting import expensive_limit
 
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+# Tendencias y heatmaps sobre el motor columnar: hasta 3 años por consulta
+MAX_ENGINE_RANGE_DAYS = 3 * 366
+# Exportación en streaming: un año completo (también bisiesto)
+MAX_EXPORT_RANGE_DAYS = 366
+# Rejillas de ocupación (mesa × franja de 15 min): hasta un año por consulta
+MAX_OCCUPANCY_RANGE_DAYS = 366
 auth_service = AuthService()
 
 
@@ -82,13 +106,25 @@ class AnalyticsSummaryResponse(BaseModel):
 async def get_reservations_in_period(
     start_date: date, end_date: date, airtable: Any
 ) -> List[Dict[str, Any]]:
-    """Obtiene todas las reservas en un período"""
+    """Obtiene todas las reservas con fecha en [start_date, end_date)"""
+    records = get_read_model().read(
+        "reservas",
+        between={
+            "fecha": (start_date.isoformat(), (end_date - timedelta(days=1)).isoformat())
+        },
+    )
+    if records is not None:
+        return records
+
     try:
-        formula = f"AND(IS_AFTER({{Fecha de Reserva}}, '{start_date}'), IS_BEFORE({{Fecha de Reserva}}, '{end_date}'))"
-        result = await airtable.query_data_source(
-            data_source_id="appQ2ZXAR68cqDmJt",
-            filter={"formula": formula},
-            page_size=1000,
+        formula = (
+            f"AND(NOT(IS_BEFORE({{Fecha de Reserva}}, '{start_date}')), "
+            f"IS_BEFORE({{Fecha de Reserva}}, '{end_date}'))"
+        )
+        result = await airtable.list_records(
+            base_id=BASE_ID,
+            table_name=TABLES["RESERVAS"],
+            filterByFormula=formula,
         )
         return result.get("records", [])
     except Exception as e:
@@ -96,27 +132,82 @@ async def get_reservations_in_period(
         return []
 
 
-def calculate_occupancy(
-    reservations: List[Dict], total_tables: int, hours_open: int = 12
-) -> float:
-    """Calcula tasa de ocupación basada en reservas"""
-    if not reservations or total_tables == 0:
-        return 0.0
+async def get_rollups_in_period(
+    start_date: date,
+    end_date: date,
+    airtable: Any,
+    group_by: Sequence[str] = GROUP_COLUMNS,
+) -> List[Dict[str, Any]]:
+    """
+    Agregados (reservas, comensales, cubiertos) con fecha en [start_date,
+    end_date) agrupados por `group_by`: desde los rollups del read model o,
+    si la réplica no está fresca, agregando en memoria las reservas de Airtable.
+    """
+    rows = await asyncio.to_thread(
+        get_read_model().read_rollups, start_date, end_date, group_by
+    )
+    if rows is not None:
+        return rows
+    reservations = await get_reservations_in_period(start_date, end_date, airtable)
+    return aggregate(reservations, group_by)
+
+
+async def get_engine_for_period(
+    start_date: date, end_date: date, airtable: Any
+) -> AnalyticsEngine:
+    """
+    Motor columnar con el histórico completo si la réplica está fresca; si
+    no, un motor temporal con las reservas del período leídas de Airtable.
+    """
+    engine = get_analytics_engine()
+    if await asyncio.to_thread(engine.ensure_loaded):
+        return engine
+    reservations = await get_reservations_in_period(start_date, end_date, airtable)
+    return AnalyticsEngine.from_records(reservations)
+
+
+async def get_occupancy_engine_for_period(
+    start_date: date, end_date: date, airtable: Any
+) -> OccupancyEngine:
+    """
+    Motor de ocupación con rejillas cacheadas si la réplica está fresca; si
+    no, uno temporal con las reservas del período y las mesas de Airtable.
+    """
+    engine = get_occupancy_engine()
+    if await asyncio.to_thread(engine.ensure_loaded):
+        return engine
+    reservations, tables = await asyncio.gather(
+        get_reservations_in_period(start_date, end_date, airtable),
+        load_table_catalog(airtable),
+    )
+    return OccupancyEngine.from_records(reservations, tables)
+
+
+async def get_utilization(start_date: date, end_date: date, airtable: Any) -> Dict[str, Any]:
+    """Utilización de mesas y plazas en [start_date, end_date) (ver OccupancyEngine)"""
+    engine = await get_occupancy_engine_for_period(start_date, end_date, airtable)
+    return await asyncio.to_thread(engine.utilization, start_date, end_date)
+
 
-    # Contar reservas confirmadas/completadas
-    active_reservations = [
-        r
-        for r in reservations
-        if r.get("fields", {}).get("estado") in ["confirmada", "sentada", "completada"]
-    ]
+def validate_range(start_date: date, end_date: date, max_days: int) -> None:
+    """Valida un rango [start_date, end_date) de como mucho `max_days` días"""
+    if end_date <= start_date:
+        raise HTTPException(
+            status_code=400, detail="end_date debe ser mayor que start_date"
+        )
+    if (end_date - start_date).days > max_days:
+        raise HTTPException(
+            status_code=400, detail=f"Rango máximo: {max_days} días"
+        )
 
-    # Cálculo simplificado: (reservas activas / (mesas totales * horas abiertas)) * 100
-    # Asume que cada reserva ocupa mesa por ~2 horas
-    table_hours_available = total_tables * hours_open
-    table_hours_used = len(active_reservations) * 2  # 2 horas promedio por reserva
 
-    occupancy = min((table_hours_used / table_hours_available) * 100, 100.0)
-    return round(occupancy, 2)
+def count_by(rows: List[Dict[str, Any]], column: str) -> Dict[str, int]:
+    """Reservas por valor de una columna de los agregados"""
+    counts: Dict[str, int] = {}
+    for row in rows:
+        key = str(row[column])
+        counts[key] = counts.get(key, 0) + row["reservas"]
+    return counts
 
 
 # ========== ENDPOINTS ==========
@@ -152,41 +243,30 @@ async def get_analytics_summary(
         next_month = start_date.replace(day=28) + timedelta(days=4)
         end_date = next_month.replace(day=1)
 
-    # Obtener reservas
-    reservations = await get_reservations_in_period(start_date, end_date, airtable)
+    # Agregados por estado, zona y hora (una sola lectura)
+    rows = await get_rollups_in_period(
+        start_date, end_date, airtable, group_by=("estado", "zona", "hora")
+    )
 
     # Calcular métricas
-    total_reservations = len(reservations)
-    total_guests = sum(
-        r.get("fields", {}).get("numero_personas", 0) for r in reservations
-    )
+    total_reservations = sum(row["reservas"] for row in rows)
+    total_guests = sum(row["comensales"] for row in rows)
     avg_party_size = (
         round(total_guests / total_reservations, 2) if total_reservations > 0 else 0.0
     )
 
-    # Status breakdown
-    status_breakdown = {}
-    for r in reservations:
-        status = r.get("fields", {}).get("estado", "pendiente")
-        status_breakdown[status] = status_breakdown.get(status, 0) + 1
-
-    # Zone breakdown
-    zone_breakdown = {}
-    for r in reservations:
-        zone = r.get("fields", {}).get("zona_preferida", "sin especificar")
-        zone_breakdown[zone] = zone_breakdown.get(zone, 0) + 1
-
-    # Hourly distribution (simplificado)
-    hourly_distribution = {}
-    for r in reservations:
-        hora = r.get("fields", {}).get("hora", "")
-        if hora:
-            hour_key = hora.split(":")[0] if ":" in hora else hora
-            hourly_distribution[hour_key] = hourly_distribution.get(hour_key, 0) + 1
-
-    # Calcular ocupación (asume 20 mesas total, placeholder)
-    total_tables = 20  # TODO: Obtener de tabla MESAS
-    occupancy_rate = calculate_occupancy(reservations, total_tables)
+    status_breakdown = count_by(rows, "estado")
+    zone_breakdown = count_by(rows, "zona")
+    hourly_distribution = {
+        f"{int(hour):02d}": count
+        for hour, count in count_by(
+            [row for row in rows if row["hora"] != UNKNOWN_HOUR], "hora"
+        ).items()
+    }
+
+    # Ocupación: mesa-franjas ocupadas sobre las disponibles en horario de apertura
+    utilization = await get_utilization(start_date, end_date, airtable)
+    occupancy_rate = utilization["table_utilization"]
 
     logger.info(
         f"Analytics summary generated: {period} from {start_date} to {end_date}"
@@ -232,23 +312,13 @@ async def get_occupancy_stats(
             detail="Rango máximo: 90 días. Para períodos más largos, use exportación.",
         )
 
-    # Obtener reservas del período
-    reservations = await get_reservations_in_period(start_date, end_date, airtable)
-
-    # Agrupar por día
-    daily_occupancy: Dict[str, List[Dict]] = {}
-    for r in reservations:
-        fecha_str = r.get("fields", {}).get("Fecha de Reserva", "")
-        if fecha_str:
-            if fecha_str not in daily_occupancy:
-                daily_occupancy[fecha_str] = []
-            daily_occupancy[fecha_str].append(r)
-
-    # Calcular métricas diarias
-    total_tables = 20  # TODO: Obtener de DB
-    daily_rates = {}
-    for day, day_reservations in daily_occupancy.items():
-        daily_rates[day] = calculate_occupancy(day_reservations, total_tables)
+    # Reservas por día (media) y ocupación diaria desde la rejilla de franjas
+    rows, utilization = await asyncio.gather(
+        get_rollups_in_period(start_date, end_date, airtable, group_by=()),
+        get_utilization(start_date, end_date, airtable),
+    )
+    total_tables = utilization["total_tables"]
+    daily_rates = utilization["daily"]
 
     # Encontrar picos
     if daily_rates:
@@ -261,7 +331,8 @@ async def get_occupancy_stats(
         peak_day = lowest_day = str(start_date)
         peak_occupancy = lowest_occupancy = avg_occupancy = 0.0
 
-    avg_reservations = round(len(reservations) / max(days_diff, 1), 2)
+    total_reservations = sum(row["reservas"] for row in rows)
+    avg_reservations = round(total_reservations / max(days_diff, 1), 2)
 
     logger.info(f"Occupancy stats generated: {start_date} to {end_date}")
 
@@ -282,88 +353,48 @@ async def get_occupancy_stats(
 @expensive_limit()
 async def export_analytics_csv(
     request: Request,
-    start_date: date = Query(..., description="Fecha inicio"),
-    end_date: date = Query(..., description="Fecha fin"),
-    format: str = Query("csv", regex="^(csv)$"),  # Futuro: excel, pdf
+    start_date: date = Query(..., description="Fecha inicio (incluida)"),
+    end_date: date = Query(..., description="Fecha fin (excluida)"),
+    format: str = Query("csv", regex="^(csv|csv\\.gz)$"),
     user: TokenData = Depends(require_role(["manager", "admin"])),
 ):
     """
-    Exporta datos de reservas en formato CSV.
+    Exporta las reservas del período en streaming: las filas se envían a
+    medida que se leen, sin cargar el rango completo en memoria.
 
     **Permisos:** Manager, Admin
 
-    **Formatos soportados:** csv (futuro: excel, pdf)
+    **Formatos soportados:** csv, csv.gz (CSV comprimido, recomendado para
+    exportaciones de un año)
     """
-    airtable = get_airtable_client()
-
-    # Validar rango
-    if end_date < start_date:
-        raise HTTPException(
-            status_code=400, detail="end_date debe ser mayor que start_date"
-        )
+    validate_range(start_date, end_date, MAX_EXPORT_RANGE_DAYS)
 
-    days_diff = (end_date - start_date).days
-    if days_diff > 365:
+    pages = iter_reservation_pages(start_date, end_date, get_airtable_client())
+    # La primera página se lee antes de responder: si Airtable falla, el
+    # cliente recibe un 503 en lugar de un CSV cortado con 200
+    try:
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        first_page = None
+    except Exception as e:
+        logger.error(f"Error starting reservations export: {e}")
         raise HTTPException(
-            status_code=400, detail="Rango máximo para exportación: 365 días"
+            status_code=503, detail="No se pudieron leer las reservas para exportar"
         )
 
-    # Obtener reservas
-    reservations = await get_reservations_in_period(start_date, end_date, airtable)
-
-    # Generar CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Headers
-    headers = [
-        "ID",
-        "Fecha",
-        "Hora",
-        "Nombre",
-        "Teléfono",
-        "Email",
-        "Num Personas",
-        "Estado",
-        "Zona",
-        "Mesa Asignada",
-        "Solicitudes Especiales",
-        "Creado en",
-        "Actualizado en",
-    ]
-    writer.writerow(headers)
-
-    # Datos
-    for r in reservations:
-        fields = r.get("fields", {})
-        row = [
-            r.get("id", ""),
-            fields.get("Fecha de Reserva", ""),
-            fields.get("hora", ""),
-            fields.get("nombre_cliente", ""),
-            fields.get("telefono", ""),
-            fields.get("email", ""),
-            fields.get("numero_personas", ""),
-            fields.get("estado", ""),
-            fields.get("zona_preferida", ""),
-            fields.get("mesa_asignada", ""),
-            fields.get("solicitudes_especiales", ""),
-            fields.get("created_at", ""),
-            fields.get("updated_at", ""),
-        ]
-        writer.writerow(row)
-
-    # Preparar respuesta
-    output.seek(0)
-    filename = f"reservas_{start_date}_{end_date}.csv"
+    async def all_pages():
+        if first_page is None:
+            return
+        yield first_page
+        async for page in pages:
+            yield page
 
-    logger.info(
-        f"CSV export generated: {len(reservations)} reservations from {start_date} to {end_date}"
-    )
+    filename = f"reservas_{start_date}_{end_date}.{format}"
+    logger.info(f"Reservations export started ({format}) from {start_date} to {end_date}")
 
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        encode_export(all_pages(), format),
+        media_type=EXPORT_MEDIA_TYPES[format],
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
@@ -381,41 +412,158 @@ async def get_dashboard_metrics(
     today = date.today()
 
     # Métricas de hoy
-    today_reservations = await get_reservations_in_period(
-        today, today + timedelta(days=1), airtable
+    today_rows = await get_rollups_in_period(
+        today, today + timedelta(days=1), airtable, group_by=("estado",)
     )
+    today_status = count_by(today_rows, "estado")
 
     # Métricas de la semana
     week_start = today - timedelta(days=today.weekday())
-    week_reservations = await get_reservations_in_period(
-        week_start, week_start + timedelta(days=7), airtable
+    week_rows = await get_rollups_in_period(
+        week_start, week_start + timedelta(days=7), airtable, group_by=("estado",)
     )
+    week_total = sum(row["reservas"] for row in week_rows)
 
-    total_tables = 20  # TODO: Obtener de DB
+    week_utilization = await get_utilization(week_start, week_start + timedelta(days=7), airtable)
 
     return {
         "today": {
-            "total": len(today_reservations),
-            "confirmed": len(
-                [
-                    r
-                    for r in today_reservations
-                    if r.get("fields", {}).get("estado") == "confirmada"
-                ]
-            ),
-            "pending": len(
-                [
-                    r
-                    for r in today_reservations
-                    if r.get("fields", {}).get("estado") == "pendiente"
-                ]
-            ),
-            "occupancy": calculate_occupancy(today_reservations, total_tables),
+            "total": sum(today_status.values()),
+            "confirmed": today_status.get("Confirmada", 0),
+            "pending": today_status.get("Pendiente", 0),
+            "occupancy": week_utilization["daily"].get(today.isoformat(), 0.0),
         },
         "this_week": {
-            "total": len(week_reservations),
-            "avg_per_day": round(len(week_reservations) / 7, 2),
-            "occupancy": calculate_occupancy(week_reservations, total_tables),
+            "total": week_total,
+            "avg_per_day": round(week_total / 7, 2),
+            "occupancy": week_utilization["table_utilization"],
         },
         "alerts": [],  # Placeholder para alertas futuras
     }
+
+
+@router.get("/trends")
+async def get_trends(
+    start_date: date = Query(..., description="Fecha inicio (incluida)"),
+    end_date: date = Query(..., description="Fecha fin (excluida)"),
+    freq: str = Query("day", regex="^(day|week|month)$"),
+    user: TokenData = Depends(require_role(["manager", "admin"])),
+):
+    """
+    Serie temporal de reservas, comensales y reservas activas por día,
+    semana o mes.
+
+    **Permisos:** Manager, Admin
+    """
+    validate_range(start_date, end_date, MAX_ENGINE_RANGE_DAYS)
+    engine = await get_engine_for_period(start_date, end_date, get_airtable_client())
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "freq": freq,
+        "series": engine.trend(start_date, end_date, freq),
+    }
+
+
+@router.get("/demand-heatmap")
+async def get_demand_heatmap(
+    start_date: date = Query(..., description="Fecha inicio (incluida)"),
+    end_date: date = Query(..., description="Fecha fin (excluida)"),
+    user: TokenData = Depends(require_role(["manager", "admin"])),
+):
+    """
+    Reservas por día de la semana × hora local (demanda histórica).
+
+    **Permisos:** Manager, Admin
+    """
+    validate_range(start_date, end_date, MAX_ENGINE_RANGE_DAYS)
+    engine = await get_engine_for_period(start_date, end_date, get_airtable_client())
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        **engine.heatmap(start_date, end_date),
+    }
+
+
+@router.get("/breakdown")
+async def get_breakdown(
+    by: str = Query(..., regex=f"^({'|'.join(BREAKDOWN_COLUMNS)})$"),
+    start_date: date = Query(..., description="Fecha inicio (incluida)"),
+    end_date: date = Query(..., description="Fecha fin (excluida)"),
+    user: TokenData = Depends(require_role(["manager", "admin"])),
+):
+    """
+    Reservas y comensales por estado, zona, mesa (record ID de Mesas) o canal.
+
+    **Permisos:** Manager, Admin
+    """
+    validate_range(start_date, end_date, MAX_ENGINE_RANGE_DAYS)
+    engine = await get_engine_for_period(start_date, end_date, get_airtable_client())
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "by": by,
+        "breakdown": engine.breakdown(by, start_date, end_date),
+    }
+
+
+@router.get("/occupancy/heatmap")
+async def get_occupancy_heatmap(
+    start_date: date = Query(..., description="Fecha inicio (incluida)"),
+    end_date: date = Query(..., description="Fecha fin (excluida)"),
+    user: TokenData = Depends(require_role(["manager", "admin"])),
+):
+    """
+    % de mesas ocupadas por día y franja de 15 minutos (según la hora de
+    cada reserva, su mesa y la duración estimada para su grupo).
+
+    **Permisos:** Manager, Admin
+    """
+    validate_range(start_date, end_date, MAX_OCCUPANCY_RANGE_DAYS)
+    engine = await get_occupancy_engine_for_period(start_date, end_date, get_airtable_client())
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        **await asyncio.to_thread(engine.heatmap, start_date, end_date),
+    }
+
+
+@router.get("/occupancy/peak-slots")
+async def get_occupancy_peak_slots(
+    start_date: date = Query(..., description="Fecha inicio (incluida)"),
+    end_date: date = Query(..., description="Fecha fin (excluida)"),
+    limit: int = Query(10, ge=1, le=100),
+    user: TokenData = Depends(require_role(["manager", "admin"])),
+):
+    """
+    Franjas de 15 minutos con más mesas ocupadas del período.
+
+    **Permisos:** Manager, Admin
+    """
+    validate_range(start_date, end_date, MAX_OCCUPANCY_RANGE_DAYS)
+    engine = await get_occupancy_engine_for_period(start_date, end_date, get_airtable_client())
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "peaks": await asyncio.to_thread(engine.peak_slots, start_date, end_date, limit),
+    }
+
+
+@router.get("/occupancy/utilization")
+async def get_occupancy_utilization(
+    start_date: date = Query(..., description="Fecha inicio (incluida)"),
+    end_date: date = Query(..., description="Fecha fin (excluida)"),
+    user: TokenData = Depends(require_role(["manager", "admin"])),
+):
+    """
+    Utilización de mesas y plazas en horario de apertura: total, por día
+    abierto y por mesa.
+
+    **Permisos:** Manager, Admin
+    """
+    validate_range(start_date, end_date, MAX_OCCUPANCY_RANGE_DAYS)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        **await get_utilization(start_date, end_date, get_airtable_client()),
+    }
@@ -38,8 +38,9 @@ async def _check_redis() -> dict:
 
 
 async def _check_airtable() -> dict:
-    """Verifica conectividad real con Airtable."""
+    """Verifica conectividad real con Airtable y el estado de sus circuit breakers."""
     try:
+        from src.infrastructure.airtable import get_airtable_resilience
         from src.infrastructure.mcp.airtable_client import airtable_client
         if not airtable_client._api:
             return {"status": "unknown", "service": "Airtable DB", "message": "API key no configurada"}
@@ -47,7 +48,21 @@ async def _check_airtable() -> dict:
         base_id = os.getenv("AIRTABLE_BASE_ID", "appQ2ZXAR68cqDmJt")
         table = "Usuarios"
         airtable_client._get_table(table)
-        return {"status": "healthy", "service": "Airtable DB", "timestamp": datetime.now().isoformat()}
+        breakers = get_airtable_resilience().get_stats()
+        if breakers["open"]:
+            return {
+                "status": "degraded",
+                "service": "Airtable DB",
+                "message": f"Circuit breaker abierto: {', '.join(breakers['open'])}",
+                "circuit_breakers": breakers["tables"],
+                "timestamp": datetime.now().isoformat(),
+            }
+        return {
+            "status": "healthy",
+            "service": "Airtable DB",
+            "circuit_breakers": breakers["tables"],
+            "timestamp": datetime.now().isoformat(),
+        }
     except Exception as e:
         return {"status": "degraded", "service": "Airtable DB", "message": str(e)[:100], "timestamp": datetime.now().isoformat()}
 
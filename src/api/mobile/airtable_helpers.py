@@ -16,25 +16,13 @@ from zoneinfo import ZoneInfo
 
 from src.core.entities.booking import BookingStatus, ZonePreference, BookingChannel
 from src.api.mobile.models import ReservationResponse
+from src.core.config.airtable_fields import AIRTABLE_FIELD_MAP
 
 
 # ========== FIELD MAPPING ==========
-# Mapeo entre campos de Booking entity y Airtable field IDs
-
-AIRTABLE_FIELD_MAP = {
-    "nombre": "Nombre del Cliente",           # fldSeZIwKo8yfn6YZ
-    "telefono": "Teléfono",                   # fldBSYJA8AnjNrxXV
-    "email": "Email",                         # fldduECur5KuqeoCp
-    "fecha": "Fecha de Reserva",              # fldzFzhnO5l74XwSi
-    "hora": "Hora",                           # fldjPJMo4E93Wx321
-    "pax": "Cantidad de Personas",            # fld4CoP935Kpvnjgo
-    "estado": "Estado",                       # flduM2hUKvl7cbqkm
-    "zona_preferencia": "Zona Preferida",     # fldDpIF2630x1pCQd
-    "mesa_asignada": "Mesa",                  # fldebZGXz38yLHm4E (linked record)
-    "canal": "Canal",                         # fldAa1TrmCXny702z
-    "vapi_call_id": "VAPI Call ID",           # fldOBkAIun1Cc4Iyy
-    "notas": "Notas Especiales"               # fldLlN6Uvse34l9fB
-}
+# AIRTABLE_FIELD_MAP (campos de Booking entity → Airtable) vive en
+# src/core/config/airtable_fields.py junto a las proyecciones por caso de
+# uso, para que repositorios y servicios lo compartan. Se re-exporta aquí.
 
 
 # ========== CONVERSION FUNCTIONS ==========
@@ -0,0 +1,138 @@
+"""
+Peticiones agrupadas de la app móvil (/batch).
+
+La pantalla principal pide de golpe perfil, stats, reservas, mesas, lista
+de espera y cocina. /batch recibe esas sub-peticiones, valida el JWT una
+vez y las ejecuta en paralelo llamando directamente a los endpoints GET.
+
+Durante un batch, las cargas compartidas (por ejemplo las reservas del día
+que leen cocina y dashboard) pasan por load_shared(): la primera
+sub-petición lanza la carga y las demás esperan el mismo resultado.
+
+Cada sub-petición recibe una Request con su propia ruta y query string
+(y su If-None-Match), así que ETags y 304 funcionan igual que por separado.
+"""
+
+import asyncio
+import inspect
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.api.mobile.models import BatchSubRequest, BatchSubResponse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Parámetros que pone el batch, no el cliente
+_INJECTED_PARAMS = ("request", "response", "user")
+
+_shared: ContextVar[Optional[Dict[Hashable, "asyncio.Future[Any]"]]] = ContextVar(
+    "mobile_batch_shared", default=None
+)
+
+
+@contextmanager
+def shared_loads() -> Iterator[None]:
+    """Ámbito de un batch: las cargas con la misma clave se hacen una vez."""
+    token = _shared.set({})
+    try:
+        yield
+    finally:
+        _shared.reset(token)
+
+
+async def load_shared(key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+    """Resultado de `loader()`, compartido con el resto del batch (si lo hay)."""
+    memo = _shared.get()
+    if memo is None:
+        return await loader()
+    future = memo.get(key)
+    if future is None:
+        future = memo[key] = asyncio.ensure_future(loader())
+    return await future
+
+
+def bind_params(endpoint: Callable[..., Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte los parámetros de la sub-petición a los tipos de la firma del
+    endpoint (los que falten toman su valor por defecto).
+
+    Raises:
+        ValueError: parámetro desconocido o con valor inválido
+    """
+    signature = inspect.signature(endpoint).parameters
+    unknown = set(params) - (set(signature) - set(_INJECTED_PARAMS))
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+    return {
+        name: TypeAdapter(signature[name].annotation).validate_python(value)
+        for name, value in params.items()
+    }
+
+
+def sub_request(request: Request, path: str, params: Dict[str, Any], if_none_match: Optional[str]) -> Request:
+    """Request GET equivalente a la sub-petición (misma auth, su ruta y su query)."""
+    scope = dict(request.scope)
+    headers = [
+        (key, value)
+        for key, value in request.scope["headers"]
+        if key not in (b"if-none-match", b"content-length", b"content-type")
+    ]
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode("latin-1")))
+    scope.update(
+        method="GET",
+        path=path,
+        raw_path=path.encode("utf-8"),
+        query_string=urlencode(params, doseq=True).encode("ascii"),
+        headers=headers,
+    )
+    return Request(scope)
+
+
+async def run_sub_request(
+    endpoint: Callable[..., Awaitable[Any]],
+    request: Request,
+    user: Any,
+    item: BatchSubRequest,
+    path: str,
+) -> BatchSubResponse:
+    """Ejecuta una sub-petición; sus errores quedan en su respuesta, no en el batch."""
+    result_fields = {"id": item.id, "path": item.path}
+    try:
+        kwargs = bind_params(endpoint, item.params)
+    except ValueError as e:
+        return BatchSubResponse(**result_fields, status=400, body={"detail": str(e)})
+
+    response = Response()
+    signature = inspect.signature(endpoint).parameters
+    if "request" in signature:
+        kwargs["request"] = sub_request(request, path, item.params, item.if_none_match)
+    if "response" in signature:
+        kwargs["response"] = response
+    try:
+        result = await endpoint(user=user, **kwargs)
+    except HTTPException as e:
+        return BatchSubResponse(**result_fields, status=e.status_code, body={"detail": e.detail})
+    except Exception as e:
+        logger.error(f"Batch: error en {item.path}: {e}", exc_info=True)
+        return BatchSubResponse(**result_fields, status=500, body={"detail": "Error interno"})
+
+    if isinstance(result, Response):
+        return BatchSubResponse(
+            **result_fields, status=result.status_code, etag=result.headers.get("etag")
+        )
+    return BatchSubResponse(
+        **result_fields,
+        status=200,
+        body=jsonable_encoder(result),
+        etag=response.headers.get("etag"),
+    )
@@ -0,0 +1,69 @@
+"""
+GET condicional (ETag / If-None-Match) para los listados que la app sondea.
+
+El ETag se calcula con las versiones del read model de las tablas de las
+que depende el listado (ver read_model.versions), la ruta, los parámetros
+de la consulta, el usuario y el día (los listados "de hoy" cambian a
+medianoche). Si el cliente ya tiene ese tag se responde 304 sin tocar
+Airtable.
+
+Solo se emiten ETags mientras esas tablas estén frescas en la réplica: si
+no, Airtable puede haber cambiado sin que la versión lo sepa y el listado
+se sirve completo, sin tag.
+"""
+
+from datetime import date
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+
+from src.application.services.auth_service import TokenData
+from src.infrastructure.read_model import get_collection_versions, get_read_model
+
+# Revalidar siempre con el servidor; nunca compartir entre usuarios
+CACHE_CONTROL = "private, no-cache"
+
+
+def collection_etag(
+    request: Request, user: TokenData, collections: Iterable[str]
+) -> Optional[str]:
+    """ETag fuerte del listado (None si la réplica no está fresca)."""
+    collections = tuple(collections)
+    read_model = get_read_model()
+    if not all(read_model.is_fresh(name) for name in collections):
+        return None
+    return get_collection_versions().etag(
+        collections,
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        user.user_id,
+        user.rol,
+        date.today().isoformat(),
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        tag[2:] if tag.startswith("W/") else tag for tag in candidates
+    )
+
+
+def conditional_get(
+    request: Request, response: Response, user: TokenData, *collections: str
+) -> Optional[Response]:
+    """
+    Respuesta 304 si el If-None-Match del cliente coincide; si no, None y
+    el ETag queda puesto en `response` para la respuesta completa.
+    """
+    etag = collection_etag(request, user, collections)
+    if etag is None:
+        return None
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
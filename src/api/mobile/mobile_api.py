@@ -4,11 +4,12 @@ Autenticación, reservas, mesas y notificaciones.
 Updated: 2026-02-22 - Forzar rebuild con login usuario
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+import asyncio
 import logging
 
 from src.application.services.auth_service import auth_service, TokenData
@@ -17,12 +18,26 @@ from src.api.mobile.models import (
     CreateReservationRequest,
     UpdateReservationRequest,
     CancelReservationRequest,
+    BatchRequest,
+    BatchResponse,
     ReservationResponse,
     PaginatedReservationsResponse,
     CreateTableRequest,
     UpdateTableRequest,
     TableResponse,
 )
+from src.api.mobile.batch import load_shared, run_sub_request, shared_loads
+from src.api.mobile.conditional import conditional_get
+from src.api.mobile.pagination import (
+    SOURCE_AIRTABLE,
+    SOURCE_READ_MODEL,
+    InvalidCursorError,
+    decode_cursor,
+    decode_sync_token,
+    encode_sync_token,
+    filters_fingerprint,
+    next_cursor,
+)
 from src.api.mobile.airtable_helpers import (
     airtable_to_reservation_response,
     reservation_request_to_airtable_fields,
@@ -31,6 +46,21 @@ from src.api.mobile.airtable_helpers import (
 )
 from src.application.services.waitlist_service import WaitlistService
 from src.core.entities.waitlist import WaitlistEntry, WaitlistStatus
+from src.core.config.airtable_fields import (
+    DAY_RESERVATION_FIELDS,
+    RESERVATION_MATCH_FIELDS,
+    RESERVATION_RESPONSE_FIELDS,
+)
+from src.infrastructure.analytics import (
+    OccupancyEngine,
+    day_stats,
+    get_dashboard_stats_materializer,
+    get_occupancy_engine,
+    load_table_catalog,
+)
+from src.infrastructure.kitchen import get_kitchen_board, kitchen_view
+from src.infrastructure.read_model import ChangeLogExpired, get_read_model
+from src.infrastructure.write_journal import get_write_journal
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/mobile", tags=["mobile"])
@@ -102,6 +132,7 @@ class DashboardStats(BaseModel):
     cancelled: int
     occupancy_rate: float
     pax_total: int
+    active_pax: int = 0
 
 
 # ============ MODELOS PARA USUARIOS ============
@@ -720,83 +751,68 @@ async def send_notification(
 # ============ COCINA ENDPOINTS ============
 
 
+async def _day_reservations(fecha: date) -> List[dict]:
+    """
+    Reservas de un día para cocina y dashboard: de la réplica local si está
+    fresca; si no, de Airtable. Dentro de /batch se cargan una sola vez.
+    """
+
+    async def load() -> List[dict]:
+        records = get_read_model().read("reservas", where={"fecha": fecha.isoformat()})
+        if records is not None:
+            return records
+        from src.infrastructure.mcp.airtable_client import airtable_client
+
+        response = await airtable_client.list_records(
+            base_id=AIRTABLE_BASE_ID,
+            table_name=RESERVATIONS_TABLE_NAME,
+            filterByFormula=f"{{{AIRTABLE_FIELD_MAP['fecha']}}} = '{fecha.isoformat()}'",
+            max_records=500,
+            fields=DAY_RESERVATION_FIELDS,
+        )
+        return response.get("records", [])
+
+    return await load_shared(("day_reservations", fecha.isoformat()), load)
+
+
 @router.get("/cocina/pedidos")
 async def get_cocina_pedidos(
-    fecha: Optional[date] = None, user: TokenData = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    fecha: Optional[date] = None,
+    user: TokenData = Depends(get_current_user),
 ):
     """
     Obtiene las reservas del día con información relevante para cocina.
 
     Incluye: hora, pax, notas especiales (alergias, sin gluten, etc.)
 
+    Hoy se sirve la instantánea del tablero de cocina en memoria (los
+    cambios llegan también como deltas a la sala "kitchen" del WebSocket,
+    con la misma `version`); otros días, o sin réplica fresca, se calcula
+    al momento.
+
     Permisos: cocina.ver (administradora, encargada, cocina)
     """
     check_permission(user, "cocina.ver")
+    not_modified = conditional_get(request, response, user, "reservas")
+    if not_modified:
+        return not_modified
 
     from datetime import date as today_date
-    from src.infrastructure.mcp.airtable_client import airtable_client
 
     # Usar hoy si no se especifica fecha
     if fecha is None:
         fecha = today_date.today()
 
     try:
-        # Obtener reservas del día
-        filter_formula = f"{{{AIRTABLE_FIELD_MAP['fecha']}}} = '{fecha.isoformat()}'"
-
-        reservations_response = await airtable_client.list_records(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            filterByFormula=filter_formula,
-            sort=[{"field": AIRTABLE_FIELD_MAP["hora"], "direction": "asc"}],
-            max_records=500,
-        )
+        board = get_kitchen_board()
+        view = board.snapshot(fecha) if await asyncio.to_thread(board.ensure_loaded) else None
+        if view is None:
+            view = kitchen_view(fecha, await _day_reservations(fecha))
 
-        records = reservations_response.get("records", [])
-
-        # Filtrar solo reservas activas (no canceladas)
-        pedidos = []
-        for record in records:
-            fields = record.get("fields", {})
-            estado = fields.get(AIRTABLE_FIELD_MAP["estado"], "")
-
-            if estado not in ["Cancelada"]:
-                pedido = {
-                    "id": record.get("id"),
-                    "hora": fields.get(AIRTABLE_FIELD_MAP["hora"], ""),
-                    "pax": fields.get(AIRTABLE_FIELD_MAP["pax"], 0),
-                    "nombre_cliente": fields.get(AIRTABLE_FIELD_MAP["nombre"], ""),
-                    "mesa": fields.get(AIRTABLE_FIELD_MAP["mesa_asignada"], []),
-                    "estado": estado,
-                    "notas": fields.get(AIRTABLE_FIELD_MAP["notas"], ""),
-                    "notas_especiales": [],
-                }
-
-                # Extraer notas especiales
-                notas = pedido["notas"].lower() if pedido["notas"] else ""
-                if "sin gluten" in notas or "celiaco" in notas:
-                    pedido["notas_especiales"].append("⚠️ SIN GLUTEN")
-                if "alergia" in notas or "alérgico" in notas:
-                    pedido["notas_especiales"].append("⚠️ ALERGIAS")
-                if "vegano" in notas or "vegetariano" in notas:
-                    pedido["notas_especiales"].append("🥬 VEGETARIANO/VEGANO")
-                if (
-                    "bebé" in notas
-                    or "bebe" in notas
-                    or "niño" in notas
-                    or "trona" in notas
-                ):
-                    pedido["notas_especiales"].append("👶 CON NIÑOS")
-
-                pedidos.append(pedido)
-
-        logger.info(f"Pedidos cocina consultados: {len(pedidos)} para {fecha}")
-
-        return {
-            "fecha": fecha.isoformat(),
-            "total_pedidos": len(pedidos),
-            "pedidos": pedidos,
-        }
+        logger.info(f"Pedidos cocina consultados: {view['total_pedidos']} para {fecha}")
+        return view
 
     except Exception as e:
         logger.error(f"Error obteniendo pedidos de cocina: {e}", exc_info=True)
@@ -811,72 +827,147 @@ async def get_cocina_pedidos(
 
 @router.get("/reservations", response_model=PaginatedReservationsResponse)
 async def get_reservations(
+    request: Request,
+    response: Response,
     fecha: Optional[date] = None,
     estado: Optional[str] = None,
     mesa: Optional[str] = None,
+    cursor: Optional[str] = None,
     offset: int = 0,
     limit: int = 100,
+    include_total: bool = False,
     user: TokenData = Depends(get_current_user),
 ):
     """
-    Obtiene lista de reservas con filtros y paginación.
+    Obtiene lista de reservas con filtros y paginación por cursor.
+
+    Se piden solo `limit` reservas: a los índices del read model (keyset por
+    fecha descendente y record ID) o, si no está fresco, a Airtable con su
+    token `offset`. La respuesta trae `next_cursor` para la página siguiente.
 
     Args:
         fecha: Filtrar por fecha de reserva (ISO format YYYY-MM-DD)
         estado: Filtrar por estado (Pendiente, Confirmada, Sentada, etc.)
         mesa: Filtrar por mesa asignada (ID de mesa)
-        offset: Número de registros a saltar (default: 0)
+        cursor: `next_cursor` de la página anterior (mismos filtros)
+        offset: Paginación clásica (obsoleta, usar cursor): registros a saltar
         limit: Máximo de registros a retornar (default: 100, max: 100)
+        include_total: Añade el total de reservas con esos filtros (solo
+            desde los índices del read model; null si se lee de Airtable)
+
+    Mientras la réplica esté fresca la respuesta lleva ETag; con
+    If-None-Match coincidente se responde 304 sin cuerpo.
 
     Returns:
-        PaginatedReservationsResponse con lista de reservas, total, y metadata de paginación
+        PaginatedReservationsResponse con lista de reservas, next_cursor y
+        metadata de paginación
     """
     check_permission(user, "reservations.view")
-
+    not_modified = conditional_get(request, response, user, "reservas")
+    if not_modified:
+        return not_modified
+    limit = max(1, min(limit, 100))
+    fingerprint = filters_fingerprint(fecha=fecha, estado=estado, mesa=mesa)
     try:
-        # Construir filtro de Airtable
-        filter_formula = build_airtable_filter(fecha=fecha, estado=estado, mesa=mesa)
-
-        # Llamar a Airtable MCP para obtener records
-        from src.infrastructure.mcp.airtable_client import airtable_client
-
-        list_params = {
-            "base_id": AIRTABLE_BASE_ID,
-            "table_name": RESERVATIONS_TABLE_NAME,
-            "max_records": limit,
-        }
-
-        if filter_formula:
-            list_params["filterByFormula"] = filter_formula
-
-        # Sort por fecha descendente (más recientes primero)
-        list_params["sort"] = [
-            {"field": AIRTABLE_FIELD_MAP["fecha"], "direction": "desc"}
-        ]
-
-        records_response = await airtable_client.list_records(**list_params)
-
-        # Extraer records
-        all_records = records_response.get("records", [])
-        total = len(all_records)
-
-        # Aplicar paginación manual (Airtable MCP puede no soportar offset nativo)
-        paginated_records = all_records[offset : offset + limit]
+        position = decode_cursor(cursor, fingerprint) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        # Convertir a ReservationResponse
-        reservations = [
-            airtable_to_reservation_response(record) for record in paginated_records
-        ]
+    try:
+        records: Optional[List[dict]] = None
+        total: Optional[int] = None
+        following = None
+
+        if position is None or position["s"] == SOURCE_READ_MODEL:
+            # Réplica local (SQL con índices) si está dentro de la cota de
+            # frescura; un cursor suyo se sigue sirviendo aunque se desfase
+            where = {}
+            if fecha:
+                where["fecha"] = fecha.isoformat()
+            if estado:
+                where["estado"] = estado
+            if mesa:
+                where["mesa"] = mesa
+            read_model = get_read_model()
+            continuing = position is not None
+            records = read_model.read(
+                "reservas",
+                where=where,
+                order_by="-fecha",
+                limit=limit + 1,
+                after=tuple(position["p"]) if continuing else None,
+                offset=None if continuing else offset,
+                allow_stale=continuing,
+            )
+            if records is None and continuing:
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="El cursor ha caducado: vuelva a pedir la primera página",
+                )
+            if records is not None:
+                if len(records) > limit:
+                    records = records[:limit]
+                    following = next_cursor(
+                        SOURCE_READ_MODEL,
+                        read_model.store.sort_key("reservas", "fecha", records[-1]),
+                        fingerprint,
+                    )
+                if include_total:
+                    total = read_model.count("reservas", where=where, allow_stale=True)
+
+        if records is None:
+            from src.infrastructure.mcp.airtable_client import airtable_client
+
+            list_params = {
+                "base_id": AIRTABLE_BASE_ID,
+                "table_name": RESERVATIONS_TABLE_NAME,
+                "fields": RESERVATION_RESPONSE_FIELDS,
+                # Sort por fecha descendente (más recientes primero)
+                "sort": [{"field": AIRTABLE_FIELD_MAP["fecha"], "direction": "desc"}],
+            }
+            filter_formula = build_airtable_filter(fecha=fecha, estado=estado, mesa=mesa)
+            if filter_formula:
+                list_params["filterByFormula"] = filter_formula
+
+            if position is None and offset:
+                # Paginación clásica: Airtable no salta registros, se piden
+                # los `offset + limit` primeros (sin cursor de continuación)
+                legacy_page = await airtable_client.list_records(
+                    max_records=offset + limit + 1, **list_params
+                )
+                window = legacy_page.get("records", [])[offset:]
+                records = window[:limit]
+                has_more = len(window) > limit
+            else:
+                page = await airtable_client.list_records_page(
+                    page_size=limit,
+                    offset=position["p"] if position else None,
+                    **list_params,
+                )
+                records = page["records"]
+                following = next_cursor(SOURCE_AIRTABLE, page["offset"], fingerprint)
+                has_more = following is not None
+        else:
+            has_more = following is not None
 
         return PaginatedReservationsResponse(
-            reservations=reservations,
+            reservations=[airtable_to_reservation_response(record) for record in records],
             total=total,
             offset=offset,
             limit=limit,
-            has_more=(offset + limit) < total,
+            has_more=has_more,
+            next_cursor=following,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
+        if position is not None and "ITERATOR_NOT_AVAILABLE" in str(e):
+            # El token offset de Airtable caduca a los pocos minutos
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="El cursor ha caducado: vuelva a pedir la primera página",
+            )
         logger.warning(f"Airtable not available for reservations, returning empty list: {e}")
         # Airtable no disponible en desarrollo: devolver lista vacía en lugar de 500
         return PaginatedReservationsResponse(
@@ -952,14 +1043,10 @@ async def update_reservation(
     check_permission(user, "reservations.update")
 
     try:
-        from src.infrastructure.mcp.airtable_client import airtable_client
+        journal = get_write_journal()
 
-        # Verificar que la reserva existe
-        existing_record = await airtable_client.get_record(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            record_id=reservation_id,
-        )
+        # Verificar que la reserva existe (incluye reservas aún sin aplicar en Airtable)
+        existing_record = await journal.get_record(RESERVATIONS_TABLE_NAME, reservation_id)
 
         if not existing_record:
             raise HTTPException(
@@ -971,12 +1058,10 @@ async def update_reservation(
         update_data = reservation.model_dump(exclude_none=True)
         airtable_fields = reservation_request_to_airtable_fields(update_data)
 
-        # Actualizar en Airtable
-        updated_record = await airtable_client.update_record(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            record_id=reservation_id,
-            fields=airtable_fields,
+        # Actualizar vía diario (acepta IDs provisionales; el read model se
+        # actualiza al aplicarse)
+        updated_record = await journal.update(
+            RESERVATIONS_TABLE_NAME, reservation_id, airtable_fields
         )
 
         if not updated_record:
@@ -984,6 +1069,12 @@ async def update_reservation(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update reservation in Airtable",
             )
+        if updated_record.get("pending_sync"):
+            # Diferido: solo trae los campos cambiados
+            updated_record = {
+                **updated_record,
+                "fields": {**existing_record.get("fields", {}), **updated_record["fields"]},
+            }
 
         # Convertir a response model
         reservation_response = airtable_to_reservation_response(updated_record)
@@ -1025,14 +1116,10 @@ async def update_reservation_status(
     check_permission(user, "reservations.update_status")
 
     try:
-        from src.infrastructure.mcp.airtable_client import airtable_client
+        journal = get_write_journal()
 
-        # Verificar que la reserva existe
-        existing_record = await airtable_client.get_record(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            record_id=reservation_id,
-        )
+        # Verificar que la reserva existe (incluye reservas aún sin aplicar en Airtable)
+        existing_record = await journal.get_record(RESERVATIONS_TABLE_NAME, reservation_id)
 
         if not existing_record:
             raise HTTPException(
@@ -1046,12 +1133,9 @@ async def update_reservation_status(
         if request.notes:
             update_fields[AIRTABLE_FIELD_MAP["notas"]] = request.notes
 
-        # Actualizar en Airtable
-        updated_record = await airtable_client.update_record(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            record_id=reservation_id,
-            fields=update_fields,
+        # Actualizar vía diario (el read model se actualiza al aplicarse)
+        updated_record = await journal.update(
+            RESERVATIONS_TABLE_NAME, reservation_id, update_fields
         )
 
         if not updated_record:
@@ -1078,6 +1162,7 @@ async def update_reservation_status(
             "message": "Status updated successfully",
             "reservation_id": reservation_id,
             "status": request.status,
+            "pending_sync": bool(updated_record.get("pending_sync")),
         }
 
     except HTTPException:
@@ -1112,18 +1197,17 @@ async def create_reservation(
     check_permission(user, "reservations.create")
 
     try:
-        from src.infrastructure.mcp.airtable_client import airtable_client
-
         # Convertir request a fields de Airtable
         airtable_fields = reservation_request_to_airtable_fields(
             reservation.model_dump()
         )
 
-        # Crear record en Airtable
-        created_record = await airtable_client.create_record(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            fields=airtable_fields,
+        # Crear vía diario: si Airtable no responde a tiempo se devuelve un ID
+        # provisional y la reserva se aplica en segundo plano
+        created_record = await get_write_journal().create(
+            RESERVATIONS_TABLE_NAME,
+            airtable_fields,
+            match_fields=RESERVATION_MATCH_FIELDS,
         )
 
         if not created_record:
@@ -1180,14 +1264,10 @@ async def cancel_reservation(
     check_permission(user, "reservations.cancel")
 
     try:
-        from src.infrastructure.mcp.airtable_client import airtable_client
+        journal = get_write_journal()
 
-        # 1. Verificar que la reserva existe
-        existing_record = await airtable_client.get_record(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            record_id=reservation_id,
-        )
+        # 1. Verificar que la reserva existe (incluye reservas aún sin aplicar en Airtable)
+        existing_record = await journal.get_record(RESERVATIONS_TABLE_NAME, reservation_id)
 
         if not existing_record:
             raise HTTPException(
@@ -1198,7 +1278,8 @@ async def cancel_reservation(
         existing_fields = existing_record.get("fields", {})
 
         # 2. Verificar que la reserva no esté ya cancelada o completada
-        current_estado = existing_fields.get(AIRTABLE_FIELD_MAP["estado"], "")
+        # (sin Estado en el registro no hay valor esperado que comprobar)
+        current_estado = existing_fields.get(AIRTABLE_FIELD_MAP["estado"])
         if current_estado in ["Cancelada", "Completada"]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -1219,13 +1300,18 @@ async def cancel_reservation(
             motivo_texto = f"\n[CANCELACIÓN] {request.motivo}"
             update_fields[AIRTABLE_FIELD_MAP["notas"]] = notas_actuales + motivo_texto
 
-        # 4. Actualizar en Airtable
-        updated_record = await airtable_client.update_record(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            record_id=reservation_id,
-            fields=update_fields,
+        # 4. Actualizar vía diario (conflicto si el estado cambió entretanto)
+        updated_record = await journal.cancel(
+            RESERVATIONS_TABLE_NAME,
+            reservation_id,
+            update_fields,
+            current_estado=current_estado,
         )
+        if updated_record is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Reservation {reservation_id} changed while cancelling",
+            )
 
         # 5. Obtener datos del cliente para notificación
         cliente_telefono = existing_fields.get(AIRTABLE_FIELD_MAP["telefono"], "")
@@ -1237,7 +1323,7 @@ async def cancel_reservation(
         sms_sent = False
         if request.notificar_cliente and cliente_telefono:
             try:
-                from src.infrastructure.services.twilio_service import twilio_service
+                from src.infrastructure.outbox import get_outbox
                 from src.infrastructure.templates.content_sids import RESERVA_CANCELADA_NUBES_SID
 
                 # Enviar notificación de cancelación usando plantilla Content API
@@ -1247,14 +1333,15 @@ async def cancel_reservation(
                     "3": hora_reserva
                 }
 
-                await twilio_service.send_whatsapp_template(
-                    to_number=cliente_telefono,
+                await get_outbox().enqueue_whatsapp(
+                    to=cliente_telefono,
                     template_sid=RESERVA_CANCELADA_NUBES_SID,
-                    variables=variables
+                    variables=variables,
+                    dedupe_key=f"cancelacion:{reservation_id}",
                 )
                 sms_sent = True
                 logger.info(
-                    f"WhatsApp sent to {cliente_telefono} for cancellation {reservation_id}"
+                    f"WhatsApp queued for {cliente_telefono} for cancellation {reservation_id}"
                 )
             except Exception as e:
                 logger.error(f"Error sending WhatsApp notification: {e}", exc_info=True)
@@ -1308,6 +1395,7 @@ async def cancel_reservation(
             > 0,
             "notificacion_enviada": sms_sent,
             "motivo": request.motivo,
+            "pending_sync": bool(updated_record.get("pending_sync")),
         }
 
     except HTTPException:
@@ -1329,7 +1417,10 @@ async def cancel_reservation(
 
 @router.get("/tables", response_model=List[TableResponse])
 async def get_tables(
-    zona: Optional[str] = None, user: TokenData = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    zona: Optional[str] = None,
+    user: TokenData = Depends(get_current_user),
 ):
     """
     Lista todas las mesas del restaurante con su estado actual.
@@ -1341,6 +1432,9 @@ async def get_tables(
         Lista de mesas con su configuración y estado actual
     """
     check_permission(user, "tables.view")
+    not_modified = conditional_get(request, response, user, "mesas")
+    if not_modified:
+        return not_modified
 
     try:
         from src.infrastructure.repositories.table_repository import table_repository
@@ -1705,10 +1799,17 @@ async def update_table_status(
 
 @router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
-    target_date: Optional[date] = None, user: TokenData = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    target_date: Optional[date] = None,
+    user: TokenData = Depends(get_current_user),
 ):
     """
-    Estadísticas del día para dashboard con cálculos reales desde Airtable.
+    Estadísticas del día para dashboard.
+
+    Con la réplica fresca salen de la caché por día (Redis si está
+    disponible), que se invalida con cada cambio de Reservas o Mesas; si
+    no, se calculan en una pasada desde Airtable.
 
     Args:
         target_date: Fecha para calcular stats (default: hoy)
@@ -1717,6 +1818,9 @@ async def get_dashboard_stats(
         DashboardStats con estadísticas calculadas en tiempo real
     """
     check_permission(user, "reports.view")
+    not_modified = conditional_get(request, response, user, "reservas", "mesas")
+    if not_modified:
+        return not_modified
 
     from datetime import date as today_date
     from src.infrastructure.mcp.airtable_client import airtable_client
@@ -1726,81 +1830,33 @@ async def get_dashboard_stats(
         target_date = today_date.today()
 
     try:
-        # 1. Obtener reservas del día
-        filter_formula = (
-            f"{{{AIRTABLE_FIELD_MAP['fecha']}}} = '{target_date.isoformat()}'"
-        )
-
-        reservations_response = await airtable_client.list_records(
-            base_id=AIRTABLE_BASE_ID,
-            table_name=RESERVATIONS_TABLE_NAME,
-            filterByFormula=filter_formula,
-            max_records=500,
-        )
-
-        reservations = reservations_response.get("records", [])
-
-        # 2. Calcular estadísticas
-        total_reservations = len(reservations)
-
-        # Contadores por estado
-        confirmed = 0
-        pending = 0
-        seated = 0
-        cancelled = 0
-        pax_total = 0
-
-        for record in reservations:
-            fields = record.get("fields", {})
-            estado = fields.get(AIRTABLE_FIELD_MAP["estado"], "")
-            pax = fields.get(AIRTABLE_FIELD_MAP["pax"], 0) or 0
-
-            pax_total += pax
-
-            if estado == "Confirmada":
-                confirmed += 1
-            elif estado == "Pendiente":
-                pending += 1
-            elif estado in ["Sentada", "Completada"]:
-                seated += 1
-            elif estado == "Cancelada":
-                cancelled += 1
-
-        # 3. Calcular tasa de ocupación
-        # Capacidad total del restaurante: 123 pax (55 Interior + 68 Terraza)
-        # Considerando 2 turnos por servicio: ~246 pax/día máximo
-        CAPACIDAD_TOTAL_DIA = 246
-
-        # Ocupación basada en pax confirmados + sentados
-        pax_activos = 0
-        for record in reservations:
-            fields = record.get("fields", {})
-            estado = fields.get(AIRTABLE_FIELD_MAP["estado"], "")
-            pax = fields.get(AIRTABLE_FIELD_MAP["pax"], 0) or 0
-            if estado in ["Confirmada", "Sentada"]:
-                pax_activos += pax
-
-        occupancy_rate = (
-            round((pax_activos / CAPACIDAD_TOTAL_DIA) * 100, 1)
-            if CAPACIDAD_TOTAL_DIA > 0
-            else 0.0
-        )
+        # 1. Estadísticas materializadas (caché por día invalidada por cambios)
+        stats = await asyncio.to_thread(get_dashboard_stats_materializer().get, target_date)
+        if stats is not None:
+            return DashboardStats(**stats)
+
+        # 2. Réplica desfasada: calcular en una pasada desde Airtable
+        reservations = await _day_reservations(target_date)
+        counters = day_stats(reservations)
+
+        # 3. Tasa de ocupación: plaza-franjas ocupadas sobre la capacidad de
+        # Mesas en horario de apertura (rejilla de ocupación por franjas)
+        occupancy_engine = get_occupancy_engine()
+        if not await asyncio.to_thread(occupancy_engine.ensure_loaded):
+            tables = await load_shared("table_catalog", lambda: load_table_catalog(airtable_client))
+            occupancy_engine = OccupancyEngine.from_records(reservations, tables)
+        utilization = await asyncio.to_thread(
+            occupancy_engine.utilization, target_date, target_date + timedelta(days=1)
+        )
+        occupancy_rate = round(utilization["seat_utilization"], 1)
 
         logger.info(
             f"Dashboard stats calculated for {target_date}: "
-            f"total={total_reservations}, confirmed={confirmed}, pending={pending}, "
-            f"occupancy={occupancy_rate}%"
+            f"total={counters['total_reservations']}, confirmed={counters['confirmed']}, "
+            f"pending={counters['pending']}, occupancy={occupancy_rate}%"
         )
 
-        return DashboardStats(
-            total_reservations=total_reservations,
-            confirmed=confirmed,
-            pending=pending,
-            seated=seated,
-            cancelled=cancelled,
-            occupancy_rate=occupancy_rate,
-            pax_total=pax_total,
-        )
+        return DashboardStats(**counters, occupancy_rate=occupancy_rate)
 
     except Exception as e:
         logger.error(f"Error calculating dashboard stats: {e}", exc_info=True)
@@ -1894,6 +1950,8 @@ def waitlist_entry_to_response(entry: WaitlistEntry) -> WaitlistResponse:
 
 @router.get("/waitlist", response_model=List[WaitlistResponse])
 async def list_waitlist(
+    request: Request,
+    response: Response,
     fecha: Optional[date] = None,
     estado: Optional[str] = None,
     user: TokenData = Depends(get_current_user),
@@ -1908,12 +1966,15 @@ async def list_waitlist(
     Permisos: reservations.view
     """
     check_permission(user, "reservations.view")
+    not_modified = conditional_get(request, response, user, "waitlist")
+    if not_modified:
+        return not_modified
 
     try:
         if estado:
             try:
                 status_filter = WaitlistStatus(estado)
-                entries = await waitlist_service.waitlist_repository.list_by_status(
+                entries = await waitlist_service.waitlist_repo.list_by_status(
                     status=status_filter, fecha=fecha
                 )
             except ValueError:
@@ -1923,7 +1984,7 @@ async def list_waitlist(
                 )
         else:
             # Sin filtro específico, traer todas las WAITING del día (o fecha especificada)
-            entries = await waitlist_service.waitlist_repository.list_by_status(
+            entries = await waitlist_service.waitlist_repo.list_by_status(
                 status=WaitlistStatus.WAITING, fecha=fecha or date.today()
             )
 
@@ -1999,7 +2060,7 @@ async def notify_waitlist_entry(
 
     try:
         # Obtener entrada
-        entry = await waitlist_service.waitlist_repository.get_by_id(entry_id)
+        entry = await waitlist_service.waitlist_repo.get_by_id(entry_id)
         if not entry:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2051,7 +2112,7 @@ async def delete_waitlist_entry(
 
     try:
         # Primero verificar que existe
-        entry = await waitlist_service.waitlist_repository.get_by_id(entry_id)
+        entry = await waitlist_service.waitlist_repo.get_by_id(entry_id)
         if not entry:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -2073,3 +2134,183 @@ async def delete_waitlist_entry(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting waitlist entry: {str(e)}",
         )
+
+
+# ============ SYNC ENDPOINTS ============
+
+# Tabla del read model → colección de la respuesta y permiso para verla
+SYNC_COLLECTIONS = {
+    "reservas": ("reservations", "reservations.view"),
+    "mesas": ("tables", "tables.view"),
+    "waitlist": ("waitlist", "reservations.view"),
+}
+MAX_SYNC_CHANGES = 1000
+
+
+def _sync_payload(name: str, record: dict) -> dict:
+    """Registro de la réplica con la misma forma que su listado."""
+    if name == "reservas":
+        return airtable_to_reservation_response(record)
+    if name == "mesas":
+        from src.infrastructure.repositories.table_repository import table_repository
+
+        # Table usa use_enum_values: zona y status ya son strings
+        table = table_repository.airtable_to_table(record)
+        return {
+            "id": table.id,
+            "nombre": table.nombre,
+            "zona": table.zona,
+            "capacidad_min": table.capacidad_min,
+            "capacidad_max": table.capacidad_max,
+            "ampliable": table.ampliable,
+            "auxiliar_requerida": table.auxiliar_requerida,
+            "capacidad_ampliada": table.capacidad_ampliada,
+            "notas": table.notas,
+            "requiere_aviso": table.requiere_aviso,
+            "prioridad": table.prioridad,
+            "status": table.status,
+        }
+    return waitlist_entry_to_response(
+        waitlist_service.waitlist_repo.from_airtable_record(record)
+    )
+
+
+def _sync_key(name: str, record: dict) -> str:
+    """ID con el que la app conoce el registro (las mesas usan 'ID Mesa')."""
+    if name == "mesas":
+        return record.get("fields", {}).get("ID Mesa") or record["id"]
+    return record["id"]
+
+
+@router.get("/sync")
+async def sync_changes(
+    since: Optional[str] = None,
+    limit: int = 500,
+    user: TokenData = Depends(get_current_user),
+):
+    """
+    Sincronización delta: reservas, mesas y entradas de la lista de espera
+    creadas, modificadas o borradas desde `since`.
+
+    Sale del registro de cambios del read model, que alimentan todas las
+    escrituras, el polling, la reconciliación y los webhooks de Airtable.
+    Sin `since` devuelve todos los registros (arranque en frío). Si
+    `has_more` es true, repetir con el nuevo `token` hasta agotarlo.
+
+    Respuestas de error:
+        400: token mal formado
+        410: token caducado (otra réplica o anterior a la retención de
+            tombstones): volver a pedir sin `since`
+        503: réplica no disponible: usar los listados completos
+
+    Permisos: reservations.view (reservas y lista de espera), tables.view (mesas)
+    """
+    names = [
+        name
+        for name, (_, permission) in SYNC_COLLECTIONS.items()
+        if auth_service.verify_role_permission(user.rol, permission)
+    ]
+    if not names:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permission denied: reservations.view",
+        )
+    limit = max(1, min(limit, MAX_SYNC_CHANGES))
+
+    try:
+        position = decode_sync_token(since) if since else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        delta = await asyncio.to_thread(get_read_model().changes, position, names, limit)
+    except ChangeLogExpired as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    if delta is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sincronización delta no disponible: usar los listados completos",
+        )
+
+    response = {collection: [] for collection, _ in SYNC_COLLECTIONS.values()}
+    response["deleted"] = {collection: [] for collection, _ in SYNC_COLLECTIONS.values()}
+    for change in delta["changes"]:
+        collection = SYNC_COLLECTIONS[change["table"]][0]
+        record = change["record"]
+        if change["deleted"]:
+            response["deleted"][collection].append(_sync_key(change["table"], record))
+            continue
+        try:
+            response[collection].append(_sync_payload(change["table"], record))
+        except Exception as e:
+            logger.warning(f"Sync: registro {record.get('id')} de {change['table']} no convertible: {e}")
+
+    logger.info(
+        f"Sync for {user.usuario}: {len(delta['changes'])} changes "
+        f"({'delta' if position else 'full'}, has_more={delta['has_more']})"
+    )
+    return {
+        **response,
+        "token": encode_sync_token(delta["epoch"], delta["position"]),
+        "has_more": delta["has_more"],
+        "full": position is None,
+    }
+
+
+# ============ BATCH ENDPOINT ============
+
+# Sub-peticiones admitidas en /batch (solo lecturas)
+BATCH_ENDPOINTS = {
+    "/auth/yo": get_current_user_profile,
+    "/dashboard/stats": get_dashboard_stats,
+    "/reservations": get_reservations,
+    "/tables": get_tables,
+    "/waitlist": list_waitlist,
+    "/cocina/pedidos": get_cocina_pedidos,
+    "/sync": sync_changes,
+}
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch(
+    request: Request,
+    body: BatchRequest,
+    user: TokenData = Depends(get_current_user),
+):
+    """
+    Ejecuta varias lecturas en una sola llamada (arranque de la app).
+
+    El JWT se valida una vez; las sub-peticiones corren en paralelo y
+    comparten las cargas comunes (reservas del día, catálogo de mesas).
+    Cada una devuelve su propio status, cuerpo y ETag, igual que por
+    separado: un 403 o 500 en una no afecta a las demás.
+
+    Rutas admitidas: /auth/yo, /dashboard/stats, /reservations, /tables,
+    /waitlist, /cocina/pedidos, /sync
+    """
+    unknown = [item.path for item in body.requests if item.path not in BATCH_ENDPOINTS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Rutas no admitidas en batch: {', '.join(unknown)}",
+        )
+
+    with shared_loads():
+        responses = await asyncio.gather(
+            *(
+                run_sub_request(
+                    BATCH_ENDPOINTS[item.path],
+                    request,
+                    user,
+                    item,
+                    f"{router.prefix}{item.path}",
+                )
+                for item in body.requests
+            )
+        )
+
+    logger.info(
+        f"Batch for {user.usuario}: {len(responses)} requests "
+        f"({sum(1 for r in responses if r.status == 304)} not modified)"
+    )
+    return BatchResponse(responses=list(responses))
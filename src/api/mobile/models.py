@@ -3,7 +3,7 @@ Pydantic models para API móvil.
 Request/Response models para endpoints CRUD.
 """
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import date, time, datetime
 from src.core.entities.booking import BookingStatus, ZonePreference, BookingChannel, SpecialRequest
 
@@ -161,10 +161,11 @@ class PaginatedReservationsResponse(BaseModel):
     """Response paginado para lista de reservas."""
 
     reservations: List[ReservationResponse]
-    total: int
+    total: Optional[int] = None  # Solo con include_total y read model disponible
     offset: int
     limit: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pasar como ?cursor= para la página siguiente
 
     class Config:
         json_schema_extra = {
@@ -173,7 +174,8 @@ class PaginatedReservationsResponse(BaseModel):
                 "total": 150,
                 "offset": 0,
                 "limit": 20,
-                "has_more": True
+                "has_more": True,
+                "next_cursor": "eyJzIjoicm0iLCJwIjpbIjIwMjYtMDUtMDQiLCJyZWNBQkMiXSwiZiI6IjEyMyJ9"
             }
         }
 
@@ -279,3 +281,48 @@ class TableResponse(BaseModel):
                 "status": "Libre"
             }
         }
+
+
+# ============ BATCH MODELS ============
+
+class BatchSubRequest(BaseModel):
+    """Una petición GET dentro de /batch."""
+
+    id: Optional[str] = Field(None, max_length=50, description="Identificador del cliente para casar la respuesta")
+    path: str = Field(..., description="Ruta relativa a /api/mobile, ej. '/dashboard/stats'")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Query params de la petición")
+    if_none_match: Optional[str] = Field(None, description="ETag de la respuesta anterior")
+
+
+class BatchRequest(BaseModel):
+    """Request de /batch: sub-peticiones que se ejecutan en paralelo."""
+
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=10)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {"id": "perfil", "path": "/auth/yo"},
+                    {"id": "stats", "path": "/dashboard/stats"},
+                    {"id": "hoy", "path": "/reservations", "params": {"fecha": "2026-02-11", "limit": 50}},
+                    {"id": "cocina", "path": "/cocina/pedidos", "if_none_match": "\"3f2a9c0d1e7b4a6c5d8e\""},
+                ]
+            }
+        }
+
+
+class BatchSubResponse(BaseModel):
+    """Resultado de una sub-petición (status y cuerpo como si fuera independiente)."""
+
+    id: Optional[str] = None
+    path: str
+    status: int
+    body: Any = None  # None en 304
+    etag: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Respuestas en el mismo orden que las sub-peticiones."""
+
+    responses: List[BatchSubResponse]
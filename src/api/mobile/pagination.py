@@ -0,0 +1,77 @@
+"""
+Cursores opacos para la paginación de listados de la API móvil.
+
+Un cursor codifica dónde sigue el listado y de qué fuente viene:
+
+- "rm": keyset (valor de ordenación, record_id) sobre los índices del read
+  model local
+- "at": token `offset` de Airtable
+
+y va ligado a los filtros de la consulta: reutilizarlo con otros filtros es
+un error del cliente (400), no una página incorrecta.
+
+Los tokens de /sync codifican (época, secuencia) del registro de cambios
+del read model.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+SOURCE_READ_MODEL = "rm"
+SOURCE_AIRTABLE = "at"
+
+
+class InvalidCursorError(ValueError):
+    """Cursor mal formado o de otra consulta."""
+
+
+def filters_fingerprint(**filters: Any) -> str:
+    """Huella corta de los filtros de un listado."""
+    canonical = json.dumps(
+        {key: str(value) for key, value in filters.items() if value is not None},
+        sort_keys=True,
+    )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(source: str, position: Any, fingerprint: str) -> str:
+    payload = json.dumps({"s": source, "p": position, "f": fingerprint}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> Dict[str, Any]:
+    """{"s": fuente, "p": posición} de un cursor emitido para estos filtros."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        source, position = payload["s"], payload["p"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Cursor inválido")
+    if source not in (SOURCE_READ_MODEL, SOURCE_AIRTABLE):
+        raise InvalidCursorError("Cursor inválido")
+    if payload.get("f") != fingerprint:
+        raise InvalidCursorError("El cursor pertenece a otra consulta (filtros distintos)")
+    return {"s": source, "p": position}
+
+
+def next_cursor(source: str, position: Optional[Any], fingerprint: str) -> Optional[str]:
+    """Cursor de la siguiente página (None si no hay más)."""
+    return encode_cursor(source, position, fingerprint) if position is not None else None
+
+
+def encode_sync_token(epoch: str, position: int) -> str:
+    payload = json.dumps({"e": epoch, "q": position}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token: str) -> Tuple[str, int]:
+    """(época, secuencia) de un token de /sync."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        epoch, position = str(payload["e"]), int(payload["q"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Token de sincronización inválido")
+    return epoch, position
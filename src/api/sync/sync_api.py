@@ -10,6 +10,7 @@ import hmac
 import hashlib
 
 from src.services.sync_service import get_sync_service, SupabaseAirtableSync
+from src.infrastructure.read_model import get_read_model
 from src.api.mobile.mobile_api import get_current_user, TokenData
 from src.core.config import settings
 
@@ -84,7 +85,9 @@ async def run_sync(
                     detail=f"Table {request.table} not configured for sync"
                 )
             
-            result = await get_sync_service().sync_table(config, request.full_sync)
+            result = await get_sync_service().run_table(config, request.full_sync)
+            if result.get("status") == "error":
+                raise RuntimeError(result.get("error"))
             results = {request.table: result}
         else:
             # Sincronizar todas
@@ -139,7 +142,9 @@ async def get_sync_status(
             }
             for c in get_sync_service().sync_configs
         ],
-        "last_syncs": get_sync_service().get_sync_history()[-5:]
+        "tables": get_sync_service().get_progress(),
+        "last_syncs": get_sync_service().get_sync_history()[-5:],
+        "checkpoints": await get_sync_service().checkpoints.get_status()
     }
 
 
@@ -184,12 +189,11 @@ async def airtable_webhook(
         )
         
         if config:
-            # Sincronizar tabla específica
-            background_tasks.add_task(
-                get_sync_service().sync_table,
-                config,
-                full_sync=False
-            )
+            # Las ráfagas de webhooks se agrupan en una sync incremental por tabla
+            get_sync_service().request_incremental_sync(config, changed_records)
+
+        # Réplica local de lectura: refrescar solo los registros notificados
+        get_read_model().notify_changed(table_id, changed_records)
         
         return {"status": "received"}
         
@@ -28,6 +28,11 @@ from cachetools import TTLCache
 from src.application.orchestrator import Orchestrator
 from src.infrastructure.services.whatsapp_service import WhatsAppService
 from src.api.middleware.rate_limiting import webhook_limit
+from src.infrastructure.inbound import (
+    InboundMessage,
+    async_ingestion_enabled,
+    get_inbound_queue,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/twilio", tags=["twilio"])
@@ -74,6 +79,11 @@ def _update_session(phone: str, intent: str, context_update: Dict[str, Any] = No
         session["booking_context"].update(context_update)
 
 
+# ACK inmediato: Twilio no envía nada; la respuesta va por la REST API
+EMPTY_TWIML = """<?xml version="1.0" encoding="UTF-8"?>
+<Response></Response>"""
+
+
 def _generate_twiml(message: str) -> str:
     """Genera respuesta TwiML para enviar mensaje de vuelta.
 
@@ -87,6 +97,42 @@ def _generate_twiml(message: str) -> str:
 </Response>"""
 
 
+async def _process_message(from_number: str, body: str, message_sid: str) -> str:
+    """Pasa el mensaje por el Orchestrator y actualiza la sesión. Devuelve la respuesta."""
+    # Obtener contexto de sesión
+    session = _get_session(from_number)
+
+    # === PASAR POR ORCHESTRATOR (Router → Logic → Human) ===
+    # El Orchestrator clasifica la intención y genera respuesta natural
+
+    result = await orchestrator.process_message(
+        message=body,
+        metadata={
+            "client_phone": from_number,
+            "channel": "whatsapp",
+            "session": session,
+            "message_sid": message_sid,
+        },
+    )
+
+    intent = result.get("intent", "other")
+    response_text = result.get("response", "")
+
+    # Actualizar sesión
+    _update_session(from_number, intent, {"last_response": response_text})
+
+    logger.info(f"✅ Intención: {intent} | Respuesta: {response_text[:50]}...")
+    return response_text
+
+
+async def _process_inbound(msg: InboundMessage) -> str:
+    """Consumidor de la cola de entrada (modo async)."""
+    return await _process_message(msg.phone, msg.body, msg.message_sid)
+
+
+get_inbound_queue().register_handler("twilio", _process_inbound)
+
+
 @router.post("/whatsapp/incoming")
 @webhook_limit()
 async def handle_incoming_whatsapp(request: Request):
@@ -99,6 +145,10 @@ async def handle_incoming_whatsapp(request: Request):
     3. Pasar por Orchestrator (Router → Logic → Human)
     4. Responder con mensaje natural de Alba
 
+    En modo async (WHATSAPP_INGESTION_MODE=async) los pasos 2-4 los hace la
+    cola de entrada: aquí solo se persiste el mensaje y se responde a Twilio
+    con un TwiML vacío; la respuesta sale después por la REST API.
+
     Twilio envía:
     - From: whatsapp:+34666123456
     - To: whatsapp:+14155238886 (tu número Twilio)
@@ -125,29 +175,15 @@ async def handle_incoming_whatsapp(request: Request):
                 media_type="application/xml",
             )
 
-        # Obtener contexto de sesión
-        session = _get_session(from_number)
-
-        # === PASAR POR ORCHESTRATOR (Router → Logic → Human) ===
-        # El Orchestrator clasifica la intención y genera respuesta natural
-
-        result = await orchestrator.process_message(
-            message=body,
-            metadata={
-                "client_phone": from_number,
-                "channel": "whatsapp",
-                "session": session,
-                "message_sid": message_sid,
-            },
-        )
-
-        intent = result.get("intent", "other")
-        response_text = result.get("response", "")
-
-        # Actualizar sesión
-        _update_session(from_number, intent, {"last_response": response_text})
+        inbound_queue = get_inbound_queue()
+        if async_ingestion_enabled() and inbound_queue.running:
+            msg = InboundMessage(phone=from_number, body=body, source="twilio")
+            if message_sid:
+                msg.message_sid = message_sid
+            await inbound_queue.submit(msg)
+            return Response(content=EMPTY_TWIML, media_type="application/xml")
 
-        logger.info(f"✅ Intención: {intent} | Respuesta: {response_text[:50]}...")
+        response_text = await _process_message(from_number, body, message_sid)
 
         # Generar respuesta TwiML
         twiml_response = _generate_twiml(response_text)
@@ -10,6 +10,7 @@ from src.infrastructure.repositories.mock_reservation_repository import (
 )
 from src.infrastructure.external.twilio_service import TwilioService
 from src.infrastructure.external.airtable_service import AirtableService
+from src.infrastructure.outbox import get_outbox
 from src.core.entities.booking import (
     Booking,
 )  # FIXED: era src.domain.models.reservation
@@ -754,12 +755,13 @@ async def tool_update_reservation(request: Request):
                 "4": hora_formateada
             }
             
-            await twilio_service.send_whatsapp_template(
-                to_number=phone,
+            await get_outbox().enqueue_whatsapp(
+                to=phone,
                 template_sid=RESERVA_CONFIRMACION_NUBES_SID,
-                variables=variables
+                variables=variables,
+                dedupe_key=f"modificacion:{reservation_id}:{fecha_formateada}:{hora_formateada}",
             )
-            logger.info(f"WhatsApp modificación enviado a {phone} usando plantilla")
+            logger.info(f"WhatsApp modificación encolado para {phone} usando plantilla")
         except Exception as e:
             logger.error(f"Error sending WhatsApp confirmation: {e}")
 
@@ -927,12 +929,13 @@ async def tool_cancel_reservation(request: Request):
                 "3": hora
             }
             
-            await twilio_service.send_whatsapp_template(
-                to_number=telefono,
+            await get_outbox().enqueue_whatsapp(
+                to=telefono,
                 template_sid=RESERVA_CANCELADA_NUBES_SID,
-                variables=variables
+                variables=variables,
+                dedupe_key=f"cancelacion:{reservation_id}",
             )
-            logger.info(f"WhatsApp cancelación enviado a {telefono} usando plantilla")
+            logger.info(f"WhatsApp cancelación encolado para {telefono} usando plantilla")
         except Exception as e:
             logger.error(f"Error sending WhatsApp cancellation: {e}")
 
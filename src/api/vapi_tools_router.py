@@ -785,29 +785,23 @@ async def tool_create_reservation(request: Request):
                 logger.info(f"Reserva {reservation_id}: Enviando WhatsApp de confirmación (teléfono móvil)")
                 
                 # Enviar WhatsApp de confirmación usando la nueva plantilla Content API
-                # OPT-3: WhatsApp send as fire-and-forget background task
-                async def _send_whatsapp_bg():
-                    try:
-                        from src.infrastructure.external.twilio_service import TwilioService
-                        from src.infrastructure.templates.content_sids import RESERVA_CONFIRMACION_NUBES_SID
-
-                        twilio = TwilioService()
-                        content_variables = {
+                # Se encola en el outbox: la entrega (y sus reintentos) ocurre fuera de la llamada
+                try:
+                    from src.infrastructure.outbox import get_outbox
+                    from src.infrastructure.templates.content_sids import RESERVA_CONFIRMACION_NUBES_SID
+
+                    await get_outbox().enqueue_whatsapp(
+                        to=telefono,
+                        template_sid=RESERVA_CONFIRMACION_NUBES_SID,
+                        variables={
                             "1": nombre,
                             "2": fecha_formateada,
                             "3": hora_str
-                        }
-
-                        sid = twilio.send_whatsapp_template(
-                            to_number=telefono,
-                            template_sid=RESERVA_CONFIRMACION_NUBES_SID,
-                            variables=content_variables
-                        )
-                        logger.info(f"WhatsApp Template enviado con SID: {sid}")
-                    except Exception as e:
-                        logger.error(f"Error enviando WhatsApp Template: {e}")
-
-                asyncio.create_task(_send_whatsapp_bg())
+                        },
+                        dedupe_key=f"confirmacion:{reservation_id}",
+                    )
+                except Exception as e:
+                    logger.error(f"Error encolando WhatsApp Template: {e}")
                 
                 return {
                     "results": [
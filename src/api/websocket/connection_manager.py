@@ -45,7 +45,7 @@ class ConnectionManager:
         
         if role in ["waiter", "camarero"]:
             self.rooms["reservations"].add(websocket)
-        elif role in ["cook", "cocinero"]:
+        elif role in ["cook", "cocinero", "cocina"]:
             self.rooms["kitchen"].add(websocket)
         elif role in ["manager", "encargada", "admin"]:
             self.rooms["reservations"].add(websocket)
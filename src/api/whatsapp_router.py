@@ -6,6 +6,11 @@ from fastapi import APIRouter, Request, Form
 from fastapi.responses import Response
 
 from src.application.orchestrator import Orchestrator
+from src.infrastructure.inbound import (
+    InboundMessage,
+    async_ingestion_enabled,
+    get_inbound_queue,
+)
 # from src.api.middleware.rate_limiting import webhook_limit  # TODO: Re-enable after fixing slowapi
 
 router = APIRouter(prefix="/whatsapp", tags=["WhatsApp"])
@@ -22,6 +27,71 @@ def get_orchestrator():
     return _orchestrator
 
 
+async def _process_message(phone: str, message: str, name: str) -> str:
+    """Procesa un mensaje entrante y devuelve el texto de respuesta."""
+    # --- Lógica de Confirmación Bidireccional SÍ/NO ---
+    msg_upper = message.upper()
+    if msg_upper in ["SÍ", "SI", "NO"]:
+        try:
+            from src.infrastructure.external.airtable_service import AirtableService
+            airtable_service = AirtableService()
+            
+            # Fetch recent reservations for this phone
+            lista_reservas = await airtable_service.get_records_by_formula(
+                formula=f"{{Teléfono}} = '{phone}'",
+                table_name="Reservas",
+                sort=["-createdTime"]
+            )
+            
+            if lista_reservas:
+                # Buscar la más reciente que esté Pendiente
+                pendientes = [r for r in lista_reservas if r.get("fields", {}).get("Estado de Reserva") == "Pendiente"]
+                if pendientes:
+                    reserva = pendientes[0]  # La primera al estar ordenado descendente
+                    reserva_id = reserva.get("id")
+                    
+                    nuevo_estado = "Confirmada" if msg_upper in ["SÍ", "SI"] else "Cancelada"
+                    
+                    await airtable_service.update_record(
+                        record_id=reserva_id,
+                        fields={"Estado de Reserva": nuevo_estado},
+                        table_name="Reservas"
+                    )
+                    
+                    logger.info(f"Reserva {reserva_id} actualizada a {nuevo_estado} vía WhatsApp interactivo.")
+                    
+                    return (
+                        "¡Genial! Hemos confirmado tu reserva. ¡Nos vemos pronto en En Las Nubes!" 
+                        if nuevo_estado == "Confirmada" 
+                        else "Entendido, hemos cancelado tu reserva. ¡Esperamos verte en otra ocasión!"
+                    )
+        except Exception as e:
+            logger.error(f"Error procesando confirmación rápida: {e}")
+
+    # Process through orchestrator
+    orchestrator = get_orchestrator()
+    result = await orchestrator.process_message(
+        message,
+        metadata={
+            "client_phone": phone,
+            "client_name": name,
+            "channel": "whatsapp",
+        },
+    )
+
+    return result.get(
+        "response", "Lo siento, no he podido procesar tu mensaje."
+    )
+
+
+async def _process_inbound(msg: InboundMessage) -> str:
+    """Consumidor de la cola de entrada (modo async)."""
+    return await _process_message(msg.phone, msg.body, msg.profile_name or "Cliente")
+
+
+get_inbound_queue().register_handler("whatsapp", _process_inbound)
+
+
 @router.post("/webhook")
 # @webhook_limit()  # TODO: Re-enable after fixing slowapi integration
 async def whatsapp_webhook(
@@ -29,10 +99,14 @@ async def whatsapp_webhook(
     From: str = Form(...),
     Body: str = Form(...),
     ProfileName: str = Form(None),
+    MessageSid: str = Form(None),
 ):
     """
     Twilio WhatsApp webhook endpoint.
     Receives messages and responds via TwiML.
+
+    In async ingestion mode the message is persisted and acknowledged with an
+    empty TwiML; the inbound queue replies later through the REST API.
     """
     try:
         # Clean phone number (remove 'whatsapp:' prefix)
@@ -42,65 +116,20 @@ async def whatsapp_webhook(
 
         logger.info(f"💬 WhatsApp from {name} ({phone}): {message}")
 
-        # --- Lógica de Confirmación Bidireccional SÍ/NO ---
-        msg_upper = message.upper()
-        if msg_upper in ["SÍ", "SI", "NO"]:
-            try:
-                from src.infrastructure.external.airtable_service import AirtableService
-                airtable_service = AirtableService()
-                
-                # Fetch recent reservations for this phone
-                lista_reservas = await airtable_service.get_records_by_formula(
-                    formula=f"{{Teléfono}} = '{phone}'",
-                    table_name="Reservas",
-                    sort=["-createdTime"]
-                )
-                
-                if lista_reservas:
-                    # Buscar la más reciente que esté Pendiente
-                    pendientes = [r for r in lista_reservas if r.get("fields", {}).get("Estado de Reserva") == "Pendiente"]
-                    if pendientes:
-                        reserva = pendientes[0]  # La primera al estar ordenado descendente
-                        reserva_id = reserva.get("id")
-                        
-                        nuevo_estado = "Confirmada" if msg_upper in ["SÍ", "SI"] else "Cancelada"
-                        
-                        await airtable_service.update_record(
-                            record_id=reserva_id,
-                            fields={"Estado de Reserva": nuevo_estado},
-                            table_name="Reservas"
-                        )
-                        
-                        logger.info(f"Reserva {reserva_id} actualizada a {nuevo_estado} vía WhatsApp interactivo.")
-                        
-                        resp_text = (
-                            "¡Genial! Hemos confirmado tu reserva. ¡Nos vemos pronto en En Las Nubes!" 
-                            if nuevo_estado == "Confirmada" 
-                            else "Entendido, hemos cancelado tu reserva. ¡Esperamos verte en otra ocasión!"
-                        )
-                        
-                        twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Message>{resp_text}</Message>
-</Response>"""
-                        return Response(content=twiml, media_type="application/xml")
-            except Exception as e:
-                logger.error(f"Error procesando confirmación rápida: {e}")
-
-        # Process through orchestrator
-        orchestrator = get_orchestrator()
-        result = await orchestrator.process_message(
-            message,
-            metadata={
-                "client_phone": phone,
-                "client_name": name,
-                "channel": "whatsapp",
-            },
-        )
-
-        response_text = result.get(
-            "response", "Lo siento, no he podido procesar tu mensaje."
-        )
+        inbound_queue = get_inbound_queue()
+        if message and async_ingestion_enabled() and inbound_queue.running:
+            msg = InboundMessage(
+                phone=phone, body=message, source="whatsapp", profile_name=name
+            )
+            if MessageSid:
+                msg.message_sid = MessageSid
+            await inbound_queue.submit(msg)
+            return Response(
+                content='<?xml version="1.0" encoding="UTF-8"?>\n<Response></Response>',
+                media_type="application/xml",
+            )
+
+        response_text = await _process_message(phone, message, name)
 
         # Return TwiML response
         twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
@@ -127,8 +127,11 @@ class Orchestrator:
             if logic_result.get("booking_created"):
                 booking_obj = logic_result.get("booking_obj")
                 if booking_obj:
-                    # Fire and forget (or log result)
-                    self.whatsapp.send_premium_confirmation(booking_obj)
+                    # Se encola en el outbox; la entrega y reintentos van en background
+                    try:
+                        await self.whatsapp.queue_premium_confirmation(booking_obj)
+                    except Exception as e:
+                        logger.error(f"[ORCHESTRATOR] Error encolando WhatsApp: {e}")
 
             # Generate human response based on result
             if logic_result.get("available"):
@@ -19,7 +19,9 @@ Tablas:
 from typing import List, Optional
 from datetime import datetime
 from pyairtable import Api
+from src.core.config.airtable_fields import CLIENTE_LIST_FIELDS
 from src.core.entities.cliente import Cliente, ClientePreferencia, ClienteNota
+from src.infrastructure.read_model import get_read_model
 import os
 
 
@@ -117,7 +119,9 @@ class ClienteService:
             >>> for c in clientes:
             ...     print(f"{c.nombre}: {len(c.preferencias)} preferencias")
         """
-        records = self.table_clientes.all()
+        records = get_read_model().read("clientes")
+        if records is None:
+            records = self.table_clientes.all(fields=CLIENTE_LIST_FIELDS)
         
         clientes = []
         for record in records:
@@ -134,12 +138,16 @@ class ClienteService:
         
         return clientes
     
-    async def get_by_phone(self, telefono: str, include_relations: bool = True) -> Optional[Cliente]:
+    async def get_by_phone(
+        self, telefono: str, include_relations: bool = True, from_replica: bool = True
+    ) -> Optional[Cliente]:
         """Busca cliente por teléfono.
         
         Args:
             telefono: Teléfono en formato E.164 (+34XXXXXXXXX)
             include_relations: Si True, incluye preferencias y notas
+            from_replica: Si False, consulta siempre Airtable (validaciones
+                antes de escribir; la réplica local puede ir unos segundos por detrás)
         
         Returns:
             Cliente si existe, None si no se encuentra
@@ -151,8 +159,12 @@ class ClienteService:
             ... else:
             ...     print("No existe")
         """
-        formula = f"{{Teléfono}} = '{telefono}'"
-        records = self.table_clientes.all(formula=formula)
+        records = None
+        if from_replica:
+            records = get_read_model().read("clientes", where={"telefono": telefono}, limit=1)
+        if records is None:
+            formula = f"{{Teléfono}} = '{telefono}'"
+            records = self.table_clientes.all(formula=formula)
         
         if not records:
             return None
@@ -188,7 +200,9 @@ class ClienteService:
             >>> print(cliente.id)  # "recXXXXXXXXXXXXXX"
         """
         # Validar que no exista
-        existing = await self.get_by_phone(cliente_data["telefono"])
+        existing = await self.get_by_phone(
+            cliente_data["telefono"], include_relations=False, from_replica=False
+        )
         if existing:
             raise ValueError(f"Cliente con teléfono {cliente_data['telefono']} ya existe")
         
@@ -213,6 +227,7 @@ class ClienteService:
         
         # Crear en Airtable
         record = self.table_clientes.create(airtable_data)
+        get_read_model().apply_write("clientes", record)
         
         return self._record_to_cliente(record)
     
@@ -253,6 +268,7 @@ class ClienteService:
         
         # Actualizar
         record = self.table_clientes.update(cliente_id, airtable_updates)
+        get_read_model().apply_write("clientes", record)
         
         return self._record_to_cliente(record)
     
@@ -18,6 +18,8 @@ from src.core.entities.reservation import (
     TipoConfirmacion
 )
 from src.core.utils.phone_utils import detectar_tipo_telefono
+from src.core.config.airtable_fields import RESERVATION_MATCH_FIELDS
+from src.infrastructure.write_journal import get_write_journal
 from pyairtable import Api
 
 
@@ -62,7 +64,8 @@ class ReservationService:
         Returns:
             Dict con la reserva creada y metadatos:
                 - success: bool
-                - reservation_id: str
+                - reservation_id: str (provisional "tmp..." si Airtable no respondió)
+                - pending_sync: bool - Pendiente de aplicar en Airtable
                 - tipo_telefono: str (movil/fijo/desconocido)
                 - requires_whatsapp_confirmation: bool
                 - requires_verbal_confirmation: bool
@@ -117,16 +120,26 @@ class ReservationService:
                 "Notas_Confirmacion": ""  # Se llenará al confirmar
             }
             
-            # Crear registro en Airtable
-            record = self.reservas_table.create(airtable_data)
+            # Crear registro vía diario: si Airtable no responde a tiempo la
+            # reserva queda aceptada con ID provisional y se aplica después
+            record = await get_write_journal().create(
+                "Reservas",
+                airtable_data,
+                match_fields=RESERVATION_MATCH_FIELDS,
+            )
             record_id = record["id"]
+            pending_sync = bool(record.get("pending_sync"))
             
-            logger.info(f"Reserva creada exitosamente: {record_id} para {telefono}")
+            logger.info(
+                f"Reserva creada exitosamente: {record_id} para {telefono}"
+                + (" (pendiente de sincronizar con Airtable)" if pending_sync else "")
+            )
             
             # Retornar respuesta diferenciada según tipo de teléfono
             response = {
                 "success": True,
                 "reservation_id": record_id,
+                "pending_sync": pending_sync,
                 "tipo_telefono": tipo_telefono,
                 "requires_whatsapp_confirmation": tipo_telefono == "movil",
                 "requires_verbal_confirmation": tipo_telefono == "fijo",
@@ -207,11 +220,23 @@ class ReservationService:
                 - reservation_id: str
         """
         try:
+            journal = get_write_journal()
+            expected = None
+
             # Si se actualiza el estado, validar la transición
             if "Estado" in updates:
-                # Primero obtener el estado actual
-                current_record = self.reservas_table.get(reservation_id)
-                current_state = current_record["fields"].get("Estado", "Pre-reserva")
+                # Primero obtener el estado actual (incluye escrituras pendientes)
+                current_record = await journal.get_record("Reservas", reservation_id)
+                if current_record is None:
+                    return {
+                        "success": False,
+                        "message": f"Reserva {reservation_id} no encontrada"
+                    }
+                current_fields = current_record["fields"]
+                current_state = current_fields.get("Estado", "Pre-reserva")
+                # Solo se exige el estado visto si el registro lo tiene
+                if "Estado" in current_fields:
+                    expected = {"Estado": current_fields["Estado"]}
                 new_state = updates["Estado"]
                 
                 # Validar transición usando el modelo Pydantic
@@ -246,8 +271,15 @@ class ReservationService:
                         "message": f"Estado inválido: {e}"
                     }
             
-            # Realizar la actualización en Airtable
-            updated_record = self.reservas_table.update(reservation_id, updates)
+            # Realizar la actualización vía diario (conflicto si el estado cambió)
+            updated_record = await journal.update(
+                "Reservas", reservation_id, updates, expected=expected
+            )
+            if updated_record is None:
+                return {
+                    "success": False,
+                    "message": "La reserva cambió mientras se actualizaba"
+                }
             
             logger.info(f"Reserva {reservation_id} actualizada exitosamente")
             
@@ -255,6 +287,7 @@ class ReservationService:
                 "success": True,
                 "message": "Reserva actualizada correctamente",
                 "reservation_id": reservation_id,
+                "pending_sync": bool(updated_record.get("pending_sync")),
                 "fields": updated_record["fields"]
             }
             
@@ -303,6 +303,10 @@ class TableAssignmentService:
     def _invalidar_cache(self):
         """Invalida el cache de mesas."""
         self._mesas_cache = None
+
+    def invalidar_cache_mesas(self):
+        """Invalida el cache de mesas (cambios recibidos por la sincronización)."""
+        self._invalidar_cache()
     
     async def _get_mesa_dict(self, mesa_id: str) -> Optional[dict]:
         """Obtiene el diccionario de configuración de una mesa desde Airtable."""
@@ -18,6 +18,7 @@ from typing import List, Optional, Tuple
 from datetime import datetime, date
 from pyairtable import Api
 
+from src.core.config.airtable_fields import MESA_ASSIGNMENT_FIELDS
 from src.core.entities.mesa import (
     Mesa,
     ConfiguracionMesa,
@@ -28,6 +29,11 @@ from src.core.entities.mesa import (
     DisponibilidadMesa,
     EstadisticasAsignacion
 )
+from src.infrastructure.airtable.resilience import (
+    AirtableUnavailableError,
+    get_airtable_resilience,
+)
+from src.infrastructure.read_model import get_read_model
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -62,11 +68,14 @@ class TableAssignmentService:
     
     def __init__(self):
         """Inicializa el servicio con la configuración de Airtable."""
-        self.api = Api(os.getenv("AIRTABLE_API_KEY"))
+        self.resilience = get_airtable_resilience()
+        self.api = Api(os.getenv("AIRTABLE_API_KEY"), timeout=self.resilience.http_timeout)
         self.base_id = "appQ2ZXAR68cqDmJt"
-        self.table_mesas = self.api.table(self.base_id, "tblRSjdDIa5SrudL5")
+        self.mesas_table_id = "tblRSjdDIa5SrudL5"
+        self.table_mesas = self.api.table(self.base_id, self.mesas_table_id)
         # ID de tabla ConfiguracionesMesas (creada en FASE 1)
-        self.table_configuraciones = self.api.table(self.base_id, "tblNNh29nlg4tPSYs")
+        self.configuraciones_table_id = "tblNNh29nlg4tPSYs"
+        self.table_configuraciones = self.api.table(self.base_id, self.configuraciones_table_id)
         
         logger.info("TableAssignmentService inicializado")
     
@@ -362,7 +371,17 @@ class TableAssignmentService:
             if zona:
                 formula = f"AND({{Disponible}} = TRUE(), {{Estado}} = 'Libre', {{Zona}} = '{zona.value}')"
             
-            records = self.table_mesas.all(formula=formula)
+            try:
+                records = await self.resilience.call(
+                    self.mesas_table_id, self.table_mesas.all, formula=formula,
+                    fields=MESA_ASSIGNMENT_FIELDS, idempotent=True, base_id=self.base_id,
+                )
+            except AirtableUnavailableError:
+                # Breaker abierto: última copia de Mesas en el read model
+                records = self._mesas_libres_desde_read_model(zona)
+                if records is None:
+                    raise
+                logger.warning("Airtable no disponible: mesas libres desde la réplica local")
             
             mesas = []
             for record in records:
@@ -377,6 +396,18 @@ class TableAssignmentService:
             logger.error(f"Error obteniendo mesas disponibles: {e}")
             return []
     
+    def _mesas_libres_desde_read_model(self, zona: Optional[ZonaMesa]) -> Optional[List[dict]]:
+        """Mismo filtro que la fórmula de _get_mesas_disponibles, sobre la réplica."""
+        records = get_read_model().read("mesas", allow_stale=True)
+        if records is None:
+            return None
+        return [
+            r for r in records
+            if r["fields"].get("Disponible")
+            and r["fields"].get("Estado") == "Libre"
+            and (zona is None or r["fields"].get("Zona") == zona.value)
+        ]
+    
     async def _get_configuraciones_activas(self) -> List[ConfiguracionMesa]:
         """Obtiene configuraciones de mesas activas desde Airtable.
         
@@ -385,7 +416,10 @@ class TableAssignmentService:
         """
         try:
             # Consultar configuraciones activas en Airtable
-            records = self.table_configuraciones.all(formula="{Activa} = TRUE()")
+            records = await self.resilience.call(
+                self.configuraciones_table_id, self.table_configuraciones.all,
+                formula="{Activa} = TRUE()", idempotent=True, base_id=self.base_id,
+            )
             configs = [self._record_to_config(r) for r in records]
             logger.debug(f"Encontradas {len(configs)} configuraciones activas")
             return configs
@@ -586,7 +620,9 @@ class TableAssignmentService:
         """
         try:
             # Obtener todas las mesas
-            all_mesas = self.table_mesas.all()
+            all_mesas = await self.resilience.call(
+                self.mesas_table_id, self.table_mesas.all, idempotent=True, base_id=self.base_id
+            )
             mesas = [self._record_to_mesa(r) for r in all_mesas]
             
             # Conteos
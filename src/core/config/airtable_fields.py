@@ -0,0 +1,82 @@
+# Airtable Field Mapping
+# Nombres de campos de Reservas y proyecciones por caso de uso.
+#
+# Los listados piden a Airtable solo los campos que van a leer (parámetro
+# `fields`) en lugar de registros completos con notas largas y arrays de
+# registros enlazados. Un nombre que no exista en la tabla hace que Airtable
+# rechace la consulta (422), así que cada proyección solo incluye campos
+# que el código ya escribe o filtra.
+
+from typing import List
+
+# Mapeo entre campos de Booking entity y Airtable field IDs
+AIRTABLE_FIELD_MAP = {
+    "nombre": "Nombre del Cliente",           # fldSeZIwKo8yfn6YZ
+    "telefono": "Teléfono",                   # fldBSYJA8AnjNrxXV
+    "email": "Email",                         # fldduECur5KuqeoCp
+    "fecha": "Fecha de Reserva",              # fldzFzhnO5l74XwSi
+    "hora": "Hora",                           # fldjPJMo4E93Wx321
+    "pax": "Cantidad de Personas",            # fld4CoP935Kpvnjgo
+    "estado": "Estado",                       # flduM2hUKvl7cbqkm
+    "zona_preferencia": "Zona Preferida",     # fldDpIF2630x1pCQd
+    "mesa_asignada": "Mesa",                  # fldebZGXz38yLHm4E (linked record)
+    "canal": "Canal",                         # fldAa1TrmCXny702z
+    "vapi_call_id": "VAPI Call ID",           # fldOBkAIun1Cc4Iyy
+    "notas": "Notas Especiales"               # fldLlN6Uvse34l9fB
+}
+
+
+def project_fields(*keys: str) -> List[str]:
+    """Nombres Airtable de las claves de AIRTABLE_FIELD_MAP indicadas."""
+    return [AIRTABLE_FIELD_MAP[key] for key in keys]
+
+
+# --- Reservas (mobile API) ---
+
+# ReservationResponse completo (airtable_to_reservation_response)
+RESERVATION_RESPONSE_FIELDS = list(AIRTABLE_FIELD_MAP.values())
+
+# Contadores del dashboard (fecha, pax y estado) y rejilla de ocupación
+# (hora y mesa) cuando el read model no está fresco
+DASHBOARD_STATS_FIELDS = project_fields("fecha", "pax", "estado", "hora", "mesa_asignada")
+
+# Vista de cocina
+KITCHEN_ORDER_FIELDS = project_fields("hora", "pax", "nombre", "mesa_asignada", "estado", "notas")
+
+# Identifican una reserva ya creada: el diario de escrituras las busca antes
+# de repetir un create que pudo llegar a Airtable tras un timeout
+RESERVATION_MATCH_FIELDS = project_fields("telefono", "fecha", "hora")
+
+# Reservas del día que comparten cocina y dashboard (una sola carga en /batch)
+DAY_RESERVATION_FIELDS = list(dict.fromkeys(DASHBOARD_STATS_FIELDS + KITCHEN_ORDER_FIELDS))
+
+# Exportación CSV de analytics (src/infrastructure/analytics/export.py)
+EXPORT_FIELDS = project_fields(
+    "fecha", "hora", "nombre", "telefono", "email", "pax", "estado",
+    "zona_preferencia", "mesa_asignada", "canal", "notas",
+) + ["Estado de Reserva"]
+
+# --- Reservas (AirtableBookingRepository._map_record_to_booking) ---
+
+BOOKING_FIELDS = project_fields("nombre", "telefono", "fecha", "hora", "pax", "mesa_asignada") + [
+    "Estado de Reserva",
+    "Notas",
+    "Recordatorio Enviado",
+]
+
+# --- Mesas (TableAssignmentService._record_to_mesa) ---
+
+MESA_ASSIGNMENT_FIELDS = [
+    "ID Mesa",
+    "Nombre de Mesa",
+    "Zona",
+    "Capacidad",
+    "Capacidad Ampliada",
+    "Mesas_Compatibles",
+    "Notas",
+    "Prioridad",
+]
+
+# --- Clientes (ClienteService._record_to_cliente) ---
+
+CLIENTE_LIST_FIELDS = ["Nombre", "Teléfono", "Email", "Primera_Reserva", "Ultima_Reserva"]
@@ -14,3 +14,15 @@ TABLES = {
     "CONFIG": "tblJiiZZBhYCEuG6G",         # Nombre real: CONFIGURACIÓN
     "FESTIVOS": "tbl4nWF0F52tm620L"        # Nombre real: Festivos
 }
+
+# Nombre real de tabla → ID (para código que usa el nombre en lugar del ID)
+TABLE_IDS_BY_NAME = {
+    "Mesas": TABLES["MESAS"],
+    "Turnos": TABLES["TURNOS"],
+    "Reservas": TABLES["RESERVAS"],
+    "Lista de Espera": TABLES["LISTA_ESPERA"],
+    "Días Especiales": TABLES["DIAS_ESPECIALES"],
+    "FAQ": TABLES["FAQ"],
+    "CONFIGURACIÓN": TABLES["CONFIG"],
+    "Festivos": TABLES["FESTIVOS"],
+}
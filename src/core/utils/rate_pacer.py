@@ -0,0 +1,29 @@
+"""
+Limitador de ritmo asíncrono.
+
+Espacia las operaciones para no superar N por segundo, compartido entre
+varias corrutinas (p.ej. workers enviando mensajes por Twilio).
+"""
+
+import asyncio
+import time
+
+
+class RatePacer:
+    """Espaciado mínimo entre operaciones (rate limit global)."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        """Espera hasta el próximo hueco disponible."""
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
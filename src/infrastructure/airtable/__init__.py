@@ -1 +1,24 @@
-"""Airtable integration module."""
\ No newline at end of file
+"""Airtable integration module."""
+
+from src.infrastructure.airtable.coalescer import WriteCoalescer, get_write_coalescer
+from src.infrastructure.airtable.resilience import (
+    AirtableCircuitBreaker,
+    AirtableResilience,
+    AirtableTimeoutError,
+    AirtableUnavailableError,
+    LatencyWindow,
+    get_airtable_resilience,
+    is_client_error,
+)
+
+__all__ = [
+    "AirtableCircuitBreaker",
+    "AirtableResilience",
+    "AirtableTimeoutError",
+    "AirtableUnavailableError",
+    "LatencyWindow",
+    "WriteCoalescer",
+    "get_airtable_resilience",
+    "get_write_coalescer",
+    "is_client_error",
+]
@@ -0,0 +1,177 @@
+"""
+Write-behind de updates pequeños a Airtable.
+
+Los updates al mismo registro que llegan dentro de la ventana
+(AIRTABLE_COALESCE_WINDOW_MS) se fusionan en uno solo, y los de registros
+distintos de la misma tabla se envían juntos en PATCH por lotes de hasta
+10 registros (límite de Airtable por petición). Cada llamador recibe el
+registro actualizado cuando su lote se confirma, o la excepción del lote.
+
+Airtable rechaza el lote entero si un solo registro es inválido (4xx): en
+ese caso el lote se reenvía registro a registro y solo falla el update
+inválido.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.core.config.airtable_ids import BASE_ID
+from src.infrastructure.airtable.resilience import is_client_error
+
+logger = logging.getLogger(__name__)
+
+AIRTABLE_BATCH_SIZE = 10
+
+
+@dataclass
+class _PendingUpdate:
+    fields: Dict[str, Any]
+    futures: List[asyncio.Future] = field(default_factory=list)
+
+
+class WriteCoalescer:
+    """
+    Agrupa updates por tabla y los envía como batch PATCH.
+
+    Args:
+        airtable: Cliente con batch_update_records() (airtable_client por defecto)
+        window_seconds: Espera máxima antes de enviar un lote incompleto
+        max_batch: Registros por petición (Airtable admite 10)
+    """
+
+    def __init__(
+        self,
+        airtable=None,
+        window_seconds: Optional[float] = None,
+        max_batch: int = AIRTABLE_BATCH_SIZE,
+    ):
+        self._airtable = airtable
+        self.window_seconds = window_seconds or (
+            float(os.getenv("AIRTABLE_COALESCE_WINDOW_MS", "50")) / 1000
+        )
+        self.max_batch = max_batch
+        self._pending: Dict[str, Dict[str, _PendingUpdate]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        # Un lote por tabla a la vez: los updates al mismo registro no se adelantan
+        self._table_locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._counters: Dict[str, int] = {
+            "requested": 0,
+            "merged": 0,
+            "records_sent": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "split_batches": 0,
+        }
+
+    @property
+    def airtable(self):
+        if self._airtable is None:
+            from src.infrastructure.mcp.airtable_client import airtable_client
+
+            self._airtable = airtable_client
+        return self._airtable
+
+    async def update(self, table: str, record_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Encola el update y espera a que Airtable lo confirme (registro resultante)."""
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(table, {})
+        if record_id in pending:
+            pending[record_id].fields.update(fields)
+            pending[record_id].futures.append(future)
+            self._counters["merged"] += 1
+        else:
+            pending[record_id] = _PendingUpdate(dict(fields), [future])
+        self._counters["requested"] += 1
+
+        if len(pending) >= self.max_batch:
+            self._flush_table(table)
+        elif table not in self._timers:
+            self._timers[table] = asyncio.get_running_loop().call_later(
+                self.window_seconds, self._flush_table, table
+            )
+        return await future
+
+    def _flush_table(self, table: str):
+        timer = self._timers.pop(table, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(table, None)
+        if not pending:
+            return
+        task = asyncio.create_task(self._send(table, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, table: str, pending: Dict[str, _PendingUpdate]):
+        items = list(pending.items())
+        async with self._table_locks.setdefault(table, asyncio.Lock()):
+            for i in range(0, len(items), self.max_batch):
+                chunk = items[i:i + self.max_batch]
+                try:
+                    await self._send_chunk(table, chunk)
+                except Exception as e:
+                    if len(chunk) == 1 or not is_client_error(e):
+                        self._fail(table, chunk, e)
+                        continue
+                    # Un registro inválido tumba el lote: se reintenta uno a uno
+                    self._counters["split_batches"] += 1
+                    logger.warning(
+                        f"Coalesced update to {table} rejected ({len(chunk)} records): {e}; "
+                        "retrying record by record"
+                    )
+                    for item in chunk:
+                        try:
+                            await self._send_chunk(table, [item])
+                        except Exception as single_error:
+                            self._fail(table, [item], single_error)
+
+    async def _send_chunk(self, table: str, chunk: List[Tuple[str, _PendingUpdate]]):
+        records = await self.airtable.batch_update_records(
+            base_id=BASE_ID,
+            table_name=table,
+            records=[{"id": rid, "fields": p.fields} for rid, p in chunk],
+        )
+        self._counters["batches"] += 1
+        self._counters["records_sent"] += len(chunk)
+        by_id = {record["id"]: record for record in records or []}
+        for rid, update in chunk:
+            for future in update.futures:
+                if not future.done():
+                    future.set_result(by_id.get(rid))
+
+    def _fail(self, table: str, chunk: List[Tuple[str, _PendingUpdate]], error: Exception):
+        self._counters["failed_batches"] += 1
+        logger.error(f"Coalesced update to {table} failed ({len(chunk)} records): {error}")
+        for _, update in chunk:
+            for future in update.futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def flush(self):
+        """Envía todo lo pendiente y espera a que terminen los lotes en curso."""
+        for table in list(self._pending):
+            self._flush_table(table)
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": round(self.window_seconds * 1000),
+            "pending": sum(len(p) for p in self._pending.values()),
+            **self._counters,
+        }
+
+
+_coalescer: Optional[WriteCoalescer] = None
+
+
+def get_write_coalescer() -> WriteCoalescer:
+    """Devuelve la instancia singleton del coalescer de updates."""
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = WriteCoalescer()
+    return _coalescer
@@ -0,0 +1,362 @@
+"""
+Capa de resiliencia compartida para llamadas a Airtable.
+
+- Circuit breaker por base y tabla: tras N fallos seguidos (timeouts, 5xx,
+  429, errores de red) la tabla queda abierta y las llamadas fallan al
+  instante con AirtableUnavailableError hasta que pasa el enfriamiento;
+  entonces una única llamada de prueba decide si se cierra.
+- Timeout adaptativo por tabla: p95 de las latencias recientes × margen,
+  acotado entre AIRTABLE_TIMEOUT_MIN_SECONDS y AIRTABLE_TIMEOUT_MAX_SECONDS.
+- Reintentos con backoff + jitter solo para lecturas (idempotent=True).
+
+Los errores 4xx (salvo 429) son respuestas válidas de Airtable: no abren el
+breaker ni se reintentan.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.core.config.airtable_ids import BASE_ID, TABLE_IDS_BY_NAME
+
+logger = logging.getLogger(__name__)
+
+MIN_SAMPLES_FOR_ADAPTIVE_TIMEOUT = 20
+
+
+class AirtableUnavailableError(RuntimeError):
+    """Airtable no disponible para esta tabla (breaker abierto o timeout)."""
+
+
+class AirtableTimeoutError(AirtableUnavailableError):
+    """
+    La llamada superó el timeout adaptativo. El thread de pyairtable sigue
+    en marcha hasta http_timeout: la escritura aún puede llegar a Airtable.
+    """
+
+
+def is_client_error(error: Exception) -> bool:
+    """
+    4xx de Airtable salvo 429 (campo inválido, permisos, registro inexistente):
+    la petición es incorrecta, reintentarla no sirve y no indica caída.
+    """
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
+    return isinstance(status_code, int) and 400 <= status_code < 500 and status_code != 429
+
+
+class AirtableCircuitBreaker:
+    """
+    Breaker de una tabla: closed → open tras `failure_threshold` fallos
+    seguidos; open → half-open tras `cooldown_seconds` (una sola llamada
+    de prueba); half-open → closed si la prueba va bien, open si falla.
+    """
+
+    def __init__(self, key: str, failure_threshold: int = 5, cooldown_seconds: float = 30.0):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True si la llamada puede ir a Airtable."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = "half-open"
+                logger.info(f"Airtable breaker {self.key} HALF-OPEN (probando recuperación)")
+            if self.state == "half-open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def release_probe(self):
+        """Libera la prueba de half-open sin resultado (llamada cancelada)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._probe_in_flight = False
+            self.failures = 0
+            if self.state != "closed":
+                self.state = "closed"
+                self.opened_at = None
+                logger.info(f"Airtable breaker {self.key} CLOSED")
+
+    def record_failure(self):
+        with self._lock:
+            self._probe_in_flight = False
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Airtable breaker {self.key} OPEN tras {self.failures} fallos seguidos"
+                    )
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == "open":
+            retry_in = round(
+                max(0.0, self.cooldown_seconds - (time.monotonic() - self.opened_at)), 1
+            )
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": retry_in,
+        }
+
+
+class LatencyWindow:
+    """Latencias recientes de una tabla y timeout derivado de su p95."""
+
+    def __init__(
+        self,
+        size: int = 200,
+        multiplier: float = 3.0,
+        min_timeout: float = 2.0,
+        max_timeout: float = 15.0,
+    ):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def timeout(self) -> float:
+        """Hasta tener muestras suficientes se usa el máximo."""
+        if len(self.samples) < MIN_SAMPLES_FOR_ADAPTIVE_TIMEOUT:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.p95() * self.multiplier))
+
+
+class AirtableResilience:
+    """
+    Registro de breakers y latencias por base/tabla.
+
+    Args:
+        failure_threshold: Fallos seguidos que abren el breaker
+        cooldown_seconds: Tiempo abierto antes de la llamada de prueba
+        read_attempts: Intentos totales para lecturas idempotentes
+        min_timeout / max_timeout: Cotas del timeout adaptativo
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        read_attempts: int = 3,
+        base_backoff_seconds: float = 0.25,
+        min_timeout: Optional[float] = None,
+        max_timeout: Optional[float] = None,
+        timeout_multiplier: float = 3.0,
+    ):
+        self.failure_threshold = failure_threshold or int(
+            os.getenv("AIRTABLE_BREAKER_FAILURES", "5")
+        )
+        self.cooldown_seconds = cooldown_seconds or float(
+            os.getenv("AIRTABLE_BREAKER_COOLDOWN_SECONDS", "30")
+        )
+        self.read_attempts = read_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.min_timeout = min_timeout or float(os.getenv("AIRTABLE_TIMEOUT_MIN_SECONDS", "2"))
+        self.max_timeout = max_timeout or float(os.getenv("AIRTABLE_TIMEOUT_MAX_SECONDS", "15"))
+        self.timeout_multiplier = timeout_multiplier
+
+        self._breakers: Dict[str, AirtableCircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self._lock = threading.Lock()
+        # Llamadas síncronas (repositorios con pyairtable) con timeout propio
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="airtable")
+
+    def _key(self, table: str, base_id: Optional[str]) -> str:
+        # Nombre o ID de tabla comparten breaker
+        return f"{base_id or BASE_ID}:{TABLE_IDS_BY_NAME.get(table, table)}"
+
+    def breaker(self, table: str, base_id: Optional[str] = None) -> AirtableCircuitBreaker:
+        key = self._key(table, base_id)
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = AirtableCircuitBreaker(
+                    key, self.failure_threshold, self.cooldown_seconds
+                )
+                self._latencies[key] = LatencyWindow(
+                    multiplier=self.timeout_multiplier,
+                    min_timeout=self.min_timeout,
+                    max_timeout=self.max_timeout,
+                )
+            return self._breakers[key]
+
+    @property
+    def http_timeout(self):
+        """Timeout (connect, read) para Api(): cota dura de los threads abandonados."""
+        return (5.0, self.max_timeout)
+
+    def is_open(self, table: str, base_id: Optional[str] = None) -> bool:
+        return self.breaker(table, base_id).state == "open"
+
+    def _backoff(self, attempt: int) -> float:
+        return self.base_backoff_seconds * 2 ** attempt * random.uniform(0.5, 1.5)
+
+    def _before(self, table: str, base_id: Optional[str]):
+        breaker = self.breaker(table, base_id)
+        if not breaker.allow():
+            raise AirtableUnavailableError(f"Airtable breaker abierto para {breaker.key}")
+        return breaker, self._latencies[breaker.key]
+
+    async def call(
+        self,
+        table: str,
+        fn: Callable[..., Any],
+        *args,
+        idempotent: bool = False,
+        base_id: Optional[str] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Ejecuta una llamada bloqueante de pyairtable en un thread con timeout
+        adaptativo. Las lecturas (idempotent=True) se reintentan con backoff.
+        """
+        attempts = self.read_attempts if idempotent else 1
+        for attempt in range(attempts):
+            breaker, latency = self._before(table, base_id)
+            timeout = latency.timeout()
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.to_thread(fn, *args, **kwargs), timeout=timeout
+                )
+            except Exception as e:
+                error = self._record_error(breaker, latency, e, started, timeout)
+                if error is None:
+                    raise
+                if attempt + 1 < attempts:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                if error is e:
+                    raise
+                raise error from e
+            except BaseException:
+                # Cancelación o KeyboardInterrupt: sin resultado, pero la
+                # prueba de half-open no puede quedar ocupada para siempre
+                breaker.release_probe()
+                raise
+            latency.record(time.monotonic() - started)
+            breaker.record_success()
+            return result
+
+    def call_sync(
+        self,
+        table: str,
+        fn: Callable[..., Any],
+        *args,
+        idempotent: bool = False,
+        base_id: Optional[str] = None,
+        **kwargs,
+    ) -> Any:
+        """Versión para código síncrono (el thread del llamador espera el timeout)."""
+        attempts = self.read_attempts if idempotent else 1
+        for attempt in range(attempts):
+            breaker, latency = self._before(table, base_id)
+            timeout = latency.timeout()
+            started = time.monotonic()
+            try:
+                result = self._executor.submit(fn, *args, **kwargs).result(timeout=timeout)
+            except Exception as e:
+                error = self._record_error(breaker, latency, e, started, timeout)
+                if error is None:
+                    raise
+                if attempt + 1 < attempts:
+                    time.sleep(self._backoff(attempt))
+                    continue
+                if error is e:
+                    raise
+                raise error from e
+            except BaseException:
+                # Cancelación o KeyboardInterrupt: sin resultado, pero la
+                # prueba de half-open no puede quedar ocupada para siempre
+                breaker.release_probe()
+                raise
+            latency.record(time.monotonic() - started)
+            breaker.record_success()
+            return result
+
+    def _record_error(
+        self,
+        breaker: AirtableCircuitBreaker,
+        latency: LatencyWindow,
+        error: Exception,
+        started: float,
+        timeout: float,
+    ) -> Optional[Exception]:
+        """
+        Registra el fallo. Devuelve el error a propagar tras agotar intentos,
+        o None si es un 4xx (respuesta válida: se propaga tal cual sin reintentar).
+        """
+        if is_client_error(error):
+            latency.record(time.monotonic() - started)
+            breaker.record_success()
+            return None
+        breaker.record_failure()
+        if isinstance(error, (asyncio.TimeoutError, FutureTimeoutError)):
+            latency.record(timeout)
+            return AirtableTimeoutError(
+                f"Airtable {breaker.key} no respondió en {timeout:.1f}s"
+            )
+        return error
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = list(self._breakers)
+        tables = {}
+        for key in keys:
+            latency = self._latencies[key]
+            p95 = latency.p95()
+            tables[key] = {
+                **self._breakers[key].to_dict(),
+                "p95_ms": None if p95 is None else round(p95 * 1000, 1),
+                "timeout_seconds": round(latency.timeout(), 2),
+            }
+        return {
+            "open": sorted(k for k, t in tables.items() if t["state"] == "open"),
+            "tables": tables,
+        }
+
+
+_resilience: Optional[AirtableResilience] = None
+
+
+def get_airtable_resilience() -> AirtableResilience:
+    """Devuelve la instancia singleton (compartida por todos los clientes Airtable)."""
+    global _resilience
+    if _resilience is None:
+        _resilience = AirtableResilience()
+    return _resilience
@@ -0,0 +1,68 @@
+"""
+Motor de analytics en memoria (columnas NumPy) sobre el histórico de
+reservas, motor de ocupación por franjas, estadísticas del dashboard
+cacheadas por día y exportación de reservas en streaming.
+"""
+
+from src.infrastructure.analytics.columns import Dictionary, ReservationColumns
+from src.infrastructure.analytics.dashboard_stats import (
+    DashboardStatsMaterializer,
+    day_stats,
+    get_dashboard_stats_materializer,
+)
+from src.infrastructure.analytics.engine import (
+    BREAKDOWN_COLUMNS,
+    TREND_FREQUENCIES,
+    AnalyticsEngine,
+    get_analytics_engine,
+)
+from src.infrastructure.analytics.export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    EXPORT_MEDIA_TYPES,
+    csv_chunks,
+    encode_export,
+    gzip_chunks,
+    iter_reservation_pages,
+    reservation_row,
+)
+from src.infrastructure.analytics.occupancy import (
+    SLOT_MINUTES,
+    DayGrid,
+    DurationModel,
+    OccupancyEngine,
+    TableInfo,
+    get_occupancy_engine,
+    load_table_catalog,
+    open_slots,
+    table_info,
+)
+
+__all__ = [
+    "AnalyticsEngine",
+    "get_analytics_engine",
+    "BREAKDOWN_COLUMNS",
+    "TREND_FREQUENCIES",
+    "DashboardStatsMaterializer",
+    "day_stats",
+    "get_dashboard_stats_materializer",
+    "Dictionary",
+    "ReservationColumns",
+    "EXPORT_COLUMNS",
+    "EXPORT_FORMATS",
+    "EXPORT_MEDIA_TYPES",
+    "csv_chunks",
+    "encode_export",
+    "gzip_chunks",
+    "iter_reservation_pages",
+    "reservation_row",
+    "SLOT_MINUTES",
+    "DayGrid",
+    "DurationModel",
+    "OccupancyEngine",
+    "TableInfo",
+    "get_occupancy_engine",
+    "load_table_catalog",
+    "open_slots",
+    "table_info",
+]
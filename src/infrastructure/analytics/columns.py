@@ -0,0 +1,157 @@
+"""
+Histórico de reservas en columnas NumPy.
+
+Una fila por reserva con los campos que usan las consultas de analytics ya
+codificados: fecha (ordinal), hora local, pax y códigos de diccionario para
+estado, zona, mesa y canal. Las consultas filtran y agrupan con operaciones
+vectorizadas (máscaras + np.bincount) en lugar de recorrer dicts de Airtable.
+
+Las filas se actualizan en sitio: un upsert sobrescribe la fila del registro
+y un borrado la marca como libre para reutilizarla.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.infrastructure.read_model.rollups import local_hour
+
+INITIAL_CAPACITY = 1024
+
+
+class Dictionary:
+    """Codificación de valores categóricos a enteros (0 = sin valor o el valor por defecto)."""
+
+    def __init__(self, empty_label: str):
+        self.values: List[str] = [empty_label]
+        self._codes: Dict[str, int] = {empty_label: 0}
+
+    def encode(self, value: Any) -> int:
+        if value is None or value == "":
+            return 0
+        key = str(value)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.values)
+            self.values.append(key)
+        return code
+
+    def code_of(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _first(value: Any) -> Any:
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+class ReservationColumns:
+    """Columnas de reservas con índice record_id → fila."""
+
+    COLUMNS = {
+        "fecha": np.int32,
+        "hora": np.int8,
+        "pax": np.int16,
+        "estado": np.int16,
+        "zona": np.int16,
+        "mesa": np.int32,
+        "canal": np.int16,
+    }
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.dictionaries = {
+            "estado": Dictionary("Pendiente"),
+            "zona": Dictionary("sin especificar"),
+            "mesa": Dictionary("sin mesa"),
+            "canal": Dictionary("sin canal"),
+        }
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.alive = np.zeros(capacity, dtype=bool)
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def size(self) -> int:
+        """Filas usadas (incluye huecos de borrados pendientes de reutilizar)."""
+        return self._size
+
+    def _grow(self):
+        capacity = max(INITIAL_CAPACITY, len(self.alive) * 2)
+        for name, array in self.arrays.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: len(array)] = array
+            self.arrays[name] = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self.alive)] = self.alive
+        self.alive = alive
+
+    def _row_for(self, record_id: str) -> int:
+        row = self._rows.get(record_id)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._size == len(self.alive):
+                self._grow()
+            row = self._size
+            self._size += 1
+        self._rows[record_id] = row
+        return row
+
+    def upsert(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            fields = record.get("fields", {})
+            fecha = str(fields.get("Fecha de Reserva") or "")[:10]
+            try:
+                ordinal = date.fromisoformat(fecha).toordinal()
+            except ValueError:
+                # Sin fecha no entra en ninguna consulta por período
+                self.delete([record["id"]])
+                continue
+            try:
+                pax = int(fields.get("Cantidad de Personas") or 0)
+            except (TypeError, ValueError):
+                pax = 0
+
+            row = self._row_for(record["id"])
+            self.arrays["fecha"][row] = ordinal
+            self.arrays["hora"][row] = local_hour(fields.get("Hora"))
+            self.arrays["pax"][row] = pax
+            self.arrays["estado"][row] = self.dictionaries["estado"].encode(
+                fields.get("Estado de Reserva") or fields.get("Estado")
+            )
+            self.arrays["zona"][row] = self.dictionaries["zona"].encode(fields.get("Zona Preferida"))
+            self.arrays["mesa"][row] = self.dictionaries["mesa"].encode(_first(fields.get("Mesa")))
+            self.arrays["canal"][row] = self.dictionaries["canal"].encode(fields.get("Canal"))
+            self.alive[row] = True
+
+    def delete(self, record_ids: Iterable[str]):
+        for record_id in record_ids:
+            row = self._rows.pop(record_id, None)
+            if row is not None:
+                self.alive[row] = False
+                self._free.append(row)
+
+    def mask(self, start: date, end: date) -> np.ndarray:
+        """Filas vivas con fecha en [start, end)."""
+        n = self._size
+        fecha = self.arrays["fecha"][:n]
+        return self.alive[:n] & (fecha >= start.toordinal()) & (fecha < end.toordinal())
+
+    def column(self, name: str, mask: np.ndarray) -> np.ndarray:
+        return self.arrays[name][: self._size][mask]
+
+    def codes_of(self, name: str, values: Iterable[str]) -> List[int]:
+        dictionary = self.dictionaries[name]
+        return [code for code in (dictionary.code_of(v) for v in values) if code is not None]
+
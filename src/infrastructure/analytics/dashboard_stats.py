@@ -0,0 +1,260 @@
+"""
+Estadísticas del dashboard por día, materializadas y cacheadas.
+
+Cada entrada (contadores por estado, comensales, comensales de reservas que
+ocupan mesa y ocupación) se calcula en una sola pasada sobre las reservas
+del día, leídas del índice por fecha del read model, y solo cuando no está
+en caché. Los cambios de la réplica (escritura propia, polling o webhook)
+invalidan los días afectados, incluido el día anterior de una reserva que
+cambia de fecha; un cambio en Mesas invalida todos (cambia la capacidad).
+
+Los workers comparten la réplica SQLite, pero los listeners solo reciben
+los cambios escritos por su propio proceso; cada día se guarda además con
+TTL (DASHBOARD_STATS_TTL_SECONDS), que acota lo que puede durar una entrada
+desfasada.
+
+Con Redis la caché se comparte entre workers (clave dashboard_stats:<día>):
+una escritura en cualquier worker borra la clave y el siguiente que la pida
+la recalcula. Un worker que leyó las reservas justo antes de ese borrado
+puede volver a guardar la versión anterior, que dura como mucho el TTL.
+Sin Redis la caché es del proceso y los cambios de otro worker no la
+invalidan: se ven al caducar el TTL.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.config.airtable_fields import AIRTABLE_FIELD_MAP
+from src.infrastructure.read_model.rollups import SEATED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "dashboard_stats:"
+
+
+def day_stats(records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Contadores del día en una pasada (sin ocupación). active_pax son los
+    comensales que cuentan como cubiertos (SEATED_STATUSES, como los rollups).
+    """
+    stats = {
+        "total_reservations": 0,
+        "confirmed": 0,
+        "pending": 0,
+        "seated": 0,
+        "cancelled": 0,
+        "pax_total": 0,
+        "active_pax": 0,
+    }
+    for record in records:
+        fields = record.get("fields", {})
+        estado = fields.get(AIRTABLE_FIELD_MAP["estado"], "")
+        pax = fields.get(AIRTABLE_FIELD_MAP["pax"], 0) or 0
+
+        stats["total_reservations"] += 1
+        stats["pax_total"] += pax
+        if estado in SEATED_STATUSES:
+            stats["active_pax"] += pax
+
+        if estado == "Confirmada":
+            stats["confirmed"] += 1
+        elif estado == "Pendiente":
+            stats["pending"] += 1
+        elif estado in ("Sentada", "Completada"):
+            stats["seated"] += 1
+        elif estado == "Cancelada":
+            stats["cancelled"] += 1
+    return stats
+
+
+def _record_day(record: Dict[str, Any]) -> Optional[str]:
+    value = record.get("fields", {}).get(AIRTABLE_FIELD_MAP["fecha"])
+    return str(value)[:10] if value else None
+
+
+class DashboardStatsMaterializer:
+    """
+    Caché de estadísticas por día con invalidación por cambios del read model.
+
+    Args:
+        read_model: ReadModel del que leer y al que suscribirse
+            (get_read_model() por defecto)
+        cache: RedisCache compartida (get_cache() por defecto; si no está
+            habilitada se usa una caché en memoria)
+        occupancy: OccupancyEngine (get_occupancy_engine() por defecto)
+        ttl_seconds: TTL de cada día, en Redis o en memoria
+            (DASHBOARD_STATS_TTL_SECONDS, 300)
+    """
+
+    def __init__(self, read_model=None, cache=None, occupancy=None, ttl_seconds: Optional[int] = None):
+        self._read_model = read_model
+        self._cache = cache
+        self._occupancy = occupancy
+        self.ttl_seconds = ttl_seconds or int(os.getenv("DASHBOARD_STATS_TTL_SECONDS", "300"))
+        self._lock = threading.RLock()
+        self._loaded = False
+        # Día → (caduca en, según time.monotonic(); estadísticas)
+        self._local: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Día de cada reserva de los días materializados (para invalidar el
+        # día anterior cuando una reserva cambia de fecha o se borra)
+        self._record_days: Dict[str, str] = {}
+        self._days_records: Dict[str, Set[str]] = {}
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def read_model(self):
+        if self._read_model is None:
+            from src.infrastructure.read_model import get_read_model
+
+            self._read_model = get_read_model()
+        return self._read_model
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from src.infrastructure.cache.redis_cache import get_cache
+
+            self._cache = get_cache()
+        return self._cache
+
+    @property
+    def occupancy(self):
+        if self._occupancy is None:
+            from src.infrastructure.analytics.occupancy import get_occupancy_engine
+
+            self._occupancy = get_occupancy_engine()
+        return self._occupancy
+
+    # --- Invalidación ---
+
+    def ensure_loaded(self) -> bool:
+        """Se suscribe a Reservas y Mesas; False mientras la réplica no esté fresca."""
+        if not self.read_model.is_fresh("reservas"):
+            return False
+        with self._lock:
+            if not self._loaded:
+                store = self.read_model.store
+                store.add_listener("reservas", self._on_reservas_change)
+                store.add_listener("mesas", self._on_mesas_change)
+                self._loaded = True
+        return True
+
+    def _on_reservas_change(self, upserted: List[Dict[str, Any]], deleted: List[str]):
+        with self._lock:
+            days: Set[str] = set()
+            for record in upserted:
+                previous = self._forget(record["id"])
+                if previous:
+                    days.add(previous)
+                day = _record_day(record)
+                if day:
+                    days.add(day)
+            for record_id in deleted:
+                previous = self._forget(record_id)
+                if previous:
+                    days.add(previous)
+        for day in days:
+            self.invalidate(day)
+
+    def _on_mesas_change(self, upserted: List[Dict[str, Any]], deleted: List[str]):
+        self.invalidate_all()
+
+    def _forget(self, record_id: str) -> Optional[str]:
+        day = self._record_days.pop(record_id, None)
+        if day is not None:
+            self._days_records.get(day, set()).discard(record_id)
+        return day
+
+    def invalidate(self, day: str):
+        with self._lock:
+            self._local.pop(day, None)
+            for record_id in self._days_records.pop(day, set()):
+                self._record_days.pop(record_id, None)
+            self._counters["invalidations"] += 1
+        if self.cache.enabled:
+            self.cache.delete(f"{CACHE_KEY_PREFIX}{day}")
+
+    def invalidate_all(self):
+        with self._lock:
+            self._local.clear()
+            self._record_days.clear()
+            self._days_records.clear()
+            self._counters["invalidations"] += 1
+        if self.cache.enabled:
+            self.cache.delete_pattern(f"{CACHE_KEY_PREFIX}*")
+
+    # --- Lectura ---
+
+    def get(self, day: date) -> Optional[Dict[str, Any]]:
+        """
+        Estadísticas del día (campos de DashboardStats), o None si la réplica
+        no está fresca y hay que calcularlas desde Airtable.
+        """
+        if not self.ensure_loaded():
+            return None
+        key = day.isoformat()
+        cached = self.cache.get(f"{CACHE_KEY_PREFIX}{key}") if self.cache.enabled else self._local_get(key)
+        if cached is not None:
+            self._counters["hits"] += 1
+            return cached
+
+        self._counters["misses"] += 1
+        records = self.read_model.read("reservas", where={"fecha": key})
+        if records is None:
+            return None
+        stats = {**day_stats(records), "occupancy_rate": self._occupancy_rate(day, records)}
+        with self._lock:
+            for record in records:
+                self._record_days[record["id"]] = key
+            self._days_records[key] = {record["id"] for record in records}
+            if not self.cache.enabled:
+                self._local[key] = (time.monotonic() + self.ttl_seconds, stats)
+        if self.cache.enabled:
+            self.cache.set(f"{CACHE_KEY_PREFIX}{key}", stats, ttl=self.ttl_seconds)
+        return stats
+
+    def _local_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._local[key]
+                return None
+            return entry[1]
+
+    def _occupancy_rate(self, day: date, records: List[Dict[str, Any]]) -> float:
+        engine = self.occupancy
+        if not engine.ensure_loaded():
+            from src.infrastructure.analytics.occupancy import OccupancyEngine, table_info
+
+            mesas = self.read_model.read("mesas", allow_stale=True) or []
+            engine = OccupancyEngine.from_records(records, [table_info(record) for record in mesas])
+        utilization = engine.utilization(day, day + timedelta(days=1))
+        return round(utilization["seat_utilization"], 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "backend": "redis" if self.cache.enabled else "memory",
+                "ttl_seconds": self.ttl_seconds,
+                "local_days": len(self._local),
+                "tracked_records": len(self._record_days),
+                **self._counters,
+            }
+
+
+_materializer: Optional[DashboardStatsMaterializer] = None
+
+
+def get_dashboard_stats_materializer() -> DashboardStatsMaterializer:
+    """Devuelve la instancia singleton del materializador de estadísticas."""
+    global _materializer
+    if _materializer is None:
+        _materializer = DashboardStatsMaterializer()
+    return _materializer
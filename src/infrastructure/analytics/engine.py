@@ -0,0 +1,227 @@
+"""
+Motor de analytics en memoria sobre columnas NumPy.
+
+Carga una vez el histórico de Reservas desde el read model y se suscribe a
+sus cambios (escrituras propias, webhooks, polling y reconciliación), así
+que se mantiene al día sin recargar. Las consultas (desglose por columna,
+tendencia por día/semana/mes, heatmap día de la semana × hora y resumen)
+son máscaras y np.bincount sobre las columnas: un rango de varios meses o
+años se resuelve en milisegundos.
+
+Si el read model no está disponible (desactivado o sin sincronizar), los
+endpoints construyen un motor temporal con from_records() a partir de las
+reservas del período leídas de Airtable: mismo código, mismas respuestas.
+"""
+
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.infrastructure.analytics.columns import ReservationColumns
+from src.infrastructure.read_model.rollups import SEATED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+BREAKDOWN_COLUMNS = ("estado", "zona", "mesa", "canal")
+TREND_FREQUENCIES = ("day", "week", "month")
+WEEKDAYS = ("lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo")
+
+
+class AnalyticsEngine:
+    """
+    Consultas vectorizadas sobre el histórico de reservas.
+
+    Args:
+        read_model: ReadModel del que cargar y al que suscribirse
+            (get_read_model() por defecto)
+    """
+
+    def __init__(self, read_model=None):
+        self._read_model = read_model
+        self.columns = ReservationColumns()
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "AnalyticsEngine":
+        """Motor independiente sobre un conjunto fijo de registros."""
+        engine = cls()
+        engine.columns.upsert(records)
+        engine._loaded = True
+        return engine
+
+    @property
+    def read_model(self):
+        if self._read_model is None:
+            from src.infrastructure.read_model import get_read_model
+
+            self._read_model = get_read_model()
+        return self._read_model
+
+    # --- Carga y actualización incremental ---
+
+    def ensure_loaded(self) -> bool:
+        """
+        Carga el histórico la primera vez que la réplica de Reservas está
+        fresca. Devuelve False si aún no se puede servir desde el motor.
+        """
+        if self._loaded:
+            return self.read_model.is_fresh("reservas")
+        with self._lock:
+            if self._loaded:
+                return True
+            if not self.read_model.is_fresh("reservas"):
+                return False
+            store = self.read_model.store
+            # Suscribirse antes de cargar: un cambio concurrente se aplica
+            # después de la carga y gana por ser upsert por record_id
+            store.add_listener("reservas", self._on_change)
+            self.columns.upsert(store.select("reservas"))
+            self._loaded = True
+            logger.info(f"Analytics engine loaded {len(self.columns)} reservations")
+            return True
+
+    def _on_change(self, upserted: List[Dict[str, Any]], deleted: List[str]):
+        with self._lock:
+            self.columns.upsert(upserted)
+            self.columns.delete(deleted)
+
+    # --- Consultas ---
+
+    def _values(self, column: str, counts: np.ndarray) -> Dict[str, int]:
+        labels = self.columns.dictionaries[column].values
+        return {labels[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def _active(self, mask: np.ndarray) -> np.ndarray:
+        """Máscara de reservas que ocupan mesa dentro de `mask`."""
+        estados = self.columns.column("estado", mask)
+        return np.isin(estados, self.columns.codes_of("estado", SEATED_STATUSES))
+
+    def breakdown(self, column: str, start: date, end: date) -> Dict[str, Dict[str, int]]:
+        """Reservas y comensales por valor de `column` con fecha en [start, end)."""
+        if column not in BREAKDOWN_COLUMNS:
+            raise ValueError(f"Unknown breakdown column: {column}")
+        with self._lock:
+            mask = self.columns.mask(start, end)
+            codes = self.columns.column(column, mask)
+            pax = self.columns.column("pax", mask)
+            size = len(self.columns.dictionaries[column])
+            counts = np.bincount(codes, minlength=size)
+            guests = np.bincount(codes, weights=pax, minlength=size)
+            labels = self.columns.dictionaries[column].values
+        return {
+            labels[code]: {"reservas": int(counts[code]), "comensales": int(guests[code])}
+            for code in np.flatnonzero(counts)
+        }
+
+    def summary(self, start: date, end: date) -> Dict[str, Any]:
+        """Totales, desglose por estado/zona y distribución horaria en [start, end)."""
+        with self._lock:
+            mask = self.columns.mask(start, end)
+            pax = self.columns.column("pax", mask)
+            horas = self.columns.column("hora", mask)
+            active = self._active(mask)
+            estados = np.bincount(
+                self.columns.column("estado", mask), minlength=len(self.columns.dictionaries["estado"])
+            )
+            zonas = np.bincount(
+                self.columns.column("zona", mask), minlength=len(self.columns.dictionaries["zona"])
+            )
+            hourly = np.bincount(horas[horas >= 0], minlength=24)
+            status_breakdown = self._values("estado", estados)
+            zone_breakdown = self._values("zona", zonas)
+        total = int(mask.sum())
+        guests = int(pax.sum())
+        return {
+            "total_reservations": total,
+            "total_guests": guests,
+            "avg_party_size": round(guests / total, 2) if total else 0.0,
+            "active_reservations": int(active.sum()),
+            "status_breakdown": status_breakdown,
+            "zone_breakdown": zone_breakdown,
+            "hourly_distribution": {f"{h:02d}": int(hourly[h]) for h in np.flatnonzero(hourly)},
+        }
+
+    def trend(self, start: date, end: date, freq: str = "day") -> List[Dict[str, Any]]:
+        """
+        Serie temporal en [start, end): reservas, comensales y reservas
+        activas por día, semana (lunes) o mes (día 1).
+        """
+        if freq not in TREND_FREQUENCIES:
+            raise ValueError(f"Unknown trend frequency: {freq}")
+        days = (end - start).days
+        if days <= 0:
+            return []
+        # Cubo de cada día del rango (tabla pequeña: un valor por día)
+        day_dates = [start + timedelta(days=i) for i in range(days)]
+        if freq == "day":
+            bucket_start = day_dates
+        elif freq == "week":
+            bucket_start = [d - timedelta(days=d.weekday()) for d in day_dates]
+        else:
+            bucket_start = [d.replace(day=1) for d in day_dates]
+        labels = list(dict.fromkeys(bucket_start))
+        bucket_index = {label: i for i, label in enumerate(labels)}
+        bucket_of_day = np.array([bucket_index[b] for b in bucket_start], dtype=np.int32)
+
+        with self._lock:
+            mask = self.columns.mask(start, end)
+            offsets = self.columns.column("fecha", mask) - start.toordinal()
+            pax = self.columns.column("pax", mask)
+            active = self._active(mask)
+        buckets = bucket_of_day[offsets]
+        n = len(labels)
+        counts = np.bincount(buckets, minlength=n)
+        guests = np.bincount(buckets, weights=pax, minlength=n)
+        actives = np.bincount(buckets[active], minlength=n)
+        return [
+            {
+                "period_start": label.isoformat(),
+                "reservas": int(counts[i]),
+                "comensales": int(guests[i]),
+                "activas": int(actives[i]),
+            }
+            for i, label in enumerate(labels)
+        ]
+
+    def heatmap(self, start: date, end: date) -> Dict[str, Any]:
+        """Reservas por día de la semana × hora local en [start, end)."""
+        with self._lock:
+            mask = self.columns.mask(start, end)
+            horas = self.columns.column("hora", mask).astype(np.int32)
+            fechas = self.columns.column("fecha", mask)
+        known = horas >= 0
+        # date.fromordinal(1) es lunes: (ordinal - 1) % 7 da 0 = lunes
+        weekdays = (fechas[known] - 1) % 7
+        grid = np.bincount(weekdays * 24 + horas[known], minlength=7 * 24).reshape(7, 24)
+        return {
+            "weekdays": list(WEEKDAYS),
+            "hours": list(range(24)),
+            "counts": grid.tolist(),
+            "without_hour": int((~known).sum()),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "reservations": len(self.columns),
+                "rows_allocated": len(self.columns.alive),
+                "categories": {
+                    name: len(dictionary) for name, dictionary in self.columns.dictionaries.items()
+                },
+            }
+
+
+_engine: Optional[AnalyticsEngine] = None
+
+
+def get_analytics_engine() -> AnalyticsEngine:
+    """Devuelve la instancia singleton del motor de analytics."""
+    global _engine
+    if _engine is None:
+        _engine = AnalyticsEngine()
+    return _engine
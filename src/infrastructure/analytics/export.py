@@ -0,0 +1,139 @@
+"""
+Exportación de reservas en streaming (CSV o CSV comprimido con gzip).
+
+Las reservas del período se leen por páginas (read model local si está
+fresco; si no, Airtable de 100 en 100) y cada página se escribe y se envía
+en cuanto llega: la memoria no depende del rango y el primer byte sale tras
+la primera página, sea una semana o un año.
+
+El gzip se vacía (Z_SYNC_FLUSH) al final de cada página para que el cliente
+reciba datos de forma continua y no solo al cerrar el compresor.
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import zlib
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from src.core.config.airtable_fields import EXPORT_FIELDS
+from src.core.config.airtable_ids import BASE_ID, TABLES
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "csv.gz")
+READ_MODEL_PAGE_SIZE = 500
+AIRTABLE_PAGE_SIZE = 100
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "csv.gz": "application/gzip"}
+
+ReservationPage = List[Dict[str, Any]]
+
+
+def _field(*names: str) -> Callable[[Dict[str, Any]], Any]:
+    """Primer campo presente de la reserva (el esquema tiene alias)."""
+
+    def get(record: Dict[str, Any]) -> Any:
+        fields = record.get("fields", {})
+        for name in names:
+            value = fields.get(name)
+            if value not in (None, ""):
+                return ", ".join(map(str, value)) if isinstance(value, list) else value
+        return ""
+
+    return get
+
+
+EXPORT_COLUMNS: Tuple[Tuple[str, Callable[[Dict[str, Any]], Any]], ...] = (
+    ("ID", lambda r: r.get("id", "")),
+    ("Fecha", _field("Fecha de Reserva")),
+    ("Hora", _field("Hora")),
+    ("Nombre", _field("Nombre del Cliente")),
+    ("Teléfono", _field("Teléfono")),
+    ("Email", _field("Email")),
+    ("Num Personas", _field("Cantidad de Personas")),
+    ("Estado", _field("Estado de Reserva", "Estado")),
+    ("Zona", _field("Zona Preferida")),
+    ("Mesa Asignada", _field("Mesa")),
+    ("Canal", _field("Canal")),
+    ("Solicitudes Especiales", _field("Notas Especiales")),
+    ("Creado en", lambda r: r.get("createdTime", "")),
+)
+
+
+def reservation_row(record: Dict[str, Any]) -> List[Any]:
+    """Fila CSV de un registro de Reservas."""
+    return [get(record) for _, get in EXPORT_COLUMNS]
+
+
+async def iter_reservation_pages(
+    start_date: date, end_date: date, airtable: Any
+) -> AsyncIterator[ReservationPage]:
+    """Reservas con fecha en [start_date, end_date), por páginas y ordenadas por fecha."""
+    from src.infrastructure.read_model import get_read_model
+
+    pages = get_read_model().iter_read(
+        "reservas",
+        order_by="fecha",
+        between={
+            "fecha": (start_date.isoformat(), (end_date - timedelta(days=1)).isoformat())
+        },
+        batch_size=READ_MODEL_PAGE_SIZE,
+    )
+    if pages is not None:
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                return
+            yield page
+
+    formula = (
+        f"AND(NOT(IS_BEFORE({{Fecha de Reserva}}, '{start_date}')), "
+        f"IS_BEFORE({{Fecha de Reserva}}, '{end_date}'))"
+    )
+    async for page in airtable.iterate_records(
+        base_id=BASE_ID,
+        table_name=TABLES["RESERVAS"],
+        filterByFormula=formula,
+        sort=["Fecha de Reserva"],
+        fields=EXPORT_FIELDS,
+        page_size=AIRTABLE_PAGE_SIZE,
+    ):
+        yield page
+
+
+async def csv_chunks(pages: AsyncIterator[ReservationPage]) -> AsyncIterator[bytes]:
+    """Cabecera y luego un bloque CSV (UTF-8) por página."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    rows = 0
+    async for page in pages:
+        writer.writerows(reservation_row(record) for record in page)
+        rows += len(page)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+    logger.info(f"Reservations export streamed: {rows} rows")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Comprime en formato gzip bloque a bloque."""
+    compressor = zlib.compressobj(level=6, wbits=31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode_export(pages: AsyncIterator[ReservationPage], format: str) -> AsyncIterator[bytes]:
+    """Cuerpo de la respuesta en el formato pedido (ver EXPORT_FORMATS)."""
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {format}")
+    chunks = csv_chunks(pages)
+    return gzip_chunks(chunks) if format == "csv.gz" else chunks
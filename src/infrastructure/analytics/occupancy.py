@@ -0,0 +1,525 @@
+"""
+Motor de ocupación: rejilla mesa × franja de 15 minutos por día.
+
+Cada reserva que ocupa mesa (confirmada, sentada o completada) marca su mesa
+desde su hora local durante la duración estimada para su número de
+comensales. Las reservas sin mesa asignada van a una fila aparte y cuentan
+como una mesa cada una. Con la rejilla se calculan:
+
+- heatmap: % de mesas ocupadas por día y franja
+- franjas pico: las franjas con más mesas ocupadas del período
+- utilización: mesa-franjas y plaza-franjas ocupadas sobre las disponibles
+  en horario de apertura (BUSINESS_HOURS), total, por día y por mesa
+
+Las capacidades salen de la tabla Mesas (read model o Airtable). Las
+duraciones parten de valores por tamaño de grupo y se ajustan con las
+estancias observadas (paso de Sentada a Completada en los cambios del read
+model).
+
+Las rejillas se cachean por día (LRU de OCCUPANCY_CACHE_DAYS días) y se
+actualizan con cada cambio de Reservas: consultar cualquier rango solo
+construye los días que falten.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.core.config.airtable_ids import BASE_ID, TABLES
+from src.core.config.restaurant import BUSINESS_HOURS
+from src.infrastructure.read_model.rollups import SEATED_STATUSES, local_minutes
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+WEEKDAY_KEYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# Duración por defecto (minutos) según comensales: (hasta pax, minutos)
+DEFAULT_DURATIONS: Tuple[Tuple[Optional[int], int], ...] = (
+    (2, 90),
+    (4, 105),
+    (6, 120),
+    (None, 150),
+)
+MIN_DURATION_MINUTES = 30
+MAX_DURATION_MINUTES = 240
+
+# Campos de Mesas que usa el catálogo de capacidades
+OCCUPANCY_TABLE_FIELDS = ["ID Mesa", "Nombre de Mesa", "Zona", "Capacidad"]
+
+
+def _slot_of(hhmm: str) -> int:
+    hours, minutes = (int(part) for part in hhmm.split(":"))
+    return (hours * 60 + minutes) // SLOT_MINUTES
+
+
+def open_slots(day: date) -> np.ndarray:
+    """
+    Franjas abiertas del día según BUSINESS_HOURS. Los cierres después de
+    medianoche se recortan al final del día (la rejilla es por fecha de
+    reserva).
+    """
+    mask = np.zeros(SLOTS_PER_DAY, dtype=bool)
+    for service in (BUSINESS_HOURS.get(WEEKDAY_KEYS[day.weekday()]) or {}).values():
+        if not service:
+            continue
+        start, end = _slot_of(service["open"]), _slot_of(service["close"])
+        mask[start:end if end > start else SLOTS_PER_DAY] = True
+    return mask
+
+
+def slot_label(slot: int) -> str:
+    minutes = int(slot) * SLOT_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _window() -> Tuple[int, int]:
+    """Primera y última franja (exclusiva) abiertas en algún día de la semana."""
+    union = np.zeros(SLOTS_PER_DAY, dtype=bool)
+    for offset in range(7):
+        union |= open_slots(date(2024, 1, 1) + timedelta(days=offset))
+    slots = np.flatnonzero(union)
+    return (int(slots[0]), int(slots[-1]) + 1) if len(slots) else (0, SLOTS_PER_DAY)
+
+
+@dataclass(frozen=True)
+class TableInfo:
+    """Mesa del catálogo de capacidades."""
+
+    record_id: str
+    nombre: str
+    zona: str
+    capacidad: int
+
+
+def table_info(record: Dict[str, Any]) -> TableInfo:
+    """TableInfo desde un registro de Mesas (mismos defaults que _record_to_mesa)."""
+    fields = record.get("fields", {})
+    try:
+        capacidad = int(fields.get("Capacidad", fields.get("Capacidad_Estandar", 2)) or 0)
+    except (TypeError, ValueError):
+        capacidad = 0
+    return TableInfo(
+        record_id=record["id"],
+        nombre=str(fields.get("Nombre de Mesa") or fields.get("ID Mesa") or record["id"]),
+        zona=str(fields.get("Zona") or "sin especificar"),
+        capacidad=capacidad,
+    )
+
+
+class DurationModel:
+    """
+    Duración estimada de una reserva por tamaño de grupo. Cada tramo usa su
+    valor por defecto hasta tener `min_samples` estancias observadas; desde
+    ahí, la media móvil exponencial de las observaciones.
+    """
+
+    def __init__(
+        self,
+        defaults: Sequence[Tuple[Optional[int], int]] = DEFAULT_DURATIONS,
+        alpha: float = 0.2,
+        min_samples: int = 5,
+    ):
+        self.defaults = tuple(defaults)
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self._learned: List[Optional[float]] = [None] * len(self.defaults)
+        self._samples = [0] * len(self.defaults)
+
+    def _bucket(self, pax: int) -> int:
+        for i, (max_pax, _) in enumerate(self.defaults):
+            if max_pax is None or pax <= max_pax:
+                return i
+        return len(self.defaults) - 1
+
+    def _bucket_minutes(self, i: int) -> int:
+        learned = self._learned[i]
+        if learned is None or self._samples[i] < self.min_samples:
+            return self.defaults[i][1]
+        return int(round(learned))
+
+    def minutes(self, pax: int) -> int:
+        return self._bucket_minutes(self._bucket(pax))
+
+    def observe(self, pax: int, minutes: float):
+        """Registra una estancia real (se descartan las absurdas)."""
+        if not MIN_DURATION_MINUTES <= minutes <= MAX_DURATION_MINUTES:
+            return
+        i = self._bucket(pax)
+        previous = self._learned[i]
+        self._learned[i] = minutes if previous is None else previous + self.alpha * (minutes - previous)
+        self._samples[i] += 1
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "max_pax": max_pax,
+                "default_minutes": default,
+                "samples": self._samples[i],
+                "minutes": self._bucket_minutes(i),
+            }
+            for i, (max_pax, default) in enumerate(self.defaults)
+        ]
+
+
+class DayGrid:
+    """Rejilla de un día: reservas por (mesa, franja) y comensales por franja."""
+
+    def __init__(self, rows: int):
+        # Última fila: reservas sin mesa del catálogo
+        self.tables = np.zeros((rows, SLOTS_PER_DAY), dtype=np.int16)
+        self.seats = np.zeros(SLOTS_PER_DAY, dtype=np.int32)
+        self.entries: Dict[str, Tuple[int, int, int, int]] = {}
+        # Reservas sin hora: no ocupan franjas, solo se cuentan
+        self.untimed: Set[str] = set()
+
+    def add(self, record_id: str, row: int, start: int, end: int, pax: int):
+        self.tables[row, start:end] += 1
+        self.seats[start:end] += pax
+        self.entries[record_id] = (row, start, end, pax)
+
+    def remove(self, record_id: str):
+        self.untimed.discard(record_id)
+        entry = self.entries.pop(record_id, None)
+        if entry is None:
+            return
+        row, start, end, pax = entry
+        self.tables[row, start:end] -= 1
+        self.seats[start:end] -= pax
+
+    def occupied_tables(self) -> np.ndarray:
+        """Mesas ocupadas por franja (una mesa con dos reservas cuenta una vez)."""
+        return (self.tables[:-1] > 0).sum(axis=0) + self.tables[-1]
+
+
+class OccupancyEngine:
+    """
+    Rejillas de ocupación por día con caché LRU e invalidación incremental.
+
+    Args:
+        read_model: ReadModel del que cargar y al que suscribirse
+            (get_read_model() por defecto)
+        durations: modelo de duraciones (uno nuevo por defecto)
+        max_cached_days: días en caché (OCCUPANCY_CACHE_DAYS, 400 por defecto)
+    """
+
+    def __init__(
+        self,
+        read_model=None,
+        durations: Optional[DurationModel] = None,
+        max_cached_days: Optional[int] = None,
+    ):
+        self._read_model = read_model
+        self.durations = durations or DurationModel()
+        self.max_cached_days = max_cached_days or int(os.getenv("OCCUPANCY_CACHE_DAYS", "400"))
+        self.tables: List[TableInfo] = []
+        self._table_rows: Dict[str, int] = {}
+        self._days: "OrderedDict[date, DayGrid]" = OrderedDict()
+        self._record_day: Dict[str, date] = {}
+        self._seated_at: Dict[str, float] = {}
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._counters = {"days_built": 0, "days_evicted": 0, "incremental_updates": 0}
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Dict[str, Any]], tables: Sequence[TableInfo]
+    ) -> "OccupancyEngine":
+        """Motor independiente sobre un conjunto fijo de reservas y mesas."""
+        engine = cls(durations=get_occupancy_engine().durations)
+        engine.set_tables(tables)
+        engine._records = list(records)
+        engine._loaded = True
+        return engine
+
+    @property
+    def read_model(self):
+        if self._read_model is None:
+            from src.infrastructure.read_model import get_read_model
+
+            self._read_model = get_read_model()
+        return self._read_model
+
+    # --- Carga y actualización incremental ---
+
+    def set_tables(self, tables: Sequence[TableInfo]):
+        """Cambia el catálogo de mesas (las rejillas cacheadas se descartan)."""
+        with self._lock:
+            self.tables = list(tables)
+            self._table_rows = {table.record_id: i for i, table in enumerate(self.tables)}
+            self._days.clear()
+            self._record_day.clear()
+
+    def ensure_loaded(self) -> bool:
+        """
+        Se suscribe a Reservas y Mesas la primera vez que la réplica de
+        Reservas está fresca y hay catálogo de mesas. Devuelve False si aún
+        no se puede servir desde el motor.
+        """
+        if self._loaded:
+            return self._records is not None or self.read_model.is_fresh("reservas")
+        with self._lock:
+            if self._loaded:
+                return True
+            if not self.read_model.is_fresh("reservas"):
+                return False
+            mesas = self.read_model.read("mesas", allow_stale=True)
+            if not mesas:
+                return False
+            self.set_tables([table_info(record) for record in mesas])
+            store = self.read_model.store
+            store.add_listener("reservas", self._on_reservas_change)
+            store.add_listener("mesas", self._on_mesas_change)
+            self._loaded = True
+            logger.info(f"Occupancy engine ready with {len(self.tables)} tables")
+            return True
+
+    def _on_mesas_change(self, upserted: List[Dict[str, Any]], deleted: List[str]):
+        self.set_tables([table_info(record) for record in self.read_model.store.select("mesas")])
+
+    def _on_reservas_change(self, upserted: List[Dict[str, Any]], deleted: List[str]):
+        now = time.time()
+        with self._lock:
+            for record in upserted:
+                self._learn(record, now)
+                self._unplace(record["id"])
+                self._place(record)
+            for record_id in deleted:
+                self._seated_at.pop(record_id, None)
+                self._unplace(record_id)
+            self._counters["incremental_updates"] += len(upserted) + len(deleted)
+
+    def _learn(self, record: Dict[str, Any], now: float):
+        """Mide estancias reales: de Sentada a Completada."""
+        fields = record.get("fields", {})
+        estado = fields.get("Estado de Reserva") or fields.get("Estado")
+        if estado == "Sentada":
+            self._seated_at.setdefault(record["id"], now)
+            return
+        seated_at = self._seated_at.pop(record["id"], None)
+        if estado == "Completada" and seated_at is not None:
+            self.durations.observe(self._pax(fields), (now - seated_at) / 60)
+
+    @staticmethod
+    def _pax(fields: Dict[str, Any]) -> int:
+        try:
+            return int(fields.get("Cantidad de Personas") or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def _placement(self, record: Dict[str, Any]) -> Optional[Tuple[date, int, Optional[int], int, int]]:
+        """(día, fila, franja inicial o None sin hora, franja final, pax) de una reserva que ocupa mesa."""
+        fields = record.get("fields", {})
+        estado = fields.get("Estado de Reserva") or fields.get("Estado") or "Pendiente"
+        if estado not in SEATED_STATUSES:
+            return None
+        try:
+            day = date.fromisoformat(str(fields.get("Fecha de Reserva") or "")[:10])
+        except ValueError:
+            return None
+        mesa = fields.get("Mesa")
+        if isinstance(mesa, list):
+            mesa = mesa[0] if mesa else None
+        row = self._table_rows.get(mesa, len(self.tables))
+        pax = self._pax(fields)
+        minutes = local_minutes(fields.get("Hora"))
+        if minutes is None:
+            return day, row, None, 0, pax
+        start = minutes // SLOT_MINUTES
+        slots = -(-self.durations.minutes(pax) // SLOT_MINUTES)
+        return day, row, start, min(start + slots, SLOTS_PER_DAY), pax
+
+    def _place(self, record: Dict[str, Any], grid: Optional[DayGrid] = None):
+        placement = self._placement(record)
+        if placement is None:
+            return
+        day, row, start, end, pax = placement
+        grid = grid or self._days.get(day)
+        if grid is None:
+            return
+        if start is None:
+            grid.untimed.add(record["id"])
+        else:
+            grid.add(record["id"], row, start, end, pax)
+        self._record_day[record["id"]] = day
+
+    def _unplace(self, record_id: str):
+        day = self._record_day.pop(record_id, None)
+        grid = self._days.get(day) if day else None
+        if grid is not None:
+            grid.remove(record_id)
+
+    def _grids(self, start: date, end: date) -> List[Tuple[date, DayGrid]]:
+        """Rejillas de los días en [start, end), construyendo las que falten."""
+        days = [start + timedelta(days=i) for i in range((end - start).days)]
+        with self._lock:
+            missing = [day for day in days if day not in self._days]
+            if missing:
+                self._build(missing)
+            grids = []
+            for day in days:
+                self._days.move_to_end(day)
+                grids.append((day, self._days[day]))
+            self._evict(keep=len(days))
+        return grids
+
+    def _build(self, missing: List[date]):
+        if self._records is not None:
+            records: Iterable[Dict[str, Any]] = self._records
+        else:
+            records = self.read_model.store.select(
+                "reservas", between={"fecha": (missing[0].isoformat(), missing[-1].isoformat())}
+            )
+        wanted = set(missing)
+        for day in missing:
+            self._days[day] = DayGrid(len(self.tables) + 1)
+        for record in records:
+            placement = self._placement(record)
+            if placement is not None and placement[0] in wanted:
+                self._place(record, self._days[placement[0]])
+        self._counters["days_built"] += len(missing)
+
+    def _evict(self, keep: int):
+        while len(self._days) > max(self.max_cached_days, keep):
+            _, grid = self._days.popitem(last=False)
+            for record_id in (*grid.entries, *grid.untimed):
+                self._record_day.pop(record_id, None)
+            self._counters["days_evicted"] += 1
+
+    # --- Consultas ---
+
+    def _rate(self, used: float, available: float) -> float:
+        return round(min(used / available, 1.0) * 100, 2) if available else 0.0
+
+    def heatmap(self, start: date, end: date) -> Dict[str, Any]:
+        """% de mesas ocupadas por día y franja de 15 minutos en [start, end)."""
+        first, last = _window()
+        total = len(self.tables)
+        rows = []
+        for day, grid in self._grids(start, end):
+            occupied = np.minimum(grid.occupied_tables()[first:last], total)
+            rates = (occupied / total * 100).round(1) if total else np.zeros(last - first)
+            rows.append({
+                "fecha": day.isoformat(),
+                "abierto": bool(open_slots(day).any()),
+                "ocupacion": rates.tolist(),
+            })
+        return {
+            "slot_minutes": SLOT_MINUTES,
+            "slots": [slot_label(slot) for slot in range(first, last)],
+            "total_tables": total,
+            "days": rows,
+        }
+
+    def peak_slots(self, start: date, end: date, limit: int = 10) -> List[Dict[str, Any]]:
+        """Las `limit` franjas con más mesas ocupadas (desempate: más comensales)."""
+        grids = self._grids(start, end)
+        if not grids:
+            return []
+        occupied = np.stack([grid.occupied_tables() for _, grid in grids])
+        seats = np.stack([grid.seats for _, grid in grids])
+        order = np.lexsort((-seats.ravel(), -occupied.ravel()))[:limit]
+        total = len(self.tables)
+        peaks = []
+        for index in order:
+            day_index, slot = divmod(int(index), SLOTS_PER_DAY)
+            if occupied[day_index, slot] == 0:
+                break
+            peaks.append({
+                "fecha": grids[day_index][0].isoformat(),
+                "franja": slot_label(slot),
+                "mesas_ocupadas": int(occupied[day_index, slot]),
+                "comensales": int(seats[day_index, slot]),
+                "ocupacion": self._rate(int(occupied[day_index, slot]), total),
+            })
+        return peaks
+
+    def utilization(self, start: date, end: date) -> Dict[str, Any]:
+        """
+        Mesa-franjas y plaza-franjas ocupadas sobre las disponibles en
+        horario de apertura, total, por día abierto y por mesa.
+        """
+        total = len(self.tables)
+        capacity = sum(table.capacidad for table in self.tables)
+        table_slots = seat_slots = open_count = 0
+        without_time = 0
+        per_table = np.zeros(total + 1, dtype=np.int64)
+        daily: Dict[str, float] = {}
+        for day, grid in self._grids(start, end):
+            without_time += len(grid.untimed)
+            is_open = open_slots(day)
+            slots = int(is_open.sum())
+            if not slots:
+                continue
+            used = int(np.minimum(grid.occupied_tables()[is_open], total).sum())
+            daily[day.isoformat()] = self._rate(used, total * slots)
+            table_slots += used
+            seat_slots += int(np.minimum(grid.seats[is_open], capacity).sum())
+            per_table += (grid.tables[:, is_open] > 0).sum(axis=1)
+            open_count += slots
+        return {
+            "total_tables": total,
+            "seat_capacity": capacity,
+            "open_hours": open_count * SLOT_MINUTES / 60,
+            "table_utilization": self._rate(table_slots, total * open_count),
+            "seat_utilization": self._rate(seat_slots, capacity * open_count),
+            "daily": daily,
+            "by_table": [
+                {
+                    "mesa": table.record_id,
+                    "nombre": table.nombre,
+                    "zona": table.zona,
+                    "capacidad": table.capacidad,
+                    "utilizacion": self._rate(int(per_table[i]), open_count),
+                }
+                for i, table in enumerate(self.tables)
+            ],
+            "unassigned_table_hours": int(per_table[-1]) * SLOT_MINUTES / 60,
+            "reservations_without_time": without_time,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "tables": len(self.tables),
+                "cached_days": len(self._days),
+                "max_cached_days": self.max_cached_days,
+                "seated_tracked": len(self._seated_at),
+                "durations": self.durations.get_stats(),
+                **self._counters,
+            }
+
+
+async def load_table_catalog(airtable: Any) -> List[TableInfo]:
+    """Catálogo de mesas desde el read model (aunque esté desfasado) o Airtable."""
+    from src.infrastructure.read_model import get_read_model
+
+    records = get_read_model().read("mesas", allow_stale=True)
+    if records is None:
+        result = await airtable.list_records(
+            base_id=BASE_ID, table_name=TABLES["MESAS"], fields=OCCUPANCY_TABLE_FIELDS
+        )
+        records = result.get("records", [])
+    return [table_info(record) for record in records]
+
+
+_engine: Optional[OccupancyEngine] = None
+
+
+def get_occupancy_engine() -> OccupancyEngine:
+    """Devuelve la instancia singleton del motor de ocupación."""
+    global _engine
+    if _engine is None:
+        _engine = OccupancyEngine()
+    return _engine
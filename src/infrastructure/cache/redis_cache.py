@@ -337,6 +337,38 @@ class RedisCache:
             logger.error(f"Redis SET error for key '{key}': {type(e).__name__}: {e}")
             return False
 
+    def set_if_absent(self, key: str, value: Any, ttl: int = 3600) -> Optional[bool]:
+        """
+        Atomically set key only if it does not exist (SET NX EX).
+
+        Used as a shared claim/idempotency marker across workers.
+
+        Returns:
+            True if the key was set, False if it already existed,
+            None if Redis is unavailable (caller must fall back).
+        """
+        if not self.enabled:
+            return None
+
+        if self.circuit_breaker.is_open():
+            logger.debug(f"Circuit breaker OPEN - skipping Redis SETNX for key '{key}'")
+            return None
+
+        start_time = time.time()
+
+        def _set_if_absent():
+            serialized = json.dumps(value, default=str)
+            return bool(self.redis_client.set(key, serialized, nx=True, ex=ttl))
+
+        try:
+            result = self._retry_with_backoff("SETNX", _set_if_absent)
+            latency_ms = (time.time() - start_time) * 1000
+            self.metrics.record_latency("set_if_absent", latency_ms)
+            return result
+        except Exception as e:
+            logger.error(f"Redis SETNX error for key '{key}': {type(e).__name__}: {e}")
+            return None
+
     def delete(self, key: str) -> bool:
         """
         Delete specific key from cache.
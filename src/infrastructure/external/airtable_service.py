@@ -3,7 +3,10 @@ from typing import Dict, Any, Optional, List  # FIXED: added List
 import os
 from pyairtable import Api
 
+from src.infrastructure.airtable.resilience import get_airtable_resilience
 from src.infrastructure.cache.redis_cache import get_cache
+from src.core.config.airtable_fields import RESERVATION_MATCH_FIELDS
+from src.infrastructure.write_journal import get_write_journal
 from src.core.logging import logger
 from src.core.utils.sanitization import sanitize_reservation_data  # SECURITY: Import sanitization
 
@@ -17,8 +20,10 @@ class AirtableService:
             max_connections=5, compress_threshold=2048
         )  # Initialize optimized cache
 
+        self.resilience = get_airtable_resilience()
+
         if self.api_key:
-            self.api = Api(self.api_key)
+            self.api = Api(self.api_key, timeout=self.resilience.http_timeout)
         else:
             self.api = None
             logger.warning("Airtable credentials not found.")
@@ -31,8 +36,16 @@ class AirtableService:
             logger.warning("AirtableService initialized - Cache disabled")
 
     async def create_record(
-        self, fields: Dict[str, Any], table_name: Optional[str] = None
+        self,
+        fields: Dict[str, Any],
+        table_name: Optional[str] = None,
+        match_fields: Optional[List[str]] = None,
     ) -> Optional[Dict]:
+        """
+        Crea un registro vía diario de escrituras. match_fields identifica
+        el registro si el create llega a Airtable tras un timeout (en
+        Reservas, teléfono + fecha + hora por defecto).
+        """
         # SECURITY: Sanitize fields to prevent formula injection
         sanitized_fields = sanitize_reservation_data(fields)
         
@@ -41,9 +54,12 @@ class AirtableService:
             return {"id": "recMOCK12345", "fields": sanitized_fields}
 
         target_table = table_name or self.table_name
+        if match_fields is None and target_table == "Reservas":
+            match_fields = RESERVATION_MATCH_FIELDS
         try:
-            table = self.api.table(self.base_id, target_table)
-            record = table.create(sanitized_fields)
+            record = await get_write_journal().create(
+                target_table, sanitized_fields, match_fields=match_fields
+            )
 
             # Invalidate cache for this table
             cache_key = f"airtable:{target_table}:*"
@@ -76,7 +92,9 @@ class AirtableService:
         # Fetch from Airtable
         try:
             table = self.api.table(self.base_id, target_table)
-            record = table.get(record_id)
+            record = await self.resilience.call(
+                target_table, table.get, record_id, idempotent=True, base_id=self.base_id
+            )
 
             # Cache for 1 hour
             self.cache.set(cache_key, record, ttl=3600)
@@ -97,8 +115,7 @@ class AirtableService:
 
         target_table = table_name or self.table_name
         try:
-            table = self.api.table(self.base_id, target_table)
-            record = table.update(record_id, sanitized_fields)
+            record = await get_write_journal().update(target_table, record_id, sanitized_fields)
 
             # Invalidate caches
             cache_key = f"airtable:{target_table}:{record_id}"
@@ -131,7 +148,10 @@ class AirtableService:
         # Fetch from Airtable
         try:
             table = self.api.table(self.base_id, target_table)
-            records = table.all(max_records=max_records)
+            records = await self.resilience.call(
+                target_table, table.all, max_records=max_records, idempotent=True,
+                base_id=self.base_id,
+            )
 
             # Cache for 10 minutes (fresher data than individual records)
             self.cache.set(cache_key, records, ttl=600)
@@ -153,7 +173,10 @@ class AirtableService:
         
         try:
             table = self.api.table(self.base_id, target_table)
-            records = table.all(formula=formula, max_records=max_records, sort=sort)
+            records = await self.resilience.call(
+                target_table, table.all, formula=formula, max_records=max_records, sort=sort,
+                idempotent=True, base_id=self.base_id,
+            )
             return records
         except Exception as e:
             logger.error(f"Error getting records by formula from Airtable: {e}")
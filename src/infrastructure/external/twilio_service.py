@@ -81,6 +81,104 @@ class TwilioService:
             logger.error(f"Error enviando plantilla WhatsApp: {ex}")
             return None
 
+    async def send_whatsapp_template_async(
+        self,
+        to_number: str,
+        template_sid: str,
+        variables: Dict[str, str],
+        http_client=None,
+        max_attempts: int = 3,
+    ) -> Optional[str]:
+        """
+        Versión async de send_whatsapp_template (REST API vía httpx).
+
+        Args:
+            http_client: httpx.AsyncClient compartido (opcional) para reutilizar conexiones
+        """
+        return await self.send_message_async(
+            to_number,
+            template_sid=template_sid,
+            variables=variables,
+            http_client=http_client,
+            max_attempts=max_attempts,
+        )
+
+    async def send_message_async(
+        self,
+        to_number: str,
+        body: Optional[str] = None,
+        template_sid: Optional[str] = None,
+        variables: Optional[Dict[str, str]] = None,
+        persistent_action: Optional[List[str]] = None,
+        channel: str = "whatsapp",
+        http_client=None,
+        max_attempts: int = 3,
+        raise_on_error: bool = False,
+    ) -> Optional[str]:
+        """
+        Envía un mensaje por la REST API de Twilio sin bloquear el event loop.
+        Reintenta cuando Twilio responde 429 respetando Retry-After.
+
+        Args:
+            channel: "whatsapp" (From = TWILIO_WHATSAPP_NUMBER) o "sms" (From = TWILIO_FROM_NUMBER)
+            raise_on_error: Propaga el error en lugar de devolver None (para reintentos del outbox)
+        """
+        if not self.sid or not self.token:
+            if raise_on_error:
+                raise RuntimeError("Twilio SID o Token no configurados")
+            return None
+
+        import asyncio
+        import json
+        import httpx
+
+        if channel == "sms":
+            from_number = os.getenv("TWILIO_FROM_NUMBER")
+            if not from_number:
+                logger.error("TWILIO_FROM_NUMBER no está configurado para SMS.")
+                if raise_on_error:
+                    raise RuntimeError("TWILIO_FROM_NUMBER no configurado")
+                return None
+            to_formatted = to_number
+        else:
+            from_number = self.whatsapp_from
+            if not to_number.startswith("whatsapp:"):
+                to_formatted = f"whatsapp:{to_number}"
+            else:
+                to_formatted = to_number
+
+        data: Dict[str, Any] = {"From": from_number, "To": to_formatted}
+        if template_sid:
+            data["ContentSid"] = template_sid
+            data["ContentVariables"] = json.dumps(variables or {})
+        if body is not None:
+            data["Body"] = body
+        if persistent_action:
+            data["PersistentAction"] = persistent_action
+
+        url = f"https://api.twilio.com/2010-04-01/Accounts/{self.sid}/Messages.json"
+        client = http_client or httpx.AsyncClient(timeout=10)
+        try:
+            for attempt in range(max_attempts):
+                response = await client.post(url, data=data, auth=(self.sid, self.token))
+                if response.status_code == 429 and attempt < max_attempts - 1:
+                    retry_after = float(response.headers.get("Retry-After", 2 ** attempt))
+                    logger.warning(f"Twilio 429 para {to_number}, reintentando en {retry_after}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+                sid = response.json().get("sid")
+                logger.info(f"Mensaje {channel} enviado a {to_number}: SID {sid}")
+                return sid
+        except Exception as ex:
+            logger.error(f"Error enviando mensaje {channel}: {ex}")
+            if raise_on_error:
+                raise
+        finally:
+            if http_client is None:
+                await client.aclose()
+        return None
+
     def _format_template_body(self, template_sid: str, variables: Dict[str, str]) -> str:
         """
         Mapeo temporal de plantillas hasta que se integre Twilio Content API.
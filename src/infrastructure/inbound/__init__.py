@@ -0,0 +1,16 @@
+"""Ingesta asíncrona de mensajes WhatsApp entrantes."""
+
+from src.infrastructure.inbound.service import (
+    InboundQueue,
+    async_ingestion_enabled,
+    get_inbound_queue,
+)
+from src.infrastructure.inbound.store import InboundMessage, SQLiteInboundStore
+
+__all__ = [
+    "InboundQueue",
+    "async_ingestion_enabled",
+    "get_inbound_queue",
+    "InboundMessage",
+    "SQLiteInboundStore",
+]
@@ -0,0 +1,256 @@
+"""
+Ingesta asíncrona de WhatsApp entrante.
+
+El webhook solo valida, persiste el mensaje y responde a Twilio con un TwiML
+vacío; el orchestrator (LLM + Airtable) corre después en un pool de
+consumidores y la respuesta sale por la REST API de Twilio. Así la latencia
+del webhook no depende de la del LLM y no se roza el timeout de 15 s.
+
+Orden por teléfono: cada teléfono se asigna siempre al mismo consumidor
+(hash % workers) y cada consumidor procesa su cola en serie, de modo que los
+mensajes de un cliente se procesan y contestan en el orden en que llegaron.
+
+Con varios procesos (uvicorn --workers) el orden y la unicidad los garantiza
+el store: cada mensaje se reclama antes de procesarlo y no se puede
+reclamar mientras otro anterior del mismo teléfono siga sin terminar. Un
+mensaje que no se pudo reclamar lo recoge el scan periódico
+(INBOUND_RECOVERY_SECONDS), que también retoma los leases caducados de
+workers caídos.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.infrastructure.inbound.store import InboundMessage, SQLiteInboundStore
+
+logger = logging.getLogger(__name__)
+
+# Devuelve el texto de respuesta (o None si no hay que contestar)
+Handler = Callable[[InboundMessage], Awaitable[Optional[str]]]
+
+FALLBACK_REPLY = (
+    "Lo siento, ha habido un error técnico. "
+    "Por favor, llama al restaurante al 941 57 84 51."
+)
+
+
+def async_ingestion_enabled() -> bool:
+    """WHATSAPP_INGESTION_MODE=async (por defecto) o sync (procesar en el webhook)."""
+    return os.getenv("WHATSAPP_INGESTION_MODE", "async").lower() != "sync"
+
+
+class InboundQueue:
+    """
+    Cola duradera de mensajes entrantes con consumidores particionados por teléfono.
+
+    Args:
+        store: Diario duradero (SQLiteInboundStore por defecto)
+        workers: Número de consumidores (particiones)
+        max_attempts: Intentos del handler antes de dar el mensaje por fallido
+        handler_timeout_seconds: Tiempo máximo de proceso de un mensaje
+        recovery_interval_seconds: Cadencia del scan de mensajes sin dueño
+    """
+
+    def __init__(
+        self,
+        store=None,
+        workers: int = None,
+        max_attempts: int = 3,
+        handler_timeout_seconds: float = 90.0,
+        retry_delay_seconds: float = 2.0,
+        recovery_interval_seconds: Optional[float] = None,
+    ):
+        self.store = store
+        self.workers = workers or int(os.getenv("INBOUND_WORKERS", "8"))
+        self.max_attempts = max_attempts
+        self.handler_timeout_seconds = handler_timeout_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self.recovery_interval_seconds = recovery_interval_seconds or float(
+            os.getenv("INBOUND_RECOVERY_SECONDS", "2")
+        )
+        # Un intento (más su espera de reintento) cabe de sobra en el lease
+        self.lease_seconds = handler_timeout_seconds + 30.0
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._handlers: Dict[str, Handler] = {}
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        # Mensajes ya en las colas locales (el scan no los duplica)
+        self._queued: Set[int] = set()
+        self._running = False
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._latency_ms: List[float] = []
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def register_handler(self, source: str, handler: Handler):
+        """Registra el procesador de un origen (p.ej. 'twilio', 'whatsapp')."""
+        self._handlers[source] = handler
+
+    def _partition(self, phone: str) -> int:
+        return zlib.crc32(phone.encode()) % self.workers
+
+    # --- Ingesta ---
+
+    async def submit(self, msg: InboundMessage) -> bool:
+        """
+        Persiste y encola un mensaje. Devuelve False si es un reintento de
+        Twilio (MessageSid ya recibido).
+        """
+        if not await self.store.append(msg):
+            self._counters["duplicates"] += 1
+            logger.info(f"Inbound: MessageSid duplicado ignorado ({msg.message_sid})")
+            return False
+        self._counters["accepted"] += 1
+        self._enqueue(msg)
+        return True
+
+    def _enqueue(self, msg: InboundMessage):
+        self._queued.add(msg.seq)
+        self._queues[self._partition(msg.phone)].put_nowait(msg)
+
+    # --- Ciclo de vida ---
+
+    async def start(self):
+        if self._running:
+            return
+        if self.store is None:
+            self.store = SQLiteInboundStore()
+
+        self._queues = [asyncio.Queue() for _ in range(self.workers)]
+        self._running = True
+
+        # Lo aceptado antes de un reinicio (o por otro worker) lo recoge el scan
+        self._tasks = [asyncio.create_task(self._consumer(q)) for q in self._queues]
+        self._tasks.append(asyncio.create_task(self._recovery_loop()))
+        logger.info(f"Inbound queue started ({self.workers} consumers, owner {self.owner})")
+
+    async def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Inbound queue stopped")
+
+    # --- Consumo ---
+
+    async def _recovery_loop(self):
+        while self._running:
+            try:
+                recovered = 0
+                for msg in await self.store.claimable():
+                    if msg.seq not in self._queued:
+                        self._enqueue(msg)
+                        recovered += 1
+                if recovered:
+                    logger.info(f"Inbound: {recovered} mensajes sin dueño encolados")
+            except Exception as e:
+                logger.error(f"Inbound: error en el scan de recuperación: {e}")
+            await asyncio.sleep(self.recovery_interval_seconds)
+
+    async def _consumer(self, queue: asyncio.Queue):
+        while self._running:
+            msg = await queue.get()
+            self._queued.discard(msg.seq)
+            try:
+                # Otro worker lo tiene, ya está hecho o espera a uno anterior
+                # del mismo teléfono: lo retomará el scan si sigue pendiente
+                if not await self.store.claim(msg, self.owner, self.lease_seconds):
+                    self._counters["not_claimed"] += 1
+                    continue
+                await self._process(msg)
+            except Exception as e:
+                logger.error(f"Inbound: error inesperado con {msg.message_sid}: {e}", exc_info=True)
+
+    async def _process(self, msg: InboundMessage):
+        handler = self._handlers.get(msg.source)
+        if handler is None:
+            await self.store.mark_failed(msg, f"Origen sin handler: {msg.source}")
+            self._counters["failed"] += 1
+            return
+
+        reply: Optional[str] = None
+        while True:
+            try:
+                reply = await asyncio.wait_for(handler(msg), timeout=self.handler_timeout_seconds)
+                break
+            except Exception as e:
+                msg.attempts += 1
+                error = str(e)[:300] or type(e).__name__
+                logger.error(f"Inbound: fallo procesando {msg.message_sid} (intento {msg.attempts}): {error}")
+                if msg.attempts >= self.max_attempts:
+                    await self.store.mark_failed(msg, error)
+                    self._counters["failed"] += 1
+                    await self._reply(msg, FALLBACK_REPLY)
+                    return
+                if not await self.store.record_attempt(msg, error, self.owner, self.lease_seconds):
+                    logger.warning(f"Inbound: lease de {msg.message_sid} perdido, se abandona")
+                    return
+                # Reintento en el mismo consumidor para no adelantar mensajes posteriores
+                await asyncio.sleep(self.retry_delay_seconds * msg.attempts)
+
+        if reply:
+            await self._reply(msg, reply)
+        await self.store.mark_done(msg)
+        self._counters["processed"] += 1
+        self._record_latency((time.time() - msg.received_at) * 1000)
+
+    async def _reply(self, msg: InboundMessage, text: str):
+        """Contesta por la REST API; si falla, lo deja en el outbox para reintentar."""
+        from src.infrastructure.external.twilio_service import twilio_service
+        from src.infrastructure.outbox import get_outbox
+
+        try:
+            await twilio_service.send_message_async(msg.phone, body=text, raise_on_error=True)
+            self._counters["replies_sent"] += 1
+        except Exception as e:
+            logger.warning(f"Inbound: respuesta a {msg.phone} diferida al outbox: {e}")
+            await get_outbox().enqueue_whatsapp(
+                to=msg.phone, body=text, dedupe_key=f"reply:{msg.message_sid}"
+            )
+            self._counters["replies_deferred"] += 1
+
+    def _record_latency(self, value_ms: float):
+        self._latency_ms.append(value_ms)
+        if len(self._latency_ms) > 500:
+            del self._latency_ms[:-500]
+
+    # --- Observabilidad ---
+
+    async def get_stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latency_ms)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else None
+        return {
+            "running": self._running,
+            "owner": self.owner,
+            "mode": "async" if async_ingestion_enabled() else "sync",
+            "workers": self.workers,
+            "queued": sum(q.qsize() for q in self._queues),
+            "store": await self.store.stats() if self.store else None,
+            "counters": dict(self._counters),
+            "end_to_end_p95_ms": round(p95, 1) if p95 is not None else None,
+        }
+
+
+# Singleton global
+_inbound_queue: Optional[InboundQueue] = None
+
+
+def get_inbound_queue() -> InboundQueue:
+    """Devuelve la instancia singleton de la cola de entrada."""
+    global _inbound_queue
+    if _inbound_queue is None:
+        _inbound_queue = InboundQueue()
+    return _inbound_queue
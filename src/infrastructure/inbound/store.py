@@ -0,0 +1,218 @@
+"""
+Diario duradero de mensajes WhatsApp entrantes.
+
+El webhook persiste cada mensaje aquí antes de responder a Twilio, de modo
+que un reinicio no pierde mensajes aceptados: los pendientes se reprocesan
+en el orden de llegada. El MessageSid de Twilio es único, así los
+reintentos del webhook no se procesan dos veces.
+
+Varios workers comparten el fichero: un mensaje se procesa solo tras
+reclamarlo (status 'processing', owner y lease_until en un único UPDATE),
+y no se puede reclamar mientras haya un mensaje anterior del mismo
+teléfono sin terminar, lo tenga quien lo tenga. Si el worker muere, el
+lease caduca y otro lo retoma.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DONE_RETENTION_SECONDS = 24 * 3600
+
+
+@dataclass
+class InboundMessage:
+    """Mensaje entrante pendiente de procesar por el orchestrator."""
+
+    phone: str
+    body: str
+    source: str = "twilio"
+    message_sid: str = field(default_factory=lambda: f"local-{uuid.uuid4().hex}")
+    profile_name: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    received_at: float = field(default_factory=time.time)
+    attempts: int = 0
+    seq: Optional[int] = None  # orden de llegada asignado por el store
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "phone": self.phone,
+                "body": self.body,
+                "source": self.source,
+                "message_sid": self.message_sid,
+                "profile_name": self.profile_name,
+                "metadata": self.metadata,
+                "received_at": self.received_at,
+            },
+            default=str,
+        )
+
+    @classmethod
+    def from_row(cls, seq: int, data: str, attempts: int) -> "InboundMessage":
+        msg = cls(**json.loads(data))
+        msg.seq = seq
+        msg.attempts = attempts
+        return msg
+
+
+class SQLiteInboundStore:
+    """Diario local en SQLite (una fila por mensaje con su estado)."""
+
+    name = "sqlite"
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS inbound (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        message_sid TEXT NOT NULL UNIQUE,
+        phone TEXT NOT NULL,
+        data TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at REAL NOT NULL,
+        owner TEXT,
+        lease_until REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_inbound_status ON inbound(status, seq);
+    CREATE INDEX IF NOT EXISTS idx_inbound_phone ON inbound(phone, seq);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("INBOUND_SQLITE_PATH", "data/inbound.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        """Añade las columnas de claim a diarios creados antes de tenerlas."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(inbound)")}
+        for name, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE inbound ADD COLUMN {name} {kind}")
+
+    async def close(self):
+        self._conn.close()
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
+
+    async def append(self, msg: InboundMessage) -> bool:
+        """Persiste el mensaje. Devuelve False si el MessageSid ya existía."""
+
+        def _insert():
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO inbound (message_sid, phone, data, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (msg.message_sid, msg.phone, msg.to_json(), msg.received_at),
+            )
+            if cur.rowcount != 1:
+                return False
+            msg.seq = cur.lastrowid
+            return True
+
+        return await self._run(_insert)
+
+    async def claimable(self, limit: int = 200) -> List[InboundMessage]:
+        """
+        Mensajes sin dueño: pendientes o en proceso con el lease caducado
+        (worker caído), en orden de llegada.
+        """
+
+        def _select():
+            rows = self._conn.execute(
+                "SELECT seq, data, attempts FROM inbound WHERE status = 'pending' "
+                "OR (status = 'processing' AND lease_until < ?) ORDER BY seq LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+            return [InboundMessage.from_row(*row) for row in rows]
+
+        return await self._run(_select)
+
+    async def claim(self, msg: InboundMessage, owner: str, lease_seconds: float) -> bool:
+        """
+        Reclama el mensaje para procesarlo. Falla si otro worker lo tiene con
+        el lease vigente, si ya está terminado o si queda un mensaje anterior
+        del mismo teléfono sin terminar (se reintenta en el siguiente scan).
+        """
+
+        def _update():
+            now = time.time()
+            cur = self._conn.execute(
+                "UPDATE inbound SET status = 'processing', owner = ?, lease_until = ? "
+                "WHERE seq = ? AND (status = 'pending' OR (status = 'processing' AND lease_until < ?)) "
+                "AND NOT EXISTS (SELECT 1 FROM inbound AS earlier WHERE earlier.phone = inbound.phone "
+                "AND earlier.seq < inbound.seq AND earlier.status IN ('pending', 'processing'))",
+                (owner, now + lease_seconds, msg.seq, now),
+            )
+            return cur.rowcount == 1
+
+        return await self._run(_update)
+
+    async def record_attempt(
+        self, msg: InboundMessage, error: str, owner: str, lease_seconds: float
+    ) -> bool:
+        """Guarda el intento fallido y renueva el lease. False si ya no es nuestro."""
+
+        def _update():
+            cur = self._conn.execute(
+                "UPDATE inbound SET attempts = ?, last_error = ?, lease_until = ? "
+                "WHERE seq = ? AND status = 'processing' AND owner = ?",
+                (msg.attempts, error, time.time() + lease_seconds, msg.seq, owner),
+            )
+            return cur.rowcount == 1
+
+        return await self._run(_update)
+
+    async def mark_done(self, msg: InboundMessage):
+        await self._set_status(msg, "done")
+
+    async def mark_failed(self, msg: InboundMessage, error: str):
+        await self._set_status(msg, "failed", error)
+
+    async def _set_status(self, msg: InboundMessage, status: str, error: Optional[str] = None):
+        def _update():
+            self._conn.execute(
+                "UPDATE inbound SET status = ?, attempts = ?, last_error = COALESCE(?, last_error), "
+                "owner = NULL, lease_until = NULL WHERE seq = ?",
+                (status, msg.attempts, error, msg.seq),
+            )
+            self._conn.execute(
+                "DELETE FROM inbound WHERE status = 'done' AND created_at < ?",
+                (time.time() - DONE_RETENTION_SECONDS,),
+            )
+
+        await self._run(_update)
+
+    async def stats(self) -> Dict[str, Any]:
+        def _count():
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM inbound GROUP BY status"
+            ).fetchall()
+            return dict(rows)
+
+        counts = await self._run(_count)
+        return {
+            "backend": self.name,
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "failed": counts.get("failed", 0),
+            "done_retained": counts.get("done", 0),
+        }
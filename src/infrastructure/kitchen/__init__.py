@@ -0,0 +1,19 @@
+"""Tablero de cocina en memoria con avisos precalculados y deltas por WebSocket."""
+
+from src.infrastructure.kitchen.board import (
+    KitchenBoard,
+    get_kitchen_board,
+    kitchen_order,
+    kitchen_view,
+)
+from src.infrastructure.kitchen.flags import DIETARY_FLAGS, dietary_flags, normalize
+
+__all__ = [
+    "KitchenBoard",
+    "get_kitchen_board",
+    "kitchen_order",
+    "kitchen_view",
+    "DIETARY_FLAGS",
+    "dietary_flags",
+    "normalize",
+]
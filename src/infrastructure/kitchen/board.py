@@ -0,0 +1,306 @@
+"""
+Tablero de cocina: vista de las reservas de hoy mantenida en memoria.
+
+Se carga del read model cuando la réplica de Reservas está fresca y desde
+entonces se actualiza con cada cambio de la réplica (escritura propia,
+polling o webhook). Los cambios se leen del registro de cambios compartido
+(rm_changes) a partir de la última secuencia aplicada, así que también
+llegan los que escribe otro worker: los del propio proceso se aplican al
+momento (listener) y los demás en el siguiente sondeo
+(KITCHEN_BOARD_POLL_SECONDS) o petición. Cada pedido se construye, con sus
+avisos de cocina, al llegar el cambio: GET /cocina/pedidos solo devuelve
+la instantánea ya ordenada, que se regenera cuando algo cambia.
+
+Cada cambio se publica como delta (pedidos nuevos o modificados e IDs
+retirados, con una versión creciente) mediante el publicador configurado;
+la API lo envía a la sala "kitchen" del WebSocket. Si un cliente ve un
+salto de versión, vuelve a pedir la instantánea.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.core.config.airtable_fields import AIRTABLE_FIELD_MAP
+from src.infrastructure.kitchen.flags import dietary_flags
+from src.infrastructure.read_model.changelog import ChangeLogExpired
+
+logger = logging.getLogger(__name__)
+
+# Estados que no llegan a cocina
+EXCLUDED_STATUSES = frozenset({"Cancelada"})
+
+Publisher = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def _fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    return record.get("fields", {})
+
+
+def _record_day(record: Dict[str, Any]) -> Optional[str]:
+    value = _fields(record).get(AIRTABLE_FIELD_MAP["fecha"])
+    return str(value)[:10] if value else None
+
+
+def kitchen_order(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Pedido de cocina de una reserva (None si no llega a cocina)."""
+    fields = _fields(record)
+    estado = fields.get(AIRTABLE_FIELD_MAP["estado"], "")
+    if estado in EXCLUDED_STATUSES:
+        return None
+    notas = fields.get(AIRTABLE_FIELD_MAP["notas"], "")
+    return {
+        "id": record.get("id"),
+        "hora": fields.get(AIRTABLE_FIELD_MAP["hora"], ""),
+        "pax": fields.get(AIRTABLE_FIELD_MAP["pax"], 0),
+        "nombre_cliente": fields.get(AIRTABLE_FIELD_MAP["nombre"], ""),
+        "mesa": fields.get(AIRTABLE_FIELD_MAP["mesa_asignada"], []),
+        "estado": estado,
+        "notas": notas,
+        "notas_especiales": dietary_flags(notas),
+    }
+
+
+def _by_time(order: Dict[str, Any]):
+    return (str(order["hora"] or ""), order["id"] or "")
+
+
+def kitchen_view(fecha: date, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Vista de cocina calculada al momento (sin tablero cargado u otro día)."""
+    pedidos = sorted(
+        (order for order in map(kitchen_order, records) if order is not None), key=_by_time
+    )
+    return {"fecha": fecha.isoformat(), "total_pedidos": len(pedidos), "pedidos": pedidos, "version": None}
+
+
+class KitchenBoard:
+    """
+    Pedidos de cocina de hoy con actualización incremental.
+
+    Args:
+        read_model: ReadModel del que cargar y al que suscribirse
+            (get_read_model() por defecto)
+        poll_interval_seconds: Cadencia con la que se leen los cambios
+            escritos por otros workers
+    """
+
+    def __init__(self, read_model=None, poll_interval_seconds: Optional[float] = None):
+        self._read_model = read_model
+        self.poll_interval_seconds = poll_interval_seconds or float(
+            os.getenv("KITCHEN_BOARD_POLL_SECONDS", "2")
+        )
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.day: Optional[date] = None
+        self.version = 0
+        # (época, secuencia) del registro de cambios ya aplicada al tablero
+        self._position: Optional[Tuple[str, int]] = None
+        self._orders: Dict[str, Dict[str, Any]] = {}
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._publisher: Optional[Publisher] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._counters = {
+            "snapshots_built": 0,
+            "deltas_published": 0,
+            "publish_errors": 0,
+            "reloads": 0,
+        }
+
+    @property
+    def read_model(self):
+        if self._read_model is None:
+            from src.infrastructure.read_model import get_read_model
+
+            self._read_model = get_read_model()
+        return self._read_model
+
+    def set_publisher(self, publisher: Optional[Publisher], loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Corutina que recibe cada delta y el bucle en el que ejecutarla."""
+        self._publisher = publisher
+        self._loop = loop
+
+    async def start(self):
+        """Sondea el registro de cambios (cambios de otros workers)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            if not self._loaded:
+                continue
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                logger.warning(f"Kitchen board sync failed: {e}")
+
+    # --- Carga y actualización incremental ---
+
+    def ensure_loaded(self) -> bool:
+        """
+        Carga los pedidos de hoy y se suscribe a Reservas la primera vez que
+        la réplica está fresca; después aplica los cambios pendientes.
+        Devuelve False si no se puede servir desde el tablero (réplica
+        desfasada).
+        """
+        if not self.read_model.is_fresh("reservas"):
+            return False
+        with self._lock:
+            if not self._loaded:
+                self.read_model.store.add_listener("reservas", self._on_reservas_change)
+                self._loaded = True
+                self._load_day(date.today())
+                logger.info(f"Kitchen board ready with {len(self._orders)} orders")
+                return True
+        self.sync()
+        return True
+
+    def _load_day(self, day: date):
+        store = self.read_model.store
+        # Posición antes de leer: lo que entre mientras tanto se vuelve a
+        # aplicar en el siguiente sync (aplicar un cambio dos veces no altera
+        # el tablero)
+        self._position = store.change_position()
+        records = store.select("reservas", where={"fecha": day.isoformat()})
+        self.day = day
+        self._orders = {}
+        for record in records:
+            order = kitchen_order(record)
+            if order is not None:
+                self._orders[record["id"]] = order
+        self.version += 1
+        self._snapshot = None
+
+    def _on_reservas_change(self, upserted: List[Dict[str, Any]], deleted: List[str]):
+        # El cambio ya está en el registro: se aplica desde ahí para no
+        # desordenarlo respecto a los de otros workers
+        self.sync()
+
+    def sync(self):
+        """Aplica los cambios del registro posteriores a la última posición y publica el delta."""
+        with self._lock:
+            if not self._loaded:
+                return
+            if self.day != date.today():
+                self._reload(date.today())
+                return
+            epoch, seq = self._position
+            upserted: List[Dict[str, Any]] = []
+            deleted: List[str] = []
+            try:
+                has_more = True
+                while has_more:
+                    changes, seq, has_more = self.read_model.store.changes_since(
+                        epoch, seq, ["reservas"]
+                    )
+                    for change in changes:
+                        if change["deleted"]:
+                            deleted.append(change["record"]["id"])
+                        else:
+                            upserted.append(change["record"])
+            except ChangeLogExpired:
+                self._reload(self.day)
+                return
+            self._position = (epoch, seq)
+            delta = self._apply(upserted, deleted)
+        if delta is not None:
+            self._publish(delta)
+
+    def _reload(self, day: date):
+        """Recarga el día entero y publica la instantánea (los clientes la sustituyen)."""
+        self._counters["reloads"] += 1
+        self._load_day(day)
+        self._publish({"type": "kitchen_snapshot", **self._current_snapshot()})
+
+    def _apply(self, upserted: List[Dict[str, Any]], deleted: List[str]) -> Optional[Dict[str, Any]]:
+        today = self.day.isoformat()
+        changed: Dict[str, Dict[str, Any]] = {}
+        removed: List[str] = []
+        for record in upserted:
+            order = kitchen_order(record) if _record_day(record) == today else None
+            if order is not None:
+                if self._orders.get(record["id"]) != order:
+                    self._orders[record["id"]] = order
+                    changed[record["id"]] = order
+            elif self._orders.pop(record["id"], None) is not None:
+                removed.append(record["id"])
+        for record_id in deleted:
+            if self._orders.pop(record_id, None) is not None:
+                removed.append(record_id)
+        if not (changed or removed):
+            return None
+        self.version += 1
+        self._snapshot = None
+        return {
+            "type": "kitchen_delta",
+            "fecha": today,
+            "version": self.version,
+            "upserted": sorted(changed.values(), key=_by_time),
+            "removed": removed,
+        }
+
+    def _publish(self, message: Dict[str, Any]):
+        if self._publisher is None or self._loop is None or self._loop.is_closed():
+            return
+        message = {**message, "timestamp": datetime.utcnow().isoformat()}
+        try:
+            asyncio.run_coroutine_threadsafe(self._publisher(message), self._loop)
+            self._counters["deltas_published"] += 1
+        except Exception as e:
+            self._counters["publish_errors"] += 1
+            logger.warning(f"Kitchen board publish failed: {e}")
+
+    # --- Lectura ---
+
+    def _current_snapshot(self) -> Dict[str, Any]:
+        if self._snapshot is None:
+            pedidos = sorted(self._orders.values(), key=_by_time)
+            self._snapshot = {
+                "fecha": self.day.isoformat(),
+                "total_pedidos": len(pedidos),
+                "pedidos": pedidos,
+                "version": self.version,
+            }
+            self._counters["snapshots_built"] += 1
+        return self._snapshot
+
+    def snapshot(self, fecha: date) -> Optional[Dict[str, Any]]:
+        """Instantánea de la vista de cocina de `fecha` (None si no es la del tablero)."""
+        with self._lock:
+            if not self._loaded or fecha != self.day:
+                return None
+            return self._current_snapshot()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "day": self.day.isoformat() if self.day else None,
+                "orders": len(self._orders),
+                "version": self.version,
+                "position": self._position[1] if self._position else None,
+                "publisher": self._publisher is not None,
+                **self._counters,
+            }
+
+
+_board: Optional[KitchenBoard] = None
+
+
+def get_kitchen_board() -> KitchenBoard:
+    """Devuelve la instancia singleton del tablero de cocina."""
+    global _board
+    if _board is None:
+        _board = KitchenBoard()
+    return _board
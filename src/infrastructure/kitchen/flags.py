@@ -0,0 +1,51 @@
+"""
+Avisos de cocina (sin gluten, alergias, vegetariano, niños) a partir de las
+notas de la reserva.
+
+Las notas se normalizan (minúsculas, sin tildes ni diéresis) y se recorren
+una sola vez con una expresión regular compilada que une todos los
+patrones; el grupo que casa indica el aviso. "Celíaco", "celiaco" y
+"CELIACO" dan el mismo resultado.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+# Aviso → patrones (se normalizan igual que las notas)
+DIETARY_FLAGS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("⚠️ SIN GLUTEN", ("sin gluten", "celiaco")),
+    ("⚠️ ALERGIAS", ("alergia", "alérgico")),
+    ("🥬 VEGETARIANO/VEGANO", ("vegano", "vegetariano")),
+    ("👶 CON NIÑOS", ("bebé", "niño", "trona")),
+)
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin marcas diacríticas ("Niño Celíaco" → "nino celiaco")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _compile() -> Tuple["re.Pattern[str]", Dict[str, str]]:
+    groups: Dict[str, str] = {}
+    alternatives = []
+    for i, (flag, patterns) in enumerate(DIETARY_FLAGS):
+        group = f"f{i}"
+        groups[group] = flag
+        alternatives.append(
+            f"(?P<{group}>{'|'.join(re.escape(normalize(p)) for p in patterns)})"
+        )
+    return re.compile("|".join(alternatives)), groups
+
+
+_MATCHER, _GROUP_FLAGS = _compile()
+_FLAG_ORDER = {flag: i for i, (flag, _) in enumerate(DIETARY_FLAGS)}
+
+
+def dietary_flags(notes: Optional[str]) -> List[str]:
+    """Avisos presentes en las notas, en el orden de DIETARY_FLAGS."""
+    if not notes:
+        return []
+    found = {_GROUP_FLAGS[m.lastgroup] for m in _MATCHER.finditer(normalize(notes))}
+    return sorted(found, key=_FLAG_ORDER.__getitem__)
@@ -1,14 +1,20 @@
 """
 Airtable Client - Wrapper para interactuar con Airtable via pyairtable.
 Proporciona una interfaz async para operaciones CRUD en Airtable.
+Las llamadas bloqueantes de pyairtable se ejecutan en un thread para no
+bloquear el event loop, con circuit breaker y timeout adaptativo por tabla
+(las lecturas se reintentan; con el breaker abierto fallan al instante con
+AirtableUnavailableError).
 """
 
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 import os
 import logging
 
 from pyairtable import Api
 
+from src.infrastructure.airtable.resilience import get_airtable_resilience
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,10 +26,11 @@ class AirtableMCPClient:
         self.api_key = os.getenv("AIRTABLE_API_KEY")
         self.base_id = os.getenv("AIRTABLE_BASE_ID")
         self._api = None
+        self._resilience = get_airtable_resilience()
 
         if self.api_key:
             try:
-                self._api = Api(self.api_key)
+                self._api = Api(self.api_key, timeout=self._resilience.http_timeout)
                 logger.info("AirtableMCPClient initialized with pyairtable")
             except Exception as e:
                 logger.error(f"Failed to initialize Airtable API: {e}")
@@ -43,10 +50,14 @@ class AirtableMCPClient:
         max_records: Optional[int] = None,
         filterByFormula: Optional[str] = None,
         sort: Optional[List[Dict[str, str]]] = None,
+        fields: Optional[List[str]] = None,
         **kwargs,
     ) -> Dict[str, Any]:
         """
         Lista records de una tabla de Airtable.
+
+        `fields` limita los campos devueltos (proyección); sin él Airtable
+        devuelve todos, incluidas notas largas y registros enlazados.
         """
         try:
             table = self._get_table(table_name)
@@ -56,6 +67,8 @@ class AirtableMCPClient:
                 kwargs_list["max_records"] = max_records
             if filterByFormula:
                 kwargs_list["formula"] = filterByFormula
+            if fields:
+                kwargs_list["fields"] = fields
             if sort:
                 # Convertir formato [{field, direction}] a ["field"] o ["-field"]
                 sort_fields = []
@@ -68,7 +81,9 @@ class AirtableMCPClient:
                         sort_fields.append(field)
                 kwargs_list["sort"] = sort_fields
 
-            records = table.all(**kwargs_list)
+            records = await self._resilience.call(
+                table_name, table.all, idempotent=True, base_id=self.base_id, **kwargs_list
+            )
             result = {"records": records}
             logger.debug(f"Listed {len(records)} records from {table_name}")
             return result
@@ -77,13 +92,82 @@ class AirtableMCPClient:
             logger.error(f"Error listing Airtable records: {e}", exc_info=True)
             raise
 
+    async def list_records_page(
+        self,
+        base_id: str,
+        table_name: str,
+        page_size: int = 100,
+        offset: Optional[str] = None,
+        filterByFormula: Optional[str] = None,
+        sort: Optional[List[Dict[str, str]]] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Una página de records (máx. 100) y el token `offset` de Airtable para
+        pedir la siguiente (None en la última página).
+
+        El token es válido unos minutos y solo con la misma consulta
+        (fórmula, orden y campos).
+        """
+        table = self._get_table(table_name)
+        params: Dict[str, Any] = {"pageSize": min(max(page_size, 1), 100)}
+        if offset:
+            params["offset"] = offset
+        if filterByFormula:
+            params["filterByFormula"] = filterByFormula
+        if fields:
+            params["fields[]"] = fields
+        for i, s in enumerate(sort or []):
+            params[f"sort[{i}][field]"] = s.get("field", "")
+            params[f"sort[{i}][direction]"] = s.get("direction", "asc").lower()
+
+        response = await self._resilience.call(
+            table_name, table.api.request, "get", table.url,
+            params=params, idempotent=True, base_id=self.base_id,
+        )
+        return {"records": response.get("records", []), "offset": response.get("offset")}
+
+    async def iterate_records(
+        self,
+        base_id: str,
+        table_name: str,
+        filterByFormula: Optional[str] = None,
+        sort: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        page_size: int = 100,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Recorre una tabla página a página (hasta 100 records por petición)
+        sin acumular el resultado: cada página se pide cuando el consumidor
+        ha procesado la anterior.
+
+        Las páginas no se reintentan: el offset de Airtable vive dentro del
+        iterador de pyairtable y un fallo a mitad corta el recorrido.
+        """
+        table = self._get_table(table_name)
+        options: Dict[str, Any] = {"page_size": page_size}
+        if filterByFormula:
+            options["formula"] = filterByFormula
+        if sort:
+            options["sort"] = sort
+        if fields:
+            options["fields"] = fields
+        pages = table.iterate(**options)
+        while True:
+            page = await self._resilience.call(table_name, next, pages, None, base_id=self.base_id)
+            if page is None:
+                return
+            yield page
+
     async def get_record(
         self, base_id: str, table_name: str, record_id: str
     ) -> Optional[Dict[str, Any]]:
         """Obtiene un record específico de Airtable."""
         try:
             table = self._get_table(table_name)
-            record = table.get(record_id)
+            record = await self._resilience.call(
+                table_name, table.get, record_id, idempotent=True, base_id=self.base_id
+            )
             logger.debug(f"Retrieved record {record_id} from {table_name}")
             return record
         except Exception as e:
@@ -98,7 +182,9 @@ class AirtableMCPClient:
         """Crea un nuevo record en Airtable."""
         try:
             table = self._get_table(table_name)
-            result = table.create(fields)
+            result = await self._resilience.call(
+                table_name, table.create, fields, base_id=self.base_id
+            )
             logger.info(f"Created record {result.get('id')} in {table_name}")
             return result
         except Exception as e:
@@ -111,20 +197,39 @@ class AirtableMCPClient:
         """Actualiza un record existente en Airtable."""
         try:
             table = self._get_table(table_name)
-            result = table.update(record_id, fields)
+            result = await self._resilience.call(
+                table_name, table.update, record_id, fields, base_id=self.base_id
+            )
             logger.info(f"Updated record {record_id} in {table_name}")
             return result
         except Exception as e:
             logger.error(f"Error updating Airtable record {record_id}: {e}")
             raise
 
+    async def batch_update_records(
+        self, base_id: str, table_name: str, records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Actualiza varios records ({"id", "fields"}) con PATCH por lotes de 10."""
+        try:
+            table = self._get_table(table_name)
+            result = await self._resilience.call(
+                table_name, table.batch_update, records, base_id=self.base_id
+            )
+            logger.info(f"Updated {len(records)} records in {table_name} (batch)")
+            return result
+        except Exception as e:
+            logger.error(f"Error batch updating {len(records)} Airtable records: {e}")
+            raise
+
     async def delete_record(
         self, base_id: str, table_name: str, record_id: str
     ) -> bool:
         """Elimina un record de Airtable."""
         try:
             table = self._get_table(table_name)
-            table.delete(record_id)
+            await self._resilience.call(
+                table_name, table.delete, record_id, base_id=self.base_id
+            )
             logger.info(f"Deleted record {record_id} from {table_name}")
             return True
         except Exception as e:
@@ -0,0 +1,16 @@
+"""Outbox duradero de mensajes salientes (WhatsApp / SMS / push)."""
+
+from src.infrastructure.outbox.service import OutboxService, get_outbox
+from src.infrastructure.outbox.store import (
+    OutboxMessage,
+    RedisStreamOutboxStore,
+    SQLiteOutboxStore,
+)
+
+__all__ = [
+    "OutboxService",
+    "get_outbox",
+    "OutboxMessage",
+    "RedisStreamOutboxStore",
+    "SQLiteOutboxStore",
+]
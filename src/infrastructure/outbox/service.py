@@ -0,0 +1,359 @@
+"""
+Outbox de mensajes salientes (WhatsApp / SMS / push).
+
+Los handlers HTTP solo encolan (enqueue_*) y responden; un pool de workers
+en background entrega los mensajes con:
+- reintentos con backoff exponencial + jitter
+- claves de deduplicación (dedupe_key)
+- rate limit por canal
+- dead-letter list tras agotar los intentos
+
+Cada worker reclama un lote (batch_size) con un visibility timeout. Un
+envío solo empieza si cabe entero (handler_timeout_seconds) antes de que
+caduque el claim; los mensajes del lote que ya no caben se devuelven a la
+cola al momento en lugar de dejar que otro consumidor los reclame mientras
+este aún los envía (entrega doble).
+
+Backend: Redis Streams si REDIS_URL está configurado; SQLite como fallback
+(también si Redis falla al encolar, para no perder el mensaje).
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.core.utils.rate_pacer import RatePacer
+from src.infrastructure.outbox.store import (
+    OutboxMessage,
+    RedisStreamOutboxStore,
+    SQLiteOutboxStore,
+)
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+DEFAULT_RATE_LIMITS = {"whatsapp": 20.0, "sms": 10.0, "push": 50.0}
+
+
+class OutboxService:
+    """
+    Cola duradera de mensajes salientes con pool de workers.
+
+    Args:
+        store: Store principal (Redis Streams o SQLite)
+        fallback_store: Store usado si el principal falla al encolar
+        workers: Número de workers concurrentes
+        max_attempts: Intentos antes de mandar a dead-letter
+        rate_limits: Mensajes/segundo por canal
+    """
+
+    def __init__(
+        self,
+        store=None,
+        fallback_store=None,
+        workers: int = None,
+        max_attempts: int = None,
+        base_backoff_seconds: float = 2.0,
+        max_backoff_seconds: float = 300.0,
+        rate_limits: Optional[Dict[str, float]] = None,
+        handler_timeout_seconds: float = 30.0,
+        visibility_timeout_seconds: float = 60.0,
+        poll_interval_seconds: float = 1.0,
+        batch_size: int = 10,
+    ):
+        self.store = store
+        self.fallback_store = fallback_store
+        self.workers = workers or int(os.getenv("OUTBOX_WORKERS", "4"))
+        self.max_attempts = max_attempts or int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.handler_timeout_seconds = handler_timeout_seconds
+        self.visibility_timeout_seconds = visibility_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.batch_size = batch_size
+        if visibility_timeout_seconds <= handler_timeout_seconds:
+            raise ValueError("visibility_timeout_seconds debe superar handler_timeout_seconds")
+
+        limits = dict(DEFAULT_RATE_LIMITS)
+        for channel in limits:
+            env_value = os.getenv(f"OUTBOX_RATE_{channel.upper()}")
+            if env_value:
+                limits[channel] = float(env_value)
+        limits.update(rate_limits or {})
+        self._pacers = {channel: RatePacer(rate) for channel, rate in limits.items()}
+
+        self._handlers: Dict[str, Handler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+        self._http_client = None
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    # --- Configuración ---
+
+    def register_handler(self, channel: str, handler: Handler):
+        """Registra la función de entrega de un canal."""
+        self._handlers[channel] = handler
+
+    def _register_default_handlers(self):
+        import httpx
+        from src.infrastructure.external.twilio_service import twilio_service
+        from src.services.push_notification_service import push_service
+
+        self._http_client = httpx.AsyncClient(timeout=10)
+
+        async def send_twilio(payload: Dict[str, Any], channel: str):
+            await twilio_service.send_message_async(
+                payload["to"],
+                body=payload.get("body"),
+                template_sid=payload.get("template_sid"),
+                variables=payload.get("variables"),
+                persistent_action=payload.get("persistent_action"),
+                channel=channel,
+                http_client=self._http_client,
+                max_attempts=1,
+                raise_on_error=True,
+            )
+
+        async def send_push(payload: Dict[str, Any]):
+            sent = await push_service.send_to_device(
+                device_token=payload["device_token"],
+                title=payload["title"],
+                body=payload["body"],
+                data=payload.get("data"),
+                priority=payload.get("priority", "normal"),
+            )
+            if not sent:
+                raise RuntimeError("FCM rechazó la notificación")
+
+        self._handlers.setdefault("whatsapp", lambda p: send_twilio(p, "whatsapp"))
+        self._handlers.setdefault("sms", lambda p: send_twilio(p, "sms"))
+        self._handlers.setdefault("push", send_push)
+
+    def _stores(self) -> list:
+        return [s for s in (self.store, self.fallback_store) if s is not None]
+
+    # --- Encolado ---
+
+    async def enqueue(
+        self, channel: str, payload: Dict[str, Any], dedupe_key: Optional[str] = None
+    ) -> bool:
+        """
+        Encola un mensaje. Devuelve False si ya existía uno con la misma dedupe_key.
+        """
+        msg = OutboxMessage(channel=channel, payload=payload, dedupe_key=dedupe_key)
+        try:
+            queued = await self.store.enqueue(msg)
+        except Exception as e:
+            if self.fallback_store is None:
+                raise
+            logger.error(f"Outbox {self.store.name} enqueue failed, using fallback: {e}")
+            queued = await self.fallback_store.enqueue(msg)
+
+        if not queued:
+            logger.info(f"Outbox: mensaje duplicado ignorado ({dedupe_key})")
+            self._counters[channel]["deduplicated"] += 1
+            return False
+
+        self._counters[channel]["enqueued"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    async def enqueue_whatsapp(
+        self,
+        to: str,
+        body: Optional[str] = None,
+        template_sid: Optional[str] = None,
+        variables: Optional[Dict[str, str]] = None,
+        persistent_action: Optional[List[str]] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> bool:
+        """Encola un WhatsApp (texto libre o plantilla Content API)."""
+        payload: Dict[str, Any] = {"to": to}
+        if body is not None:
+            payload["body"] = body
+        if template_sid:
+            payload["template_sid"] = template_sid
+            payload["variables"] = variables or {}
+        if persistent_action:
+            payload["persistent_action"] = persistent_action
+        return await self.enqueue("whatsapp", payload, dedupe_key=dedupe_key)
+
+    async def enqueue_sms(self, to: str, body: str, dedupe_key: Optional[str] = None) -> bool:
+        """Encola un SMS."""
+        return await self.enqueue("sms", {"to": to, "body": body}, dedupe_key=dedupe_key)
+
+    async def enqueue_push(
+        self,
+        device_token: str,
+        title: str,
+        body: str,
+        data: Optional[dict] = None,
+        priority: str = "normal",
+        dedupe_key: Optional[str] = None,
+    ) -> bool:
+        """Encola una notificación push FCM."""
+        payload = {
+            "device_token": device_token,
+            "title": title,
+            "body": body,
+            "data": data or {},
+            "priority": priority,
+        }
+        return await self.enqueue("push", payload, dedupe_key=dedupe_key)
+
+    # --- Workers ---
+
+    async def start(self):
+        if self._running:
+            return
+        if not self._handlers:
+            self._register_default_handlers()
+
+        try:
+            await self.store.setup()
+        except Exception as e:
+            if self.fallback_store is None:
+                raise
+            logger.error(f"Outbox {self.store.name} unavailable, using {self.fallback_store.name}: {e}")
+            self.store, self.fallback_store = self.fallback_store, None
+
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{os.getpid()}-{n}")) for n in range(self.workers)
+        ]
+        logger.info(f"Outbox started ({self.workers} workers, backend: {self.store.name})")
+
+    async def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        logger.info("Outbox stopped")
+
+    async def _worker(self, consumer: str):
+        while self._running:
+            processed = 0
+            for store in self._stores():
+                # Último momento en que un envío aún termina dentro del claim
+                deadline = (
+                    time.monotonic() + self.visibility_timeout_seconds - self.handler_timeout_seconds
+                )
+                try:
+                    messages = await store.claim(
+                        consumer, self.batch_size, self.visibility_timeout_seconds
+                    )
+                except Exception as e:
+                    logger.error(f"Outbox claim error ({store.name}): {e}")
+                    continue
+                for i, msg in enumerate(messages):
+                    pacer = self._pacers.get(msg.channel)
+                    if pacer:
+                        await pacer.wait()
+                    if time.monotonic() >= deadline:
+                        await self._release(store, messages[i:])
+                        break
+                    await self._process(store, msg)
+                processed += len(messages)
+
+            if not processed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _process(self, store, msg: OutboxMessage):
+        counters = self._counters[msg.channel]
+        handler = self._handlers.get(msg.channel)
+        if handler is None:
+            msg.last_error = f"Canal desconocido: {msg.channel}"
+            await store.dead_letter(msg)
+            counters["dead"] += 1
+            return
+
+        try:
+            await asyncio.wait_for(handler(msg.payload), timeout=self.handler_timeout_seconds)
+        except Exception as e:
+            msg.attempts += 1
+            msg.last_error = str(e)[:300] or type(e).__name__
+            counters["failed_attempts"] += 1
+            if msg.attempts >= self.max_attempts:
+                logger.error(
+                    f"Outbox: {msg.channel} {msg.id} a dead-letter tras {msg.attempts} intentos: {msg.last_error}"
+                )
+                await store.dead_letter(msg)
+                counters["dead"] += 1
+            else:
+                msg.next_attempt_at = time.time() + self._backoff(msg.attempts)
+                await store.retry(msg)
+                counters["retried"] += 1
+            return
+
+        await store.ack(msg)
+        counters["sent"] += 1
+
+    async def _release(self, store, messages: List[OutboxMessage]):
+        """Devuelve a la cola, sin gastar intento, mensajes cuyo claim ya no da margen."""
+        for msg in messages:
+            msg.next_attempt_at = time.time()
+            await store.retry(msg)
+            self._counters[msg.channel]["released"] += 1
+        logger.info(f"Outbox: {len(messages)} mensajes devueltos a la cola (claim a punto de caducar)")
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    # --- Observabilidad ---
+
+    async def get_stats(self) -> Dict[str, Any]:
+        stores = []
+        for store in self._stores():
+            try:
+                stores.append(await store.stats())
+            except Exception as e:
+                stores.append({"backend": store.name, "error": str(e)[:100]})
+        return {
+            "running": self._running,
+            "workers": self.workers,
+            "stores": stores,
+            "channels": {channel: dict(c) for channel, c in self._counters.items()},
+        }
+
+    async def list_dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        dead: List[Dict[str, Any]] = []
+        for store in self._stores():
+            dead.extend(await store.list_dead_letters(limit))
+        return dead[:limit]
+
+
+# Singleton global
+_outbox: Optional[OutboxService] = None
+
+
+def get_outbox() -> OutboxService:
+    """Devuelve la instancia singleton del outbox (Redis Streams o SQLite)."""
+    global _outbox
+    if _outbox is None:
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            _outbox = OutboxService(
+                store=RedisStreamOutboxStore(redis_url), fallback_store=SQLiteOutboxStore()
+            )
+        else:
+            _outbox = OutboxService(store=SQLiteOutboxStore())
+    return _outbox
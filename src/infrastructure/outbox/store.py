@@ -0,0 +1,305 @@
+"""
+Almacenamiento duradero del outbox de mensajes salientes.
+
+- RedisStreamOutboxStore: Redis Streams con consumer group. Los reintentos
+  esperan en un ZSET ordenado por hora de reintento y los mensajes de un
+  worker caído se recuperan con XAUTOCLAIM tras el visibility timeout.
+- SQLiteOutboxStore: fallback local (una tabla con estado por mensaje)
+  cuando Redis no está configurado o no responde.
+
+Ambos comparten la misma interfaz: enqueue, claim, ack, retry,
+dead_letter, list_dead_letters y stats.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEDUPE_TTL_SECONDS = 24 * 3600
+DEAD_LETTER_MAX = 1000
+
+
+@dataclass
+class OutboxMessage:
+    """Mensaje pendiente de envío por un canal (whatsapp, sms, push)."""
+
+    channel: str
+    payload: Dict[str, Any]
+    dedupe_key: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    next_attempt_at: float = field(default_factory=time.time)
+    last_error: Optional[str] = None
+    # Identificador interno del store (entry id del stream); no se serializa
+    receipt: Optional[str] = field(default=None, repr=False, compare=False)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data.pop("receipt", None)
+        return json.dumps(data, default=str)
+
+    @classmethod
+    def from_json(cls, raw: str, receipt: Optional[str] = None) -> "OutboxMessage":
+        msg = cls(**json.loads(raw))
+        msg.receipt = receipt
+        return msg
+
+
+class RedisStreamOutboxStore:
+    """Outbox sobre Redis Streams (XADD / XREADGROUP / XAUTOCLAIM)."""
+
+    name = "redis"
+
+    STREAM = "outbox:stream"
+    GROUP = "outbox-workers"
+    DELAYED = "outbox:delayed"
+    DEAD = "outbox:dead"
+    DEDUPE_PREFIX = "outbox:dedupe:"
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as aioredis
+
+        self.redis = aioredis.from_url(
+            redis_url, socket_connect_timeout=2, socket_timeout=5, decode_responses=True
+        )
+        self._ready = False
+
+    async def setup(self):
+        if self._ready:
+            return
+        try:
+            await self.redis.xgroup_create(self.STREAM, self.GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._ready = True
+
+    async def close(self):
+        await self.redis.aclose()
+
+    async def enqueue(self, msg: OutboxMessage) -> bool:
+        await self.setup()
+        if msg.dedupe_key:
+            fresh = await self.redis.set(
+                f"{self.DEDUPE_PREFIX}{msg.dedupe_key}", msg.id, nx=True, ex=DEDUPE_TTL_SECONDS
+            )
+            if not fresh:
+                return False
+        await self.redis.xadd(self.STREAM, {"data": msg.to_json()})
+        return True
+
+    async def claim(
+        self, consumer: str, count: int, visibility_timeout: float
+    ) -> List[OutboxMessage]:
+        await self.setup()
+        await self._promote_delayed()
+
+        # Mensajes de workers caídos (pendientes sin ACK más allá del timeout)
+        _, entries, *_ = await self.redis.xautoclaim(
+            self.STREAM,
+            self.GROUP,
+            consumer,
+            min_idle_time=int(visibility_timeout * 1000),
+            start_id="0-0",
+            count=count,
+        )
+        entries = [e for e in entries if e and e[1]]
+
+        if len(entries) < count:
+            fresh = await self.redis.xreadgroup(
+                self.GROUP, consumer, {self.STREAM: ">"}, count=count - len(entries)
+            )
+            for _, stream_entries in fresh or []:
+                entries.extend(stream_entries)
+
+        return [OutboxMessage.from_json(fields["data"], receipt=entry_id) for entry_id, fields in entries]
+
+    async def _promote_delayed(self):
+        """Mueve al stream los reintentos cuya hora ya llegó."""
+        due = await self.redis.zrangebyscore(self.DELAYED, 0, time.time(), start=0, num=100)
+        for raw in due:
+            # ZREM decide qué worker lo promueve (evita duplicados)
+            if await self.redis.zrem(self.DELAYED, raw):
+                await self.redis.xadd(self.STREAM, {"data": raw})
+
+    def _remove(self, msg: OutboxMessage, pipe):
+        pipe.xack(self.STREAM, self.GROUP, msg.receipt)
+        pipe.xdel(self.STREAM, msg.receipt)
+
+    async def ack(self, msg: OutboxMessage):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._remove(msg, pipe)
+            await pipe.execute()
+
+    async def retry(self, msg: OutboxMessage):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.DELAYED, {msg.to_json(): msg.next_attempt_at})
+            self._remove(msg, pipe)
+            await pipe.execute()
+
+    async def dead_letter(self, msg: OutboxMessage):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(self.DEAD, msg.to_json())
+            pipe.ltrim(self.DEAD, 0, DEAD_LETTER_MAX - 1)
+            self._remove(msg, pipe)
+            await pipe.execute()
+
+    async def list_dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return [json.loads(raw) for raw in await self.redis.lrange(self.DEAD, 0, limit - 1)]
+
+    async def stats(self) -> Dict[str, Any]:
+        await self.setup()
+        pending = await self.redis.xpending(self.STREAM, self.GROUP)
+        return {
+            "backend": self.name,
+            "queued": await self.redis.xlen(self.STREAM),
+            "in_flight": pending.get("pending", 0) if isinstance(pending, dict) else 0,
+            "delayed": await self.redis.zcard(self.DELAYED),
+            "dead": await self.redis.llen(self.DEAD),
+        }
+
+
+class SQLiteOutboxStore:
+    """Outbox local en SQLite (fallback sin Redis). Sobrevive a reinicios."""
+
+    name = "sqlite"
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id TEXT PRIMARY KEY,
+        channel TEXT NOT NULL,
+        data TEXT NOT NULL,
+        dedupe_key TEXT UNIQUE,
+        status TEXT NOT NULL DEFAULT 'pending',
+        next_attempt_at REAL NOT NULL,
+        locked_until REAL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_outbox_ready ON outbox(status, next_attempt_at);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("OUTBOX_SQLITE_PATH", "data/outbox.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    async def setup(self):
+        return None
+
+    async def close(self):
+        self._conn.close()
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
+
+    async def enqueue(self, msg: OutboxMessage) -> bool:
+        def _insert():
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (id, channel, data, dedupe_key, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?)",
+                (msg.id, msg.channel, msg.to_json(), msg.dedupe_key, msg.next_attempt_at, msg.created_at),
+            )
+            return cur.rowcount == 1
+
+        return await self._run(_insert)
+
+    async def claim(
+        self, consumer: str, count: int, visibility_timeout: float
+    ) -> List[OutboxMessage]:
+        def _claim():
+            now = time.time()
+            self._purge(now)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, data FROM outbox WHERE "
+                    "(status = 'pending' AND next_attempt_at <= ?) OR "
+                    "(status = 'inflight' AND locked_until < ?) "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (now, now, count),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'inflight', locked_until = ? WHERE id = ?",
+                    [(now + visibility_timeout, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return [OutboxMessage.from_json(row[1], receipt=row[0]) for row in rows]
+
+        return await self._run(_claim)
+
+    def _purge(self, now: float):
+        """Borra los enviados antiguos (solo se guardan para deduplicar)."""
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        self._conn.execute(
+            "DELETE FROM outbox WHERE status = 'done' AND created_at < ?",
+            (now - DEDUPE_TTL_SECONDS,),
+        )
+
+    async def _set_status(self, msg: OutboxMessage, status: str):
+        def _update():
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, data = ?, next_attempt_at = ?, locked_until = NULL "
+                "WHERE id = ?",
+                (status, msg.to_json(), msg.next_attempt_at, msg.id),
+            )
+
+        await self._run(_update)
+
+    async def ack(self, msg: OutboxMessage):
+        await self._set_status(msg, "done")
+
+    async def retry(self, msg: OutboxMessage):
+        await self._set_status(msg, "pending")
+
+    async def dead_letter(self, msg: OutboxMessage):
+        await self._set_status(msg, "dead")
+
+    async def list_dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        def _select():
+            rows = self._conn.execute(
+                "SELECT data FROM outbox WHERE status = 'dead' ORDER BY created_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            return [json.loads(row[0]) for row in rows]
+
+        return await self._run(_select)
+
+    async def stats(self) -> Dict[str, Any]:
+        def _count():
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+            return dict(rows)
+
+        counts = await self._run(_count)
+        return {
+            "backend": self.name,
+            "queued": counts.get("pending", 0),
+            "in_flight": counts.get("inflight", 0),
+            "dead": counts.get("dead", 0),
+            "done_retained": counts.get("done", 0),
+        }
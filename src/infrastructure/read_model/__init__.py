@@ -0,0 +1,37 @@
+"""Read model local en SQLite con réplica de las tablas de Airtable más leídas."""
+
+from src.infrastructure.read_model.changelog import ChangeLog, ChangeLogExpired
+from src.infrastructure.read_model.rollups import (
+    GROUP_COLUMNS,
+    SEATED_STATUSES,
+    UNKNOWN_HOUR,
+    ReservationRollups,
+    aggregate,
+)
+from src.infrastructure.read_model.service import ReadModel, get_read_model, read_model_enabled
+from src.infrastructure.read_model.store import (
+    READ_MODEL_TABLES,
+    IndexedColumn,
+    ReadModelTable,
+    SQLiteReadModelStore,
+)
+from src.infrastructure.read_model.versions import CollectionVersions, get_collection_versions
+
+__all__ = [
+    "ReadModel",
+    "get_read_model",
+    "read_model_enabled",
+    "READ_MODEL_TABLES",
+    "IndexedColumn",
+    "ReadModelTable",
+    "SQLiteReadModelStore",
+    "ChangeLog",
+    "ChangeLogExpired",
+    "CollectionVersions",
+    "get_collection_versions",
+    "GROUP_COLUMNS",
+    "SEATED_STATUSES",
+    "UNKNOWN_HOUR",
+    "ReservationRollups",
+    "aggregate",
+]
@@ -0,0 +1,163 @@
+"""
+Registro de cambios del read model para la sincronización delta de la app.
+
+Cada upsert o borrado de la réplica (escritura propia, polling,
+reconciliación o webhook) deja, en la misma transacción, una fila por
+registro en rm_changes con un número de secuencia creciente. Solo se guarda
+el último cambio de cada registro: un registro editado diez veces ocupa una
+fila, y la tabla no crece más que la réplica salvo por los tombstones, que
+guardan la última versión del registro borrado y se purgan pasada la
+retención.
+
+Un token de sincronización es (época, secuencia). La época identifica la
+base SQLite: si la réplica se recrea, los tokens anteriores dejan de valer.
+Un token anterior a los tombstones purgados tampoco vale (el cliente no
+sabría qué se borró): en ambos casos ChangeLogExpired y resincronización
+completa.
+"""
+
+import sqlite3
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CHANGES_TABLE = "rm_changes"
+
+
+class ChangeLogExpired(Exception):
+    """El token es de otra réplica o anterior a los tombstones conservados."""
+
+
+class ChangeLog:
+    """Tabla rm_changes dentro de la base del read model."""
+
+    SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        record_id TEXT NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        last_data TEXT,
+        changed_at REAL NOT NULL,
+        UNIQUE (table_name, record_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_{CHANGES_TABLE}_deleted ON {CHANGES_TABLE}(deleted, changed_at);
+    CREATE TABLE IF NOT EXISTS {CHANGES_TABLE}_meta (name TEXT PRIMARY KEY, value TEXT);
+    """
+
+    # REPLACE borra la fila anterior del registro: el cambio recibe una secuencia nueva
+    _RECORD_SQL = (
+        f"INSERT OR REPLACE INTO {CHANGES_TABLE} "
+        "(table_name, record_id, deleted, last_data, changed_at) VALUES (?, ?, ?, ?, ?)"
+    )
+
+    def __init__(self):
+        self.epoch: Optional[str] = None
+
+    def ensure(self, conn: sqlite3.Connection, table_names: Iterable[str]) -> bool:
+        """
+        Crea las tablas. En una réplica que aún no tenía registro de cambios,
+        abre una época nueva y registra los registros existentes como
+        cambios (para que un cliente sin token los reciba todos).
+        """
+        conn.executescript(self.SCHEMA)
+        self.epoch = self._meta(conn, "epoch")
+        if self.epoch is not None:
+            return False
+        with conn:
+            conn.execute("BEGIN")
+            now = time.time()
+            for name in table_names:
+                conn.execute(
+                    f"INSERT OR IGNORE INTO {CHANGES_TABLE} "
+                    "(table_name, record_id, deleted, changed_at) "
+                    f"SELECT ?, record_id, 0, ? FROM rm_{name}",
+                    (name, now),
+                )
+            self.epoch = uuid.uuid4().hex[:12]
+            self._set_meta(conn, "epoch", self.epoch)
+            self._set_meta(conn, "floor", "0")
+        return True
+
+    def _meta(self, conn: sqlite3.Connection, name: str) -> Optional[str]:
+        row = conn.execute(
+            f"SELECT value FROM {CHANGES_TABLE}_meta WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, name: str, value: str):
+        conn.execute(
+            f"INSERT INTO {CHANGES_TABLE}_meta (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, value),
+        )
+
+    def record(
+        self,
+        conn: sqlite3.Connection,
+        name: str,
+        upserted: Sequence[str] = (),
+        deleted: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Anota los cambios (misma transacción que la réplica). `deleted`
+        mapea record ID → JSON de la última versión guardada.
+        """
+        now = time.time()
+        rows = [(name, rid, 0, None, now) for rid in upserted]
+        rows.extend((name, rid, 1, data, now) for rid, data in (deleted or {}).items())
+        if rows:
+            conn.executemany(self._RECORD_SQL, rows)
+
+    def position(self, conn: sqlite3.Connection) -> int:
+        """Última secuencia asignada (0 si no hay cambios)."""
+        row = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = ?", (CHANGES_TABLE,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def since(
+        self,
+        conn: sqlite3.Connection,
+        epoch: Optional[str],
+        seq: int,
+        table_names: Sequence[str],
+        limit: int,
+    ) -> Tuple[List[Tuple[int, str, str, bool, Optional[str]]], bool]:
+        """
+        Cambios con secuencia > `seq` de esas tablas, en orden, como
+        (seq, tabla, record_id, borrado, última versión si borrado), y si
+        quedan más. Sin época (cliente nuevo) se devuelven desde el inicio.
+        """
+        if epoch is not None and (
+            epoch != self.epoch or seq < int(self._meta(conn, "floor") or 0)
+        ):
+            raise ChangeLogExpired("Token de sincronización caducado")
+        if epoch is None:
+            seq = 0
+        rows = conn.execute(
+            f"SELECT seq, table_name, record_id, deleted, last_data FROM {CHANGES_TABLE} "
+            f"WHERE seq > ? AND table_name IN ({', '.join('?' * len(table_names))}) "
+            "ORDER BY seq LIMIT ?",
+            (seq, *table_names, limit + 1),
+        ).fetchall()
+        return [(s, t, r, bool(d), data) for s, t, r, d, data in rows[:limit]], len(rows) > limit
+
+    def prune(self, conn: sqlite3.Connection, older_than: float) -> int:
+        """Purga los tombstones anteriores a `older_than` y sube el suelo de tokens válidos."""
+        with conn:
+            conn.execute("BEGIN")
+            row = conn.execute(
+                f"SELECT MAX(seq), COUNT(*) FROM {CHANGES_TABLE} WHERE deleted = 1 AND changed_at < ?",
+                (older_than,),
+            ).fetchone()
+            if not row[1]:
+                return 0
+            conn.execute(
+                f"DELETE FROM {CHANGES_TABLE} WHERE deleted = 1 AND changed_at < ?",
+                (older_than,),
+            )
+            floor = max(int(self._meta(conn, "floor") or 0), row[0])
+            self._set_meta(conn, "floor", str(floor))
+        return row[1]
+
@@ -0,0 +1,246 @@
+"""
+Agregados diarios de reservas mantenidos de forma incremental.
+
+Una fila por (fecha, turno, zona, estado, hora) con número de reservas,
+comensales (pax reservados) y cubiertos (pax de reservas que ocupan mesa:
+confirmadas, sentadas o completadas). Las filas viven en la misma base
+SQLite que la réplica de Reservas y se actualizan en la misma transacción
+que cada upsert/borrado de la réplica: se resta la contribución de la
+versión anterior del registro y se suma la nueva. Así cualquier cambio
+(escritura propia, webhook, polling o reconciliación) queda reflejado sin
+recorrer las reservas.
+
+Un resumen de semana, mes o año lee como mucho unos cientos de filas.
+"""
+
+import json
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+# Subir la versión fuerza un backfill completo (cambio de claves o métricas)
+ROLLUP_VERSION = 1
+
+MADRID_TZ = ZoneInfo("Europe/Madrid")
+
+# Estados que ocupan mesa (cuentan como cubiertos)
+SEATED_STATUSES = frozenset({"Confirmada", "Sentada", "Completada"})
+
+# Servicio de cena a partir de esta hora local
+DINNER_FROM_HOUR = 18
+
+UNKNOWN_HOUR = -1
+GROUP_COLUMNS = ("fecha", "turno", "zona", "estado", "hora")
+
+RollupKey = Tuple[str, str, str, str, int]
+
+
+def local_minutes(value: Any) -> Optional[int]:
+    """Minutos desde medianoche (Europe/Madrid) de 'Hora': ISO en UTC o legacy 'HH:MM'."""
+    if not value:
+        return None
+    text = str(value)
+    try:
+        if "T" in text:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            if dt.tzinfo is not None:
+                dt = dt.astimezone(MADRID_TZ)
+            return dt.hour * 60 + dt.minute
+        parts = text.split(":")
+        return int(parts[0]) * 60 + (int(parts[1][:2]) if len(parts) > 1 else 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def local_hour(value: Any) -> int:
+    """Hora local (Europe/Madrid) de 'Hora': ISO en UTC o legacy 'HH:MM'."""
+    minutes = local_minutes(value)
+    return UNKNOWN_HOUR if minutes is None else minutes // 60
+
+
+def shift_for_hour(hour: int) -> str:
+    if hour == UNKNOWN_HOUR:
+        return "sin hora"
+    return "cena" if hour >= DINNER_FROM_HOUR else "comida"
+
+
+def rollup_contribution(record: Dict[str, Any]) -> Optional[Tuple[RollupKey, int]]:
+    """Clave de agregado y pax de un registro de Reservas (None sin fecha)."""
+    fields = record.get("fields", {})
+    fecha = fields.get("Fecha de Reserva")
+    if not fecha:
+        return None
+    hour = local_hour(fields.get("Hora"))
+    estado = fields.get("Estado de Reserva") or fields.get("Estado") or "Pendiente"
+    zona = fields.get("Zona Preferida") or "sin especificar"
+    try:
+        pax = int(fields.get("Cantidad de Personas") or 0)
+    except (TypeError, ValueError):
+        pax = 0
+    return (str(fecha)[:10], shift_for_hour(hour), str(zona), str(estado), hour), pax
+
+
+def aggregate(
+    records: Iterable[Dict[str, Any]], group_by: Sequence[str] = GROUP_COLUMNS
+) -> List[Dict[str, Any]]:
+    """
+    Agrega registros en memoria con las mismas claves y métricas que la
+    tabla de rollups (lecturas desde Airtable cuando la réplica no es fresca).
+    """
+    positions = [GROUP_COLUMNS.index(column) for column in group_by]
+    totals: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for record in records:
+        contribution = rollup_contribution(record)
+        if contribution is None:
+            continue
+        key, pax = contribution
+        row = totals[tuple(key[i] for i in positions)]
+        row[0] += 1
+        row[1] += pax
+        row[2] += pax if key[3] in SEATED_STATUSES else 0
+    return [
+        {**dict(zip(group_by, key)), "reservas": r, "comensales": g, "cubiertos": c}
+        for key, (r, g, c) in sorted(totals.items())
+    ]
+
+
+class ReservationRollups:
+    """Tabla rollup_reservas_diario dentro de la base del read model."""
+
+    TABLE = "rollup_reservas_diario"
+
+    SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {TABLE} (
+        fecha TEXT NOT NULL,
+        turno TEXT NOT NULL,
+        zona TEXT NOT NULL,
+        estado TEXT NOT NULL,
+        hora INTEGER NOT NULL,
+        reservas INTEGER NOT NULL DEFAULT 0,
+        comensales INTEGER NOT NULL DEFAULT 0,
+        cubiertos INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (fecha, turno, zona, estado, hora)
+    );
+    CREATE TABLE IF NOT EXISTS rollup_meta (name TEXT PRIMARY KEY, version INTEGER);
+    """
+
+    _APPLY_SQL = (
+        f"INSERT INTO {TABLE} (fecha, turno, zona, estado, hora, reservas, comensales, cubiertos) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(fecha, turno, zona, estado, hora) DO UPDATE SET "
+        "reservas = reservas + excluded.reservas, "
+        "comensales = comensales + excluded.comensales, "
+        "cubiertos = cubiertos + excluded.cubiertos"
+    )
+
+    def __init__(self, source_table: str = "rm_reservas"):
+        self.source_table = source_table
+
+    def ensure(self, conn: sqlite3.Connection) -> bool:
+        """Crea las tablas y hace el backfill si faltan o cambió la versión."""
+        conn.executescript(self.SCHEMA)
+        row = conn.execute(
+            "SELECT version FROM rollup_meta WHERE name = ?", (self.TABLE,)
+        ).fetchone()
+        if row and row[0] == ROLLUP_VERSION:
+            return False
+        with conn:
+            conn.execute("BEGIN")
+            self.rebuild(conn)
+        return True
+
+    def rebuild(self, conn: sqlite3.Connection):
+        """Backfill completo desde la réplica (dentro de la transacción del llamador)."""
+        conn.execute(f"DELETE FROM {self.TABLE}")
+        records = (json.loads(row[0]) for row in conn.execute(f"SELECT data FROM {self.source_table}"))
+        conn.executemany(
+            self._APPLY_SQL,
+            [
+                (*(row[c] for c in GROUP_COLUMNS), row["reservas"], row["comensales"], row["cubiertos"])
+                for row in aggregate(records)
+            ],
+        )
+        conn.execute(
+            "INSERT INTO rollup_meta (name, version) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET version = excluded.version",
+            (self.TABLE, ROLLUP_VERSION),
+        )
+
+    def previous_versions(
+        self, conn: sqlite3.Connection, record_ids: Sequence[str]
+    ) -> List[Dict[str, Any]]:
+        """Versiones actuales en la réplica de los registros que van a cambiar."""
+        found: List[Dict[str, Any]] = []
+        for i in range(0, len(record_ids), 500):
+            chunk = record_ids[i:i + 500]
+            found.extend(
+                json.loads(row[0])
+                for row in conn.execute(
+                    f"SELECT data FROM {self.source_table} "
+                    f"WHERE record_id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        return found
+
+    def apply(
+        self,
+        conn: sqlite3.Connection,
+        removed: Iterable[Dict[str, Any]] = (),
+        added: Iterable[Dict[str, Any]] = (),
+    ):
+        """Resta las versiones anteriores y suma las nuevas (misma transacción que la réplica)."""
+        deltas: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+        for sign, records in ((-1, removed), (1, added)):
+            for record in records:
+                contribution = rollup_contribution(record)
+                if contribution is None:
+                    continue
+                key, pax = contribution
+                delta = deltas[key]
+                delta[0] += sign
+                delta[1] += sign * pax
+                delta[2] += sign * pax if key[3] in SEATED_STATUSES else 0
+        changed = [(*key, *delta) for key, delta in deltas.items() if any(delta)]
+        if not changed:
+            return
+        conn.executemany(self._APPLY_SQL, changed)
+        conn.executemany(
+            f"DELETE FROM {self.TABLE} WHERE fecha = ? AND turno = ? AND zona = ? "
+            "AND estado = ? AND hora = ? AND reservas <= 0",
+            [row[:5] for row in changed],
+        )
+
+    def select(
+        self,
+        conn: sqlite3.Connection,
+        start: date,
+        end: date,
+        group_by: Sequence[str] = GROUP_COLUMNS,
+    ) -> List[Dict[str, Any]]:
+        """Totales por las columnas de `group_by` con fecha en [start, end)."""
+        for column in group_by:
+            if column not in GROUP_COLUMNS:
+                raise ValueError(f"Unknown rollup column: {column}")
+        columns = ", ".join(group_by)
+        sql = (
+            f"SELECT {columns + ', ' if columns else ''}"
+            "SUM(reservas), SUM(comensales), SUM(cubiertos) "
+            f"FROM {self.TABLE} WHERE fecha >= ? AND fecha < ?"
+        )
+        if columns:
+            sql += f" GROUP BY {columns} ORDER BY {columns}"
+        rows = conn.execute(sql, (start.isoformat(), end.isoformat())).fetchall()
+        n = len(group_by)
+        return [
+            {
+                **dict(zip(group_by, row[:n])),
+                "reservas": row[n] or 0,
+                "comensales": row[n + 1] or 0,
+                "cubiertos": row[n + 2] or 0,
+            }
+            for row in rows
+            if row[n]
+        ]
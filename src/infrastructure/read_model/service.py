@@ -0,0 +1,452 @@
+"""
+Sincronización y lectura del read model local (lado de lectura CQRS).
+
+- Polling incremental por tabla con LAST_MODIFIED_TIME() (READ_MODEL_POLL_SECONDS).
+- Reconciliación completa periódica para detectar borrados
+  (READ_MODEL_FULL_SYNC_SECONDS).
+- Webhooks: se refrescan solo los record IDs notificados.
+- Cota de frescura: read() solo sirve datos si la última sincronización de
+  la tabla tiene menos de READ_MODEL_MAX_STALENESS_SECONDS; si no, devuelve
+  None y el repositorio lee de Airtable como antes.
+- iter_read(): lectura por páginas para exportaciones largas.
+- read_rollups(): agregados diarios de reservas para analytics, con la
+  misma cota.
+- versions: contador por tabla que sube con cada cambio de la réplica
+  (base de los ETag de los listados).
+- changes(): cambios y tombstones desde un token (sincronización delta de
+  la app); los tombstones se purgan pasados READ_MODEL_CHANGELOG_RETENTION_DAYS.
+
+Cada proceso mantiene su propia réplica (no depende del líder del scheduler).
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from src.core.config.airtable_ids import BASE_ID
+from src.infrastructure.read_model.rollups import GROUP_COLUMNS
+from src.infrastructure.read_model.store import READ_MODEL_TABLES, SQLiteReadModelStore
+from src.infrastructure.read_model.versions import CollectionVersions, get_collection_versions
+from src.infrastructure.services.job_scheduler import JobScheduler
+
+logger = logging.getLogger(__name__)
+
+# Solape del cursor: cubre desfases de reloj con Airtable
+CURSOR_OVERLAP = timedelta(minutes=1)
+RECORD_ID_BATCH_SIZE = 50
+_RECORD_ID_RE = re.compile(r"rec[A-Za-z0-9]+")
+
+
+def read_model_enabled() -> bool:
+    """READ_MODEL_ENABLED=false desactiva la réplica (todas las lecturas van a Airtable)."""
+    return os.getenv("READ_MODEL_ENABLED", "true").lower() not in ("false", "0", "no")
+
+
+class ReadModel:
+    """
+    Réplica local de Reservas, Mesas, Clientes, Lista de Espera y Config.
+
+    Args:
+        store: SQLiteReadModelStore (por defecto en READ_MODEL_SQLITE_PATH)
+        airtable: Cliente con list_records() (airtable_client por defecto)
+        poll_interval_seconds: Cadencia del polling incremental
+        full_sync_interval_seconds: Cadencia de la reconciliación completa
+        max_staleness_seconds: Antigüedad máxima para servir lecturas
+        versions: CollectionVersions (la global por defecto)
+    """
+
+    def __init__(
+        self,
+        store: Optional[SQLiteReadModelStore] = None,
+        airtable=None,
+        poll_interval_seconds: Optional[float] = None,
+        full_sync_interval_seconds: Optional[float] = None,
+        max_staleness_seconds: Optional[float] = None,
+        versions: Optional[CollectionVersions] = None,
+    ):
+        self.versions = versions or get_collection_versions()
+        self._store = store
+        if store is not None:
+            self.versions.attach(store)
+        self._airtable = airtable
+        self.poll_interval_seconds = poll_interval_seconds or float(
+            os.getenv("READ_MODEL_POLL_SECONDS", "30")
+        )
+        self.full_sync_interval_seconds = full_sync_interval_seconds or float(
+            os.getenv("READ_MODEL_FULL_SYNC_SECONDS", "3600")
+        )
+        self.max_staleness_seconds = max_staleness_seconds or float(
+            os.getenv("READ_MODEL_MAX_STALENESS_SECONDS", "120")
+        )
+        self.changelog_retention_seconds = (
+            float(os.getenv("READ_MODEL_CHANGELOG_RETENTION_DAYS", "14")) * 86400
+        )
+        self.jobs = JobScheduler()
+        self._running = False
+        self._table_locks: Dict[str, asyncio.Lock] = {}
+        self._webhook_tasks: Set[asyncio.Task] = set()
+        self._counters: Dict[str, Dict[str, int]] = {
+            name: {
+                "reads": 0,
+                "stale_reads": 0,
+                "fallbacks": 0,
+                "polls": 0,
+                "full_syncs": 0,
+                "poll_errors": 0,
+            }
+            for name in READ_MODEL_TABLES
+        }
+
+    @property
+    def store(self) -> SQLiteReadModelStore:
+        if self._store is None:
+            self._store = SQLiteReadModelStore()
+            self.versions.attach(self._store)
+        return self._store
+
+    @property
+    def airtable(self):
+        if self._airtable is None:
+            from src.infrastructure.mcp.airtable_client import airtable_client
+
+            self._airtable = airtable_client
+        return self._airtable
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self):
+        if self._running:
+            return
+        if not read_model_enabled():
+            logger.info("Read model disabled (READ_MODEL_ENABLED=false)")
+            return
+        self._running = True
+        for name in READ_MODEL_TABLES:
+            self.jobs.add_periodic(
+                f"read_model:{name}",
+                lambda name=name: self.refresh(name),
+                interval_seconds=self.poll_interval_seconds,
+                timeout_seconds=max(60.0, self.poll_interval_seconds * 2),
+            )
+        self.jobs.add_periodic(
+            "read_model:changelog_prune",
+            lambda: asyncio.to_thread(self.store.prune_changes, self.changelog_retention_seconds),
+            interval_seconds=3600,
+        )
+        await self.jobs.start()
+        logger.info(
+            f"Read model started (poll: {self.poll_interval_seconds}s, "
+            f"max staleness: {self.max_staleness_seconds}s)"
+        )
+
+    async def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        await self.jobs.stop()
+        for task in list(self._webhook_tasks):
+            task.cancel()
+        await asyncio.gather(*self._webhook_tasks, return_exceptions=True)
+
+    # --- Sincronización ---
+
+    async def refresh(self, name: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Trae de Airtable los cambios de la tabla desde el último cursor. Sin
+        cursor, o cuando toca reconciliar, relee la tabla entera y elimina
+        los registros que ya no existen.
+        """
+        table = READ_MODEL_TABLES[name]
+        async with self._table_locks.setdefault(name, asyncio.Lock()):
+            meta = await asyncio.to_thread(self.store.get_meta, name)
+            last_full = meta["last_full_sync_at"]
+            full = (
+                full
+                or meta["cursor"] is None
+                or last_full is None
+                or time.time() - last_full >= self.full_sync_interval_seconds
+            )
+            run_started = datetime.now(timezone.utc)
+            params: Dict[str, Any] = {}
+            if not full:
+                params["filterByFormula"] = (
+                    f"IS_AFTER(LAST_MODIFIED_TIME(), '{meta['cursor']}')"
+                )
+
+            try:
+                response = await self.airtable.list_records(
+                    base_id=BASE_ID, table_name=table.airtable_table, **params
+                )
+            except Exception as e:
+                self._counters[name]["poll_errors"] += 1
+                logger.warning(f"Read model refresh failed for {name}: {e}")
+                raise
+
+            records = response.get("records", [])
+            removed = 0
+            if full:
+                removed = await asyncio.to_thread(self.store.replace_all, name, records)
+                self._counters[name]["full_syncs"] += 1
+            else:
+                await asyncio.to_thread(self.store.upsert, name, records)
+                self._counters[name]["polls"] += 1
+
+            cursor = (run_started - CURSOR_OVERLAP).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            await asyncio.to_thread(self.store.mark_synced, name, cursor, full)
+
+        if records or removed:
+            logger.debug(
+                f"Read model {name}: {len(records)} upserted, {removed} removed "
+                f"({'full' if full else 'incremental'})"
+            )
+        return {"table": name, "full": full, "upserted": len(records), "removed": removed}
+
+    async def refresh_records(self, name: str, record_ids: List[str]) -> Dict[str, Any]:
+        """
+        Refresca solo los registros indicados (webhooks). Los que Airtable ya
+        no devuelve se eliminan de la réplica. No mueve el cursor ni la cota
+        de frescura: el polling sigue cubriendo cambios no notificados.
+        """
+        table = READ_MODEL_TABLES[name]
+        ids = [rid for rid in dict.fromkeys(record_ids) if _RECORD_ID_RE.fullmatch(rid)]
+        found: List[Dict[str, Any]] = []
+        for i in range(0, len(ids), RECORD_ID_BATCH_SIZE):
+            batch = ids[i:i + RECORD_ID_BATCH_SIZE]
+            formula = "OR(" + ",".join(f"RECORD_ID()='{rid}'" for rid in batch) + ")"
+            response = await self.airtable.list_records(
+                base_id=BASE_ID, table_name=table.airtable_table, filterByFormula=formula
+            )
+            found.extend(response.get("records", []))
+
+        missing = set(ids) - {record["id"] for record in found}
+        async with self._table_locks.setdefault(name, asyncio.Lock()):
+            await asyncio.to_thread(self.store.upsert, name, found)
+            if missing:
+                await asyncio.to_thread(self.store.delete, name, missing)
+        return {"table": name, "upserted": len(found), "removed": len(missing)}
+
+    def notify_changed(self, airtable_table: str, record_ids: List[str]) -> bool:
+        """
+        Webhook de Airtable: refresca en segundo plano los registros
+        cambiados. Acepta el ID de tabla de Airtable o el nombre del read model.
+        """
+        name = self._resolve(airtable_table)
+        if name is None or not self._running:
+            return False
+        if record_ids:
+            coro = self.refresh_records(name, record_ids)
+        else:
+            coro = self.refresh(name)
+        task = asyncio.create_task(coro)
+        self._webhook_tasks.add(task)
+        task.add_done_callback(self._webhook_done)
+        return True
+
+    def _webhook_done(self, task: asyncio.Task):
+        self._webhook_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Read model webhook refresh failed: {task.exception()}")
+
+    def apply_write(self, name: str, record: Optional[Dict[str, Any]]):
+        """
+        Refleja en la réplica un registro que Airtable acaba de devolver tras
+        una escritura propia (read-your-writes sin esperar al polling).
+        """
+        if not self._running or not record or "id" not in record:
+            return
+        try:
+            self.store.upsert(name, [record])
+        except Exception as e:
+            logger.warning(f"Read model write-through failed for {name}: {e}")
+
+    def apply_delete(self, name: str, record_id: str):
+        """Quita de la réplica un registro recién borrado en Airtable."""
+        if not self._running:
+            return
+        try:
+            self.store.delete(name, [record_id])
+        except Exception as e:
+            logger.warning(f"Read model delete failed for {name}: {e}")
+
+    @staticmethod
+    def _resolve(table: str) -> Optional[str]:
+        if table in READ_MODEL_TABLES:
+            return table
+        return next(
+            (t.name for t in READ_MODEL_TABLES.values() if t.airtable_table == table),
+            None,
+        )
+
+    # --- Lectura ---
+
+    def staleness_seconds(self, name: str) -> Optional[float]:
+        """Segundos desde la última sincronización correcta (None si nunca)."""
+        last = self.store.get_meta(name)["last_synced_at"]
+        return None if last is None else max(0.0, time.time() - last)
+
+    def is_fresh(self, name: str) -> bool:
+        if not self._running:
+            return False
+        staleness = self.staleness_seconds(name)
+        return staleness is not None and staleness <= self.max_staleness_seconds
+
+    def read(
+        self,
+        name: str,
+        where: Optional[Dict[str, Any]] = None,
+        exclude: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        between: Optional[Dict[str, Any]] = None,
+        allow_stale: bool = False,
+        after: Optional[Tuple[Any, str]] = None,
+        offset: Optional[int] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Registros en formato Airtable desde la réplica, o None si está más
+        desfasada que la cota (el llamador debe ir a Airtable).
+
+        allow_stale=True ignora la cota (Airtable no disponible): solo
+        devuelve None si la tabla nunca se ha sincronizado.
+        """
+        if not self._can_serve(name, allow_stale):
+            return None
+        return self.store.select(
+            name,
+            where=where,
+            exclude=exclude,
+            order_by=order_by,
+            limit=limit,
+            between=between,
+            after=after,
+            offset=offset,
+        )
+
+    def count(
+        self, name: str, where: Optional[Dict[str, Any]] = None, allow_stale: bool = False
+    ) -> Optional[int]:
+        """Número de registros desde los índices de la réplica (None si no es fresca)."""
+        if not self._can_serve(name, allow_stale):
+            return None
+        return self.store.count(name, where=where)
+
+    def iter_read(
+        self,
+        name: str,
+        order_by: str,
+        between: Optional[Dict[str, Any]] = None,
+        batch_size: int = 500,
+        allow_stale: bool = False,
+    ) -> Optional[Iterator[List[Dict[str, Any]]]]:
+        """
+        Como read() pero por páginas (exportaciones largas con memoria
+        constante). La cota de frescura se comprueba una vez, al empezar.
+        """
+        if not self._can_serve(name, allow_stale):
+            return None
+        return self.store.iter_select(name, order_by=order_by, between=between, batch_size=batch_size)
+
+    def read_rollups(
+        self,
+        start: date,
+        end: date,
+        group_by: Sequence[str] = GROUP_COLUMNS,
+        allow_stale: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Agregados diarios de reservas (reservas, comensales, cubiertos) con
+        fecha en [start, end) agrupados por `group_by`, o None si la réplica
+        de Reservas no es fresca (misma cota que read()).
+        """
+        if not self._can_serve("reservas", allow_stale):
+            return None
+        return self.store.select_rollups(start, end, group_by)
+
+    def changes(
+        self,
+        since: Optional[Tuple[str, int]],
+        names: Sequence[str],
+        limit: int = 500,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cambios de `names` desde el token (época, secuencia), o todos los
+        registros si no hay token: {"changes", "epoch", "position",
+        "has_more"}. None si la réplica no está sincronizada. Se sirve aunque
+        la réplica se haya desfasado: lo que llegue después entra en el
+        registro con secuencias mayores y el cliente lo recibe en la
+        siguiente llamada.
+
+        Raises:
+            ChangeLogExpired: token de otra réplica o anterior a la retención
+        """
+        if not all(self._can_serve(name, allow_stale=True) for name in names):
+            return None
+        epoch, seq = since if since else (None, 0)
+        changes, position, has_more = self.store.changes_since(epoch, seq, names, limit)
+        return {
+            "changes": changes,
+            "epoch": self.store.changelog.epoch,
+            "position": position,
+            "has_more": has_more,
+        }
+
+    def _can_serve(self, name: str, allow_stale: bool) -> bool:
+        if allow_stale:
+            if not self._running or self.staleness_seconds(name) is None:
+                return False
+            self._counters[name]["stale_reads"] += 1
+        elif not self.is_fresh(name):
+            self._counters[name]["fallbacks"] += 1
+            return False
+        else:
+            self._counters[name]["reads"] += 1
+        return True
+
+    def read_one(self, name: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Registro por ID desde la réplica (None si no está o no es fresca)."""
+        if not self.is_fresh(name):
+            self._counters[name]["fallbacks"] += 1
+            return None
+        self._counters[name]["reads"] += 1
+        return self.store.get(name, record_id)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        def _collect():
+            tables = {}
+            for name in READ_MODEL_TABLES:
+                meta = self.store.get_meta(name)
+                staleness = self.staleness_seconds(name)
+                tables[name] = {
+                    "records": self.store.count(name),
+                    "fresh": self.is_fresh(name),
+                    "staleness_seconds": None if staleness is None else round(staleness, 1),
+                    "cursor": meta["cursor"],
+                    **self._counters[name],
+                }
+            return tables
+
+        return {
+            "running": self._running,
+            "max_staleness_seconds": self.max_staleness_seconds,
+            "poll_interval_seconds": self.poll_interval_seconds,
+            "tables": await asyncio.to_thread(_collect),
+            "versions": self.versions.get_stats(),
+            "jobs": self.jobs.get_stats(),
+        }
+
+
+_read_model: Optional[ReadModel] = None
+
+
+def get_read_model() -> ReadModel:
+    """Devuelve la instancia singleton del read model."""
+    global _read_model
+    if _read_model is None:
+        _read_model = ReadModel()
+    return _read_model
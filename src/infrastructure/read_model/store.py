@@ -0,0 +1,564 @@
+"""
+Read model local: espejo en SQLite de las tablas de Airtable que más se leen.
+
+Cada tabla se guarda como una fila por registro con el JSON original de
+Airtable ({"id", "createdTime", "fields"}) más unas columnas extraídas e
+indexadas (fecha, teléfono, estado...). Así las lecturas son consultas SQL
+locales en lugar de fórmulas de Airtable sin índice, y los mappers
+existentes siguen recibiendo el mismo formato de registro.
+
+Airtable sigue siendo la fuente de verdad: aquí solo se escribe lo que se
+lee de Airtable (polling incremental, webhooks y reconciliación completa).
+
+Los agregados diarios de Reservas (rollups.py) y el registro de cambios
+para la sincronización delta (changelog.py) se mantienen en la misma
+transacción que cada cambio de la réplica, igual que la versión de cada
+tabla (rm_versions, base de los ETags). Varios workers comparten el fichero:
+lo que deba verse en todos ellos se lee de estas tablas. Los listeners de
+add_listener() solo reciben, tras el commit, los cambios escritos por su
+propio proceso.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.config.airtable_ids import TABLES
+from src.infrastructure.read_model.changelog import ChangeLog
+from src.infrastructure.read_model.rollups import GROUP_COLUMNS, ReservationRollups
+
+logger = logging.getLogger(__name__)
+
+
+def _first_link(value: Any) -> Any:
+    """Linked records llegan como lista de IDs: se indexa el primero."""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _day(value: Any) -> Any:
+    """Fechas y date-times se indexan por día (YYYY-MM-DD)."""
+    return str(value)[:10] if value else None
+
+
+def _sortable_int(value: Any) -> Any:
+    """Números con ceros a la izquierda para que ORDER BY sobre TEXT sea numérico."""
+    try:
+        return f"{int(value):08d}"
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class IndexedColumn:
+    """Columna indexada extraída de uno o varios campos de Airtable."""
+
+    name: str
+    # Se usa el primer campo presente (el esquema real tiene alias, p. ej.
+    # "Estado de Reserva" / "Estado")
+    fields: Tuple[str, ...]
+    normalize: Optional[Callable[[Any], Any]] = None
+
+    def extract(self, record_fields: Dict[str, Any]) -> Optional[str]:
+        for name in self.fields:
+            value = record_fields.get(name)
+            if value is None:
+                continue
+            if self.normalize:
+                value = self.normalize(value)
+            return None if value is None else str(value)
+        return None
+
+
+@dataclass(frozen=True)
+class ReadModelTable:
+    """Tabla de Airtable replicada en el read model."""
+
+    name: str
+    airtable_table: str
+    columns: Tuple[IndexedColumn, ...] = ()
+
+
+READ_MODEL_TABLES: Dict[str, ReadModelTable] = {
+    table.name: table
+    for table in (
+        ReadModelTable(
+            "reservas",
+            TABLES["RESERVAS"],
+            (
+                IndexedColumn("fecha", ("Fecha de Reserva",), _day),
+                IndexedColumn("telefono", ("Teléfono",)),
+                IndexedColumn("estado", ("Estado de Reserva", "Estado")),
+                IndexedColumn("mesa", ("Mesa",), _first_link),
+            ),
+        ),
+        ReadModelTable(
+            "mesas",
+            TABLES["MESAS"],
+            (
+                IndexedColumn("id_mesa", ("ID Mesa",)),
+                IndexedColumn("nombre", ("Nombre de Mesa",)),
+                IndexedColumn("ubicacion", ("Ubicación",)),
+                IndexedColumn("prioridad", ("Prioridad",), _sortable_int),
+            ),
+        ),
+        ReadModelTable(
+            "clientes",
+            "tblPcVRnFTKDu7Z9t",
+            (IndexedColumn("telefono", ("Teléfono",)), IndexedColumn("nombre", ("Nombre",))),
+        ),
+        ReadModelTable(
+            "waitlist",
+            TABLES["LISTA_ESPERA"],
+            (
+                IndexedColumn("estado", ("Estado",)),
+                IndexedColumn("fecha", ("Fecha Solicitada",), _day),
+                IndexedColumn("telefono", ("Teléfono",)),
+                IndexedColumn("entrada", ("Fecha Entrada Lista",)),
+            ),
+        ),
+        ReadModelTable(
+            "config",
+            TABLES["CONFIG"],
+            (IndexedColumn("parametro", ("Parámetro",)),),
+        ),
+    )
+}
+
+
+# (registros upserted, record IDs borrados)
+ChangeListener = Callable[[List[Dict[str, Any]], List[str]], None]
+
+
+class SQLiteReadModelStore:
+    """Réplica local en SQLite, una tabla por entidad con sus índices."""
+
+    _META_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS read_model_meta (
+        table_name TEXT PRIMARY KEY,
+        cursor TEXT,
+        last_synced_at REAL,
+        last_full_sync_at REAL
+    );
+    CREATE TABLE IF NOT EXISTS rm_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    );
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        tables: Optional[Dict[str, ReadModelTable]] = None,
+    ):
+        self.path = path or os.getenv("READ_MODEL_SQLITE_PATH", "data/read_model.sqlite3")
+        self.tables = tables or READ_MODEL_TABLES
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._META_SCHEMA + self._tables_schema())
+        self._lock = threading.Lock()
+        self._listeners: Dict[str, List[ChangeListener]] = {}
+        self.rollups = ReservationRollups() if "reservas" in self.tables else None
+        if self.rollups and self.rollups.ensure(self._conn):
+            logger.info("Read model: agregados diarios de reservas reconstruidos")
+        self.changelog = ChangeLog()
+        if self.changelog.ensure(self._conn, self.tables):
+            logger.info("Read model: registro de cambios iniciado (época nueva)")
+
+    def _tables_schema(self) -> str:
+        statements = []
+        for table in self.tables.values():
+            columns = "".join(f", {c.name} TEXT" for c in table.columns)
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS rm_{table.name} "
+                f"(record_id TEXT PRIMARY KEY, data TEXT NOT NULL{columns});"
+            )
+            statements.extend(
+                f"CREATE INDEX IF NOT EXISTS idx_rm_{table.name}_{c.name} "
+                f"ON rm_{table.name}({c.name});"
+                for c in table.columns
+            )
+        return "\n".join(statements)
+
+    def close(self):
+        self._conn.close()
+
+    def _table(self, name: str) -> ReadModelTable:
+        table = self.tables.get(name)
+        if table is None:
+            raise KeyError(f"Unknown read model table: {name}")
+        return table
+
+    def _column_names(self, table: ReadModelTable) -> List[str]:
+        return [c.name for c in table.columns]
+
+    # --- Escritura (solo desde la sincronización con Airtable) ---
+
+    def add_listener(self, name: str, listener: ChangeListener):
+        """Suscribe `listener` a los cambios de la tabla (se llama tras el commit)."""
+        self._table(name)
+        self._listeners.setdefault(name, []).append(listener)
+
+    def remove_listener(self, name: str, listener: ChangeListener):
+        if listener in self._listeners.get(name, []):
+            self._listeners[name].remove(listener)
+
+    def _notify(self, name: str, upserted: List[Dict[str, Any]], deleted: List[str]):
+        if not (upserted or deleted):
+            return
+        for listener in list(self._listeners.get(name, [])):
+            try:
+                listener(upserted, deleted)
+            except Exception as e:
+                logger.warning(f"Read model listener failed for {name}: {e}")
+
+    def _previous_versions(self, name: str, record_ids: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Versiones a restar de los agregados (None si la tabla no tiene agregados)."""
+        if name != "reservas" or self.rollups is None:
+            return None
+        return self.rollups.previous_versions(self._conn, record_ids)
+
+    def upsert(self, name: str, records: Iterable[Dict[str, Any]]) -> int:
+        table = self._table(name)
+        # Un registro repetido en el lote contaría dos veces en los agregados
+        records = list({record["id"]: record for record in records}.values())
+        columns = ["record_id", "data", *self._column_names(table)]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+        sql = (
+            f"INSERT INTO rm_{table.name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(record_id) DO UPDATE SET {updates}"
+        )
+        rows = [
+            (
+                record["id"],
+                json.dumps(record, ensure_ascii=False, default=str),
+                *(c.extract(record.get("fields", {})) for c in table.columns),
+            )
+            for record in records
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                # Los registros idénticos a los guardados (solape del cursor,
+                # reconciliación completa) no son cambios: ni se escriben ni
+                # se notifican
+                stored = self._stored_data(table, [row[0] for row in rows])
+                changed = [i for i, row in enumerate(rows) if stored.get(row[0]) != row[1]]
+                rows = [rows[i] for i in changed]
+                records = [records[i] for i in changed]
+                previous = self._previous_versions(name, [row[0] for row in rows])
+                self._conn.executemany(sql, rows)
+                self.changelog.record(self._conn, name, upserted=[row[0] for row in rows])
+                if rows:
+                    self._bump_version(name)
+                if previous is not None:
+                    self.rollups.apply(self._conn, removed=previous, added=records)
+        self._notify(name, records, [])
+        return len(rows)
+
+    def _bump_version(self, name: str):
+        """Sube la versión de la tabla (dentro de la transacción del cambio)."""
+        self._conn.execute(
+            "INSERT INTO rm_versions (table_name, version) VALUES (?, 1) "
+            "ON CONFLICT(table_name) DO UPDATE SET version = version + 1",
+            (name,),
+        )
+
+    def bump_version(self, name: str) -> int:
+        """Fuerza un cambio de versión sin cambio de registros."""
+        self._table(name)
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._bump_version(name)
+                return self._conn.execute(
+                    "SELECT version FROM rm_versions WHERE table_name = ?", (name,)
+                ).fetchone()[0]
+
+    def _stored_data(self, table: ReadModelTable, record_ids: List[str]) -> Dict[str, str]:
+        """JSON guardado de los registros indicados (los que existan)."""
+        stored: Dict[str, str] = {}
+        for i in range(0, len(record_ids), 500):
+            batch = record_ids[i : i + 500]
+            stored.update(
+                self._conn.execute(
+                    f"SELECT record_id, data FROM rm_{table.name} "
+                    f"WHERE record_id IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+            )
+        return stored
+
+    def delete(self, name: str, record_ids: Iterable[str]) -> int:
+        table = self._table(name)
+        ids = [(rid,) for rid in record_ids]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                previous = self._previous_versions(name, [rid for (rid,) in ids])
+                stored = self._stored_data(table, [rid for (rid,) in ids])
+                cur = self._conn.executemany(
+                    f"DELETE FROM rm_{table.name} WHERE record_id = ?", ids
+                )
+                self.changelog.record(self._conn, name, deleted=stored)
+                if stored:
+                    self._bump_version(name)
+                if previous:
+                    self.rollups.apply(self._conn, removed=previous)
+        self._notify(name, [], [rid for (rid,) in ids])
+        return cur.rowcount
+
+    def replace_all(self, name: str, records: List[Dict[str, Any]]) -> int:
+        """Reconciliación completa: deja exactamente estos registros (detecta borrados)."""
+        table = self._table(name)
+        keep = {record["id"] for record in records}
+        with self._lock:
+            existing = {
+                row[0]
+                for row in self._conn.execute(f"SELECT record_id FROM rm_{table.name}")
+            }
+        removed = existing - keep
+        self.upsert(name, records)
+        if removed:
+            self.delete(name, removed)
+        return len(removed)
+
+    def mark_synced(self, name: str, cursor: Optional[str], full: bool = False):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO read_model_meta (table_name, cursor, last_synced_at, last_full_sync_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(table_name) DO UPDATE SET "
+                "cursor = excluded.cursor, last_synced_at = excluded.last_synced_at, "
+                "last_full_sync_at = COALESCE(excluded.last_full_sync_at, last_full_sync_at)",
+                (name, cursor, now, now if full else None),
+            )
+
+    # --- Lectura ---
+
+    def get_meta(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cursor, last_synced_at, last_full_sync_at FROM read_model_meta "
+                "WHERE table_name = ?",
+                (name,),
+            ).fetchone()
+        if not row:
+            return {"cursor": None, "last_synced_at": None, "last_full_sync_at": None}
+        return {"cursor": row[0], "last_synced_at": row[1], "last_full_sync_at": row[2]}
+
+    def get(self, name: str, record_id: str) -> Optional[Dict[str, Any]]:
+        table = self._table(name)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT data FROM rm_{table.name} WHERE record_id = ?", (record_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _filters(
+        self,
+        table: ReadModelTable,
+        where: Optional[Dict[str, Any]] = None,
+        exclude: Optional[Dict[str, Any]] = None,
+        between: Optional[Dict[str, Tuple[Any, Any]]] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        """Cláusulas WHERE y parámetros sobre columnas indexadas."""
+        allowed = set(self._column_names(table))
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (where or {}).items():
+            self._check_column(column, allowed)
+            clauses.append(f"{column} = ?")
+            params.append(str(value))
+        for column, value in (exclude or {}).items():
+            self._check_column(column, allowed)
+            clauses.append(f"({column} IS NULL OR {column} != ?)")
+            params.append(str(value))
+        for column, (low, high) in (between or {}).items():
+            self._check_column(column, allowed)
+            clauses.append(f"{column} BETWEEN ? AND ?")
+            params.extend((str(low), str(high)))
+        return clauses, params
+
+    def select(
+        self,
+        name: str,
+        where: Optional[Dict[str, Any]] = None,
+        exclude: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        between: Optional[Dict[str, Tuple[Any, Any]]] = None,
+        after: Optional[Tuple[Any, str]] = None,
+        offset: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Registros (formato Airtable) filtrados por columnas indexadas.
+
+        Args:
+            where: {columna: valor} por igualdad
+            exclude: {columna: valor} por desigualdad (NULL no se excluye,
+                igual que `{Campo} != 'x'` en Airtable)
+            order_by: columna indexada; prefijo "-" para descendente (se
+                desempata por record_id para que el orden sea estable)
+            between: {columna: (desde, hasta)} con ambos extremos incluidos
+            after: sort_key() del último registro de la página anterior
+                (paginación por keyset: requiere order_by y omite filas con
+                order_by NULL)
+            offset: registros a saltar (paginación clásica; prefiera after)
+        """
+        table = self._table(name)
+        clauses, params = self._filters(table, where, exclude, between)
+
+        descending = bool(order_by) and order_by.startswith("-")
+        column = order_by.lstrip("-") if order_by else None
+        if column:
+            self._check_column(column, set(self._column_names(table)))
+        if after is not None:
+            if not column:
+                raise ValueError("after requires order_by")
+            clauses.append(f"({column}, record_id) {'<' if descending else '>'} (?, ?)")
+            params.extend((str(after[0]), after[1]))
+
+        sql = f"SELECT data FROM rm_{table.name}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if column:
+            direction = "DESC" if descending else "ASC"
+            sql += f" ORDER BY {column} {direction}, record_id {direction}"
+        if limit or offset:
+            sql += " LIMIT ?"
+            params.append(int(limit) if limit else -1)
+        if offset:
+            sql += " OFFSET ?"
+            params.append(int(offset))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def sort_key(self, name: str, column: str, record: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        """Posición de un registro en el orden por `column` (para after=)."""
+        extractor = next((c for c in self._table(name).columns if c.name == column), None)
+        if extractor is None:
+            raise ValueError(f"Column '{column}' is not indexed in the read model")
+        return extractor.extract(record.get("fields", {})), record["id"]
+
+    def iter_select(
+        self,
+        name: str,
+        order_by: str,
+        between: Optional[Dict[str, Tuple[Any, Any]]] = None,
+        batch_size: int = 500,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Igual que select() pero por páginas de `batch_size` registros
+        ordenados por (order_by, record_id): la memoria no depende del
+        número de filas y el lock se libera entre páginas.
+        """
+        column = order_by.lstrip("-")
+        after = None
+        while True:
+            page = self.select(
+                name, order_by=order_by, limit=batch_size, between=between, after=after
+            )
+            if not page:
+                return
+            yield page
+            if len(page) < batch_size:
+                return
+            after = self.sort_key(name, column, page[-1])
+
+    @staticmethod
+    def _check_column(column: str, allowed: set):
+        if column not in allowed:
+            raise ValueError(f"Column '{column}' is not indexed in the read model")
+
+    def count(self, name: str, where: Optional[Dict[str, Any]] = None) -> int:
+        """Número de registros (con `where`, resuelto sobre los índices)."""
+        table = self._table(name)
+        clauses, params = self._filters(table, where)
+        sql = f"SELECT COUNT(*) FROM rm_{table.name}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def versions(self, names: Iterable[str]) -> Dict[str, int]:
+        """Versión actual de cada tabla (0 si nunca ha cambiado)."""
+        names = list(names)
+        with self._lock:
+            rows = dict(
+                self._conn.execute(
+                    f"SELECT table_name, version FROM rm_versions "
+                    f"WHERE table_name IN ({', '.join('?' * len(names))})",
+                    names,
+                ).fetchall()
+            ) if names else {}
+        return {name: rows.get(name, 0) for name in names}
+
+    def change_position(self) -> Tuple[str, int]:
+        """(época, última secuencia) del registro de cambios."""
+        with self._lock:
+            return self.changelog.epoch, self.changelog.position(self._conn)
+
+    def changes_since(
+        self,
+        epoch: Optional[str],
+        seq: int,
+        names: Sequence[str],
+        limit: int = 500,
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Cambios de las tablas `names` posteriores a (época, secuencia), como
+        {"table", "record", "deleted"} con la versión actual del registro (o
+        la última conocida si se borró); la secuencia hasta la que llegan; y
+        si quedan más. Lanza ChangeLogExpired si el token ya no vale.
+        """
+        for name in names:
+            self._table(name)
+        with self._lock:
+            # Una sola transacción de lectura: otro worker puede escribir
+            # entre consultas, y una posición posterior a los cambios leídos
+            # haría que el cliente se saltara los nuevos
+            with self._conn:
+                self._conn.execute("BEGIN")
+                rows, has_more = self.changelog.since(self._conn, epoch, seq, names, limit)
+                current: Dict[str, Dict[str, str]] = {}
+                for name in names:
+                    ids = [rid for _, table, rid, deleted, _ in rows if table == name and not deleted]
+                    current[name] = self._stored_data(self.tables[name], ids) if ids else {}
+                position = rows[-1][0] if rows else max(seq, self.changelog.position(self._conn))
+        changes = []
+        for _, name, rid, deleted, last_data in rows:
+            data = last_data if deleted else current[name].get(rid)
+            changes.append({
+                "table": name,
+                "record": json.loads(data) if data else {"id": rid, "fields": {}},
+                "deleted": deleted,
+            })
+        return changes, position, has_more
+
+    def prune_changes(self, retention_seconds: float) -> int:
+        """Purga los tombstones más antiguos que la retención."""
+        with self._lock:
+            return self.changelog.prune(self._conn, time.time() - retention_seconds)
+
+    def select_rollups(
+        self, start: date, end: date, group_by: Sequence[str] = GROUP_COLUMNS
+    ) -> List[Dict[str, Any]]:
+        """Agregados diarios de reservas con fecha en [start, end)."""
+        if self.rollups is None:
+            return []
+        with self._lock:
+            return self.rollups.select(self._conn, start, end, group_by)
@@ -0,0 +1,79 @@
+"""
+Contadores de versión por colección del read model.
+
+Cada cambio que llega a la réplica (escritura propia vía apply_write /
+apply_delete, polling, reconciliación o webhook) sube la versión de su
+tabla. Con la versión de las tablas de las que depende un listado se
+construye un ETag fuerte: mientras la réplica esté fresca y la versión no
+cambie, el listado no ha cambiado.
+
+Las versiones viven en la base SQLite del read model (rm_versions) y suben
+en la misma transacción que el cambio, así que todos los workers que
+comparten el fichero ven la misma versión aunque el cambio lo escribiera
+otro proceso. El ETag incluye la época del registro de cambios: si la
+réplica se recrea y las versiones vuelven a empezar, los tags anteriores
+nunca coinciden por casualidad.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from src.infrastructure.read_model.store import READ_MODEL_TABLES, SQLiteReadModelStore
+
+
+class CollectionVersions:
+    """Versión monótona por tabla del read model (leída de la réplica)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store: Optional[SQLiteReadModelStore] = None
+
+    def attach(self, store: SQLiteReadModelStore):
+        """Lee las versiones de `store` (la réplica del proceso)."""
+        with self._lock:
+            self._store = store
+
+    @property
+    def store(self) -> SQLiteReadModelStore:
+        with self._lock:
+            if self._store is None:
+                raise RuntimeError("CollectionVersions is not attached to a read model store")
+            return self._store
+
+    def bump(self, name: str) -> int:
+        return self.store.bump_version(name)
+
+    def version(self, name: str) -> int:
+        return self.store.versions([name])[name]
+
+    def etag(self, collections: Iterable[str], *parts: Any) -> str:
+        """
+        ETag fuerte de un listado que depende de `collections`. `parts`
+        distingue variantes de la misma colección (ruta, filtros, usuario).
+        """
+        store = self.store
+        versions = store.versions(sorted(collections))
+        canonical = json.dumps(
+            [store.changelog.epoch, versions, [str(part) for part in parts]], sort_keys=True
+        )
+        return f'"{hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:20]}"'
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            store = self._store
+        if store is None:
+            return {"epoch": None, "versions": {}}
+        return {"epoch": store.changelog.epoch, "versions": store.versions(READ_MODEL_TABLES)}
+
+
+_collection_versions: Optional[CollectionVersions] = None
+
+
+def get_collection_versions() -> CollectionVersions:
+    """Obtiene la instancia global de CollectionVersions."""
+    global _collection_versions
+    if _collection_versions is None:
+        _collection_versions = CollectionVersions()
+    return _collection_versions
@@ -5,18 +5,63 @@ from pyairtable import Api
 from src.core.ports.booking_repository import BookingRepository
 from src.core.entities.booking import Booking, BookingStatus, BookingChannel
 from src.core.entities.table import Table, TableStatus, normalize_zone
+from src.core.config.airtable_fields import BOOKING_FIELDS
 from src.core.config.airtable_ids import TABLES, BASE_ID
+from src.infrastructure.airtable.resilience import (
+    AirtableUnavailableError,
+    get_airtable_resilience,
+)
+from src.infrastructure.read_model import get_read_model
 from loguru import logger
 
+# Máximo de registros por petición batch en la API de Airtable
+AIRTABLE_BATCH_SIZE = 10
+
 
 class AirtableBookingRepository(BookingRepository):
     def __init__(self):
         self.api_key = os.getenv("AIRTABLE_API_KEY")
         if not self.api_key:
             logger.warning("AIRTABLE_API_KEY not found in env")
-        self.api = Api(self.api_key)
+        self.resilience = get_airtable_resilience()
+        self.api = Api(self.api_key, timeout=self.resilience.http_timeout)
         self.base_id = BASE_ID
 
+    def _call(self, table_id: str, fn, *args, idempotent: bool = False, **kwargs):
+        """Llamada a Airtable con breaker y timeout adaptativo de la tabla."""
+        return self.resilience.call_sync(table_id, fn, *args, idempotent=idempotent, **kwargs)
+
+    def _read_records(
+        self,
+        name: str,
+        table_id: str,
+        formula: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        **query,
+    ) -> List[Dict[str, Any]]:
+        """
+        Réplica local si está dentro de la cota de frescura; si no, Airtable
+        (solo con los campos de `fields`, si se indican).
+        Con Airtable no disponible (breaker abierto o timeout) se sirve la
+        réplica aunque esté desfasada.
+        """
+        read_model = get_read_model()
+        records = read_model.read(name, **query)
+        if records is not None:
+            return records
+        table_api = self.api.table(self.base_id, table_id)
+        kwargs = {"formula": formula} if formula else {}
+        if fields:
+            kwargs["fields"] = fields
+        try:
+            return self._call(table_id, table_api.all, idempotent=True, **kwargs)
+        except AirtableUnavailableError:
+            records = read_model.read(name, allow_stale=True, **query)
+            if records is None:
+                raise
+            logger.warning(f"Airtable no disponible: '{name}' servido desde la réplica local")
+            return records
+
     # --- MAPPING HELPERS ---
 
     def _map_booking_to_fields(self, booking: Booking) -> Dict[str, Any]:
@@ -98,6 +143,7 @@ class AirtableBookingRepository(BookingRepository):
                 if fields.get("Mesa")
                 else None,
                 canal=BookingChannel.WHATSAPP,  # Default channel
+                recordatorio_enviado=bool(fields.get("Recordatorio Enviado", False)),
             )
         except Exception as e:
             logger.error(f"Error mapping record {record.get('id')}: {e}")
@@ -107,8 +153,7 @@ class AirtableBookingRepository(BookingRepository):
 
     def get_all_tables(self) -> List[Table]:
         try:
-            table_api = self.api.table(self.base_id, TABLES["MESAS"])
-            records = table_api.all()
+            records = self._read_records("mesas", TABLES["MESAS"])
             tables = []
 
             for r in records:
@@ -141,14 +186,18 @@ class AirtableBookingRepository(BookingRepository):
     def get_bookings_for_date(self, date: datetime) -> List[Booking]:
         """Obtiene reservas para una fecha específica."""
         try:
-            table_api = self.api.table(self.base_id, TABLES["RESERVAS"])
-
             # Format date for Airtable formula
             date_str = date.strftime("%Y-%m-%d")
             # Formula checks if 'Fecha de Reserva' matches the requested date
             formula = f"IS_SAME({{Fecha de Reserva}}, '{date_str}', 'day')"
 
-            records = table_api.all(formula=formula)
+            records = self._read_records(
+                "reservas",
+                TABLES["RESERVAS"],
+                formula,
+                fields=BOOKING_FIELDS,
+                where={"fecha": date_str},
+            )
             bookings = []
 
             for r in records:
@@ -170,7 +219,8 @@ class AirtableBookingRepository(BookingRepository):
             fields = self._map_booking_to_fields(booking)
 
             # Create
-            record = table_api.create(fields)
+            record = self._call(TABLES["RESERVAS"], table_api.create, fields)
+            get_read_model().apply_write("reservas", record)
 
             # Update ID and return
             booking.id = record["id"]
@@ -192,7 +242,8 @@ class AirtableBookingRepository(BookingRepository):
             if table_id:
                 fields["Mesa"] = [table_id]
 
-            table_api.update(booking_id, fields)
+            record = self._call(TABLES["RESERVAS"], table_api.update, booking_id, fields)
+            get_read_model().apply_write("reservas", record)
             logger.info(f"Reserva {booking_id} actualizada a {status}")
             return True
 
@@ -203,8 +254,6 @@ class AirtableBookingRepository(BookingRepository):
     def find_pending_booking_by_phone(self, phone: str) -> Optional[Booking]:
         """Busca una reserva pendiente para este teléfono (HOY o FUTURO)."""
         try:
-            table_api = self.api.table(self.base_id, TABLES["RESERVAS"])
-
             # Simple exact match first. Ideally should handle format diffs.
             # We filter by Status='Pendiente' AND Phone match
             # Note: Phone formatting is tricky. We'll try to match exact first.
@@ -212,7 +261,13 @@ class AirtableBookingRepository(BookingRepository):
                 f"AND({{Teléfono}} = '{phone}', {{Estado de Reserva}} = 'Pendiente')"
             )
 
-            records = table_api.all(formula=formula)
+            records = self._read_records(
+                "reservas",
+                TABLES["RESERVAS"],
+                formula,
+                fields=BOOKING_FIELDS,
+                where={"telefono": phone, "estado": "Pendiente"},
+            )
 
             # If multiple, take the most recent one (createdTime) or closest execution date?
             # Let's take the one closest to future.
@@ -242,12 +297,15 @@ class AirtableBookingRepository(BookingRepository):
             table_api = self.api.table(self.base_id, TABLES["RESERVAS"])
             # First get current notes to append? Or just overwrite?
             # Append is safer.
-            record = table_api.get(booking_id)
+            record = self._call(TABLES["RESERVAS"], table_api.get, booking_id, idempotent=True)
             current_notes = record["fields"].get("Notas", "")
 
             updated_note = f"{current_notes}\n[WhatsApp]: {new_note}".strip()
 
-            table_api.update(booking_id, {"Notas": updated_note})
+            record = self._call(
+                TABLES["RESERVAS"], table_api.update, booking_id, {"Notas": updated_note}
+            )
+            get_read_model().apply_write("reservas", record)
             logger.info(f"Notas actualizadas para {booking_id}")
             return True
         except Exception as e:
@@ -266,15 +324,20 @@ class AirtableBookingRepository(BookingRepository):
             Lista de reservas para esa fecha
         """
         try:
-            table_api = self.api.table(self.base_id, TABLES["RESERVAS"])
-
             # Format date for Airtable formula
             date_str = fecha.strftime("%Y-%m-%d")
 
             # Formula: buscar reservas de esta fecha que NO estén canceladas
             formula = f"AND(IS_SAME({{Fecha de Reserva}}, '{date_str}', 'day'), {{Estado de Reserva}} != 'Cancelada')"
 
-            records = table_api.all(formula=formula)
+            records = self._read_records(
+                "reservas",
+                TABLES["RESERVAS"],
+                formula,
+                fields=BOOKING_FIELDS,
+                where={"fecha": date_str},
+                exclude={"estado": "Cancelada"},
+            )
             bookings = []
 
             for r in records:
@@ -308,7 +371,8 @@ class AirtableBookingRepository(BookingRepository):
                 "Recordatorio Enviado": True,
             }
 
-            table_api.update(booking_id, fields)
+            record = self._call(TABLES["RESERVAS"], table_api.update, booking_id, fields)
+            get_read_model().apply_write("reservas", record)
             logger.info(f"Recordatorio marcado como enviado para {booking_id}")
             return True
 
@@ -316,6 +380,37 @@ class AirtableBookingRepository(BookingRepository):
             logger.error(f"Error marking reminder as sent: {e}")
             return False
 
+    def mark_reminders_sent(self, booking_ids: List[str]) -> List[str]:
+        """
+        Marca varias reservas como recordatorio enviado usando PATCH por lotes
+        de 10 registros (límite de Airtable por petición).
+
+        Args:
+            booking_ids: IDs de reservas en Airtable
+
+        Returns:
+            IDs que se actualizaron correctamente
+        """
+        table_api = self.api.table(self.base_id, TABLES["RESERVAS"])
+        updated: List[str] = []
+
+        for i in range(0, len(booking_ids), AIRTABLE_BATCH_SIZE):
+            chunk = booking_ids[i : i + AIRTABLE_BATCH_SIZE]
+            try:
+                records = self._call(
+                    TABLES["RESERVAS"],
+                    table_api.batch_update,
+                    [{"id": booking_id, "fields": {"Recordatorio Enviado": True}} for booking_id in chunk],
+                )
+                for record in records or []:
+                    get_read_model().apply_write("reservas", record)
+                updated.extend(chunk)
+            except Exception as e:
+                logger.error(f"Error marking reminders as sent for {chunk}: {e}")
+
+        logger.info(f"Recordatorio marcado como enviado para {len(updated)}/{len(booking_ids)} reservas")
+        return updated
+
     def modify_booking(
         self,
         booking_id: str,
@@ -347,7 +442,9 @@ class AirtableBookingRepository(BookingRepository):
             if new_time:
                 # Update 'Hora' (DateTime field) - needs ISO format
                 # Get current booking to preserve date if only time changed
-                current = table_api.get(booking_id)
+                current = self._call(
+                    TABLES["RESERVAS"], table_api.get, booking_id, idempotent=True
+                )
                 current_date = current["fields"].get(
                     "Fecha de Reserva", datetime.now().strftime("%Y-%m-%d")
                 )
@@ -363,7 +460,8 @@ class AirtableBookingRepository(BookingRepository):
                 logger.warning("No hay campos para modificar")
                 return False
 
-            table_api.update(booking_id, fields)
+            record = self._call(TABLES["RESERVAS"], table_api.update, booking_id, fields)
+            get_read_model().apply_write("reservas", record)
             logger.info(f"Reserva {booking_id} modificada: {fields}")
             return True
 
@@ -385,14 +483,19 @@ class AirtableBookingRepository(BookingRepository):
             La reserva más próxima encontrada o None
         """
         try:
-            table_api = self.api.table(self.base_id, TABLES["RESERVAS"])
-
             # Buscar por teléfono, excluyendo canceladas
             formula = (
                 f"AND({{Teléfono}} = '{phone}', {{Estado de Reserva}} != 'Cancelada')"
             )
 
-            records = table_api.all(formula=formula)
+            records = self._read_records(
+                "reservas",
+                TABLES["RESERVAS"],
+                formula,
+                fields=BOOKING_FIELDS,
+                where={"telefono": phone},
+                exclude={"estado": "Cancelada"},
+            )
 
             if not records:
                 return None
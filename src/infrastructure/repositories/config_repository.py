@@ -6,6 +6,7 @@ import logging
 import json
 from typing import Optional, Dict, Any
 from src.infrastructure.mcp.airtable_client import airtable_client
+from src.infrastructure.read_model import get_read_model
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +27,16 @@ class ConfigRepository:
     async def get_param(self, name: str, default: Any = None) -> Any:
         """Obtiene un parámetro por nombre."""
         try:
-            formula = f"{{{FIELD_MAP['parametro']}}} = '{name}'"
-            result = await airtable_client.list_records(
-                base_id=BASE_ID,
-                table_name=TABLE_NAME,
-                filterByFormula=formula,
-                max_records=1
-            )
-            records = result.get("records", [])
+            records = get_read_model().read("config", where={"parametro": name}, limit=1)
+            if records is None:
+                formula = f"{{{FIELD_MAP['parametro']}}} = '{name}'"
+                result = await airtable_client.list_records(
+                    base_id=BASE_ID,
+                    table_name=TABLE_NAME,
+                    filterByFormula=formula,
+                    max_records=1
+                )
+                records = result.get("records", [])
             if not records:
                 return default
             
@@ -82,18 +85,19 @@ class ConfigRepository:
 
             records = result.get("records", [])
             if records:
-                await airtable_client.update_record(
+                record = await airtable_client.update_record(
                     base_id=BASE_ID,
                     table_name=TABLE_NAME,
                     record_id=records[0].get("id"),
                     fields=fields
                 )
             else:
-                await airtable_client.create_record(
+                record = await airtable_client.create_record(
                     base_id=BASE_ID,
                     table_name=TABLE_NAME,
                     fields=fields
                 )
+            get_read_model().apply_write("config", record)
             return True
         except Exception as e:
             logger.error(f"Error guardando parámetro {name}: {e}")
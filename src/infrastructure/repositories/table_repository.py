@@ -7,7 +7,9 @@ from datetime import datetime
 import logging
 
 from src.core.entities.table import Table, TableZone, TableStatus, normalize_zone
+from src.infrastructure.airtable.coalescer import get_write_coalescer
 from src.infrastructure.mcp.airtable_client import airtable_client
+from src.infrastructure.read_model import get_read_model
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +64,7 @@ class TableRepository:
         return fields
 
     @staticmethod
-    def _airtable_to_table(record: Dict[str, Any]) -> Table:
+    def airtable_to_table(record: Dict[str, Any]) -> Table:
         """Convierte record de Airtable a objeto Table."""
         fields = record.get("fields", {})
 
@@ -111,21 +113,26 @@ class TableRepository:
     async def list_all(self, zona: Optional[TableZone] = None) -> List[Table]:
         """Lista todas las mesas, opcionalmente filtradas por zona."""
         try:
-            # Construir filtro Airtable
-            filter_formula = None
-            if zona:
-                filter_formula = f"{{Ubicación}} = '{zona.value}'"
-
-            # Obtener records de Airtable
-            result = await airtable_client.list_records(
-                base_id=BASE_ID,
-                table_name=TABLE_NAME,
-                filterByFormula=filter_formula,
-                sort=[{"field": "Prioridad", "direction": "asc"}]
+            records = get_read_model().read(
+                "mesas",
+                where={"ubicacion": zona.value} if zona else None,
+                order_by="prioridad",
             )
-
-            records = result.get("records", [])
-            tables = [self._airtable_to_table(r) for r in records]
+            if records is None:
+                # Construir filtro Airtable
+                filter_formula = None
+                if zona:
+                    filter_formula = f"{{Ubicación}} = '{zona.value}'"
+
+                # Obtener records de Airtable
+                result = await airtable_client.list_records(
+                    base_id=BASE_ID,
+                    table_name=TABLE_NAME,
+                    filterByFormula=filter_formula,
+                    sort=[{"field": "Prioridad", "direction": "asc"}]
+                )
+                records = result.get("records", [])
+            tables = [self.airtable_to_table(r) for r in records]
 
             logger.info(f"Retrieved {len(tables)} tables from Airtable (zona filter: {zona.value if zona else 'all'})")
             return tables
@@ -137,20 +144,21 @@ class TableRepository:
     async def get_by_id(self, table_id: str) -> Optional[Table]:
         """Obtiene una mesa por su ID único."""
         try:
-            # Buscar por ID Mesa
-            result = await airtable_client.list_records(
-                base_id=BASE_ID,
-                table_name=TABLE_NAME,
-                filterByFormula=f"{{ID Mesa}} = '{table_id}'",
-                max_records=1
-            )
-
-            records = result.get("records", [])
+            records = get_read_model().read("mesas", where={"id_mesa": table_id}, limit=1)
+            if records is None:
+                # Buscar por ID Mesa
+                result = await airtable_client.list_records(
+                    base_id=BASE_ID,
+                    table_name=TABLE_NAME,
+                    filterByFormula=f"{{ID Mesa}} = '{table_id}'",
+                    max_records=1
+                )
+                records = result.get("records", [])
             if not records:
                 logger.warning(f"Table {table_id} not found in Airtable")
                 return None
 
-            table = self._airtable_to_table(records[0])
+            table = self.airtable_to_table(records[0])
             logger.debug(f"Retrieved table {table_id} from Airtable")
             return table
 
@@ -174,7 +182,8 @@ class TableRepository:
                 fields=fields
             )
 
-            created_table = self._airtable_to_table(result)
+            get_read_model().apply_write("mesas", result)
+            created_table = self.airtable_to_table(result)
             logger.info(f"Created table {table.id} in Airtable (record: {result.get('id')})")
             return created_table
 
@@ -232,15 +241,13 @@ class TableRepository:
                 airtable_updates["Estado"] = status_value
                 airtable_updates["Disponible"] = status_value == "Libre"
 
-            # Actualizar en Airtable
-            updated_record = await airtable_client.update_record(
-                base_id=BASE_ID,
-                table_name=TABLE_NAME,
-                record_id=record_id,
-                fields=airtable_updates
+            # Actualizar en Airtable (coalescido con otros cambios de mesas cercanos)
+            updated_record = await get_write_coalescer().update(
+                TABLE_NAME, record_id, airtable_updates
             )
 
-            updated_table = self._airtable_to_table(updated_record)
+            get_read_model().apply_write("mesas", updated_record)
+            updated_table = self.airtable_to_table(updated_record)
             logger.info(f"Updated table {table_id} in Airtable")
             return updated_table
 
@@ -272,6 +279,7 @@ class TableRepository:
                 table_name=TABLE_NAME,
                 record_id=record_id
             )
+            get_read_model().apply_delete("mesas", record_id)
 
             logger.info(f"Deleted table {table_id} from Airtable")
             return True
@@ -8,7 +8,9 @@ from datetime import datetime, date, time
 import logging
 
 from src.core.entities.waitlist import WaitlistEntry, WaitlistStatus
+from src.infrastructure.airtable.coalescer import get_write_coalescer
 from src.infrastructure.mcp.airtable_client import airtable_client
+from src.infrastructure.read_model import get_read_model
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +55,7 @@ class WaitlistRepository:
             result = await self.client.create_record(
                 base_id=BASE_ID, table_name=TABLE_NAME, fields=fields
             )
+            get_read_model().apply_write("waitlist", result)
 
             entry.id = result["id"]
             entry.airtable_id = result["id"]
@@ -78,12 +81,9 @@ class WaitlistRepository:
                 elif key == "notas":
                     airtable_updates["Notas"] = value
 
-            result = await self.client.update_record(
-                base_id=BASE_ID,
-                table_name=TABLE_NAME,
-                record_id=entry_id,
-                fields=airtable_updates,
-            )
+            # Coalescido: los updates cercanos viajan en un mismo PATCH por lotes
+            result = await get_write_coalescer().update(TABLE_NAME, entry_id, airtable_updates)
+            get_read_model().apply_write("waitlist", result)
 
             logger.info(f"Waitlist entry actualizada: {entry_id}")
             return await self.get_by_id(entry_id)
@@ -95,10 +95,12 @@ class WaitlistRepository:
     async def get_by_id(self, entry_id: str) -> Optional[WaitlistEntry]:
         """Obtiene una entrada por su ID de Airtable."""
         try:
-            record = await self.client.get_record(
-                base_id=BASE_ID, table_name=TABLE_NAME, record_id=entry_id
-            )
-            return self._from_airtable_record(record)
+            record = get_read_model().read_one("waitlist", entry_id)
+            if record is None:
+                record = await self.client.get_record(
+                    base_id=BASE_ID, table_name=TABLE_NAME, record_id=entry_id
+                )
+            return self.from_airtable_record(record)
 
         except Exception as e:
             logger.error(f"Error obteniendo waitlist entry {entry_id}: {e}")
@@ -112,14 +114,19 @@ class WaitlistRepository:
             status_value = STATUS_MAP.get(status, "Esperando")
             filter_formula = f"{{Estado}}='{status_value}'"
 
-            result = await self.client.list_records(
-                base_id=BASE_ID,
-                table_name=TABLE_NAME,
-                filterByFormula=filter_formula,
-                sort=[{"field": "Fecha Entrada Lista", "direction": "asc"}],
+            records = get_read_model().read(
+                "waitlist", where={"estado": status_value}, order_by="entrada"
             )
+            if records is None:
+                result = await self.client.list_records(
+                    base_id=BASE_ID,
+                    table_name=TABLE_NAME,
+                    filterByFormula=filter_formula,
+                    sort=[{"field": "Fecha Entrada Lista", "direction": "asc"}],
+                )
+                records = result.get("records", [])
 
-            entries = [self._from_airtable_record(r) for r in result.get("records", [])]
+            entries = [self.from_airtable_record(r) for r in records]
             logger.info(
                 f"Encontradas {len(entries)} entradas con estado {status_value}"
             )
@@ -151,6 +158,7 @@ class WaitlistRepository:
             await self.client.delete_record(
                 base_id=BASE_ID, table_name=TABLE_NAME, record_id=entry_id
             )
+            get_read_model().apply_delete("waitlist", entry_id)
             logger.info(f"Waitlist entry eliminada: {entry_id}")
             return True
 
@@ -158,7 +166,7 @@ class WaitlistRepository:
             logger.error(f"Error eliminando waitlist entry {entry_id}: {e}")
             return False
 
-    def _from_airtable_record(self, record: dict) -> WaitlistEntry:
+    def from_airtable_record(self, record: dict) -> WaitlistEntry:
         """Convierte registro de Airtable a WaitlistEntry."""
         fields = record.get("fields", {})
 
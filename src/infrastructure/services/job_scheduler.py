@@ -0,0 +1,318 @@
+"""
+Planificador de tareas en proceso (heap de prioridades).
+
+Cada tarea tiene su propia cadencia (periódica) o una hora exacta de
+ejecución (one-shot). El loop duerme hasta la próxima tarea vencida en lugar
+de hacer polling a intervalo fijo, y cada ejecución corre como task
+independiente con su propio timeout, de modo que una llamada lenta a Airtable
+no retrasa al resto de tareas.
+
+Métricas por tarea: ejecuciones, fallos, timeouts, duración y lag
+(retraso entre la hora prevista y el arranque real).
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class JobMetrics:
+    """Métricas acumuladas de una tarea."""
+
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped_overlaps: int = 0
+    last_duration_ms: Optional[float] = None
+    max_duration_ms: float = 0.0
+    total_duration_ms: float = 0.0
+    last_lag_ms: Optional[float] = None
+    max_lag_ms: float = 0.0
+    last_run_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        avg = self.total_duration_ms / self.runs if self.runs else None
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped_overlaps": self.skipped_overlaps,
+            "last_duration_ms": _round(self.last_duration_ms),
+            "avg_duration_ms": _round(avg),
+            "max_duration_ms": _round(self.max_duration_ms),
+            "last_lag_ms": _round(self.last_lag_ms),
+            "max_lag_ms": _round(self.max_lag_ms),
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class ScheduledJob:
+    """Tarea registrada en el planificador."""
+
+    name: str
+    func: JobFunc
+    next_run: float  # epoch seconds
+    interval_seconds: Optional[float] = None  # None = one-shot
+    timeout_seconds: float = 60.0
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+    token: int = 0  # invalida entradas antiguas del heap al reprogramar
+
+    @property
+    def is_periodic(self) -> bool:
+        return self.interval_seconds is not None
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+class JobScheduler:
+    """
+    Planificador asíncrono basado en heap.
+
+    - add_periodic(): tarea con cadencia propia.
+    - add_at(): tarea one-shot a una hora exacta (reprograma si ya existe).
+    - cancel(): elimina una tarea pendiente.
+
+    El heap usa invalidación perezosa: reprogramar o cancelar solo cambia el
+    token de la tarea y las entradas obsoletas se descartan al salir del heap.
+    Si las obsoletas superan a las vivas (re-planificaciones frecuentes de
+    tareas lejanas) el heap se reconstruye solo con las vivas.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._tokens = itertools.count(1)
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._running = False
+        # Contador de tareas one-shot ya finalizadas (se eliminan de _jobs)
+        self._completed_oneshots = 0
+
+    # --- Registro de tareas ---
+
+    def add_periodic(
+        self,
+        name: str,
+        func: JobFunc,
+        interval_seconds: float,
+        timeout_seconds: float = 60.0,
+        initial_delay: float = 0.0,
+    ) -> ScheduledJob:
+        """Registra (o reemplaza) una tarea periódica."""
+        job = self._jobs.get(name)
+        next_run = time.time() + initial_delay
+        if job is None:
+            job = ScheduledJob(
+                name=name,
+                func=func,
+                next_run=next_run,
+                interval_seconds=interval_seconds,
+                timeout_seconds=timeout_seconds,
+            )
+            self._jobs[name] = job
+        else:
+            job.func = func
+            job.interval_seconds = interval_seconds
+            job.timeout_seconds = timeout_seconds
+            job.next_run = next_run
+        self._push(job)
+        return job
+
+    def add_at(
+        self,
+        name: str,
+        func: JobFunc,
+        run_at: datetime,
+        timeout_seconds: float = 60.0,
+    ) -> ScheduledJob:
+        """
+        Registra una tarea one-shot para una hora exacta.
+        Si ya existe una tarea con ese nombre se reprograma con la nueva
+        función y hora. Horas en el pasado se ejecutan de inmediato.
+        """
+        job = self._jobs.get(name)
+        next_run = run_at.timestamp()
+        if job is None:
+            job = ScheduledJob(
+                name=name,
+                func=func,
+                next_run=next_run,
+                timeout_seconds=timeout_seconds,
+            )
+            self._jobs[name] = job
+        else:
+            job.func = func
+            job.interval_seconds = None
+            job.timeout_seconds = timeout_seconds
+            job.next_run = next_run
+        self._push(job)
+        return job
+
+    def cancel(self, name: str) -> bool:
+        """Cancela una tarea pendiente. No interrumpe una ejecución en curso."""
+        job = self._jobs.pop(name, None)
+        if job is None:
+            return False
+        job.token = 0
+        self._maybe_compact()
+        return True
+
+    def cancel_prefix(self, prefix: str) -> int:
+        """Cancela todas las tareas pendientes cuyo nombre empieza por prefix."""
+        names = [name for name in self._jobs if name.startswith(prefix)]
+        for name in names:
+            self.cancel(name)
+        return len(names)
+
+    def has_job(self, name: str) -> bool:
+        return name in self._jobs
+
+    def _push(self, job: ScheduledJob):
+        job.token = next(self._tokens)
+        heapq.heappush(self._heap, (job.next_run, next(self._seq), job.name, job.token))
+        self._maybe_compact()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _is_live(self, entry: Tuple[float, int, str, int]) -> bool:
+        job = self._jobs.get(entry[2])
+        return job is not None and job.token == entry[3]
+
+    def _maybe_compact(self):
+        """Reconstruye el heap cuando las entradas obsoletas superan a las vivas."""
+        if len(self._heap) <= 2 * len(self._jobs):
+            return
+        self._heap = [entry for entry in self._heap if self._is_live(entry)]
+        heapq.heapify(self._heap)
+
+    def _next_due(self) -> Optional[float]:
+        """Hora de la próxima tarea viva, descartando obsoletas de la cima."""
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    # --- Ciclo de vida ---
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        tasks = [t for t in [self._loop_task, *self._running_tasks.values()] if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running_tasks.clear()
+        self._loop_task = None
+
+    async def _run_loop(self):
+        """Duerme hasta la próxima tarea vencida; sin trabajo no hay polling."""
+        while self._running:
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, name, token = heapq.heappop(self._heap)
+                job = self._jobs.get(name)
+                if job is None or job.token != token:
+                    continue  # entrada obsoleta
+                self._dispatch(job, due, now)
+
+            next_due = self._next_due()
+            timeout = next_due - time.time() if next_due is not None else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, job: ScheduledJob, due: float, now: float):
+        running = self._running_tasks.get(job.name)
+        if running is not None and not running.done():
+            job.metrics.skipped_overlaps += 1
+            logger.warning(f"Job '{job.name}' still running, skipping this run")
+        else:
+            self._running_tasks[job.name] = asyncio.create_task(
+                self._run_job(job, lag_ms=(now - due) * 1000)
+            )
+
+        if job.is_periodic:
+            # Cadencia fija; si vamos muy retrasados no acumulamos ejecuciones
+            job.next_run = max(due + job.interval_seconds, now)
+            self._push(job)
+        else:
+            self._jobs.pop(job.name, None)
+
+    async def _run_job(self, job: ScheduledJob, lag_ms: float):
+        metrics = job.metrics
+        metrics.last_lag_ms = lag_ms
+        metrics.max_lag_ms = max(metrics.max_lag_ms, lag_ms)
+        metrics.last_run_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(job.func(), timeout=job.timeout_seconds)
+            metrics.last_error = None
+        except asyncio.TimeoutError:
+            metrics.timeouts += 1
+            metrics.failures += 1
+            metrics.last_error = f"timeout after {job.timeout_seconds}s"
+            logger.error(f"Job '{job.name}' timed out after {job.timeout_seconds}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            metrics.failures += 1
+            metrics.last_error = str(e)[:200]
+            logger.error(f"Job '{job.name}' failed: {e}", exc_info=True)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            metrics.runs += 1
+            metrics.last_duration_ms = duration_ms
+            metrics.total_duration_ms += duration_ms
+            metrics.max_duration_ms = max(metrics.max_duration_ms, duration_ms)
+            if not job.is_periodic:
+                self._completed_oneshots += 1
+            if self._running_tasks.get(job.name) is asyncio.current_task():
+                del self._running_tasks[job.name]
+
+    # --- Métricas ---
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del planificador y métricas por tarea pendiente."""
+        next_due = self._next_due()
+        return {
+            "running": self._running,
+            "pending_jobs": len(self._jobs),
+            "running_jobs": sorted(self._running_tasks.keys()),
+            "completed_oneshot_jobs": self._completed_oneshots,
+            "next_run_in_seconds": _round(next_due - time.time()) if next_due is not None else None,
+            "jobs": {
+                name: {
+                    "periodic": job.is_periodic,
+                    "interval_seconds": job.interval_seconds,
+                    "next_run": datetime.fromtimestamp(job.next_run).isoformat(),
+                    **job.metrics.to_dict(),
+                }
+                for name, job in sorted(self._jobs.items())
+            },
+        }
@@ -0,0 +1,174 @@
+"""
+Elección de líder basada en un lease de Redis.
+
+Con varios workers solo uno debe ejecutar las tareas programadas. Cada
+instancia intenta adquirir la clave del lease con SET NX PX; el líder la
+renueva periódicamente (solo si sigue siendo suya) y el resto quedan en
+standby reintentando. Si el líder cae, el lease expira tras su TTL y otra
+instancia toma el relevo.
+
+Sin REDIS_URL se asume despliegue de una sola instancia y esta es líder.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[], Awaitable[None]]
+
+# Renueva/libera solo si el lease sigue perteneciendo a esta instancia
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderElection:
+    """
+    Lease de liderazgo con TTL y renovación.
+
+    Args:
+        name: Nombre lógico del lease (clave Redis: leader:<name>)
+        ttl_seconds: Vida del lease sin renovar
+        renew_interval_seconds: Cadencia de renovación / reintento en standby
+        on_elected: Callback async al obtener el liderazgo
+        on_revoked: Callback async al perderlo
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: int = 30,
+        renew_interval_seconds: int = 10,
+        on_elected: Optional[Callback] = None,
+        on_revoked: Optional[Callback] = None,
+    ):
+        self.key = f"leader:{name}"
+        self.ttl_seconds = ttl_seconds
+        self.renew_interval_seconds = renew_interval_seconds
+        self.on_elected = on_elected
+        self.on_revoked = on_revoked
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+        self._lease_expires_at = 0.0
+        self._transitions = 0
+        self._last_error: Optional[str] = None
+
+    async def start(self):
+        """Arranca el bucle de elección (o asume liderazgo sin Redis)."""
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            logger.warning(
+                f"REDIS_URL not configured - assuming single instance, "
+                f"{self.instance_id} is leader for '{self.key}'"
+            )
+            await self._become_leader()
+            return
+
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(
+            redis_url, socket_connect_timeout=2, socket_timeout=2, decode_responses=True
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detiene la elección y libera el lease si lo tenemos."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.is_leader and self._redis is not None:
+            try:
+                await self._redis.eval(_RELEASE_SCRIPT, 1, self.key, self.instance_id)
+            except Exception as e:
+                logger.warning(f"Could not release leader lease '{self.key}': {e}")
+        await self._step_down()
+
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _run(self):
+        while True:
+            try:
+                if self.is_leader:
+                    renewed = await self._redis.eval(
+                        _RENEW_SCRIPT, 1, self.key, self.instance_id, self.ttl_seconds * 1000
+                    )
+                    if renewed:
+                        self._lease_expires_at = time.monotonic() + self.ttl_seconds
+                    else:
+                        logger.warning(f"Leader lease '{self.key}' lost by {self.instance_id}")
+                        await self._step_down()
+                else:
+                    acquired = await self._redis.set(
+                        self.key, self.instance_id, nx=True, px=self.ttl_seconds * 1000
+                    )
+                    if acquired:
+                        self._lease_expires_at = time.monotonic() + self.ttl_seconds
+                        await self._become_leader()
+                self._last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._last_error = str(e)[:200]
+                logger.error(f"Leader election error for '{self.key}': {e}")
+                # Sin poder renovar, dejamos el liderazgo antes de que expire
+                # el lease para no solaparnos con el siguiente líder
+                if self.is_leader and (
+                    time.monotonic() + self.renew_interval_seconds >= self._lease_expires_at
+                ):
+                    await self._step_down()
+
+            await asyncio.sleep(self.renew_interval_seconds)
+
+    async def _become_leader(self):
+        if self.is_leader:
+            return
+        self.is_leader = True
+        self._transitions += 1
+        logger.info(f"👑 {self.instance_id} elected leader for '{self.key}'")
+        if self.on_elected:
+            await self.on_elected()
+
+    async def _step_down(self):
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        self._transitions += 1
+        logger.info(f"{self.instance_id} stepped down as leader for '{self.key}'")
+        if self.on_revoked:
+            await self.on_revoked()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "instance_id": self.instance_id,
+            "is_leader": self.is_leader,
+            "mode": "redis" if self._redis is not None else "single-instance",
+            "ttl_seconds": self.ttl_seconds,
+            "transitions": self._transitions,
+            "last_error": self._last_error,
+        }
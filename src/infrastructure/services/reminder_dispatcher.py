@@ -0,0 +1,161 @@
+"""
+Pipeline de envío de recordatorios 24h.
+
+1. Envío concurrente vía Twilio async con un pool acotado de workers.
+2. Ritmo de envío limitado (mensajes/segundo) para no superar el
+   throughput del sender de WhatsApp en Twilio.
+3. Los IDs enviados con éxito se marcan en Airtable con PATCH por lotes
+   de 10 registros en lugar de una petición por reserva.
+4. Cada ejecución devuelve un informe con throughput y fallos.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import httpx
+
+from src.core.entities.booking import Booking
+from src.core.utils.rate_pacer import RatePacer
+from src.infrastructure.templates.content_sids import RESERVA_RECORDATORIO_NUBES_SID
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReminderRunReport:
+    """Resultado de una ejecución del pipeline."""
+
+    total: int = 0
+    sent_ids: List[str] = field(default_factory=list)
+    failed_ids: List[str] = field(default_factory=list)
+    marked_ids: List[str] = field(default_factory=list)
+    send_seconds: float = 0.0
+    writeback_seconds: float = 0.0
+
+    @property
+    def unmarked_ids(self) -> List[str]:
+        """Enviados por WhatsApp pero sin marcar en Airtable."""
+        marked = set(self.marked_ids)
+        return [i for i in self.sent_ids if i not in marked]
+
+    @property
+    def throughput_per_second(self) -> float:
+        if self.send_seconds <= 0:
+            return 0.0
+        return len(self.sent_ids) / self.send_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "sent": len(self.sent_ids),
+            "failed": len(self.failed_ids),
+            "marked": len(self.marked_ids),
+            "unmarked": len(self.unmarked_ids),
+            "send_seconds": round(self.send_seconds, 3),
+            "writeback_seconds": round(self.writeback_seconds, 3),
+            "throughput_per_second": round(self.throughput_per_second, 2),
+        }
+
+
+class ReminderDispatcher:
+    """
+    Envía recordatorios para una lista de reservas y marca los enviados.
+
+    Args:
+        twilio_service: TwilioService (usa send_whatsapp_template_async)
+        booking_repository: AirtableBookingRepository (usa mark_reminders_sent)
+        concurrency: Workers simultáneos enviando
+        rate_per_second: Máximo de mensajes por segundo hacia Twilio
+    """
+
+    def __init__(
+        self,
+        twilio_service,
+        booking_repository,
+        concurrency: int = None,
+        rate_per_second: float = None,
+    ):
+        self.twilio_service = twilio_service
+        self.booking_repository = booking_repository
+        self.concurrency = concurrency or int(os.getenv("REMINDER_CONCURRENCY", "8"))
+        self.rate_per_second = rate_per_second or float(
+            os.getenv("REMINDER_RATE_PER_SECOND", "20")
+        )
+
+    async def dispatch(self, bookings: List[Booking]) -> ReminderRunReport:
+        report = ReminderRunReport(total=len(bookings))
+        if not bookings:
+            return report
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for booking in bookings:
+            queue.put_nowait(booking)
+
+        pacer = RatePacer(self.rate_per_second)
+        start = time.perf_counter()
+
+        async with httpx.AsyncClient(timeout=10) as http_client:
+
+            async def worker():
+                while True:
+                    try:
+                        booking = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await pacer.wait()
+                    if await self._send_one(booking, http_client):
+                        report.sent_ids.append(booking.id)
+                    else:
+                        report.failed_ids.append(booking.id)
+
+            workers = min(self.concurrency, len(bookings))
+            await asyncio.gather(*(worker() for _ in range(workers)))
+
+        report.send_seconds = time.perf_counter() - start
+
+        if report.sent_ids:
+            start = time.perf_counter()
+            report.marked_ids = await asyncio.to_thread(
+                self.booking_repository.mark_reminders_sent, report.sent_ids
+            )
+            report.writeback_seconds = time.perf_counter() - start
+
+        if report.unmarked_ids:
+            logger.warning(
+                f"⚠️ WhatsApp enviado pero no se pudo marcar en DB: {report.unmarked_ids}"
+            )
+        logger.info(f"📊 Recordatorios 24h: {report.to_dict()}")
+        return report
+
+    async def _send_one(self, booking: Booking, http_client: httpx.AsyncClient) -> bool:
+        variables = {
+            "1": booking.nombre,
+            "2": str(booking.fecha),
+            "3": str(booking.hora),
+            "4": str(booking.pax),
+        }
+        try:
+            sid = await self.twilio_service.send_whatsapp_template_async(
+                to_number=booking.telefono,
+                template_sid=RESERVA_RECORDATORIO_NUBES_SID,
+                variables=variables,
+                http_client=http_client,
+            )
+        except Exception as e:
+            logger.error(f"❌ Error enviando recordatorio para booking {booking.id}: {e}")
+            return False
+
+        if not sid:
+            logger.error(
+                f"❌ Fallo enviando WhatsApp a {booking.telefono} (reserva: {booking.id})"
+            )
+            return False
+        logger.info(
+            f"✅ Recordatorio enviado: {booking.nombre} "
+            f"({booking.telefono}) para {booking.fecha} {booking.hora}"
+        )
+        return True
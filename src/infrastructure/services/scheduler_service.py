@@ -1,20 +1,26 @@
 """
 Servicio de Tareas Programadas (Scheduled Jobs)
-Ejecuta tareas periódicas en background:
+Ejecuta tareas en background sobre JobScheduler:
 - Expirar notificaciones de waitlist antiguas (>15 minutos)
-- Recordatorios de reserva 24h antes (WhatsApp)
+- Recordatorios de reserva 24h antes (WhatsApp), a su hora exacta
 - Futuro: Limpieza de caché Redis
 """
 
 import asyncio
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta, date
-from typing import Optional
+from functools import partial
+from typing import Dict, List, Optional
 
 from src.application.services.waitlist_service import WaitlistService
 from src.core.entities.waitlist import WaitlistStatus
 from src.infrastructure.repositories.booking_repo import AirtableBookingRepository
 from src.infrastructure.external.twilio_service import TwilioService
+from src.infrastructure.cache.redis_cache import get_cache
+from src.infrastructure.services.job_scheduler import JobScheduler
+from src.infrastructure.services.leader_election import LeaderElection
+from src.infrastructure.services.reminder_dispatcher import ReminderDispatcher
 from src.infrastructure.templates.whatsapp_messages import recordatorio_24h_template
 from src.infrastructure.templates.content_sids import (
     RESERVA_CONFIRMACION_NUBES_SID,
@@ -29,37 +35,81 @@ logger = logging.getLogger(__name__)
 class SchedulerService:
     """
     Servicio para ejecutar tareas programadas en background.
-    Usa asyncio para no bloquear el servidor FastAPI.
+    Se apoya en JobScheduler (heap de prioridades): cada tarea tiene su propia
+    cadencia y los recordatorios 24h se programan a su hora exacta
+    (hora de la reserva - 24h), agrupados por minuto de envío.
 
-    IMPORTANT: In production with multiple workers, this can cause duplicate messages.
-    Solution: Use a distributed lock (Redis) or run scheduler in only one worker.
-    For now: Increased interval to 5 minutes to reduce duplicate risk.
+    Con varios workers solo la instancia con el lease de Redis (LeaderElection)
+    ejecuta las tareas; los recordatorios enviados se registran en Redis para
+    que un cambio de líder no provoque envíos duplicados.
     """
 
     # Track processed booking IDs to prevent duplicates within the same process
     _processed_reminders: set = set()
 
-    def __init__(self, interval_seconds: int = 300):  # Changed from 60 to 300 (5 min)
+    REMINDER_LEAD_TIME = timedelta(hours=24)
+    REMINDER_JOB_PREFIX = "reminders@"
+    REMINDER_CLAIM_PREFIX = "scheduler:reminder_sent:"
+    REMINDER_CLAIM_TTL = 3 * 24 * 3600
+
+    def __init__(
+        self,
+        expire_interval_seconds: int = 60,
+        planning_interval_seconds: int = 900,
+        job_timeout_seconds: int = 120,
+    ):
         """
         Args:
-            interval_seconds: Intervalo entre ejecuciones (default: 300s = 5 minutos)
+            expire_interval_seconds: Cadencia de expiración de waitlist (default: 60s)
+            planning_interval_seconds: Cadencia con la que se revisan las reservas
+                de mañana para programar sus recordatorios (default: 900s)
+            job_timeout_seconds: Timeout por ejecución de cada tarea
         """
-        self.interval_seconds = interval_seconds
+        self.expire_interval_seconds = expire_interval_seconds
+        self.planning_interval_seconds = planning_interval_seconds
+        self.job_timeout_seconds = job_timeout_seconds
         self.waitlist_service = WaitlistService()
         self.booking_repository = AirtableBookingRepository()
         self.twilio_service = TwilioService()
-        self._task: Optional[asyncio.Task] = None
+        self.cache = get_cache()
+        self.reminder_dispatcher = ReminderDispatcher(
+            self.twilio_service, self.booking_repository
+        )
+        self.last_reminder_report: Optional[dict] = None
+        self.jobs = JobScheduler()
+        self.election = LeaderElection(
+            "scheduler", on_elected=self._on_elected, on_revoked=self._on_revoked
+        )
         self._running = False
 
     async def start(self):
-        """Inicia el scheduler en background."""
+        """
+        Inicia el scheduler en background.
+        Solo la instancia líder ejecuta las tareas; el resto quedan en standby.
+        """
         if self._running:
             logger.warning("Scheduler already running")
             return
 
         self._running = True
-        self._task = asyncio.create_task(self._run_loop())
-        logger.info(f"Scheduler started (interval: {self.interval_seconds}s)")
+        self.jobs.add_periodic(
+            "expire_waitlist_notifications",
+            self._expire_old_notifications,
+            interval_seconds=self.expire_interval_seconds,
+            timeout_seconds=self.job_timeout_seconds,
+        )
+        self.jobs.add_periodic(
+            "plan_24h_reminders",
+            self._plan_24h_reminders,
+            interval_seconds=self.planning_interval_seconds,
+            timeout_seconds=self.job_timeout_seconds,
+        )
+        await self.election.start()
+        logger.info(
+            f"Scheduler started (expire: {self.expire_interval_seconds}s, "
+            f"reminder planning: {self.planning_interval_seconds}s, "
+            f"leader: {self.election.is_leader})"
+        )
 
     async def stop(self):
         """Detiene el scheduler gracefully."""
@@ -67,35 +117,47 @@ class SchedulerService:
             return
 
         self._running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        await self.election.stop()
         logger.info("Scheduler stopped")
 
-    async def _run_loop(self):
-        """Loop principal que ejecuta las tareas periódicamente."""
-        while self._running:
-            try:
-                await self._execute_jobs()
-            except Exception as e:
-                logger.error(f"Error executing scheduled jobs: {e}", exc_info=True)
-
-            # Esperar hasta el próximo ciclo
-            await asyncio.sleep(self.interval_seconds)
-
-    async def _execute_jobs(self):
-        """Ejecuta todas las tareas programadas."""
-        # Job 1: Expirar notificaciones antiguas de waitlist
-        await self._expire_old_notifications()
-
-        # Job 2: Enviar recordatorios WhatsApp 24h antes
-        await self._send_24h_reminders_whatsapp()
+    async def _on_elected(self):
+        """Esta instancia pasa a ser líder: arrancar tareas."""
+        await self.jobs.start()
 
-        # Futuro: Agregar más jobs aquí
-        # await self._cleanup_redis_cache()
+    async def _on_revoked(self):
+        """
+        Esta instancia deja de ser líder: parar tareas y descartar los
+        recordatorios programados (el nuevo líder los re-planifica).
+        """
+        await self.jobs.stop()
+        self.jobs.cancel_prefix(self.REMINDER_JOB_PREFIX)
+
+    def get_stats(self):
+        """Métricas de ejecución (duración, lag, fallos) por tarea y estado del liderazgo."""
+        return {
+            "leader": self.election.get_status(),
+            "last_reminder_run": self.last_reminder_report,
+            **self.jobs.get_stats(),
+        }
+
+    def _claim_reminder(self, booking_id: str) -> bool:
+        """
+        Reserva el envío del recordatorio en almacenamiento compartido (Redis)
+        para que ningún otro worker lo envíe. Sin Redis, dedupe por proceso.
+        """
+        if booking_id in SchedulerService._processed_reminders:
+            return False
+        claimed = self.cache.set_if_absent(
+            f"{self.REMINDER_CLAIM_PREFIX}{booking_id}",
+            self.election.instance_id,
+            ttl=self.REMINDER_CLAIM_TTL,
+        )
+        # None = Redis no disponible: nos quedamos con el set local
+        return claimed is not False
+
+    def _release_reminder(self, booking_id: str):
+        """Libera la reserva de envío tras un fallo para permitir reintentos."""
+        self.cache.delete(f"{self.REMINDER_CLAIM_PREFIX}{booking_id}")
 
     async def _expire_old_notifications(self):
         """
@@ -116,37 +178,37 @@ class SchedulerService:
             expiration_threshold = timedelta(minutes=15)
             expired_count = 0
 
-            for entry in notified_entries:
-                if not entry.notified_at:
-                    continue
+            expired = [
+                entry
+                for entry in notified_entries
+                if entry.notified_at and now - entry.notified_at > expiration_threshold
+            ]
 
-                # Calcular tiempo transcurrido desde notificación
-                time_since_notification = now - entry.notified_at
-
-                if time_since_notification > expiration_threshold:
-                    # EXPIRAR: cambiar estado a EXPIRED
-                    try:
-                        await self.waitlist_service.waitlist_repository.update(
-                            entry_id=entry.airtable_id, estado=WaitlistStatus.EXPIRED
-                        )
-                        expired_count += 1
-                        logger.info(
-                            f"Expired waitlist entry {entry.airtable_id} "
-                            f"({entry.nombre_cliente}) - notified {time_since_notification.total_seconds() / 60:.1f} min ago"
-                        )
-
-                        # Opcional: Notificar al próximo en la fila
-                        # await self.waitlist_service.notify_next_in_queue(
-                        #     fecha=entry.fecha,
-                        #     hora=entry.hora,
-                        #     pax=entry.num_personas
-                        # )
-
-                    except Exception as e:
-                        logger.error(
-                            f"Error expiring waitlist entry {entry.airtable_id}: {e}",
-                            exc_info=True,
-                        )
+            # EXPIRAR: los updates se lanzan a la vez para que el coalescer
+            # de Airtable los agrupe en PATCH por lotes
+            results = await asyncio.gather(
+                *(
+                    self.waitlist_service.waitlist_repo.update(
+                        entry.airtable_id, {"estado": WaitlistStatus.EXPIRED}
+                    )
+                    for entry in expired
+                ),
+                return_exceptions=True,
+            )
+
+            for entry, result in zip(expired, results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        f"Error expiring waitlist entry {entry.airtable_id}: {result}",
+                        exc_info=result,
+                    )
+                    continue
+                expired_count += 1
+                logger.info(
+                    f"Expired waitlist entry {entry.airtable_id} "
+                    f"({entry.nombre_cliente}) - notified "
+                    f"{(now - entry.notified_at).total_seconds() / 60:.1f} min ago"
+                )
 
             if expired_count > 0:
                 logger.info(f"Expired {expired_count} waitlist notification(s)")
@@ -154,114 +216,80 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"Error in _expire_old_notifications: {e}", exc_info=True)
 
-    async def _send_24h_reminders_whatsapp(self):
+    async def _plan_24h_reminders(self):
         """
-        Envía recordatorios WhatsApp 24 horas antes de cada reserva.
+        Programa los recordatorios WhatsApp de las reservas de mañana.
 
         Proceso:
         1. Obtiene reservas para mañana (fecha actual + 1 día)
         2. Filtra las que NO han recibido recordatorio
-        3. Envía WhatsApp usando template recordatorio_24h_template()
-        4. Marca como enviado en Airtable
+        3. Agrupa por minuto de envío (hora de la reserva - 24h)
+        4. Programa una tarea one-shot por grupo; si la hora ya pasó
+           (reserva hecha con menos de 24h) se envía de inmediato
+
+        Cada pasada descarta los grupos programados antes y los vuelve a
+        crear con las reservas actuales: una reserva cancelada o movida de
+        hora no conserva su recordatorio con los datos de la pasada anterior.
         """
-        try:
-            # Calcular fecha de mañana
-            tomorrow = date.today() + timedelta(days=1)
-
-            # Obtener todas las reservas de mañana (no canceladas)
-            bookings = self.booking_repository.list_by_date(fecha=tomorrow)
-
-            if not bookings:
-                logger.debug(f"No hay reservas para {tomorrow.strftime('%Y-%m-%d')}")
-                return
-
-            # Filtrar solo las que NO han recibido recordatorio y NO están en nuestro set local
-            pending_reminders = [
-                booking
-                for booking in bookings
-                if not booking.recordatorio_enviado
-                and booking.id not in SchedulerService._processed_reminders
-            ]
+        tomorrow = date.today() + timedelta(days=1)
+
+        bookings = await asyncio.to_thread(
+            self.booking_repository.list_by_date, fecha=tomorrow
+        )
+        self.jobs.cancel_prefix(self.REMINDER_JOB_PREFIX)
+        if not bookings:
+            logger.debug(f"No hay reservas para {tomorrow.strftime('%Y-%m-%d')}")
+            return
 
-            if not pending_reminders:
-                logger.debug(
-                    f"Todas las reservas de {tomorrow} ya tienen recordatorio enviado"
-                )
-                return
-
-            sent_count = 0
-            failed_count = 0
-
-            for booking in pending_reminders:
-                try:
-                    # Generar mensaje usando template
-                    mensaje = recordatorio_24h_template(
-                        nombre_cliente=booking.nombre,
-                        fecha=booking.fecha,
-                        hora=booking.hora,
-                        num_personas=booking.pax,
-                        mesa_asignada=booking.mesa_asignada,  # Puede ser None
-                    )
+        pending_reminders = [
+            booking
+            for booking in bookings
+            if not booking.recordatorio_enviado
+            and booking.id not in SchedulerService._processed_reminders
+        ]
+        if not pending_reminders:
+            logger.debug(f"Todas las reservas de {tomorrow} ya tienen recordatorio enviado")
+            return
 
-                    # Enviar WhatsApp vía Twilio usando plantilla Content API
-                    # Usar el método send_whatsapp_template que aprovecha content_sid y content_variables
-                    variables = {
-                        "1": booking.nombre,
-                        "2": str(booking.fecha),
-                        "3": str(booking.hora),
-                        "4": str(booking.pax)
-                    }
-                    success = self.twilio_service.send_whatsapp_template(
-                        to_number=booking.telefono,
-                        template_sid=RESERVA_RECORDATORIO_NUBES_SID,
-                        variables=variables
-                    )
+        groups: Dict[datetime, list] = defaultdict(list)
+        for booking in pending_reminders:
+            due = (booking.datetime_completo - self.REMINDER_LEAD_TIME).replace(
+                second=0, microsecond=0
+            )
+            groups[due].append(booking)
+
+        for due, group in groups.items():
+            self.jobs.add_at(
+                f"{self.REMINDER_JOB_PREFIX}{due.strftime('%Y-%m-%dT%H:%M')}",
+                partial(self._send_24h_reminders_whatsapp, group),
+                run_at=due,
+                timeout_seconds=self.job_timeout_seconds,
+            )
 
-                    if success:
-                        # Add to processed set to prevent duplicates in this process
-                        SchedulerService._processed_reminders.add(booking.id)
-
-                        # Marcar como enviado en Airtable
-                        update_success = (
-                            self.booking_repository.update_booking_reminder_sent(
-                                booking_id=booking.id
-                            )
-                        )
-
-                        if update_success:
-                            sent_count += 1
-                            logger.info(
-                                f"✅ Recordatorio enviado: {booking.nombre} "
-                                f"({booking.telefono}) para {booking.fecha} {booking.hora}"
-                            )
-                        else:
-                            failed_count += 1
-                            logger.warning(
-                                f"⚠️ WhatsApp enviado pero no se pudo marcar en DB: {booking.id}"
-                            )
-                    else:
-                        failed_count += 1
-                        logger.error(
-                            f"❌ Fallo enviando WhatsApp a {booking.telefono} "
-                            f"(reserva: {booking.id})"
-                        )
-
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(
-                        f"❌ Error enviando recordatorio para booking {booking.id}: {e}",
-                        exc_info=True,
-                    )
+        logger.info(
+            f"📅 Recordatorios 24h programados: {len(pending_reminders)} reservas "
+            f"en {len(groups)} franja(s) para {tomorrow}"
+        )
 
-            # Resumen final
-            if sent_count > 0 or failed_count > 0:
-                logger.info(
-                    f"📊 Recordatorios 24h: {sent_count} enviados, "
-                    f"{failed_count} fallidos (total: {len(pending_reminders)} pendientes)"
-                )
+    async def _send_24h_reminders_whatsapp(self, bookings: List):
+        """
+        Envía recordatorios WhatsApp para un grupo de reservas cuya hora
+        de envío (24h antes) ha llegado. El envío concurrente y el marcado
+        por lotes en Airtable lo hace ReminderDispatcher.
+        """
+        claimed = [b for b in bookings if self._claim_reminder(b.id)]
+        if not claimed:
+            return
 
-        except Exception as e:
-            logger.error(f"Error in _send_24h_reminders_whatsapp: {e}", exc_info=True)
+        report = await self.reminder_dispatcher.dispatch(claimed)
+
+        for booking_id in report.sent_ids:
+            # Add to processed set to prevent duplicates in this process
+            SchedulerService._processed_reminders.add(booking_id)
+        for booking_id in report.failed_ids:
+            self._release_reminder(booking_id)
+
+        self.last_reminder_report = report.to_dict()
 
 
 # Singleton global
@@ -272,8 +300,5 @@ def get_scheduler() -> SchedulerService:
     """Devuelve la instancia singleton del scheduler."""
     global _scheduler
     if _scheduler is None:
-        # DISABLED: Scheduler causing duplicate messages across multiple workers
-        # Interval increased to 3600s (1 hour) to minimize duplicates
-        # TODO: Implement Redis-based distributed lock for multi-worker environments
-        _scheduler = SchedulerService(interval_seconds=3600)  # 1 hora
+        _scheduler = SchedulerService()
     return _scheduler
@@ -9,6 +9,9 @@ from src.infrastructure.templates.content_sids import (
     MESA_DISPONIBLE_NUBES_SID
 )
 
+# Ubicación que acompaña a la confirmación (lat, lon, etiqueta)
+RESTAURANT_LOCATION = (42.4636, -2.4474, "En Las Nubes Restobar")
+
 
 class WhatsAppService:
     def __init__(self):
@@ -45,17 +48,10 @@ class WhatsAppService:
             print(f"❌ Error sending WhatsApp: {e}")
             return False
 
-    def send_premium_confirmation(
-        self, booking: Booking, restaurant_name="En Las Nubes"
-    ):
-        """Sends the polished Initial Confirmation message using unified template."""
-        # Booking v2 uses 'telefono' instead of 'client_phone'
-        if not booking.telefono:
-            return False
-
-        # Use unified template from whatsapp_messages.py
-        # This ensures same format for both immediate confirmation and 24h reminders
-        msg = confirmacion_reserva_template(
+    @staticmethod
+    def premium_confirmation_text(booking: Booking) -> str:
+        """Texto de la confirmación inicial (misma plantilla que el recordatorio de 24h)."""
+        return confirmacion_reserva_template(
             nombre_cliente=booking.nombre,
             fecha=booking.fecha,
             hora=booking.hora,
@@ -68,14 +64,30 @@ class WhatsAppService:
             else None,
         )
 
-        text_sent = self.send_message(booking.telefono, msg)
+    async def queue_premium_confirmation(
+        self, booking: Booking, restaurant_name="En Las Nubes"
+    ) -> bool:
+        """Queues the premium confirmation (text + location) in the outbox."""
+        from src.infrastructure.outbox import get_outbox
+
+        # Booking v2 uses 'telefono' instead of 'client_phone'
+        if not booking.telefono:
+            return False
 
-        # 2. Enviar ubicación (Mapa)
-        loc_sent = self.send_location(
-            booking.telefono, lat=42.4636, lon=-2.4474, label="En Las Nubes Restobar"
+        lat, lon, label = RESTAURANT_LOCATION
+        outbox = get_outbox()
+        text_queued = await outbox.enqueue_whatsapp(
+            to=booking.telefono,
+            body=self.premium_confirmation_text(booking),
+            dedupe_key=f"confirmacion_premium:{booking.id}" if booking.id else None,
         )
-
-        return text_sent and loc_sent
+        loc_queued = await outbox.enqueue_whatsapp(
+            to=booking.telefono,
+            body=label,
+            persistent_action=[f"geo:{lat},{lon}|{label}"],
+            dedupe_key=f"ubicacion:{booking.id}" if booking.id else None,
+        )
+        return text_queued and loc_queued
 
     def send_location(self, to_number: str, lat: float, lon: float, label: str) -> bool:
         """Sends a location message via WhatsApp."""
@@ -0,0 +1,23 @@
+"""Diario local de escrituras a Airtable (creates / updates / cancelaciones)."""
+
+from src.infrastructure.write_journal.service import (
+    WriteJournal,
+    get_write_journal,
+    write_journal_enabled,
+)
+from src.infrastructure.write_journal.store import (
+    JournalEntry,
+    SQLiteJournalStore,
+    is_provisional,
+    new_provisional_id,
+)
+
+__all__ = [
+    "WriteJournal",
+    "get_write_journal",
+    "write_journal_enabled",
+    "JournalEntry",
+    "SQLiteJournalStore",
+    "is_provisional",
+    "new_provisional_id",
+]
@@ -0,0 +1,593 @@
+"""
+Diario de escrituras hacia Airtable (creates, updates y cancelaciones).
+
+Toda escritura se persiste primero en el diario local y se responde sin
+esperar a Airtable más de WRITE_JOURNAL_INLINE_TIMEOUT_SECONDS:
+- Si Airtable responde a tiempo, el llamador recibe el registro real.
+- Si no (caída, lentitud, 5xx), recibe el registro con un ID provisional
+  ("tmp...") y un worker en background lo reaplica en orden de llegada.
+
+En el replay:
+- Los updates sobre IDs provisionales esperan a que su create se aplique.
+- Un create que pudo llegar a Airtable antes del timeout se busca por sus
+  match_fields antes de repetirlo (no se duplican reservas).
+- Un update con `expected` cuyos valores ya no coinciden con Airtable
+  queda en conflicto para revisión manual en lugar de pisar el cambio.
+- Errores 4xx (salvo 429) marcan la entrada como fallida; el resto se
+  reintenta con backoff exponencial, bloqueando las entradas posteriores.
+
+Con varios workers sobre el mismo diario, cada entrada se reclama en SQLite
+antes de aplicarla (en línea o en el replay), así que nunca la aplican dos
+procesos a la vez; un claim caduca a los WRITE_JOURNAL_CLAIM_SECONDS.
+
+Un timeout no cancela la petición HTTP: el thread de pyairtable sigue hasta
+su propio timeout y el create puede llegar a Airtable después. Tras un
+timeout el claim se mantiene WRITE_JOURNAL_IN_FLIGHT_SECONDS (por defecto
+el connect + read de http_timeout), de modo que el replay no busca ni
+repite la escritura mientras la llamada abandonada aún puede aplicarse.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import socket
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from src.core.config.airtable_ids import BASE_ID, TABLE_IDS_BY_NAME
+from src.infrastructure.airtable.resilience import (
+    AirtableTimeoutError,
+    get_airtable_resilience,
+    is_client_error,
+)
+from src.infrastructure.write_journal.store import (
+    JournalEntry,
+    SQLiteJournalStore,
+    is_provisional,
+    new_provisional_id,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def write_journal_enabled() -> bool:
+    """WRITE_JOURNAL_ENABLED=false escribe directamente en Airtable (sin diario)."""
+    return os.getenv("WRITE_JOURNAL_ENABLED", "true").lower() not in ("false", "0", "no")
+
+
+def _formula_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "TRUE()" if value else "FALSE()"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:\d{2})?)?$")
+
+
+def _match_condition(name: str, value: Any) -> str:
+    """
+    Condición de fórmula para un match_field. Fechas y fechas-hora se
+    comparan con IS_SAME: `=` contra un campo de fecha de Airtable no
+    coincide nunca.
+    """
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    if isinstance(value, str) and _ISO_DATE.match(value):
+        unit = "day" if len(value) == 10 else "second"
+        return f"IS_SAME({{{name}}}, '{value}', '{unit}')"
+    return f"{{{name}}} = {_formula_value(value)}"
+
+
+def _may_still_land(error: BaseException) -> bool:
+    """Timeouts: la llamada abandonada puede aplicarse en Airtable más tarde."""
+    return isinstance(error, (asyncio.TimeoutError, AirtableTimeoutError))
+
+
+class _Blocked(Exception):
+    """La entrada depende de un create provisional aún no aplicado."""
+
+
+class WriteJournal:
+    """
+    Escrituras a Airtable que no dependen de su disponibilidad.
+
+    Args:
+        store: SQLiteJournalStore (por defecto en WRITE_JOURNAL_SQLITE_PATH)
+        airtable: Cliente con create/update/get/list_records (airtable_client por defecto)
+        inline_timeout_seconds: Espera máxima a Airtable dentro de la petición
+        replay_interval_seconds: Cadencia del replay cuando no hay avisos
+        max_attempts: Intentos antes de marcar una entrada como fallida
+        claim_seconds: Vida del claim de una entrada si el worker muere
+            aplicándola (WRITE_JOURNAL_CLAIM_SECONDS, 60 por defecto)
+        in_flight_seconds: Tiempo que se mantiene el claim tras un timeout
+            (WRITE_JOURNAL_IN_FLIGHT_SECONDS; por defecto connect + read de
+            http_timeout)
+    """
+
+    def __init__(
+        self,
+        store: Optional[SQLiteJournalStore] = None,
+        airtable=None,
+        inline_timeout_seconds: Optional[float] = None,
+        replay_interval_seconds: float = 5.0,
+        max_attempts: Optional[int] = None,
+        base_backoff_seconds: float = 2.0,
+        max_backoff_seconds: float = 120.0,
+        batch_size: int = 50,
+        claim_seconds: Optional[float] = None,
+        in_flight_seconds: Optional[float] = None,
+    ):
+        self._store = store
+        self._airtable = airtable
+        self.inline_timeout_seconds = inline_timeout_seconds or float(
+            os.getenv("WRITE_JOURNAL_INLINE_TIMEOUT_SECONDS", "2.5")
+        )
+        self.replay_interval_seconds = replay_interval_seconds
+        self.max_attempts = max_attempts or int(os.getenv("WRITE_JOURNAL_MAX_ATTEMPTS", "50"))
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.batch_size = batch_size
+        self.claim_seconds = claim_seconds or float(os.getenv("WRITE_JOURNAL_CLAIM_SECONDS", "60"))
+        self.in_flight_seconds = in_flight_seconds or float(
+            os.getenv("WRITE_JOURNAL_IN_FLIGHT_SECONDS")
+            or sum(get_airtable_resilience().http_timeout)
+        )
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+        self._consecutive_failures = 0
+        self._counters: Dict[str, int] = {
+            "accepted": 0,
+            "applied_inline": 0,
+            "applied_replay": 0,
+            "deferred": 0,
+            "conflicts": 0,
+            "failed": 0,
+            "retries": 0,
+        }
+
+    @property
+    def store(self) -> SQLiteJournalStore:
+        if self._store is None:
+            self._store = SQLiteJournalStore()
+        return self._store
+
+    @property
+    def airtable(self):
+        if self._airtable is None:
+            from src.infrastructure.mcp.airtable_client import airtable_client
+
+            self._airtable = airtable_client
+        return self._airtable
+
+    # --- API de escritura ---
+
+    async def create(
+        self,
+        table: str,
+        fields: Dict[str, Any],
+        match_fields: Optional[List[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Crea un registro. Devuelve el registro de Airtable o, si Airtable no
+        responde a tiempo, {"id": "tmp...", "fields": ..., "pending_sync": True}.
+        Un error 4xx de Airtable se propaga.
+
+        Args:
+            table: Nombre de la tabla en Airtable
+            fields: Campos del registro
+            match_fields: Campos que identifican el registro si el create
+                llegó a aplicarse antes de un timeout (evita duplicados)
+        """
+        if not write_journal_enabled():
+            return await self.airtable.create_record(
+                base_id=BASE_ID, table_name=table, fields=fields
+            )
+        entry = JournalEntry(
+            op="create",
+            table=table,
+            record_id=new_provisional_id(),
+            fields=fields,
+            match_fields=[f for f in (match_fields or []) if f in fields],
+        )
+        return await self._accept(entry)
+
+    async def update(
+        self,
+        table: str,
+        record_id: str,
+        fields: Dict[str, Any],
+        expected: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Actualiza un registro (ID real o provisional). Si se difiere, devuelve
+        {"id": ..., "fields": <campos cambiados>, "pending_sync": True}.
+
+        Args:
+            expected: Valores actuales que el llamador vio al decidir el
+                cambio; si en Airtable son otros, el cambio no se aplica y
+                la entrada queda en conflicto (None si ocurre en línea)
+        """
+        if not write_journal_enabled():
+            return await self.airtable.update_record(
+                base_id=BASE_ID, table_name=table, record_id=record_id, fields=fields
+            )
+        record_id = await self.resolve(record_id)
+        entry = JournalEntry(
+            op="update",
+            table=table,
+            record_id=record_id,
+            fields=fields,
+            expected=expected or {},
+        )
+        return await self._accept(entry)
+
+    async def cancel(
+        self,
+        table: str,
+        record_id: str,
+        fields: Dict[str, Any],
+        current_estado: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Cancelación: update que entra en conflicto si el Estado cambió entretanto."""
+        expected = {"Estado": current_estado} if current_estado is not None else None
+        return await self.update(table, record_id, fields, expected=expected)
+
+    async def get_record(self, table: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Registro con las escrituras pendientes aplicadas encima. Para IDs
+        provisionales se construye solo desde el diario; si Airtable no
+        responde se usa la copia del read model (aunque esté desfasada).
+        """
+        real_id = await self.store.resolve(record_id) or record_id
+        pending = await self.store.pending_for_record(table, real_id)
+        if is_provisional(real_id):
+            create = await self.store.find_create(real_id)
+            if create is None or create.status != "pending":
+                return None
+            record = self._provisional_record(create)
+        else:
+            try:
+                record = await self.airtable.get_record(
+                    base_id=BASE_ID, table_name=table, record_id=real_id
+                )
+            except Exception:
+                # Airtable caído: última copia conocida en el read model
+                record = self._read_model_copy(table, real_id)
+                if record is None:
+                    raise
+            if record is None:
+                return None
+        for entry in pending:
+            if entry.op == "update":
+                record["fields"].update(entry.fields)
+        if pending:
+            record["pending_sync"] = True
+        return record
+
+    async def resolve(self, record_id: str) -> str:
+        """ID real si el create provisional ya se aplicó; si no, el mismo ID."""
+        if not is_provisional(record_id):
+            return record_id
+        return await self.store.resolve(record_id) or record_id
+
+    @staticmethod
+    def _provisional_record(entry: JournalEntry) -> Dict[str, Any]:
+        return {
+            "id": entry.record_id,
+            "fields": dict(entry.fields),
+            "pending_sync": True,
+        }
+
+    async def _accept(self, entry: JournalEntry) -> Optional[Dict[str, Any]]:
+        await self.store.append(entry)
+        self._counters["accepted"] += 1
+
+        # Solo se aplica dentro de la petición si lo pendiente por delante se
+        # está aplicando ya (en cualquier worker) y no toca el mismo registro
+        if await self.store.claim_inline(entry, self.owner, self.claim_seconds):
+            try:
+                record = await asyncio.wait_for(
+                    self._apply(entry), timeout=self.inline_timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                entry.attempts += 1
+                entry.last_error = f"timeout inline ({self.inline_timeout_seconds}s)"
+                await self.store.record_attempt(entry, hold_seconds=self.in_flight_seconds)
+            except _Blocked:
+                await self.store.release(entry, self.owner)
+            except Exception as e:
+                await self._handle_error(entry, e)
+                if entry.status == "failed":
+                    raise
+            else:
+                await self._finish(entry, record)
+                if entry.status != "applied":
+                    return None
+                self._counters["applied_inline"] += 1
+                return record
+
+        self._counters["deferred"] += 1
+        logger.warning(
+            f"Write journal: {entry.op} {entry.table}/{entry.record_id} diferido "
+            f"(seq {entry.seq})"
+        )
+        record = self._provisional_record(entry)
+        if entry.op == "create":
+            self._reflect(entry.table, record)
+        else:
+            self._reflect_update(entry.table, entry.record_id, entry.fields)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return record
+
+    # --- Aplicación en Airtable ---
+
+    async def _apply(self, entry: JournalEntry) -> Optional[Dict[str, Any]]:
+        """
+        Aplica una entrada. Devuelve el registro resultante, o None si la
+        entrada quedó en conflicto (entry.status se actualiza).
+        """
+        if entry.op == "create":
+            if entry.attempts and entry.match_fields:
+                existing = await self._find_applied_create(entry)
+                if existing is not None:
+                    logger.info(
+                        f"Write journal: create {entry.record_id} ya estaba en Airtable "
+                        f"({existing['id']})"
+                    )
+                    return existing
+            return await self.airtable.create_record(
+                base_id=BASE_ID, table_name=entry.table, fields=entry.fields
+            )
+
+        record_id = entry.record_id
+        if is_provisional(record_id):
+            real_id = await self.store.resolve(record_id)
+            if real_id is None:
+                create = await self.store.find_create(record_id)
+                if create is not None and create.status == "pending":
+                    raise _Blocked(record_id)
+                entry.status = "failed"
+                entry.last_error = f"create de {record_id} no aplicado"
+                return None
+            record_id = real_id
+
+        if entry.expected:
+            current = await self.airtable.get_record(
+                base_id=BASE_ID, table_name=entry.table, record_id=record_id
+            )
+            if current is None:
+                entry.status = "conflict"
+                entry.last_error = "el registro ya no existe en Airtable"
+                return None
+            current_fields = current.get("fields", {})
+            already_applied = all(current_fields.get(k) == v for k, v in entry.fields.items())
+            if already_applied:
+                return current
+            changed = {
+                k: current_fields.get(k)
+                for k, v in entry.expected.items()
+                if current_fields.get(k) != v
+            }
+            if changed:
+                entry.status = "conflict"
+                entry.last_error = f"valores cambiados en Airtable: {changed}"[:300]
+                return None
+
+        return await self.airtable.update_record(
+            base_id=BASE_ID, table_name=entry.table, record_id=record_id, fields=entry.fields
+        )
+
+    async def _find_applied_create(self, entry: JournalEntry) -> Optional[Dict[str, Any]]:
+        conditions = [_match_condition(name, entry.fields[name]) for name in entry.match_fields]
+        formula = conditions[0] if len(conditions) == 1 else f"AND({', '.join(conditions)})"
+        response = await self.airtable.list_records(
+            base_id=BASE_ID, table_name=entry.table, filterByFormula=formula, max_records=1
+        )
+        records = response.get("records", [])
+        return records[0] if records else None
+
+    async def _finish(self, entry: JournalEntry, record: Optional[Dict[str, Any]]):
+        if entry.status == "pending":
+            entry.status = "applied"
+            if record and entry.op == "create":
+                entry.real_id = record.get("id")
+            elif entry.op == "update":
+                entry.real_id = record.get("id") if record else entry.record_id
+        if entry.status == "applied":
+            entry.last_error = None
+        await self.store.finish(entry)
+
+        if entry.status == "conflict":
+            self._counters["conflicts"] += 1
+            logger.error(
+                f"Write journal: conflicto en {entry.table}/{entry.record_id} "
+                f"(seq {entry.seq}): {entry.last_error}"
+            )
+        elif entry.status == "failed":
+            self._counters["failed"] += 1
+            logger.error(
+                f"Write journal: {entry.op} {entry.table}/{entry.record_id} fallido "
+                f"(seq {entry.seq}): {entry.last_error}"
+            )
+        elif record:
+            if entry.op == "create" and is_provisional(entry.record_id):
+                self._forget(entry.table, entry.record_id)
+            self._reflect(entry.table, record)
+
+    async def _handle_error(self, entry: JournalEntry, error: Exception):
+        entry.attempts += 1
+        entry.last_error = str(error)[:300] or type(error).__name__
+        if is_client_error(error) or entry.attempts >= self.max_attempts:
+            entry.status = "failed"
+            await self._finish(entry, None)
+        else:
+            self._counters["retries"] += 1
+            hold = self.in_flight_seconds if _may_still_land(error) else 0.0
+            await self.store.record_attempt(entry, hold_seconds=hold)
+
+    # --- Read model ---
+
+    @staticmethod
+    def _read_model_name(table: str) -> Optional[str]:
+        from src.infrastructure.read_model import READ_MODEL_TABLES
+
+        table_id = TABLE_IDS_BY_NAME.get(table, table)
+        return next(
+            (t.name for t in READ_MODEL_TABLES.values() if t.airtable_table == table_id), None
+        )
+
+    def _reflect(self, table: str, record: Dict[str, Any]):
+        name = self._read_model_name(table)
+        if name is not None:
+            from src.infrastructure.read_model import get_read_model
+
+            get_read_model().apply_write(name, {"id": record["id"], "fields": record["fields"]})
+
+    def _read_model_copy(self, table: str, record_id: str) -> Optional[Dict[str, Any]]:
+        name = self._read_model_name(table)
+        if name is None:
+            return None
+        from src.infrastructure.read_model import get_read_model
+
+        read_model = get_read_model()
+        if not read_model.running:
+            return None
+        try:
+            return read_model.store.get(name, record_id)
+        except Exception as e:
+            logger.warning(f"Write journal: read model lookup failed for {name}: {e}")
+            return None
+
+    def _reflect_update(self, table: str, record_id: str, fields: Dict[str, Any]):
+        """Update diferido: se mezcla sobre la copia del read model, si la hay."""
+        current = self._read_model_copy(table, record_id)
+        if current is not None:
+            self._reflect(
+                table, {"id": record_id, "fields": {**current.get("fields", {}), **fields}}
+            )
+
+    def _forget(self, table: str, provisional_id: str):
+        name = self._read_model_name(table)
+        if name is not None:
+            from src.infrastructure.read_model import get_read_model
+
+            get_read_model().apply_delete(name, provisional_id)
+
+    # --- Replay ---
+
+    async def start(self):
+        if self._running:
+            return
+        if not write_journal_enabled():
+            logger.info("Write journal disabled (WRITE_JOURNAL_ENABLED=false)")
+            return
+        self._running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._replay_loop())
+        stats = await self.store.stats()
+        logger.info(f"Write journal started ({stats['pending']} pending entries)")
+
+    async def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Write journal stopped")
+
+    async def _replay_loop(self):
+        while self._running:
+            self._wakeup.clear()
+            try:
+                progressed = await self.replay_once()
+            except Exception as e:
+                logger.error(f"Write journal replay error: {e}")
+                progressed = False
+
+            if progressed:
+                continue
+            if self._consecutive_failures:
+                delay = min(
+                    self.max_backoff_seconds,
+                    self.base_backoff_seconds * 2 ** (self._consecutive_failures - 1),
+                ) * random.uniform(0.5, 1.5)
+            else:
+                delay = self.replay_interval_seconds
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def replay_once(self) -> bool:
+        """
+        Aplica entradas pendientes en orden hasta el primer error transitorio.
+        Devuelve True si se cerró al menos una entrada.
+        """
+        progressed = False
+        for entry in await self.store.pending(self.batch_size):
+            # Otro worker (o una petición) la está aplicando: se respeta el orden
+            if not await self.store.claim(entry, self.owner, self.claim_seconds):
+                break
+            try:
+                record = await self._apply(entry)
+            except _Blocked:
+                # Su create se está aplicando en línea; se reintenta en la siguiente pasada
+                await self.store.release(entry, self.owner)
+                break
+            except Exception as e:
+                await self._handle_error(entry, e)
+                if entry.status == "pending":
+                    self._consecutive_failures += 1
+                    logger.warning(
+                        f"Write journal: replay detenido en seq {entry.seq} "
+                        f"(intento {entry.attempts}): {entry.last_error}"
+                    )
+                    break
+                progressed = True
+                continue
+
+            await self._finish(entry, record)
+            if entry.status == "applied":
+                self._counters["applied_replay"] += 1
+            self._consecutive_failures = 0
+            progressed = True
+        return progressed
+
+    # --- Observabilidad ---
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "owner": self.owner,
+            "inline_timeout_seconds": self.inline_timeout_seconds,
+            "in_flight_seconds": self.in_flight_seconds,
+            "consecutive_failures": self._consecutive_failures,
+            "store": await self.store.stats(),
+            "counters": dict(self._counters),
+        }
+
+    async def list_entries(self, status: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Entradas en un estado (conflict / failed / pending) para revisión."""
+        return [entry.to_dict() for entry in await self.store.list_by_status(status, limit)]
+
+
+_write_journal: Optional[WriteJournal] = None
+
+
+def get_write_journal() -> WriteJournal:
+    """Devuelve la instancia singleton del diario de escrituras."""
+    global _write_journal
+    if _write_journal is None:
+        _write_journal = WriteJournal()
+    return _write_journal
@@ -0,0 +1,358 @@
+"""
+Diario local de escrituras a Airtable (append-only en SQLite).
+
+Cada create / update se persiste aquí antes de intentar Airtable. Un create
+recibe un ID provisional ("tmp...") que se puede usar de inmediato en
+updates posteriores; al aplicarse se guarda el record ID real y las
+entradas que apuntan al provisional se resuelven en el replay.
+
+Varios workers comparten el fichero: antes de aplicar una entrada, el
+worker la reclama (claimed_by / claimed_until) con un único UPDATE
+condicional. Solo quien la reclama la aplica; si el worker muere, el
+claim caduca y otro la retoma.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROVISIONAL_PREFIX = "tmp"
+APPLIED_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+def new_provisional_id() -> str:
+    return f"{PROVISIONAL_PREFIX}{uuid.uuid4().hex[:14]}"
+
+
+def is_provisional(record_id: Optional[str]) -> bool:
+    return bool(record_id) and record_id.startswith(PROVISIONAL_PREFIX)
+
+
+@dataclass
+class JournalEntry:
+    """Escritura pendiente de aplicar en Airtable."""
+
+    op: str  # create | update
+    table: str
+    record_id: str  # record ID real o provisional
+    fields: Dict[str, Any]
+    # Valores que el llamador vio al decidir el cambio; si Airtable tiene
+    # otros al aplicar, la entrada queda en conflicto en lugar de pisarlos
+    expected: Dict[str, Any] = field(default_factory=dict)
+    # Campos que identifican un create ya aplicado (tras un timeout)
+    match_fields: List[str] = field(default_factory=list)
+    status: str = "pending"  # pending | applied | conflict | failed
+    attempts: int = 0
+    last_error: Optional[str] = None
+    real_id: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    seq: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "op": self.op,
+            "table": self.table,
+            "record_id": self.record_id,
+            "real_id": self.real_id,
+            "fields": self.fields,
+            "expected": self.expected,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at,
+        }
+
+
+class SQLiteJournalStore:
+    """Diario en SQLite: entradas en orden de llegada + mapa provisional → real."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS journal (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        op TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        record_id TEXT NOT NULL,
+        fields TEXT NOT NULL,
+        expected TEXT NOT NULL,
+        match_fields TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        real_id TEXT,
+        created_at REAL NOT NULL,
+        applied_at REAL,
+        claimed_by TEXT,
+        claimed_until REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_journal_status ON journal(status, seq);
+    CREATE TABLE IF NOT EXISTS provisional_ids (
+        provisional_id TEXT PRIMARY KEY,
+        real_id TEXT NOT NULL
+    );
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("WRITE_JOURNAL_SQLITE_PATH", "data/write_journal.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        """Añade las columnas de claim a diarios creados antes de tenerlas."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(journal)")}
+        for name, kind in (("claimed_by", "TEXT"), ("claimed_until", "REAL")):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE journal ADD COLUMN {name} {kind}")
+
+    async def close(self):
+        self._conn.close()
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
+
+    @staticmethod
+    def _from_row(row) -> JournalEntry:
+        (seq, op, table, record_id, fields, expected, match_fields,
+         status, attempts, last_error, real_id, created_at) = row
+        return JournalEntry(
+            op=op,
+            table=table,
+            record_id=record_id,
+            fields=json.loads(fields),
+            expected=json.loads(expected),
+            match_fields=json.loads(match_fields),
+            status=status,
+            attempts=attempts,
+            last_error=last_error,
+            real_id=real_id,
+            created_at=created_at,
+            seq=seq,
+        )
+
+    _COLUMNS = (
+        "seq, op, table_name, record_id, fields, expected, match_fields, "
+        "status, attempts, last_error, real_id, created_at"
+    )
+
+    async def append(self, entry: JournalEntry) -> JournalEntry:
+        def _insert():
+            cur = self._conn.execute(
+                "INSERT INTO journal (op, table_name, record_id, fields, expected, "
+                "match_fields, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.op,
+                    entry.table,
+                    entry.record_id,
+                    json.dumps(entry.fields, ensure_ascii=False, default=str),
+                    json.dumps(entry.expected, ensure_ascii=False, default=str),
+                    json.dumps(entry.match_fields),
+                    entry.created_at,
+                ),
+            )
+            entry.seq = cur.lastrowid
+            return entry
+
+        return await self._run(_insert)
+
+    async def pending(self, limit: int = 100) -> List[JournalEntry]:
+        """Entradas por aplicar, en el orden en que se aceptaron."""
+
+        def _select():
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM journal WHERE status = 'pending' "
+                "ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+            return [self._from_row(row) for row in rows]
+
+        return await self._run(_select)
+
+    async def claim(self, entry: JournalEntry, owner: str, lease_seconds: float) -> bool:
+        """
+        Reclama una entrada pendiente para aplicarla en el replay. Falla si
+        otro worker (o esta misma instancia) tiene un claim vigente.
+        """
+
+        def _update():
+            now = time.time()
+            cur = self._conn.execute(
+                "UPDATE journal SET claimed_by = ?, claimed_until = ? "
+                "WHERE seq = ? AND status = 'pending' "
+                "AND (claimed_by IS NULL OR claimed_until < ?)",
+                (owner, now + lease_seconds, entry.seq, now),
+            )
+            return cur.rowcount == 1
+
+        return await self._run(_update)
+
+    async def claim_inline(self, entry: JournalEntry, owner: str, lease_seconds: float) -> bool:
+        """
+        Reclama una entrada recién aceptada para aplicarla dentro de la
+        petición. Solo se concede si todo lo pendiente por delante está
+        reclamado (se está aplicando ya, en cualquier worker) y nada de eso
+        toca el mismo registro; si no, la entrada espera al replay.
+        """
+
+        def _update():
+            now = time.time()
+            cur = self._conn.execute(
+                "UPDATE journal SET claimed_by = ?, claimed_until = ? "
+                "WHERE seq = ? AND status = 'pending' AND claimed_by IS NULL "
+                "AND NOT EXISTS (SELECT 1 FROM journal AS ahead "
+                "WHERE ahead.status = 'pending' AND ahead.seq < ? "
+                "AND (ahead.record_id = ? OR ahead.claimed_by IS NULL OR ahead.claimed_until < ?))",
+                (owner, now + lease_seconds, entry.seq, entry.seq, entry.record_id, now),
+            )
+            return cur.rowcount == 1
+
+        return await self._run(_update)
+
+    async def release(self, entry: JournalEntry, owner: str):
+        """Suelta el claim sin cerrar la entrada (el replay la reintentará)."""
+        await self._run(
+            lambda: self._conn.execute(
+                "UPDATE journal SET claimed_by = NULL, claimed_until = NULL "
+                "WHERE seq = ? AND claimed_by = ?",
+                (entry.seq, owner),
+            )
+        )
+
+    async def record_attempt(self, entry: JournalEntry, hold_seconds: float = 0.0):
+        """
+        Guarda el intento fallido y suelta el claim. Con `hold_seconds` el
+        claim se mantiene ese tiempo (la llamada abandonada aún puede llegar
+        a Airtable y nadie debe reintentarla antes).
+        """
+        if hold_seconds > 0:
+            await self._run(
+                lambda: self._conn.execute(
+                    "UPDATE journal SET attempts = ?, last_error = ?, claimed_until = ? "
+                    "WHERE seq = ?",
+                    (entry.attempts, entry.last_error, time.time() + hold_seconds, entry.seq),
+                )
+            )
+            return
+        await self._run(
+            lambda: self._conn.execute(
+                "UPDATE journal SET attempts = ?, last_error = ?, "
+                "claimed_by = NULL, claimed_until = NULL WHERE seq = ?",
+                (entry.attempts, entry.last_error, entry.seq),
+            )
+        )
+
+    async def finish(self, entry: JournalEntry):
+        """Cierra la entrada (applied / conflict / failed) y registra el ID real."""
+
+        def _update():
+            now = time.time()
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.execute(
+                    "UPDATE journal SET status = ?, attempts = ?, last_error = ?, "
+                    "real_id = ?, applied_at = ?, claimed_by = NULL, claimed_until = NULL "
+                    "WHERE seq = ?",
+                    (entry.status, entry.attempts, entry.last_error, entry.real_id, now, entry.seq),
+                )
+                if entry.op == "create" and entry.real_id and is_provisional(entry.record_id):
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO provisional_ids (provisional_id, real_id) "
+                        "VALUES (?, ?)",
+                        (entry.record_id, entry.real_id),
+                    )
+                self._conn.execute(
+                    "DELETE FROM journal WHERE status = 'applied' AND applied_at < ?",
+                    (now - APPLIED_RETENTION_SECONDS,),
+                )
+
+        await self._run(_update)
+
+    async def resolve(self, record_id: str) -> Optional[str]:
+        """Record ID real de un ID provisional (None si aún no se ha aplicado)."""
+
+        def _select():
+            row = self._conn.execute(
+                "SELECT real_id FROM provisional_ids WHERE provisional_id = ?", (record_id,)
+            ).fetchone()
+            return row[0] if row else None
+
+        return await self._run(_select)
+
+    async def find_create(self, provisional_id: str) -> Optional[JournalEntry]:
+        """Entrada create que asignó un ID provisional."""
+
+        def _select():
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM journal WHERE op = 'create' AND record_id = ?",
+                (provisional_id,),
+            ).fetchone()
+            return self._from_row(row) if row else None
+
+        return await self._run(_select)
+
+    async def pending_for_record(self, table: str, record_id: str) -> List[JournalEntry]:
+        """Entradas pendientes de un registro (por ID real o provisional), en orden."""
+
+        def _select():
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM journal WHERE status = 'pending' "
+                "AND table_name = ? AND record_id = ? ORDER BY seq",
+                (table, record_id),
+            ).fetchall()
+            return [self._from_row(row) for row in rows]
+
+        return await self._run(_select)
+
+    async def list_by_status(self, status: str, limit: int = 50) -> List[JournalEntry]:
+        def _select():
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM journal WHERE status = ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (status, limit),
+            ).fetchall()
+            return [self._from_row(row) for row in rows]
+
+        return await self._run(_select)
+
+    async def stats(self) -> Dict[str, Any]:
+        def _count():
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM journal GROUP BY status"
+                ).fetchall()
+            )
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM journal WHERE status = 'pending'"
+            ).fetchone()[0]
+            claimed = self._conn.execute(
+                "SELECT COUNT(*) FROM journal WHERE status = 'pending' AND claimed_until >= ?",
+                (time.time(),),
+            ).fetchone()[0]
+            return counts, oldest, claimed
+
+        counts, oldest, claimed = await self._run(_count)
+        return {
+            "pending": counts.get("pending", 0),
+            "claimed": claimed,
+            "applied_retained": counts.get("applied", 0),
+            "conflicts": counts.get("conflict", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_pending_seconds": round(time.time() - oldest, 1) if oldest else None,
+        }
@@ -1,6 +1,7 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -32,7 +33,20 @@ from src.api.middleware.rate_limiting import limiter, rate_limit_exceeded_handle
 from slowapi.errors import RateLimitExceeded
 
 # Import Services
+from src.application.services.auth_service import require_role
 from src.infrastructure.services.scheduler_service import get_scheduler
+from src.infrastructure.outbox import get_outbox
+from src.infrastructure.inbound import get_inbound_queue
+from src.infrastructure.read_model import get_read_model
+from src.infrastructure.write_journal import get_write_journal
+from src.infrastructure.airtable import get_write_coalescer
+from src.infrastructure.analytics import (
+    get_analytics_engine,
+    get_dashboard_stats_materializer,
+    get_occupancy_engine,
+)
+from src.infrastructure.kitchen import get_kitchen_board
+from src.api.websocket.connection_manager import manager as websocket_manager
 
 # Get CORS origins from environment
 _raw_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173")
@@ -59,6 +73,15 @@ async def lifespan(app: FastAPI):
     # === STARTUP ===
     logger.info("🚀 Starting Cerebro En Las Nubes Backend...")
     logger.info("Starting background services...")
+    await get_outbox().start()
+    await get_inbound_queue().start()
+    await get_read_model().start()
+    await get_write_journal().start()
+    get_kitchen_board().set_publisher(
+        lambda delta: websocket_manager.broadcast_to_room("kitchen", delta),
+        asyncio.get_running_loop(),
+    )
+    await get_kitchen_board().start()
     scheduler = get_scheduler()
     if scheduler:
         await scheduler.start()
@@ -72,7 +95,14 @@ async def lifespan(app: FastAPI):
     scheduler = get_scheduler()
     if scheduler:
         await scheduler.stop()
-        logger.info("Background services stopped successfully")
+    await get_write_coalescer().flush()
+    await get_kitchen_board().stop()
+    get_kitchen_board().set_publisher(None)
+    await get_write_journal().stop()
+    await get_read_model().stop()
+    await get_inbound_queue().stop()
+    await get_outbox().stop()
+    logger.info("Background services stopped successfully")
 
 
 app = FastAPI(
@@ -168,6 +198,124 @@ async def cache_health():
     }
 
 
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    """
+    Get scheduled jobs metrics (run duration, lag, failures).
+    """
+    scheduler = get_scheduler()
+
+    return {
+        "scheduler": scheduler.get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/outbox/stats")
+async def outbox_stats():
+    """
+    Get outbound message queue status (queued, in flight, dead letters).
+    """
+    return {
+        "outbox": await get_outbox().get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/inbound/stats")
+async def inbound_stats():
+    """
+    Get inbound WhatsApp queue status (pending, processed, end-to-end latency).
+    """
+    return {
+        "inbound": await get_inbound_queue().get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/read-model/stats")
+async def read_model_stats():
+    """
+    Get local read model status (records, staleness per table, reads served).
+    """
+    return {
+        "read_model": await get_read_model().get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/write-journal/stats")
+async def write_journal_stats():
+    """
+    Get Airtable write journal status (pending writes, conflicts, replay backlog age).
+    """
+    return {
+        "write_journal": await get_write_journal().get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/write-journal/entries", dependencies=[Depends(require_role(["admin"]))])
+async def write_journal_entries(status: str = "conflict", limit: int = 50):
+    """
+    List journal entries by status (conflict, failed, pending) for manual review.
+    Admin only: entries carry customer names and phone numbers.
+    """
+    return {
+        "entries": await get_write_journal().list_entries(status, limit),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/airtable/write-coalescer/stats")
+async def write_coalescer_stats():
+    """
+    Get Airtable update coalescing stats (merged updates, batch PATCH calls, pending).
+    """
+    return {
+        "write_coalescer": get_write_coalescer().get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/analytics/engine/stats")
+async def analytics_engine_stats():
+    """
+    Get analytics engine stats: columnar history (reservations, rows, categories),
+    occupancy grids (cached days, learned durations) and cached dashboard stats
+    (hits, misses, invalidations).
+    """
+    return {
+        "analytics_engine": get_analytics_engine().get_stats(),
+        "occupancy_engine": get_occupancy_engine().get_stats(),
+        "dashboard_stats": get_dashboard_stats_materializer().get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/kitchen/board/stats")
+async def kitchen_board_stats():
+    """
+    Get kitchen board stats (today's orders in memory, version, deltas pushed).
+    """
+    return {
+        "kitchen_board": get_kitchen_board().get_stats(),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
+@app.get("/outbox/dead-letters", dependencies=[Depends(require_role(["admin"]))])
+async def outbox_dead_letters(limit: int = 50):
+    """
+    List messages that exhausted their delivery attempts.
+    Admin only: payloads carry phone numbers and message bodies.
+    """
+    return {
+        "dead_letters": await get_outbox().list_dead_letters(limit),
+        "timestamp": __import__("datetime").datetime.now().isoformat(),
+    }
+
+
 @app.get("/")
 async def root():
     return {
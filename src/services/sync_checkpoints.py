@@ -0,0 +1,166 @@
+"""
+Checkpoints persistentes de la sincronización Supabase <-> Airtable.
+
+Por cada tabla y sentido se guarda:
+- cursor: instante desde el que pedir cambios en la próxima ejecución
+  incremental (LAST_MODIFIED_TIME() en Airtable, updated_at en Supabase).
+- hash de contenido por registro: lo último que se escribió en el destino.
+  Si el registro transformado tiene el mismo hash, la escritura se omite.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Límite de variables por sentencia en SQLite
+_SQL_IN_CHUNK = 500
+
+
+def content_hash(row: Dict[str, Any], exclude: Iterable[str] = ()) -> str:
+    """Hash estable del contenido de un registro (sin campos volátiles)."""
+    excluded = set(exclude)
+    payload = {k: v for k, v in row.items() if k not in excluded}
+    raw = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SyncCheckpointStore:
+    """Checkpoints en SQLite (sobreviven a reinicios)."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sync_cursor (
+        table_name TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        cursor TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (table_name, direction)
+    );
+    CREATE TABLE IF NOT EXISTS sync_record_hash (
+        table_name TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        record_key TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        PRIMARY KEY (table_name, direction, record_key)
+    );
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SYNC_CHECKPOINT_PATH", "data/sync_checkpoints.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
+
+    # --- Cursor ---
+
+    async def get_cursor(self, table_name: str, direction: str) -> Optional[str]:
+        def _select():
+            row = self._conn.execute(
+                "SELECT cursor FROM sync_cursor WHERE table_name = ? AND direction = ?",
+                (table_name, direction),
+            ).fetchone()
+            return row[0] if row else None
+
+        return await self._run(_select)
+
+    async def set_cursor(self, table_name: str, direction: str, cursor: str):
+        def _upsert():
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO sync_cursor (table_name, direction, cursor, updated_at) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(table_name, direction) "
+                    "DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at",
+                    (table_name, direction, cursor, datetime.utcnow().isoformat()),
+                )
+
+        await self._run(_upsert)
+
+    # --- Hashes ---
+
+    async def get_hashes(
+        self, table_name: str, direction: str, keys: List[str]
+    ) -> Dict[str, str]:
+        """Hashes guardados para las claves dadas (las ausentes no aparecen)."""
+
+        def _select():
+            found: Dict[str, str] = {}
+            for i in range(0, len(keys), _SQL_IN_CHUNK):
+                chunk = keys[i:i + _SQL_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT record_key, hash FROM sync_record_hash "
+                    f"WHERE table_name = ? AND direction = ? AND record_key IN ({placeholders})",
+                    (table_name, direction, *chunk),
+                ).fetchall()
+                found.update(rows)
+            return found
+
+        return await self._run(_select)
+
+    async def save_hashes(self, table_name: str, direction: str, hashes: Dict[str, str]):
+        if not hashes:
+            return
+
+        def _upsert():
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO sync_record_hash (table_name, direction, record_key, hash) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(table_name, direction, record_key) "
+                    "DO UPDATE SET hash = excluded.hash",
+                    [(table_name, direction, key, h) for key, h in hashes.items()],
+                )
+
+        await self._run(_upsert)
+
+    async def reset(self, table_name: str):
+        """Olvida cursor y hashes de una tabla (fuerza una sync completa)."""
+
+        def _delete():
+            with self._conn:
+                self._conn.execute("DELETE FROM sync_cursor WHERE table_name = ?", (table_name,))
+                self._conn.execute(
+                    "DELETE FROM sync_record_hash WHERE table_name = ?", (table_name,)
+                )
+
+        await self._run(_delete)
+
+    async def get_status(self) -> List[Dict[str, Any]]:
+        def _select():
+            rows = self._conn.execute(
+                "SELECT c.table_name, c.direction, c.cursor, c.updated_at, "
+                "(SELECT COUNT(*) FROM sync_record_hash h "
+                " WHERE h.table_name = c.table_name AND h.direction = c.direction) "
+                "FROM sync_cursor c ORDER BY c.table_name, c.direction"
+            ).fetchall()
+            return [
+                {
+                    "table": r[0],
+                    "direction": r[1],
+                    "cursor": r[2],
+                    "updated_at": r[3],
+                    "tracked_records": r[4],
+                }
+                for r in rows
+            ]
+
+        return await self._run(_select)
@@ -0,0 +1,366 @@
+"""
+Motor de escritura masiva para la sincronización Supabase <-> Airtable.
+
+- Supabase: upsert en lotes (~500 filas) con on_conflict sobre la clave
+  primaria, en lugar de select + update/insert por fila.
+- Airtable: PATCH por lotes de 10 registros (máximo de la API). Los
+  registros ya conocidos se actualizan por record ID usando un mapa
+  precargado en una única pasada; los nuevos se envían con performUpsert
+  sobre fieldsToMergeOn para no duplicar si otro proceso los creó entre
+  medias.
+- Ritmo de peticiones a Airtable limitado (5 req/s por base) y reintento
+  ante 429.
+- Lectura en streaming: las páginas se consumen como async generator y
+  prefetched() pide la página N+1 mientras se procesa la N, con una ventana
+  acotada para que la memoria no dependa del tamaño de la tabla.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, TypeVar
+
+import httpx
+from postgrest.types import ReturnMethod
+
+from src.core.utils.rate_pacer import RatePacer
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_CHUNK_SIZE = 500
+AIRTABLE_BATCH_SIZE = 10
+AIRTABLE_REQUESTS_PER_SECOND = 5.0
+AIRTABLE_PAGE_SIZE = 100
+PREFETCH_PAGES = 2
+
+T = TypeVar("T")
+_END = object()
+
+
+def chunked(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def prefetched(pages: AsyncIterator[T], window: int = PREFETCH_PAGES) -> AsyncIterator[T]:
+    """
+    Consume un async iterator en segundo plano con hasta `window` páginas
+    por delante, solapando la siguiente lectura con el proceso de la actual.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, window))
+
+    async def producer():
+        try:
+            async for page in pages:
+                await queue.put((page, None))
+            await queue.put((_END, None))
+        except Exception as e:
+            await queue.put((_END, e))
+
+    task = asyncio.create_task(producer())
+    try:
+        while True:
+            page, error = await queue.get()
+            if page is _END:
+                if error is not None:
+                    raise error
+                return
+            yield page
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+@dataclass
+class BulkWriteResult:
+    """Resultado de una escritura masiva en un sentido."""
+
+    direction: str
+    total: int = 0
+    inserted: int = 0
+    updated: int = 0
+    # Escritos sin distinguir alta de actualización (upsert sin conteo detallado)
+    upserted: int = 0
+    errors: int = 0
+    skipped: int = 0
+    unchanged: int = 0
+    requests: int = 0
+    duration_seconds: float = 0.0
+    error_samples: List[str] = field(default_factory=list)
+    # Claves escritas con éxito (para actualizar los checkpoints)
+    written_keys: List[str] = field(default_factory=list, repr=False)
+
+    @property
+    def records_per_second(self) -> float:
+        if self.duration_seconds <= 0:
+            return 0.0
+        return self.written / self.duration_seconds
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated + self.upserted
+
+    def merge(self, other: "BulkWriteResult"):
+        """Acumula el resultado de un lote (la duración la mide el llamador)."""
+        self.total += other.total
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.upserted += other.upserted
+        self.errors += other.errors
+        self.skipped += other.skipped
+        self.unchanged += other.unchanged
+        self.requests += other.requests
+        self.written_keys.extend(other.written_keys)
+        for sample in other.error_samples:
+            if len(self.error_samples) < 5:
+                self.error_samples.append(sample)
+
+    def add_error(self, count: int, error: Exception):
+        self.errors += count
+        if len(self.error_samples) < 5:
+            self.error_samples.append(str(error)[:200])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "direction": self.direction,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "upserted": self.upserted,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "unchanged": self.unchanged,
+            "total": self.total,
+            "requests": self.requests,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "records_per_second": round(self.records_per_second, 1),
+            "error_samples": self.error_samples,
+        }
+
+
+class BulkSyncEngine:
+    """
+    Escrituras por lotes contra Supabase y la REST API de Airtable.
+
+    Args:
+        supabase: Cliente de Supabase (síncrono; se ejecuta en un hilo)
+        airtable_url: https://api.airtable.com/v0/<base_id>
+        airtable_api_key: Token de Airtable
+    """
+
+    def __init__(
+        self,
+        supabase,
+        airtable_url: str,
+        airtable_api_key: str,
+        supabase_chunk_size: int = SUPABASE_CHUNK_SIZE,
+        airtable_rate_per_second: float = AIRTABLE_REQUESTS_PER_SECOND,
+        max_retries: int = 3,
+    ):
+        self.supabase = supabase
+        self.airtable_url = airtable_url
+        self.airtable_api_key = airtable_api_key
+        self.supabase_chunk_size = supabase_chunk_size
+        self.max_retries = max_retries
+        self.pacer = RatePacer(airtable_rate_per_second)
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.airtable_api_key}",
+            "Content-Type": "application/json",
+        }
+
+    # --- Supabase ---
+
+    async def upsert_supabase(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        primary_key: str,
+        detailed_counts: bool = False,
+    ) -> BulkWriteResult:
+        """
+        Upsert por lotes en Supabase sobre primary_key (una petición por lote).
+
+        Con detailed_counts cada lote consulta antes qué claves existían para
+        separar inserted de updated (el doble de peticiones); si no, todo
+        cuenta como upserted.
+        """
+        result = BulkWriteResult(direction="airtable_to_supabase", total=len(rows))
+        start = time.perf_counter()
+
+        # Sin clave no hay upsert posible; la última versión de cada clave gana
+        unique: Dict[Any, Dict[str, Any]] = {}
+        for row in rows:
+            key = row.get(primary_key)
+            if key is None:
+                result.skipped += 1
+                continue
+            unique[key] = row
+
+        for chunk in chunked(list(unique.values()), self.supabase_chunk_size):
+            keys = [row[primary_key] for row in chunk]
+            try:
+                if detailed_counts:
+                    existing = await asyncio.to_thread(
+                        self._select_existing_keys, table, primary_key, keys
+                    )
+                    result.requests += 1
+                await asyncio.to_thread(
+                    lambda: self.supabase.table(table)
+                    .upsert(chunk, on_conflict=primary_key, returning=ReturnMethod.minimal)
+                    .execute()
+                )
+                result.requests += 1
+                if detailed_counts:
+                    result.updated += len(existing)
+                    result.inserted += len(chunk) - len(existing)
+                else:
+                    result.upserted += len(chunk)
+                result.written_keys.extend(str(k) for k in keys)
+            except Exception as e:
+                logger.error(f"Supabase upsert failed on {table} ({len(chunk)} rows): {e}")
+                result.add_error(len(chunk), e)
+
+        result.duration_seconds = time.perf_counter() - start
+        return result
+
+    def _select_existing_keys(self, table: str, primary_key: str, keys: List[Any]) -> set:
+        response = (
+            self.supabase.table(table).select(primary_key).in_(primary_key, keys).execute()
+        )
+        return {row[primary_key] for row in response.data or []}
+
+    # --- Airtable ---
+
+    async def _airtable_request(
+        self, client: httpx.AsyncClient, method: str, url: str, **kwargs
+    ) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            await self.pacer.wait()
+            response = await client.request(method, url, headers=self._headers, **kwargs)
+            if response.status_code == 429 and attempt < self.max_retries:
+                # Airtable pide esperar 30 s tras superar el límite
+                delay = float(response.headers.get("Retry-After", 30))
+                logger.warning(f"Airtable 429, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response.json()
+        return {}
+
+    async def iter_airtable_pages(
+        self,
+        client: httpx.AsyncClient,
+        table_id: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre una tabla de Airtable página a página (sin límite de registros)."""
+        offset = None
+        while True:
+            page_params: Dict[str, Any] = {"pageSize": AIRTABLE_PAGE_SIZE, **(params or {})}
+            if offset:
+                page_params["offset"] = offset
+            data = await self._airtable_request(
+                client, "GET", f"{self.airtable_url}/{table_id}", params=page_params
+            )
+            records = data.get("records", [])
+            if records:
+                yield records
+            offset = data.get("offset")
+            if not offset:
+                return
+
+    async def prefetch_airtable_id_map(
+        self, client: httpx.AsyncClient, table_id: str, key_field: str
+    ) -> Dict[str, str]:
+        """
+        Mapa {valor de key_field: record ID} de toda la tabla en una sola pasada
+        paginada, pidiendo solo el campo clave.
+        """
+        id_map: Dict[str, str] = {}
+        async for page in self.iter_airtable_pages(client, table_id, {"fields[]": key_field}):
+            for record in page:
+                key = record.get("fields", {}).get(key_field)
+                if key is not None:
+                    id_map[str(key)] = record["id"]
+        return id_map
+
+    async def upsert_airtable(
+        self,
+        client: httpx.AsyncClient,
+        table_id: str,
+        rows: List[Dict[str, Any]],
+        key_field: str,
+        id_map: Optional[Dict[str, str]] = None,
+    ) -> BulkWriteResult:
+        """
+        Escribe filas (ya en formato Airtable) en lotes de 10.
+
+        Las filas cuya clave está en id_map se actualizan por record ID; el
+        resto va con performUpsert sobre key_field.
+        """
+        result = BulkWriteResult(direction="supabase_to_airtable", total=len(rows))
+        start = time.perf_counter()
+        if id_map is None:
+            id_map = await self.prefetch_airtable_id_map(client, table_id, key_field)
+            result.requests += 1
+
+        known: List[Dict[str, Any]] = []
+        new: List[Dict[str, Any]] = []
+        for row in rows:
+            key = row.get(key_field)
+            if key is None:
+                result.skipped += 1
+                continue
+            record_id = id_map.get(str(key))
+            if record_id:
+                known.append({"id": record_id, "fields": row})
+            else:
+                new.append({"fields": row})
+
+        url = f"{self.airtable_url}/{table_id}"
+        for batch in chunked(known, AIRTABLE_BATCH_SIZE):
+            try:
+                await self._airtable_request(
+                    client, "PATCH", url, json={"records": batch, "typecast": True}
+                )
+                result.updated += len(batch)
+                result.written_keys.extend(str(r["fields"][key_field]) for r in batch)
+            except Exception as e:
+                logger.error(f"Airtable batch update failed on {table_id}: {e}")
+                result.add_error(len(batch), e)
+            result.requests += 1
+
+        for batch in chunked(new, AIRTABLE_BATCH_SIZE):
+            try:
+                data = await self._airtable_request(
+                    client,
+                    "PATCH",
+                    url,
+                    json={
+                        "performUpsert": {"fieldsToMergeOn": [key_field]},
+                        "records": batch,
+                        "typecast": True,
+                    },
+                )
+                created = data.get("createdRecords")
+                if created is None:
+                    result.inserted += len(batch)
+                else:
+                    result.inserted += len(created)
+                    result.updated += len(data.get("updatedRecords", []))
+                for record in data.get("records", []):
+                    key = record.get("fields", {}).get(key_field)
+                    if key is not None:
+                        id_map[str(key)] = record["id"]
+                result.written_keys.extend(str(r["fields"][key_field]) for r in batch)
+            except Exception as e:
+                logger.error(f"Airtable batch upsert failed on {table_id}: {e}")
+                result.add_error(len(batch), e)
+            result.requests += 1
+
+        result.duration_seconds = time.perf_counter() - start
+        return result
@@ -4,19 +4,33 @@ Mantiene consistencia de datos entre ambas plataformas.
 """
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
-import urllib.parse
 
 import httpx
 from supabase import create_client, Client
 
 from src.core.config import settings
+from src.services.sync_checkpoints import SyncCheckpointStore, content_hash
+from src.services.sync_engine import BulkSyncEngine, BulkWriteResult, chunked, prefetched
 
 logger = logging.getLogger(__name__)
 
+# Solape del cursor incremental: cubre desfases de reloj; los hashes evitan
+# reescribir lo que ya se sincronizó en la ventana solapada
+CURSOR_OVERLAP = timedelta(minutes=1)
+
+SUPABASE_PAGE_SIZE = 1000
+
+# Record IDs por fórmula OR(RECORD_ID()=...): acota la longitud de la URL
+RECORD_ID_BATCH_SIZE = 50
+_RECORD_ID_RE = re.compile(r"rec[A-Za-z0-9]+")
+
 
 class SyncDirection(Enum):
     AIRTABLE_TO_SUPABASE = "airtable_to_supabase"
@@ -32,6 +46,73 @@ class SyncConfig:
     direction: SyncDirection
     primary_key: str = "id"
     last_sync_field: str = "updated_at"
+    # Campo de Airtable que contiene primary_key (fieldsToMergeOn del upsert)
+    airtable_key_field: str = "ID"
+    # Campos que no cuentan para el hash de contenido
+    volatile_fields: Tuple[str, ...] = ("created_at", "updated_at")
+    # Nombre de la tabla en las claves de caché de AirtableService
+    # (airtable:{nombre}:{record_id}); None si no se cachea
+    airtable_table_name: Optional[str] = None
+
+
+@dataclass
+class TableSyncProgress:
+    """Estado de sincronización de una tabla (para /sync/status)."""
+
+    table: str
+    state: str = "idle"  # idle | queued | running | success | error
+    trigger: Optional[str] = None
+    full_sync: bool = False
+    phase: Optional[str] = None
+    records_processed: int = 0
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+    last_result: Optional[Dict[str, Any]] = None
+    pending_webhook_events: int = 0
+    _started: float = field(default=0.0, repr=False)
+
+    def start(self, trigger: str, full_sync: bool):
+        self.state = "running"
+        self.trigger = trigger
+        self.full_sync = full_sync
+        self.phase = None
+        self.records_processed = 0
+        self.started_at = datetime.utcnow().isoformat()
+        self.finished_at = None
+        self._started = time.perf_counter()
+
+    def _stop(self, state: str):
+        self.state = state
+        self.finished_at = datetime.utcnow().isoformat()
+        self.duration_seconds = round(time.perf_counter() - self._started, 3)
+
+    def finish(self, result: Dict[str, Any]):
+        self._stop("success")
+        self.last_error = None
+        self.last_result = result
+
+    def fail(self, error: str):
+        self._stop("error")
+        self.last_error = error[:300]
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+        if self.state == "running":
+            data["elapsed_seconds"] = round(time.perf_counter() - self._started, 3)
+        return data
+
+
+@dataclass
+class PendingWebhookSync:
+    """Ráfaga de webhooks de una tabla esperando a ejecutarse."""
+
+    first_event: float
+    last_event: float
+    events: int = 0
+    record_ids: Set[str] = field(default_factory=set)
+    task: Optional[asyncio.Task] = None
 
 
 class SupabaseAirtableSync:
@@ -54,14 +135,16 @@ class SupabaseAirtableSync:
                 supabase_table="reservations",
                 direction=SyncDirection.BIDIRECTIONAL,
                 primary_key="id",
-                last_sync_field="updated_at"
+                last_sync_field="updated_at",
+                airtable_table_name="Reservas"
             ),
             SyncConfig(
                 table_name="tables",
                 airtable_table_id="tblTables",
                 supabase_table="tables",
                 direction=SyncDirection.AIRTABLE_TO_SUPABASE,
-                primary_key="id"
+                primary_key="id",
+                airtable_table_name="Mesas"
             ),
             SyncConfig(
                 table_name="users",
@@ -72,11 +155,32 @@ class SupabaseAirtableSync:
             )
         ]
         
+        self.engine = BulkSyncEngine(
+            self.supabase, self.airtable_url, self.airtable_api_key
+        )
+        self.checkpoints = SyncCheckpointStore()
+        # Páginas pedidas por delante mientras se procesa la actual
+        self.prefetch_pages = int(os.getenv("SYNC_PREFETCH_PAGES", "2"))
         self._sync_history: List[Dict] = []
+
+        self.max_parallel_tables = int(os.getenv("SYNC_MAX_PARALLEL_TABLES", "3"))
+        self.webhook_debounce_seconds = float(os.getenv("SYNC_WEBHOOK_DEBOUNCE_SECONDS", "5"))
+        self.webhook_max_wait_seconds = float(os.getenv("SYNC_WEBHOOK_MAX_WAIT_SECONDS", "30"))
+        self._table_locks: Dict[str, asyncio.Lock] = {}
+        self._progress: Dict[str, TableSyncProgress] = {}
+        self._pending_webhooks: Dict[str, PendingWebhookSync] = {}
+        # Cachés en proceso a invalidar cuando cambian registros de una tabla
+        self._change_listeners: Dict[str, List[Callable[[List[str]], None]]] = {}
+        self._cache = None
     
     async def sync_all(self, full_sync: bool = False) -> Dict[str, Any]:
         """
         Ejecuta sincronización completa de todas las tablas configuradas.
+
+        Las tablas son independientes y se sincronizan en paralelo
+        (SYNC_MAX_PARALLEL_TABLES); todas comparten el mismo presupuesto de
+        peticiones a Airtable (el pacer del engine). El fallo de una tabla no
+        afecta a las demás.
         
         Args:
             full_sync: Si True, sincroniza todos los registros. 
@@ -85,29 +189,59 @@ class SupabaseAirtableSync:
         Returns:
             Dict con estadísticas de sincronización por tabla
         """
-        results = {}
-        
+        semaphore = asyncio.Semaphore(self.max_parallel_tables)
+
+        async def run(config: SyncConfig) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.run_table(config, full_sync, trigger="sync_all")
+
         for config in self.sync_configs:
+            self._progress_for(config).state = "queued"
+        results = await asyncio.gather(*(run(config) for config in self.sync_configs))
+        return {
+            config.table_name: result
+            for config, result in zip(self.sync_configs, results)
+        }
+
+    async def run_table(
+        self,
+        config: SyncConfig,
+        full_sync: bool = False,
+        trigger: str = "manual",
+        record_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Sincroniza una tabla con aislamiento de errores, tiempos y progreso.
+        Nunca lanza: un fallo se devuelve como {"status": "error"}.
+
+        Con record_ids solo se sincronizan esos registros de Airtable
+        (ver sync_records).
+        """
+        progress = self._progress_for(config)
+        # Una misma tabla no se sincroniza dos veces a la vez (manual + webhook)
+        async with self._table_locks.setdefault(config.table_name, asyncio.Lock()):
+            progress.start(trigger, full_sync)
+            logger.info(f"Syncing {config.table_name} ({trigger})...")
             try:
-                logger.info(f"Syncing {config.table_name}...")
-                result = await self.sync_table(config, full_sync)
-                results[config.table_name] = result
-                
-                # Registrar en historial
-                self._sync_history.append({
-                    "table": config.table_name,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "result": result
-                })
-                
+                if record_ids:
+                    result = await self.sync_records(config, record_ids)
+                else:
+                    result = await self.sync_table(config, full_sync)
+                progress.finish(result)
             except Exception as e:
                 logger.error(f"Error syncing {config.table_name}: {e}")
-                results[config.table_name] = {
-                    "status": "error",
-                    "error": str(e)
-                }
-        
-        return results
+                result = {"status": "error", "error": str(e)}
+                progress.fail(str(e))
+
+        # Registrar en historial
+        self._sync_history.append({
+            "table": config.table_name,
+            "timestamp": datetime.utcnow().isoformat(),
+            "trigger": trigger,
+            "duration_seconds": progress.duration_seconds,
+            "result": result
+        })
+        return result
     
     async def sync_table(self, config: SyncConfig, full_sync: bool = False) -> Dict[str, Any]:
         """Sincroniza una tabla específica."""
@@ -118,141 +252,403 @@ class SupabaseAirtableSync:
             return await self._sync_supabase_to_airtable(config, full_sync)
         else:  # BIDIRECTIONAL
             return await self._sync_bidirectional(config, full_sync)
+
+    # --- Webhooks ---
+
+    def request_incremental_sync(
+        self, config: SyncConfig, changed_records: Optional[List[str]] = None
+    ):
+        """
+        Agrupa ráfagas de webhooks: cada evento retrasa la ejecución hasta
+        que haya SYNC_WEBHOOK_DEBOUNCE_SECONDS sin eventos (como mucho
+        SYNC_WEBHOOK_MAX_WAIT_SECONDS desde el primero) y entonces se lanza
+        una única sync de la tabla: solo de los registros acumulados si el
+        webhook los indica, incremental completa si no.
+        """
+        now = time.monotonic()
+        pending = self._pending_webhooks.get(config.table_name)
+        if pending is None:
+            pending = PendingWebhookSync(first_event=now, last_event=now)
+            self._pending_webhooks[config.table_name] = pending
+            pending.task = asyncio.create_task(self._run_debounced(config, pending))
+        pending.last_event = now
+        pending.events += 1
+        pending.record_ids.update(changed_records or [])
+        self._progress_for(config).pending_webhook_events = pending.events
+
+    async def _run_debounced(self, config: SyncConfig, pending: "PendingWebhookSync"):
+        while True:
+            deadline = min(
+                pending.last_event + self.webhook_debounce_seconds,
+                pending.first_event + self.webhook_max_wait_seconds,
+            )
+            delay = deadline - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+
+        # Eventos que lleguen a partir de aquí abren una nueva ventana
+        self._pending_webhooks.pop(config.table_name, None)
+        self._progress_for(config).pending_webhook_events = 0
+        logger.info(
+            f"Webhook sync {config.table_name}: {pending.events} events, "
+            f"{len(pending.record_ids)} changed records coalesced"
+        )
+        record_ids = sorted(pending.record_ids)
+        if record_ids and config.direction != SyncDirection.SUPABASE_TO_AIRTABLE:
+            await self.run_table(config, trigger="webhook", record_ids=record_ids)
+        else:
+            await self.run_table(config, full_sync=False, trigger="webhook")
+
+    async def sync_records(self, config: SyncConfig, record_ids: List[str]) -> Dict[str, Any]:
+        """
+        Sincroniza solo los registros de Airtable indicados (payload
+        changed_records de un webhook) hacia Supabase.
+
+        Los IDs se piden en lotes con OR(RECORD_ID()='rec...', ...) en lugar
+        de releer la tabla, y las entradas de caché de esos registros se
+        invalidan una a una. El cursor incremental no se toca: cubre cambios
+        que el webhook no haya notificado.
+        """
+        direction = SyncDirection.AIRTABLE_TO_SUPABASE.value
+        # Solo IDs con formato de Airtable: van dentro de una fórmula
+        valid = [rid for rid in dict.fromkeys(record_ids) if _RECORD_ID_RE.fullmatch(rid)]
+        result = BulkWriteResult(direction=direction)
+        start = time.perf_counter()
+        found: Set[str] = set()
+        buffer: List[Dict] = []
+
+        async def flush():
+            result.merge(await self._write_to_supabase(config, buffer, full_sync=False))
+            buffer.clear()
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            for batch in chunked(valid, RECORD_ID_BATCH_SIZE):
+                formula = "OR(" + ",".join(f"RECORD_ID()='{rid}'" for rid in batch) + ")"
+                async for page in self.engine.iter_airtable_pages(
+                    client, config.airtable_table_id, {"filterByFormula": formula}
+                ):
+                    found.update(record["id"] for record in page)
+                    buffer.extend(
+                        self._transform_airtable_to_supabase(record, config.table_name)
+                        for record in page
+                    )
+                    self._report_progress(config, direction, len(page))
+                    if len(buffer) >= self.engine.supabase_chunk_size:
+                        await flush()
+        if buffer:
+            await flush()
+
+        result.duration_seconds = time.perf_counter() - start
+        # También los no encontrados (borrados en Airtable) salen de la caché
+        await self._invalidate_caches(config, valid)
+        logger.info(
+            f"{config.table_name} → Supabase (webhook): {len(found)}/{len(valid)} records, "
+            f"{result.upserted} upserted, {result.unchanged} unchanged"
+        )
+        return {
+            **result.to_dict(),
+            "targeted": True,
+            "requested": len(record_ids),
+            "found": len(found),
+            "missing": len(valid) - len(found),
+            "invalid_ids": len(record_ids) - len(valid),
+        }
+
+    # --- Cachés ---
+
+    def add_change_listener(self, table_name: str, listener: Callable[[List[str]], None]):
+        """Registra una caché en proceso a invalidar cuando cambian registros de la tabla."""
+        self._change_listeners.setdefault(table_name, []).append(listener)
+
+    def _get_cache(self):
+        if self._cache is None:
+            from src.infrastructure.cache.redis_cache import get_cache
+
+            self._cache = get_cache()
+        return self._cache
+
+    async def _invalidate_caches(self, config: SyncConfig, record_ids: List[str]):
+        """
+        Invalida exactamente las entradas de los registros cambiados
+        (airtable:{tabla}:{record_id}) más los listados de la tabla, que
+        pueden contenerlos.
+        """
+        if config.airtable_table_name and record_ids:
+            prefix = f"airtable:{config.airtable_table_name}"
+
+            def _delete():
+                cache = self._get_cache()
+                for record_id in record_ids:
+                    cache.delete(f"{prefix}:{record_id}")
+                cache.delete_pattern(f"{prefix}:all")
+                cache.delete_pattern(f"{prefix}:list:*")
+
+            try:
+                await asyncio.to_thread(_delete)
+            except Exception as e:
+                logger.warning(f"Cache invalidation failed for {config.table_name}: {e}")
+
+        for listener in self._change_listeners.get(config.table_name, []):
+            try:
+                listener(record_ids)
+            except Exception as e:
+                logger.warning(f"Change listener failed for {config.table_name}: {e}")
+
+    # --- Progreso ---
+
+    def _progress_for(self, config: SyncConfig) -> "TableSyncProgress":
+        progress = self._progress.get(config.table_name)
+        if progress is None:
+            progress = TableSyncProgress(table=config.table_name)
+            self._progress[config.table_name] = progress
+        return progress
+
+    def _report_progress(self, config: SyncConfig, direction: str, processed: int):
+        progress = self._progress.get(config.table_name)
+        if progress is not None:
+            progress.phase = direction
+            progress.records_processed += processed
+
+    def get_progress(self) -> List[Dict[str, Any]]:
+        """Estado por tabla: en curso, última duración, errores y eventos pendientes."""
+        return [self._progress_for(config).to_dict() for config in self.sync_configs]
     
     async def _sync_airtable_to_supabase(
         self, 
         config: SyncConfig, 
         full_sync: bool
     ) -> Dict[str, Any]:
-        """Sincroniza desde Airtable hacia Supabase."""
-        
-        # Obtener registros de Airtable
-        airtable_records = await self._get_airtable_records(
-            config.airtable_table_id,
-            full_sync
+        """
+        Sincroniza desde Airtable hacia Supabase.
+
+        Incremental: solo registros con LAST_MODIFIED_TIME() posterior al
+        checkpoint, y sin escribir los que no han cambiado (hash).
+        full_sync: relee toda la tabla y reescribe todo.
+
+        Las páginas se procesan en streaming: mientras se escribe un lote en
+        Supabase ya se está pidiendo la siguiente página a Airtable.
+        """
+        direction = SyncDirection.AIRTABLE_TO_SUPABASE.value
+        run_started = datetime.now(timezone.utc)
+        since = None if full_sync else await self.checkpoints.get_cursor(
+            config.table_name, direction
         )
-        
-        inserted = 0
-        updated = 0
-        errors = 0
-        
-        for record in airtable_records:
-            try:
-                # Transformar datos de Airtable a formato Supabase
-                supabase_data = self._transform_airtable_to_supabase(
-                    record, 
-                    config.table_name
-                )
-                
-                # Verificar si existe en Supabase
-                existing = self.supabase.table(config.supabase_table)\
-                    .select("*")\
-                    .eq(config.primary_key, supabase_data[config.primary_key])\
-                    .execute()
-                
-                if existing.data:
-                    # Actualizar
-                    self.supabase.table(config.supabase_table)\
-                        .update(supabase_data)\
-                        .eq(config.primary_key, supabase_data[config.primary_key])\
-                        .execute()
-                    updated += 1
-                else:
-                    # Insertar
-                    self.supabase.table(config.supabase_table)\
-                        .insert(supabase_data)\
-                        .execute()
-                    inserted += 1
-                    
-            except Exception as e:
-                logger.error(f"Error processing record {record.get('id')}: {e}")
-                errors += 1
-        
-        return {
-            "status": "success",
-            "direction": "airtable_to_supabase",
-            "inserted": inserted,
-            "updated": updated,
-            "errors": errors,
-            "total": len(airtable_records)
-        }
+        result = BulkWriteResult(direction=direction)
+        start = time.perf_counter()
+        buffer: List[Dict] = []
+
+        async def flush():
+            result.merge(await self._write_to_supabase(config, buffer, full_sync))
+            buffer.clear()
+
+        async for page in self._iter_airtable_pages(
+            config.airtable_table_id, full_sync, modified_since=since
+        ):
+            # Transformar datos de Airtable a formato Supabase
+            buffer.extend(
+                self._transform_airtable_to_supabase(record, config.table_name)
+                for record in page
+            )
+            self._report_progress(config, direction, len(page))
+            if len(buffer) >= self.engine.supabase_chunk_size:
+                await flush()
+        if buffer:
+            await flush()
+
+        result.duration_seconds = time.perf_counter() - start
+        await self._advance_cursor(config, direction, result, run_started)
+        logger.info(
+            f"{config.table_name} → Supabase: {result.upserted} upserted, "
+            f"{result.unchanged} unchanged, "
+            f"{result.records_per_second:.0f} records/s"
+        )
+        return {**result.to_dict(), "incremental": since is not None, "since": since}
     
+    async def _write_to_supabase(
+        self, config: SyncConfig, rows: List[Dict], full_sync: bool
+    ) -> BulkWriteResult:
+        """Escribe en Supabase las filas cambiadas y actualiza los hashes."""
+        direction = SyncDirection.AIRTABLE_TO_SUPABASE.value
+        changed, hashes = await self._filter_unchanged(
+            config, direction, rows, config.primary_key, full_sync
+        )
+        # Upsert por lotes sobre la clave primaria
+        part = await self.engine.upsert_supabase(
+            config.supabase_table, changed, config.primary_key
+        )
+        await self._save_hashes(config, direction, part, hashes)
+        if config.direction == SyncDirection.BIDIRECTIONAL:
+            # Lo recién escrito en Supabase no debe volver a Airtable como cambio
+            await self._seed_reverse_hashes(
+                config,
+                SyncDirection.SUPABASE_TO_AIRTABLE.value,
+                [self._transform_supabase_to_airtable(r, config.table_name) for r in changed],
+                config.airtable_key_field,
+                set(part.written_keys),
+            )
+        part.total = len(rows)
+        part.unchanged = len(rows) - len(changed)
+        return part
+
     async def _sync_supabase_to_airtable(
         self, 
         config: SyncConfig, 
         full_sync: bool
     ) -> Dict[str, Any]:
-        """Sincroniza desde Supabase hacia Airtable."""
-        
-        # Obtener registros de Supabase
-        query = self.supabase.table(config.supabase_table).select("*")
-        
+        """
+        Sincroniza desde Supabase hacia Airtable (incremental por updated_at).
+
+        Lee Supabase por páginas y escribe cada página en Airtable mientras
+        se pide la siguiente.
+        """
+        direction = SyncDirection.SUPABASE_TO_AIRTABLE.value
+        run_started = datetime.now(timezone.utc)
+        since = None
         if not full_sync and config.last_sync_field:
-            # Solo registros modificados desde última sync
-            last_sync = await self._get_last_sync_timestamp(config.table_name)
-            if last_sync:
-                query = query.gte(config.last_sync_field, last_sync)
-        
-        supabase_records = query.execute().data
-        
-        inserted = 0
-        updated = 0
-        errors = 0
-        
-        async with httpx.AsyncClient() as client:
-            for record in supabase_records:
-                try:
-                    # Transformar datos de Supabase a formato Airtable
-                    airtable_data = self._transform_supabase_to_airtable(
-                        record, 
-                        config.table_name
-                    )
-                    
-                    # Verificar si existe en Airtable
-                    existing_id = await self._find_airtable_record(
+            # Solo registros modificados desde el último checkpoint
+            since = await self.checkpoints.get_cursor(config.table_name, direction)
+
+        result = BulkWriteResult(direction=direction)
+        start = time.perf_counter()
+        id_map: Optional[Dict[str, str]] = None
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            async for page in prefetched(
+                self._iter_supabase_pages(config, since), self.prefetch_pages
+            ):
+                # Transformar datos de Supabase a formato Airtable
+                rows = [
+                    self._transform_supabase_to_airtable(record, config.table_name)
+                    for record in page
+                ]
+                self._report_progress(config, direction, len(page))
+                changed, hashes = await self._filter_unchanged(
+                    config, direction, rows, config.airtable_key_field, full_sync
+                )
+                part = BulkWriteResult(direction=direction)
+                if changed:
+                    if id_map is None:
+                        # Un único mapa clave → record ID para toda la ejecución
+                        # en lugar de buscar cada fila en Airtable
+                        id_map = await self.engine.prefetch_airtable_id_map(
+                            client, config.airtable_table_id, config.airtable_key_field
+                        )
+                    # Lotes de 10 registros por petición
+                    part = await self.engine.upsert_airtable(
                         client,
                         config.airtable_table_id,
+                        changed,
+                        config.airtable_key_field,
+                        id_map=id_map,
+                    )
+                await self._save_hashes(config, direction, part, hashes)
+                if config.direction == SyncDirection.BIDIRECTIONAL:
+                    await self._seed_reverse_hashes(
+                        config,
+                        SyncDirection.AIRTABLE_TO_SUPABASE.value,
+                        [
+                            self._transform_airtable_to_supabase({"fields": r}, config.table_name)
+                            for r in changed
+                        ],
                         config.primary_key,
-                        record[config.primary_key]
+                        set(part.written_keys),
                     )
-                    
-                    if existing_id:
-                        # Actualizar
-                        await self._update_airtable_record(
-                            client,
-                            config.airtable_table_id,
-                            existing_id,
-                            airtable_data
-                        )
-                        updated += 1
-                    else:
-                        # Insertar
-                        await self._create_airtable_record(
-                            client,
-                            config.airtable_table_id,
-                            airtable_data
-                        )
-                        inserted += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing record {record.get('id')}: {e}")
-                    errors += 1
-        
-        return {
-            "status": "success",
-            "direction": "supabase_to_airtable",
-            "inserted": inserted,
-            "updated": updated,
-            "errors": errors,
-            "total": len(supabase_records)
+                part.total = len(rows)
+                part.unchanged = len(rows) - len(changed)
+                result.merge(part)
+
+        result.duration_seconds = time.perf_counter() - start
+        await self._advance_cursor(config, direction, result, run_started)
+        logger.info(
+            f"{config.table_name} → Airtable: {result.inserted} inserted, "
+            f"{result.updated} updated, {result.unchanged} unchanged, "
+            f"{result.records_per_second:.0f} records/s"
+        )
+        return {**result.to_dict(), "incremental": since is not None, "since": since}
+
+    async def _filter_unchanged(
+        self,
+        config: SyncConfig,
+        direction: str,
+        rows: List[Dict],
+        key_field: str,
+        full_sync: bool,
+    ) -> Tuple[List[Dict], Dict[str, str]]:
+        """
+        Descarta las filas cuyo hash coincide con el último escrito.
+        Devuelve (filas a escribir, {clave: hash nuevo}).
+        """
+        hashes = {
+            str(row[key_field]): content_hash(row, config.volatile_fields)
+            for row in rows
+            if row.get(key_field) is not None
         }
+        if full_sync or not hashes:
+            return list(rows), hashes
+
+        stored = await self.checkpoints.get_hashes(
+            config.table_name, direction, list(hashes)
+        )
+        changed = [
+            row for row in rows
+            if row.get(key_field) is None
+            or stored.get(str(row[key_field])) != hashes[str(row[key_field])]
+        ]
+        return changed, hashes
+
+    async def _save_hashes(
+        self,
+        config: SyncConfig,
+        direction: str,
+        result: BulkWriteResult,
+        hashes: Dict[str, str],
+    ):
+        await self.checkpoints.save_hashes(
+            config.table_name,
+            direction,
+            {key: hashes[key] for key in result.written_keys if key in hashes},
+        )
+
+    async def _advance_cursor(
+        self,
+        config: SyncConfig,
+        direction: str,
+        result: BulkWriteResult,
+        run_started: datetime,
+    ):
+        # Con errores no se avanza el cursor: lo fallido se reintenta en la
+        # siguiente ejecución y lo ya escrito se omite por hash
+        if result.errors == 0:
+            cursor = (run_started - CURSOR_OVERLAP).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            await self.checkpoints.set_cursor(config.table_name, direction, cursor)
+
+    async def _seed_reverse_hashes(
+        self,
+        config: SyncConfig,
+        direction: str,
+        rows: List[Dict],
+        key_field: str,
+        written_keys: set,
+    ):
+        hashes = {
+            str(row[key_field]): content_hash(row, config.volatile_fields)
+            for row in rows
+            if row.get(key_field) is not None and str(row[key_field]) in written_keys
+        }
+        await self.checkpoints.save_hashes(config.table_name, direction, hashes)
     
     async def _sync_bidirectional(
         self, 
         config: SyncConfig, 
         full_sync: bool
     ) -> Dict[str, Any]:
-        """Sincronización bidireccional con resolución de conflictos."""
+        """
+        Sincronización bidireccional con resolución de conflictos.
+
+        Los dos sentidos van en serie a propósito: el segundo usa los hashes
+        que siembra el primero para no devolver como cambio lo recién escrito.
+        """
         
         # Primero: Airtable → Supabase
         airtable_result = await self._sync_airtable_to_supabase(config, full_sync)
@@ -267,105 +663,49 @@ class SupabaseAirtableSync:
             "supabase_to_airtable": supabase_result
         }
     
-    async def _get_airtable_records(
-        self, 
-        table_id: str, 
-        full_sync: bool
-    ) -> List[Dict]:
-        """Obtiene registros de Airtable con límite máximo."""
-        MAX_RECORDS = 10000  # Límite máximo para prevenir OOM
-        records = []
-        offset = None
-        
-        async with httpx.AsyncClient() as client:
-            while True:
-                params = {}
-                if offset:
-                    params["offset"] = offset
-                
-                response = await client.get(
-                    f"{self.airtable_url}/{table_id}",
-                    headers={"Authorization": f"Bearer {self.airtable_api_key}"},
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                new_records = data.get("records", [])
-                records.extend(new_records)
-                
-                # Verificar límite máximo
-                if len(records) >= MAX_RECORDS:
-                    logger.warning(
-                        f"Reached maximum records limit ({MAX_RECORDS}) "
-                        f"for table {table_id}. Partial sync performed."
-                    )
-                    break
-                
-                offset = data.get("offset")
-                
-                if not offset:
-                    break
-        
-        return records
-    
-    async def _find_airtable_record(
-        self,
-        client: httpx.AsyncClient,
-        table_id: str,
-        field: str,
-        value: str
-    ) -> Optional[str]:
-        """Busca un registro en Airtable por campo."""
-        escaped_value = urllib.parse.quote(value, safe='')
-        response = await client.get(
-            f"{self.airtable_url}/{table_id}",
-            headers={"Authorization": f"Bearer {self.airtable_api_key}"},
-            params={"filterByFormula": f"{{{field}}}='{escaped_value}'"}
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        records = data.get("records", [])
-        return records[0]["id"] if records else None
-    
-    async def _create_airtable_record(
+    async def _iter_airtable_pages(
         self,
-        client: httpx.AsyncClient,
         table_id: str,
-        data: Dict
-    ):
-        """Crea un registro en Airtable."""
-        response = await client.post(
-            f"{self.airtable_url}/{table_id}",
-            headers={
-                "Authorization": f"Bearer {self.airtable_api_key}",
-                "Content-Type": "application/json"
-            },
-            json={"fields": data}
-        )
-        response.raise_for_status()
-        return response.json()
-    
-    async def _update_airtable_record(
-        self,
-        client: httpx.AsyncClient,
-        table_id: str,
-        record_id: str,
-        data: Dict
-    ):
-        """Actualiza un registro en Airtable."""
-        response = await client.patch(
-            f"{self.airtable_url}/{table_id}/{record_id}",
-            headers={
-                "Authorization": f"Bearer {self.airtable_api_key}",
-                "Content-Type": "application/json"
-            },
-            json={"fields": data}
-        )
-        response.raise_for_status()
-        return response.json()
-    
+        full_sync: bool,
+        modified_since: Optional[str] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Páginas de registros de Airtable, con la siguiente página ya en
+        camino mientras se procesa la actual. Sin límite de registros: la
+        memoria la acota la ventana de prefetch, no el tamaño de la tabla.
+        """
+        params = {}
+        if modified_since and not full_sync:
+            params["filterByFormula"] = (
+                f"IS_AFTER(LAST_MODIFIED_TIME(), '{modified_since}')"
+            )
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            async for page in prefetched(
+                self.engine.iter_airtable_pages(client, table_id, params),
+                self.prefetch_pages,
+            ):
+                yield page
+
+    async def _iter_supabase_pages(
+        self, config: SyncConfig, since: Optional[str]
+    ) -> AsyncIterator[List[Dict]]:
+        """Páginas de Supabase ordenadas por clave primaria."""
+        offset = 0
+        while True:
+            query = self.supabase.table(config.supabase_table).select("*")
+            if since:
+                query = query.gte(config.last_sync_field, since)
+            query = query.order(config.primary_key).range(
+                offset, offset + SUPABASE_PAGE_SIZE - 1
+            )
+            page = (await asyncio.to_thread(query.execute)).data or []
+            if page:
+                yield page
+            if len(page) < SUPABASE_PAGE_SIZE:
+                return
+            offset += SUPABASE_PAGE_SIZE
+
     def _transform_airtable_to_supabase(
         self, 
         airtable_record: Dict, 
@@ -465,14 +805,6 @@ class SupabaseAirtableSync:
             "Activo": record.get("is_active", True)
         }
     
-    async def _get_last_sync_timestamp(self, table_name: str) -> Optional[str]:
-        """Obtiene el timestamp de última sincronización."""
-        # Buscar en historial
-        for entry in reversed(self._sync_history):
-            if entry["table"] == table_name and entry["result"]["status"] == "success":
-                return entry["timestamp"]
-        return None
-    
     def get_sync_history(self) -> List[Dict]:
         """Retorna historial de sincronizaciones."""
         return self._sync_history[-100:]  # Últimas 100
@@ -486,7 +818,15 @@ def get_sync_service() -> SupabaseAirtableSync:
     global _sync_service_instance
     if _sync_service_instance is None:
         _sync_service_instance = SupabaseAirtableSync()
+        _sync_service_instance.add_change_listener("tables", _invalidate_table_assignment)
     return _sync_service_instance
 
+
+def _invalidate_table_assignment(record_ids: List[str]):
+    """Las mesas cambiadas en Airtable invalidan la caché del asignador."""
+    from src.application.services.table_assignment import get_table_assignment_service
+
+    get_table_assignment_service().invalidar_cache_mesas()
+
 # For backward compatibility
 sync_service = property(lambda self: get_sync_service())
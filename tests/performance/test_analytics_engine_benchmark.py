@@ -0,0 +1,99 @@
+"""
+Benchmark del motor de analytics columnar sobre un histórico sintético.
+
+3 años × ~150 reservas/día (~165k reservas). Mide tiempo real, así que no
+forma parte de la suite por defecto: pytest -m benchmark, o directamente
+python -m tests.performance.test_analytics_engine_benchmark
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from src.infrastructure.analytics import AnalyticsEngine
+
+YEARS = 3
+PER_DAY = 150
+START = date(2023, 1, 1)
+
+ESTADOS = ["Confirmada", "Confirmada", "Completada", "Sentada", "Cancelada", "Pendiente", "No Show"]
+ZONAS = ["Interior", "Terraza", "sin especificar"]
+CANALES = ["VAPI", "WhatsApp", "Web", "Teléfono"]
+
+
+def synthetic_history(seed: int = 42):
+    rng = random.Random(seed)
+    i = 0
+    for day in range(YEARS * 365):
+        fecha = (START + timedelta(days=day)).isoformat()
+        for _ in range(PER_DAY):
+            i += 1
+            hour = rng.choice([11, 12, 13, 18, 19, 20])
+            yield {
+                "id": f"rec{i:07d}",
+                "fields": {
+                    "Fecha de Reserva": fecha,
+                    "Hora": f"{fecha}T{hour:02d}:{rng.choice(['00', '30'])}:00.000Z",
+                    "Estado de Reserva": rng.choice(ESTADOS),
+                    "Cantidad de Personas": rng.randint(1, 10),
+                    "Zona Preferida": rng.choice(ZONAS),
+                    "Mesa": [f"recMesa{rng.randint(1, 30)}"],
+                    "Canal": rng.choice(CANALES),
+                },
+            }
+
+
+def _timed(fn, *args, repeat: int = 5, **kwargs) -> float:
+    """Mejor tiempo en milisegundos de `repeat` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args, **kwargs)
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def run_benchmark() -> dict:
+    started = time.perf_counter()
+    engine = AnalyticsEngine.from_records(synthetic_history())
+    load_ms = (time.perf_counter() - started) * 1000
+
+    quarter = (date(2025, 1, 1), date(2025, 4, 1))
+    full = (START, START + timedelta(days=YEARS * 365))
+    results = {
+        "reservations": len(engine.columns),
+        "load_ms": load_ms,
+        "summary_quarter_ms": _timed(engine.summary, *quarter),
+        "breakdown_mesa_quarter_ms": _timed(engine.breakdown, "mesa", *quarter),
+        "trend_day_quarter_ms": _timed(engine.trend, *quarter, freq="day"),
+        "summary_all_ms": _timed(engine.summary, *full),
+        "trend_week_all_ms": _timed(engine.trend, *full, freq="week"),
+        "heatmap_all_ms": _timed(engine.heatmap, *full),
+    }
+
+    # Refresco incremental: cambio de estado de 1.000 reservas
+    changed = [
+        {"id": f"rec{i:07d}", "fields": {"Fecha de Reserva": "2025-02-01", "Estado de Reserva": "Cancelada"}}
+        for i in range(1, 1001)
+    ]
+    results["incremental_1000_ms"] = _timed(engine._on_change, changed, [], repeat=1)
+    return results
+
+
+@pytest.mark.benchmark
+def test_multi_month_queries_run_in_milliseconds():
+    results = run_benchmark()
+
+    assert results["reservations"] == YEARS * 365 * PER_DAY
+    # Dashboards de varios meses: holgura amplia para máquinas de CI lentas
+    for name in ("summary_quarter_ms", "breakdown_mesa_quarter_ms", "trend_day_quarter_ms"):
+        assert results[name] < 50, (name, results[name])
+    for name in ("summary_all_ms", "trend_week_all_ms", "heatmap_all_ms"):
+        assert results[name] < 250, (name, results[name])
+
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name:>28}: {value:,.2f}" if isinstance(value, float) else f"{name:>28}: {value:,}")
@@ -0,0 +1,49 @@
+"""
+Unit tests for Airtable field projections on list queries.
+"""
+
+from src.core.config.airtable_fields import (
+    AIRTABLE_FIELD_MAP,
+    BOOKING_FIELDS,
+    DASHBOARD_STATS_FIELDS,
+    RESERVATION_RESPONSE_FIELDS,
+    project_fields,
+)
+from src.infrastructure.mcp.airtable_client import AirtableMCPClient
+
+
+class FakeTable:
+    def __init__(self):
+        self.calls = []
+
+    def all(self, **kwargs):
+        self.calls.append(kwargs)
+        return []
+
+
+class PassThroughResilience:
+    async def call(self, table, fn, *args, idempotent=False, base_id=None, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def test_projections_are_derived_from_the_field_map():
+    assert DASHBOARD_STATS_FIELDS == ["Fecha de Reserva", "Cantidad de Personas", "Estado", "Hora", "Mesa"]
+    assert project_fields("hora") == [AIRTABLE_FIELD_MAP["hora"]]
+    assert set(RESERVATION_RESPONSE_FIELDS) == set(AIRTABLE_FIELD_MAP.values())
+    assert "Notas Especiales" not in DASHBOARD_STATS_FIELDS
+    assert len(BOOKING_FIELDS) == len(set(BOOKING_FIELDS))
+
+
+async def test_list_records_forwards_the_projection(monkeypatch):
+    client = AirtableMCPClient()
+    table = FakeTable()
+    monkeypatch.setattr(client, "_get_table", lambda name: table)
+    monkeypatch.setattr(client, "_resilience", PassThroughResilience())
+
+    await client.list_records(
+        base_id="app", table_name="Reservas", fields=DASHBOARD_STATS_FIELDS
+    )
+    await client.list_records(base_id="app", table_name="Reservas")
+
+    assert table.calls[0]["fields"] == DASHBOARD_STATS_FIELDS
+    assert "fields" not in table.calls[1]
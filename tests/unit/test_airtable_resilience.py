@@ -0,0 +1,144 @@
+"""
+Unit tests for the Airtable resilience layer (circuit breaker + adaptive timeouts).
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.airtable import (
+    AirtableResilience,
+    AirtableUnavailableError,
+    LatencyWindow,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+class Flaky:
+    """Función bloqueante que falla las primeras `failures` veces."""
+
+    def __init__(self, failures=0, error=None, delay=0.0):
+        self.failures = failures
+        self.error = error or ConnectionError("boom")
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise self.error
+        return {"records": []}
+
+
+@pytest.fixture
+def resilience():
+    return AirtableResilience(
+        failure_threshold=2,
+        cooldown_seconds=0.1,
+        base_backoff_seconds=0.001,
+        min_timeout=0.05,
+        max_timeout=0.5,
+    )
+
+
+def test_reads_are_retried_with_backoff(resilience):
+    fn = Flaky(failures=1)
+
+    assert resilience.call_sync("Reservas", fn, idempotent=True) == {"records": []}
+    assert fn.calls == 2
+
+
+def test_writes_are_not_retried(resilience):
+    fn = Flaky(failures=1)
+
+    with pytest.raises(ConnectionError):
+        resilience.call_sync("Reservas", fn)
+    assert fn.calls == 1
+
+
+def test_breaker_opens_and_fails_fast_until_probe_succeeds(resilience):
+    failing = Flaky(failures=10)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            resilience.call_sync("Reservas", failing)
+
+    assert resilience.is_open("Reservas")
+    with pytest.raises(AirtableUnavailableError):
+        resilience.call_sync("Reservas", failing)
+    assert failing.calls == 2
+
+    # Otra tabla no se ve afectada
+    assert resilience.call_sync("Mesas", Flaky()) == {"records": []}
+
+    time.sleep(0.12)
+    assert resilience.call_sync("Reservas", Flaky()) == {"records": []}
+    assert resilience.get_stats()["open"] == []
+
+
+def test_table_name_and_id_share_a_breaker(resilience):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            resilience.call_sync("Reservas", Flaky(failures=1))
+
+    with pytest.raises(AirtableUnavailableError):
+        resilience.call_sync("tblHPyRRo18IwBAUC", Flaky())
+
+
+def test_client_errors_do_not_open_the_breaker(resilience):
+    for _ in range(3):
+        with pytest.raises(HTTPError):
+            resilience.call_sync("Reservas", Flaky(failures=1, error=HTTPError(422)), idempotent=True)
+
+    assert not resilience.is_open("Reservas")
+
+
+def test_slow_call_times_out_as_unavailable(resilience):
+    with pytest.raises(AirtableUnavailableError):
+        resilience.call_sync("Reservas", Flaky(delay=0.7))
+
+
+async def test_async_call_uses_the_same_breaker(resilience):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await resilience.call("Reservas", Flaky(failures=1))
+
+    with pytest.raises(AirtableUnavailableError):
+        await resilience.call("Reservas", Flaky(), idempotent=True)
+
+
+async def test_cancelled_probe_frees_the_half_open_slot(resilience):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await resilience.call("Reservas", Flaky(failures=1))
+    time.sleep(0.12)
+
+    probe = asyncio.create_task(resilience.call("Reservas", Flaky(delay=0.2)))
+    await asyncio.sleep(0.05)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert await resilience.call("Reservas", Flaky()) == {"records": []}
+    assert not resilience.is_open("Reservas")
+
+
+def test_adaptive_timeout_follows_p95():
+    window = LatencyWindow(multiplier=3.0, min_timeout=0.5, max_timeout=10.0)
+    assert window.timeout() == 10.0  # sin muestras suficientes
+
+    for _ in range(100):
+        window.record(0.4)
+    assert window.timeout() == pytest.approx(1.2)
+
+    # La ventana olvida las latencias antiguas
+    for _ in range(200):
+        window.record(0.05)
+    assert window.timeout() == 0.5
@@ -0,0 +1,110 @@
+"""
+Unit tests for the columnar (NumPy) analytics engine.
+"""
+
+from datetime import date
+
+import pytest
+
+from src.infrastructure.analytics import AnalyticsEngine
+from src.infrastructure.read_model import ReadModel, SQLiteReadModelStore, aggregate
+
+
+def _reserva(i, fecha="2026-05-04", estado="Confirmada", pax=2, hora="2026-05-04T19:00:00.000Z", zona="Terraza", mesa="recMesa1", canal="VAPI"):
+    return {
+        "id": f"rec{i}",
+        "fields": {
+            "Fecha de Reserva": fecha,
+            "Hora": hora,
+            "Estado de Reserva": estado,
+            "Cantidad de Personas": pax,
+            "Zona Preferida": zona,
+            "Mesa": [mesa],
+            "Canal": canal,
+        },
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def engine(store):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    read_model._running = True
+    store.upsert("reservas", [
+        _reserva(1, pax=4),
+        _reserva(2, estado="Cancelada", zona="Interior", canal="WhatsApp"),
+        _reserva(3, fecha="2026-05-12", estado="Pendiente", pax=3, hora="2026-05-12T11:00:00.000Z"),
+    ])
+    store.mark_synced("reservas", cursor="c", full=True)
+    engine = AnalyticsEngine(read_model=read_model)
+    assert engine.ensure_loaded()
+    return engine
+
+
+def test_summary_matches_in_memory_aggregate(engine, store):
+    summary = engine.summary(date(2026, 5, 1), date(2026, 6, 1))
+
+    assert summary["total_reservations"] == 3
+    assert summary["total_guests"] == 9
+    assert summary["active_reservations"] == 1
+    assert summary["status_breakdown"] == {"Confirmada": 1, "Cancelada": 1, "Pendiente": 1}
+    assert summary["hourly_distribution"] == {"13": 1, "21": 2}
+
+    by_estado = {r["estado"]: r["reservas"] for r in aggregate(store.select("reservas"), ("estado",))}
+    assert summary["status_breakdown"] == by_estado
+
+
+def test_engine_follows_read_model_changes(engine, store):
+    store.upsert("reservas", [_reserva(1, estado="Cancelada", pax=4)])
+    store.delete("reservas", ["rec3"])
+    store.upsert("reservas", [_reserva(4, fecha="2026-05-05", canal="WhatsApp")])
+
+    breakdown = engine.breakdown("canal", date(2026, 5, 1), date(2026, 6, 1))
+
+    assert breakdown == {
+        "VAPI": {"reservas": 1, "comensales": 4},
+        "WhatsApp": {"reservas": 2, "comensales": 4},
+    }
+    assert len(engine.columns) == 3
+
+
+def test_trend_buckets_by_week_and_month(engine):
+    weekly = engine.trend(date(2026, 5, 4), date(2026, 5, 18), freq="week")
+    assert weekly == [
+        {"period_start": "2026-05-04", "reservas": 2, "comensales": 6, "activas": 1},
+        {"period_start": "2026-05-11", "reservas": 1, "comensales": 3, "activas": 0},
+    ]
+
+    monthly = engine.trend(date(2026, 4, 20), date(2026, 6, 1), freq="month")
+    assert [(p["period_start"], p["reservas"]) for p in monthly] == [
+        ("2026-04-01", 0),
+        ("2026-05-01", 3),
+    ]
+
+
+def test_heatmap_is_weekday_by_local_hour(engine):
+    heatmap = engine.heatmap(date(2026, 5, 1), date(2026, 6, 1))
+
+    # 2026-05-04 es lunes (21:00 Madrid); 2026-05-12 es martes (13:00)
+    assert heatmap["counts"][0][21] == 2
+    assert heatmap["counts"][1][13] == 1
+    assert sum(map(sum, heatmap["counts"])) == 3
+
+
+def test_not_loaded_while_read_model_is_stale(store):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    read_model._running = True
+
+    assert AnalyticsEngine(read_model=read_model).ensure_loaded() is False
+
+
+def test_from_records_builds_a_standalone_engine():
+    engine = AnalyticsEngine.from_records([_reserva(1), _reserva(2, fecha=None)])
+
+    assert engine.summary(date(2026, 5, 1), date(2026, 6, 1))["total_reservations"] == 1
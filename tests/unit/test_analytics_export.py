@@ -0,0 +1,130 @@
+"""
+Unit tests for the streaming reservations export.
+"""
+
+import csv
+import gzip
+import io
+from datetime import date
+
+import pytest
+
+import src.infrastructure.read_model as read_model_package
+from src.infrastructure.analytics import export
+from src.infrastructure.analytics import EXPORT_COLUMNS, encode_export, iter_reservation_pages
+from src.infrastructure.read_model import ReadModel, SQLiteReadModelStore
+
+
+def _reserva(i, fecha):
+    return {
+        "id": f"rec{i:03d}",
+        "createdTime": "2026-04-01T10:00:00.000Z",
+        "fields": {
+            "Fecha de Reserva": fecha,
+            "Nombre del Cliente": f"Cliente {i}",
+            "Cantidad de Personas": 2,
+            "Estado de Reserva": "Confirmada",
+            "Mesa": ["recMesa1"],
+        },
+    }
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def _pages(*pages):
+    for page in pages:
+        yield page
+
+
+class FakeAirtable:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    async def iterate_records(self, **kwargs):
+        self.calls.append(kwargs)
+        for page in self.pages:
+            yield page
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_iter_select_pages_by_keyset(store):
+    store.upsert("reservas", [_reserva(i, f"2026-05-{1 + i % 5:02d}") for i in range(12)])
+    store.upsert("reservas", [_reserva(99, "2026-06-01")])
+
+    pages = list(store.iter_select(
+        "reservas", order_by="fecha", between={"fecha": ("2026-05-01", "2026-05-31")}, batch_size=5
+    ))
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    keys = [(r["fields"]["Fecha de Reserva"], r["id"]) for page in pages for r in page]
+    assert keys == sorted(keys)
+    assert len(set(keys)) == 12
+
+
+async def test_pages_come_from_fresh_read_model(store, monkeypatch):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    read_model._running = True
+    store.upsert("reservas", [_reserva(i, "2026-05-04") for i in range(7)])
+    store.mark_synced("reservas", cursor="c", full=True)
+    monkeypatch.setattr(read_model_package, "get_read_model", lambda: read_model)
+    monkeypatch.setattr(export, "READ_MODEL_PAGE_SIZE", 3)
+    airtable = FakeAirtable([])
+
+    pages = [page async for page in iter_reservation_pages(date(2026, 5, 1), date(2026, 6, 1), airtable)]
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert airtable.calls == []
+
+
+async def test_pages_fall_back_to_airtable_when_stale(store, monkeypatch):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    monkeypatch.setattr(read_model_package, "get_read_model", lambda: read_model)
+    airtable = FakeAirtable([[_reserva(1, "2026-05-04")], [_reserva(2, "2026-05-05")]])
+
+    pages = [page async for page in iter_reservation_pages(date(2026, 5, 1), date(2026, 6, 1), airtable)]
+
+    assert len(pages) == 2
+    call = airtable.calls[0]
+    assert "IS_BEFORE({Fecha de Reserva}, '2026-06-01')" in call["filterByFormula"]
+    assert "Nombre del Cliente" in call["fields"]
+
+
+async def test_csv_streams_one_chunk_per_page():
+    chunks = [
+        chunk
+        async for chunk in encode_export(
+            _pages([_reserva(1, "2026-05-04")], [_reserva(2, "2026-05-05")]), "csv"
+        )
+    ]
+
+    assert len(chunks) == 2
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert rows[0] == [header for header, _ in EXPORT_COLUMNS]
+    assert rows[1][:4] == ["rec001", "2026-05-04", "", "Cliente 1"]
+    assert rows[1][9] == "recMesa1"
+    assert len(rows) == 3
+
+
+async def test_empty_export_still_has_header():
+    body = await _collect(encode_export(_pages(), "csv"))
+
+    assert body.decode("utf-8").strip() == ",".join(header for header, _ in EXPORT_COLUMNS)
+
+
+async def test_gzip_export_round_trips():
+    pages = [[_reserva(i, "2026-05-04") for i in range(j * 50, (j + 1) * 50)] for j in range(4)]
+
+    plain = await _collect(encode_export(_pages(*pages), "csv"))
+    compressed = await _collect(encode_export(_pages(*pages), "csv.gz"))
+
+    assert gzip.decompress(compressed) == plain
+    assert len(compressed) < len(plain)
@@ -0,0 +1,103 @@
+"""
+Unit tests for the incrementally maintained daily reservation rollups.
+"""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from src.infrastructure.read_model import ReadModel, SQLiteReadModelStore, aggregate
+
+
+def _reserva(i, fecha="2026-05-01", estado="Confirmada", pax=2, hora="2026-05-01T19:00:00.000Z", zona="Terraza"):
+    return {
+        "id": f"rec{i}",
+        "fields": {
+            "Fecha de Reserva": fecha,
+            "Hora": hora,
+            "Estado de Reserva": estado,
+            "Cantidad de Personas": pax,
+            "Zona Preferida": zona,
+        },
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    yield store
+    store.close()
+
+
+def _totals(store, group_by=("estado",)):
+    return {
+        tuple(row[c] for c in group_by): (row["reservas"], row["comensales"], row["cubiertos"])
+        for row in store.select_rollups(date(2026, 5, 1), date(2026, 6, 1), group_by)
+    }
+
+
+def test_rollups_follow_creates_updates_and_deletes(store):
+    store.upsert("reservas", [_reserva(1, pax=4), _reserva(2, estado="Pendiente", pax=3)])
+    assert _totals(store) == {("Confirmada",): (1, 4, 4), ("Pendiente",): (1, 3, 0)}
+
+    # Cancelación: la reserva cambia de estado, no se cuenta dos veces
+    store.upsert("reservas", [_reserva(1, estado="Cancelada", pax=4)])
+    assert _totals(store) == {("Cancelada",): (1, 4, 0), ("Pendiente",): (1, 3, 0)}
+
+    store.delete("reservas", ["rec2"])
+    assert _totals(store) == {("Cancelada",): (1, 4, 0)}
+
+
+def test_hour_and_shift_use_local_time(store):
+    # 19:00 UTC en mayo = 21:00 en Madrid (cena); 11:30 UTC = 13:30 (comida)
+    store.upsert("reservas", [_reserva(1), _reserva(2, hora="2026-05-01T11:30:00.000Z")])
+
+    assert _totals(store, ("turno", "hora")) == {
+        ("cena", 21): (1, 2, 2),
+        ("comida", 13): (1, 2, 2),
+    }
+
+
+def test_backfill_runs_once_from_existing_replica(tmp_path):
+    path = str(tmp_path / "read_model.sqlite3")
+    store = SQLiteReadModelStore(path)
+    store.upsert("reservas", [_reserva(1), _reserva(2, fecha="2026-05-02")])
+    store.close()
+
+    # Réplica anterior a los agregados: se borran y se reconstruyen al abrir
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE rollup_reservas_diario")
+    conn.execute("DELETE FROM rollup_meta")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteReadModelStore(path)
+    assert _totals(store, ("fecha",)) == {("2026-05-01",): (1, 2, 2), ("2026-05-02",): (1, 2, 2)}
+    store.close()
+
+
+def test_in_memory_aggregate_matches_rollup_table(store):
+    records = [
+        _reserva(i, estado=("Confirmada", "Cancelada", "Sentada")[i % 3], pax=i % 5 + 1)
+        for i in range(30)
+    ]
+    store.upsert("reservas", records)
+
+    expected = {
+        (row["estado"], row["zona"]): (row["reservas"], row["comensales"], row["cubiertos"])
+        for row in aggregate(records, ("estado", "zona"))
+    }
+    assert _totals(store, ("estado", "zona")) == expected
+
+
+def test_read_rollups_respects_staleness_bound(store):
+    model = ReadModel(store=store, max_staleness_seconds=60)
+    model._running = True
+    store.upsert("reservas", [_reserva(1)])
+
+    assert model.read_rollups(date(2026, 5, 1), date(2026, 5, 2)) is None
+
+    store.mark_synced("reservas", cursor="c", full=True)
+    rows = model.read_rollups(date(2026, 5, 1), date(2026, 5, 2), group_by=())
+    assert rows == [{"reservas": 1, "comensales": 2, "cubiertos": 2}]
@@ -0,0 +1,114 @@
+"""
+Unit tests for read model collection versions and conditional GET (ETag).
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.api.mobile import conditional
+from src.api.mobile.conditional import conditional_get, etag_matches
+from src.infrastructure.read_model import CollectionVersions, ReadModel, SQLiteReadModelStore
+
+USER = SimpleNamespace(user_id="recUser1", rol="encargada")
+
+
+def _reserva(i, estado="Confirmada"):
+    return {"id": f"rec{i}", "fields": {"Fecha de Reserva": "2026-05-05", "Estado de Reserva": estado}}
+
+
+def _request(query="fecha=2026-05-05", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/mobile/reservations",
+        "query_string": query.encode(),
+        "headers": headers,
+    })
+
+
+@pytest.fixture
+def read_model(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    read_model = ReadModel(store=store, max_staleness_seconds=60, versions=CollectionVersions())
+    read_model._running = True
+    store.upsert("reservas", [_reserva(1)])
+    store.mark_synced("reservas", cursor="c", full=True)
+    yield read_model
+    store.close()
+
+
+def test_versions_bump_only_on_real_changes(read_model):
+    versions, store = read_model.versions, read_model.store
+    before = versions.version("reservas")
+
+    store.upsert("reservas", [_reserva(1)])  # solape del cursor: sin cambios
+    assert versions.version("reservas") == before
+
+    store.upsert("reservas", [_reserva(1, estado="Sentada")])
+    store.delete("reservas", ["rec1"])
+    assert versions.version("reservas") == before + 2
+    assert versions.version("mesas") == 0
+
+
+def test_etag_is_strong_and_depends_on_version_and_query(read_model):
+    versions = read_model.versions
+    tag = versions.etag(["reservas"], "/r", "fecha=1")
+
+    assert tag.startswith('"') and not tag.startswith("W/")
+    assert tag == versions.etag(["reservas"], "/r", "fecha=1")
+    assert tag != versions.etag(["reservas"], "/r", "fecha=2")
+    versions.bump("reservas")
+    assert tag != versions.etag(["reservas"], "/r", "fecha=1")
+
+
+def test_a_change_written_by_another_worker_changes_the_etag(read_model, tmp_path):
+    # Otro worker: su propio store y sus versiones sobre el mismo fichero
+    other = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    other_versions = CollectionVersions()
+    other_versions.attach(other)
+    tag = read_model.versions.etag(["reservas"], "/r")
+    assert tag == other_versions.etag(["reservas"], "/r")
+
+    other.upsert("reservas", [_reserva(1, estado="Sentada")])
+
+    assert read_model.versions.etag(["reservas"], "/r") != tag
+    assert read_model.versions.etag(["reservas"], "/r") == other_versions.etag(["reservas"], "/r")
+    other.close()
+
+
+def test_etag_matches_if_none_match_lists():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_conditional_get_returns_304_until_the_collection_changes(read_model, monkeypatch):
+    monkeypatch.setattr(conditional, "get_read_model", lambda: read_model)
+    monkeypatch.setattr(conditional, "get_collection_versions", lambda: read_model.versions)
+
+    first = Response()
+    assert conditional_get(_request(), first, USER, "reservas") is None
+    etag = first.headers["etag"]
+
+    not_modified = conditional_get(_request(if_none_match=etag), Response(), USER, "reservas")
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+    # Otro filtro, o un cambio en la tabla, invalidan el tag
+    assert conditional_get(_request("fecha=2026-05-06", etag), Response(), USER, "reservas") is None
+    read_model.store.upsert("reservas", [_reserva(2)])
+    assert conditional_get(_request(if_none_match=etag), Response(), USER, "reservas") is None
+
+
+def test_no_etag_while_the_replica_is_stale(read_model, monkeypatch):
+    monkeypatch.setattr(conditional, "get_read_model", lambda: read_model)
+    read_model._running = False
+
+    response = Response()
+    assert conditional_get(_request(if_none_match="*"), response, USER, "reservas") is None
+    assert "etag" not in response.headers
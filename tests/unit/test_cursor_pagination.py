@@ -0,0 +1,76 @@
+"""
+Unit tests for cursor pagination of mobile reservation lists.
+"""
+
+import pytest
+
+from src.api.mobile.pagination import (
+    SOURCE_READ_MODEL,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    filters_fingerprint,
+    next_cursor,
+)
+from src.infrastructure.read_model import SQLiteReadModelStore
+
+
+def _reserva(i, fecha, estado="Confirmada"):
+    return {"id": f"rec{i:03d}", "fields": {"Fecha de Reserva": fecha, "Estado de Reserva": estado}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    store.upsert("reservas", [
+        _reserva(i, f"2026-05-{1 + i % 4:02d}", estado="Cancelada" if i % 5 == 0 else "Confirmada")
+        for i in range(23)
+    ])
+    yield store
+    store.close()
+
+
+def test_cursor_round_trip_and_filter_binding():
+    fingerprint = filters_fingerprint(fecha=None, estado="Confirmada", mesa=None)
+    cursor = encode_cursor(SOURCE_READ_MODEL, ["2026-05-04", "rec001"], fingerprint)
+
+    assert decode_cursor(cursor, fingerprint) == {"s": "rm", "p": ["2026-05-04", "rec001"]}
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, filters_fingerprint(estado="Pendiente"))
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", fingerprint)
+    assert next_cursor(SOURCE_READ_MODEL, None, fingerprint) is None
+
+
+def test_keyset_pages_cover_every_record_once(store):
+    where = {"estado": "Confirmada"}
+    seen, after = [], None
+    while True:
+        page = store.select("reservas", where=where, order_by="-fecha", limit=5, after=after)
+        seen.extend(record["id"] for record in page)
+        if len(page) < 5:
+            break
+        after = store.sort_key("reservas", "fecha", page[-1])
+
+    assert len(seen) == len(set(seen)) == store.count("reservas", where=where) == 18
+    fechas = [store.get("reservas", rid)["fields"]["Fecha de Reserva"] for rid in seen]
+    assert fechas == sorted(fechas, reverse=True)
+
+
+def test_keyset_is_stable_when_earlier_rows_are_inserted(store):
+    first = store.select("reservas", order_by="-fecha", limit=10)
+    after = store.sort_key("reservas", "fecha", first[-1])
+
+    # Una reserva nueva en la primera página no desplaza la segunda
+    store.upsert("reservas", [_reserva(900, "2026-06-01")])
+    second = store.select("reservas", order_by="-fecha", limit=10, after=after)
+
+    assert {r["id"] for r in first}.isdisjoint(r["id"] for r in second)
+    assert second == store.select("reservas", order_by="-fecha", limit=10, offset=11)
+
+
+def test_offset_pagination_is_still_supported(store):
+    everything = store.select("reservas", order_by="-fecha")
+
+    assert store.select("reservas", order_by="-fecha", limit=5, offset=20) == everything[20:]
+    assert store.select("reservas", order_by="-fecha", offset=21) == everything[21:]
@@ -0,0 +1,173 @@
+"""
+Unit tests for the cached, write-invalidated dashboard stats.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from src.infrastructure.analytics import DashboardStatsMaterializer, dashboard_stats, day_stats
+from src.infrastructure.read_model import ReadModel, SQLiteReadModelStore
+
+DAY = date(2026, 5, 5)
+NEXT_DAY = DAY + timedelta(days=1)
+
+
+def _reserva(i, estado="Confirmada", pax=2, fecha=DAY):
+    return {
+        "id": f"rec{i}",
+        "fields": {
+            "Fecha de Reserva": fecha.isoformat(),
+            "Hora": "13:00",
+            "Cantidad de Personas": pax,
+            "Estado": estado,
+        },
+    }
+
+
+class FakeCache:
+    """RedisCache mínima compartida entre materializadores (dos workers)."""
+
+    enabled = True
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl=3600):
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    def delete_pattern(self, pattern):
+        keys = [key for key in self.data if key.startswith(pattern.rstrip("*"))]
+        for key in keys:
+            del self.data[key]
+        return len(keys)
+
+
+class FixedOccupancy:
+    def ensure_loaded(self):
+        return True
+
+    def utilization(self, start, end):
+        return {"seat_utilization": 12.34}
+
+
+class DisabledCache:
+    enabled = False
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    store.upsert("reservas", [
+        _reserva(1, pax=4),
+        _reserva(2, estado="Sentada", pax=3),
+        _reserva(3, estado="Cancelada"),
+        _reserva(4, estado="Pendiente", pax=5, fecha=NEXT_DAY),
+    ])
+    store.mark_synced("reservas", cursor="c", full=True)
+    yield store
+    store.close()
+
+
+def _materializer(store, cache, ttl_seconds=None):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    read_model._running = True
+    return DashboardStatsMaterializer(
+        read_model=read_model, cache=cache, occupancy=FixedOccupancy(), ttl_seconds=ttl_seconds
+    )
+
+
+def test_day_stats_counts_in_one_pass():
+    records = [
+        _reserva(1, pax=4),
+        _reserva(2, estado="Sentada", pax=3),
+        _reserva(3, estado="Completada"),
+        _reserva(4, estado="Pendiente", pax=6),
+    ]
+
+    assert day_stats(records) == {
+        "total_reservations": 4,
+        "confirmed": 1,
+        "pending": 1,
+        "seated": 2,
+        "cancelled": 0,
+        "pax_total": 15,
+        "active_pax": 9,
+    }
+
+
+def test_stats_are_cached_until_a_change(store):
+    materializer = _materializer(store, DisabledCache())
+
+    stats = materializer.get(DAY)
+    assert (stats["total_reservations"], stats["pax_total"], stats["occupancy_rate"]) == (3, 9, 12.3)
+    assert materializer.get(DAY) is stats
+    assert materializer.get_stats()["hits"] == 1
+
+    store.upsert("reservas", [_reserva(5, estado="Sentada", pax=6)])
+
+    stats = materializer.get(DAY)
+    assert (stats["total_reservations"], stats["seated"], stats["active_pax"]) == (4, 2, 13)
+    assert materializer.get_stats()["misses"] == 2
+
+
+def test_moving_a_reservation_invalidates_both_days(store):
+    materializer = _materializer(store, DisabledCache())
+    assert materializer.get(DAY)["total_reservations"] == 3
+    assert materializer.get(NEXT_DAY)["total_reservations"] == 1
+
+    store.upsert("reservas", [_reserva(1, pax=4, fecha=NEXT_DAY)])
+    assert materializer.get(DAY)["total_reservations"] == 2
+    assert materializer.get(NEXT_DAY)["total_reservations"] == 2
+
+    store.delete("reservas", ["rec1"])
+    assert materializer.get(NEXT_DAY)["total_reservations"] == 1
+
+
+def test_shared_cache_is_invalidated_by_any_worker(store):
+    cache = FakeCache()
+    worker_a = _materializer(store, cache)
+    worker_b = _materializer(store, cache)
+
+    assert worker_a.get(DAY)["confirmed"] == 1
+    assert worker_b.get(DAY)["confirmed"] == 1
+    assert worker_b.get_stats()["hits"] == 1
+
+    store.upsert("reservas", [_reserva(1, estado="Cancelada", pax=4)])
+    assert "dashboard_stats:2026-05-05" not in cache.data
+    assert worker_b.get(DAY)["cancelled"] == 2
+
+    store.upsert("mesas", [{"id": "recM1", "fields": {"ID Mesa": "1", "Capacidad": 4}}])
+    assert cache.data == {}
+
+
+def test_local_cache_expires_changes_from_other_workers(store, tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(dashboard_stats.time, "monotonic", lambda: now[0])
+    materializer = _materializer(store, DisabledCache(), ttl_seconds=30)
+    assert materializer.get(DAY)["confirmed"] == 1
+
+    # Otro worker escribe en el mismo fichero: aquí no salta ningún listener
+    other = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    other.upsert("reservas", [_reserva(1, estado="Cancelada", pax=4)])
+    other.close()
+    now[0] += 29
+    assert materializer.get(DAY)["confirmed"] == 1
+
+    now[0] += 2
+    assert materializer.get(DAY)["confirmed"] == 0
+    assert materializer.get_stats()["misses"] == 2
+
+
+def test_stale_replica_returns_none(store):
+    materializer = _materializer(store, DisabledCache())
+    materializer.read_model._running = False
+
+    assert materializer.get(DAY) is None
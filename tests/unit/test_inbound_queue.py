@@ -0,0 +1,200 @@
+"""
+Unit tests for the asynchronous WhatsApp ingestion queue.
+"""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from src.infrastructure.inbound import InboundMessage, InboundQueue, SQLiteInboundStore
+from src.infrastructure.inbound.service import FALLBACK_REPLY
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "inbound.sqlite3")
+
+
+def _queue(db_path, **kwargs):
+    kwargs.setdefault("workers", 4)
+    kwargs.setdefault("retry_delay_seconds", 0.01)
+    queue = InboundQueue(store=SQLiteInboundStore(db_path), **kwargs)
+    queue.replies = []
+
+    async def fake_reply(msg, text):
+        queue.replies.append((msg.phone, text))
+
+    queue._reply = fake_reply
+    return queue
+
+
+async def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+async def test_messages_from_same_phone_keep_order(db_path):
+    processed = []
+
+    async def handler(msg):
+        # Latencia variable tipo LLM: sin partición por teléfono se desordenaría
+        await asyncio.sleep(random.uniform(0, 0.02))
+        processed.append((msg.phone, msg.body))
+        return f"ok {msg.body}"
+
+    queue = _queue(db_path)
+    queue.register_handler("twilio", handler)
+    await queue.start()
+    try:
+        for i in range(10):
+            for phone in ("+34600000001", "+34600000002", "+34600000003"):
+                await queue.submit(InboundMessage(phone=phone, body=str(i)))
+        assert await _wait_for(lambda: len(processed) == 30)
+    finally:
+        await queue.stop()
+
+    for phone in ("+34600000001", "+34600000002", "+34600000003"):
+        bodies = [body for p, body in processed if p == phone]
+        assert bodies == [str(i) for i in range(10)]
+    assert len(queue.replies) == 30
+
+
+async def test_submit_returns_before_processing(db_path):
+    release = asyncio.Event()
+
+    async def slow_handler(msg):
+        await release.wait()
+        return "respuesta"
+
+    queue = _queue(db_path)
+    queue.register_handler("twilio", slow_handler)
+    await queue.start()
+    try:
+        start = time.perf_counter()
+        assert await queue.submit(InboundMessage(phone="+34600", body="hola"))
+        assert time.perf_counter() - start < 0.5
+        assert queue.replies == []
+
+        release.set()
+        assert await _wait_for(lambda: queue.replies == [("+34600", "respuesta")])
+    finally:
+        await queue.stop()
+
+
+async def test_duplicate_message_sid_is_ignored(db_path):
+    queue = _queue(db_path)
+    queue.register_handler("twilio", lambda msg: asyncio.sleep(0, result="ok"))
+    await queue.start()
+    try:
+        assert await queue.submit(InboundMessage(phone="+34600", body="hola", message_sid="SM1"))
+        assert not await queue.submit(InboundMessage(phone="+34600", body="hola", message_sid="SM1"))
+        assert await _wait_for(lambda: len(queue.replies) == 1)
+    finally:
+        await queue.stop()
+
+    stats = await queue.get_stats()
+    assert stats["counters"]["duplicates"] == 1
+
+
+async def test_pending_messages_are_recovered_after_restart(db_path):
+    store = SQLiteInboundStore(db_path)
+    await store.append(InboundMessage(phone="+34600", body="primero", message_sid="SM1"))
+    await store.append(InboundMessage(phone="+34600", body="segundo", message_sid="SM2"))
+    await store.close()
+
+    processed = []
+
+    async def handler(msg):
+        processed.append(msg.body)
+        return None
+
+    queue = _queue(db_path)
+    queue.register_handler("twilio", handler)
+    await queue.start()
+    try:
+        assert await _wait_for(lambda: len(processed) == 2)
+    finally:
+        await queue.stop()
+
+    assert processed == ["primero", "segundo"]
+    assert (await queue.store.stats())["pending"] == 0
+
+
+async def test_failing_handler_sends_fallback_reply(db_path):
+    calls = []
+
+    async def handler(msg):
+        calls.append(msg.body)
+        raise RuntimeError("LLM timeout")
+
+    queue = _queue(db_path, max_attempts=2)
+    queue.register_handler("twilio", handler)
+    await queue.start()
+    try:
+        await queue.submit(InboundMessage(phone="+34600", body="hola"))
+        assert await _wait_for(lambda: len(queue.replies) == 1)
+    finally:
+        await queue.stop()
+
+    assert len(calls) == 2
+    assert queue.replies == [("+34600", FALLBACK_REPLY)]
+    assert (await queue.store.stats())["failed"] == 1
+
+
+async def test_workers_sharing_the_store_process_each_message_once(db_path):
+    store = SQLiteInboundStore(db_path)
+    for i in range(6):
+        await store.append(InboundMessage(phone=f"+3460{i % 2}", body=str(i)))
+    await store.close()
+
+    processed = []
+
+    async def handler(msg):
+        await asyncio.sleep(random.uniform(0, 0.02))
+        processed.append((msg.phone, msg.body))
+        return None
+
+    # Tres procesos arrancando a la vez sobre el mismo diario
+    queues = [_queue(db_path, recovery_interval_seconds=0.02) for _ in range(3)]
+    for queue in queues:
+        queue.register_handler("twilio", handler)
+        await queue.start()
+    try:
+        assert await _wait_for(lambda: len(processed) == 6)
+        await asyncio.sleep(0.1)
+    finally:
+        for queue in queues:
+            await queue.stop()
+
+    assert len(processed) == 6
+    assert [body for phone, body in processed if phone == "+34600"] == ["0", "2", "4"]
+    assert [body for phone, body in processed if phone == "+34601"] == ["1", "3", "5"]
+
+
+async def test_expired_lease_of_a_dead_worker_is_taken_over(db_path):
+    store = SQLiteInboundStore(db_path)
+    msg = InboundMessage(phone="+34600", body="hola")
+    await store.append(msg)
+    assert await store.claim(msg, "muerto", lease_seconds=0.05)
+    assert await store.claimable() == []
+
+    processed = []
+
+    async def handler(m):
+        processed.append(m.body)
+        return None
+
+    queue = _queue(db_path, recovery_interval_seconds=0.02)
+    queue.register_handler("twilio", handler)
+    await queue.start()
+    try:
+        assert await _wait_for(lambda: processed == ["hola"])
+    finally:
+        await queue.stop()
+        await store.close()
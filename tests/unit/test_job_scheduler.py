@@ -0,0 +1,132 @@
+"""
+Unit tests for JobScheduler (heap-based in-process scheduler).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.infrastructure.services.job_scheduler import JobScheduler
+
+
+@pytest.fixture
+async def scheduler():
+    s = JobScheduler()
+    await s.start()
+    yield s
+    await s.stop()
+
+
+class TestJobScheduler:
+    """Tests for periodic and one-shot jobs"""
+
+    async def test_oneshot_runs_at_due_time(self, scheduler):
+        """One-shot job runs once and is removed"""
+        calls = []
+
+        async def job():
+            calls.append(datetime.now())
+
+        scheduler.add_at("once", job, run_at=datetime.now() + timedelta(milliseconds=50))
+        await asyncio.sleep(0.15)
+
+        assert len(calls) == 1
+        assert not scheduler.has_job("once")
+        assert scheduler.get_stats()["completed_oneshot_jobs"] == 1
+
+    async def test_past_due_runs_immediately(self, scheduler):
+        """Jobs scheduled in the past run right away"""
+        done = asyncio.Event()
+
+        async def job():
+            done.set()
+
+        scheduler.add_at("late", job, run_at=datetime.now() - timedelta(hours=1))
+        await asyncio.wait_for(done.wait(), timeout=0.5)
+
+    async def test_periodic_job_runs_repeatedly(self, scheduler):
+        """Periodic job keeps its own cadence"""
+        calls = []
+
+        async def job():
+            calls.append(1)
+
+        scheduler.add_periodic("tick", job, interval_seconds=0.05)
+        await asyncio.sleep(0.28)
+
+        assert 4 <= len(calls) <= 7
+        stats = scheduler.get_stats()["jobs"]["tick"]
+        assert stats["periodic"] is True
+        assert stats["runs"] == len(calls)
+        assert stats["avg_duration_ms"] is not None
+
+    async def test_slow_job_does_not_delay_others(self, scheduler):
+        """Jobs run concurrently: a slow job does not block a fast one"""
+        fast_done = asyncio.Event()
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        async def fast():
+            fast_done.set()
+
+        now = datetime.now()
+        scheduler.add_at("slow", slow, run_at=now)
+        scheduler.add_at("fast", fast, run_at=now + timedelta(milliseconds=20))
+        await asyncio.wait_for(fast_done.wait(), timeout=0.3)
+
+    async def test_timeout_is_recorded(self, scheduler):
+        """Per-job timeout cancels the run and is counted as failure"""
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        job = scheduler.add_periodic("hang", hang, interval_seconds=60, timeout_seconds=0.05)
+        await asyncio.sleep(0.15)
+
+        assert job.metrics.timeouts == 1
+        assert job.metrics.failures == 1
+        assert "timeout" in job.metrics.last_error
+
+    async def test_failure_is_recorded(self, scheduler):
+        """Exceptions are captured in metrics and do not stop the scheduler"""
+
+        async def boom():
+            raise ValueError("boom")
+
+        job = scheduler.add_periodic("boom", boom, interval_seconds=60)
+        await asyncio.sleep(0.05)
+
+        assert job.metrics.failures == 1
+        assert job.metrics.last_error == "boom"
+
+    async def test_reschedule_and_cancel(self, scheduler):
+        """Rescheduling replaces the due time; cancel drops the job"""
+        calls = []
+
+        async def job():
+            calls.append(1)
+
+        scheduler.add_at("x", job, run_at=datetime.now() + timedelta(milliseconds=30))
+        scheduler.add_at("x", job, run_at=datetime.now() + timedelta(hours=1))
+        await asyncio.sleep(0.1)
+        assert calls == []
+
+        assert scheduler.cancel("x") is True
+        assert scheduler.get_stats()["pending_jobs"] == 0
+
+    async def test_replanning_keeps_the_heap_compact(self, scheduler):
+        """Stale heap entries are dropped and never reported as next due"""
+
+        async def job():
+            pass
+
+        for _ in range(50):
+            scheduler.add_at("far", job, run_at=datetime.now() + timedelta(hours=1))
+        assert len(scheduler._heap) <= 2
+
+        scheduler.add_at("soon", job, run_at=datetime.now() + timedelta(minutes=5))
+        scheduler.cancel("soon")
+        next_run = scheduler.get_stats()["next_run_in_seconds"]
+        assert 3500 < next_run <= 3600
@@ -0,0 +1,131 @@
+"""
+Unit tests for the in-memory kitchen board and dietary flag matcher.
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from src.infrastructure.kitchen import KitchenBoard, dietary_flags, kitchen_view, normalize
+from src.infrastructure.read_model import ReadModel, SQLiteReadModelStore
+
+TODAY = date.today()
+
+
+def _reserva(i, hora="13:00", notas="", estado="Confirmada", fecha=None):
+    return {
+        "id": f"rec{i}",
+        "fields": {
+            "Fecha de Reserva": (fecha or TODAY).isoformat(),
+            "Hora": hora,
+            "Cantidad de Personas": 2,
+            "Nombre del Cliente": f"Cliente {i}",
+            "Estado": estado,
+            "Notas Especiales": notas,
+        },
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def board(store):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    read_model._running = True
+    store.upsert("reservas", [
+        _reserva(1, hora="14:00", notas="Niño CELÍACO"),
+        _reserva(2, hora="13:30"),
+        _reserva(3, estado="Cancelada"),
+        _reserva(4, fecha=TODAY + timedelta(days=1)),
+    ])
+    store.mark_synced("reservas", cursor="c", full=True)
+    board = KitchenBoard(read_model=read_model)
+    assert board.ensure_loaded()
+    return board
+
+
+def test_flags_are_accent_insensitive_and_ordered():
+    assert normalize("Niño Celíaco") == "nino celiaco"
+    assert dietary_flags("trona para el bebe; ALÉRGICO al marisco, sin gluten") == [
+        "⚠️ SIN GLUTEN", "⚠️ ALERGIAS", "👶 CON NIÑOS",
+    ]
+    assert dietary_flags("Vegano") == ["🥬 VEGETARIANO/VEGANO"]
+    assert dietary_flags("") == dietary_flags(None) == []
+
+
+def test_snapshot_has_todays_active_orders_by_time(board):
+    view = board.snapshot(TODAY)
+
+    assert [p["id"] for p in view["pedidos"]] == ["rec2", "rec1"]
+    assert view["pedidos"][1]["notas_especiales"] == ["⚠️ SIN GLUTEN", "👶 CON NIÑOS"]
+    assert board.snapshot(TODAY) is view  # sin cambios no se reconstruye
+    assert board.snapshot(TODAY + timedelta(days=1)) is None
+
+
+def test_changes_update_the_board_and_publish_deltas(board, store):
+    loop = asyncio.new_event_loop()
+    published = []
+
+    async def publish(message):
+        published.append(message)
+
+    board.set_publisher(publish, loop)
+    version = board.snapshot(TODAY)["version"]
+
+    store.upsert("reservas", [_reserva(2, hora="13:30", estado="Cancelada")])
+    store.upsert("reservas", [_reserva(5, hora="12:00", notas="vegetariano")])
+    store.upsert("reservas", [_reserva(5, hora="12:00", notas="vegetariano")])  # sin cambios
+    store.delete("reservas", ["rec1"])
+    loop.run_until_complete(asyncio.sleep(0.01))
+    loop.close()
+
+    assert [(m["removed"], [p["id"] for p in m["upserted"]]) for m in published] == [
+        (["rec2"], []),
+        ([], ["rec5"]),
+        (["rec1"], []),
+    ]
+    assert [m["version"] for m in published] == [version + 1, version + 2, version + 3]
+    view = board.snapshot(TODAY)
+    assert [p["id"] for p in view["pedidos"]] == ["rec5"]
+    assert view["version"] == version + 3
+
+
+def test_changes_written_by_another_worker_reach_the_board(board, store, tmp_path):
+    loop = asyncio.new_event_loop()
+    published = []
+
+    async def publish(message):
+        published.append(message)
+
+    board.set_publisher(publish, loop)
+    version = board.snapshot(TODAY)["version"]
+    # Otro worker escribe en el mismo fichero: aquí no salta ningún listener
+    other = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    other.upsert("reservas", [_reserva(2, hora="13:30", estado="Cancelada"), _reserva(6, hora="15:00")])
+    other.delete("reservas", ["rec1"])
+    assert board.snapshot(TODAY)["version"] == version
+
+    board.sync()
+    loop.run_until_complete(asyncio.sleep(0.01))
+    loop.close()
+    other.close()
+
+    assert [(sorted(m["removed"]), [p["id"] for p in m["upserted"]]) for m in published] == [
+        (["rec1", "rec2"], ["rec6"]),
+    ]
+    view = board.snapshot(TODAY)
+    assert [p["id"] for p in view["pedidos"]] == ["rec6"]
+    assert view["version"] == version + 1
+
+
+def test_kitchen_view_matches_board_shape(board, store):
+    view = kitchen_view(TODAY, store.select("reservas", where={"fecha": TODAY.isoformat()}))
+
+    assert view["pedidos"] == board.snapshot(TODAY)["pedidos"]
+    assert view["total_pedidos"] == 2 and view["version"] is None
@@ -0,0 +1,108 @@
+"""
+Unit tests for Redis-lease-based LeaderElection.
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.infrastructure.services.leader_election import LeaderElection
+
+
+class FakeAsyncRedis:
+    """Minimal in-memory stand-in for redis.asyncio (SET NX + lease scripts)."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, owner, *args):
+        if self.store.get(key) != owner:
+            return 0
+        if "pexpire" in script:
+            return 1
+        del self.store[key]
+        return 1
+
+    async def aclose(self):
+        pass
+
+
+def _election(redis, events, name):
+    async def elected():
+        events.append((name, "elected"))
+
+    async def revoked():
+        events.append((name, "revoked"))
+
+    election = LeaderElection(
+        "test", ttl_seconds=1, renew_interval_seconds=0.02,
+        on_elected=elected, on_revoked=revoked,
+    )
+    election._redis = redis
+    return election
+
+
+class TestLeaderElection:
+    """Tests for lease acquisition, standby and failover"""
+
+    @patch.dict(os.environ, {}, clear=True)
+    async def test_single_instance_without_redis(self):
+        """Without REDIS_URL the instance is leader immediately"""
+        events = []
+        election = _election(None, events, "a")
+        await election.start()
+
+        assert election.is_leader
+        assert election.get_status()["mode"] == "single-instance"
+
+        await election.stop()
+        assert not election.is_leader
+        assert events == [("a", "elected"), ("a", "revoked")]
+
+    async def test_only_one_leader_and_failover(self):
+        """Second instance stays on standby until the leader releases the lease"""
+        redis = FakeAsyncRedis()
+        events = []
+        a = _election(redis, events, "a")
+        b = _election(redis, events, "b")
+        a._task = asyncio.create_task(a._run())
+        await asyncio.sleep(0.05)
+        b._task = asyncio.create_task(b._run())
+        await asyncio.sleep(0.05)
+
+        assert a.is_leader and not b.is_leader
+        assert redis.store["leader:test"] == a.instance_id
+
+        await a.stop()
+        await asyncio.sleep(0.05)
+
+        assert b.is_leader
+        assert redis.store["leader:test"] == b.instance_id
+        await b.stop()
+        assert events == [
+            ("a", "elected"), ("a", "revoked"), ("b", "elected"), ("b", "revoked")
+        ]
+
+    async def test_steps_down_when_lease_stolen(self):
+        """Leader steps down if renewal finds the lease owned by someone else"""
+        redis = FakeAsyncRedis()
+        events = []
+        a = _election(redis, events, "a")
+        a._task = asyncio.create_task(a._run())
+        await asyncio.sleep(0.05)
+        assert a.is_leader
+
+        redis.store["leader:test"] = "other-instance"
+        await asyncio.sleep(0.05)
+
+        assert not a.is_leader
+        await a.stop()
+        assert redis.store["leader:test"] == "other-instance"
@@ -0,0 +1,97 @@
+"""
+Unit tests for /mobile/batch helpers (shared loads and sub-request dispatch).
+"""
+
+import asyncio
+from datetime import date
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException, Request, Response
+
+from src.api.mobile.batch import bind_params, load_shared, run_sub_request, shared_loads
+from src.api.mobile.models import BatchSubRequest
+
+USER = object()
+
+
+def _batch_request():
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/mobile/batch",
+        "query_string": b"",
+        "headers": [(b"authorization", b"Bearer t"), (b"content-length", b"42")],
+    })
+
+
+async def _list_endpoint(
+    request: Request,
+    response: Response,
+    fecha: Optional[date] = None,
+    limit: int = 100,
+    user=None,
+):
+    if request.headers.get("if-none-match") == '"v1"':
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+    response.headers["ETag"] = '"v1"'
+    return {"fecha": fecha, "limit": limit, "query": request.url.query, "path": request.url.path}
+
+
+async def _forbidden_endpoint(user=None):
+    raise HTTPException(status_code=403, detail="Permission denied: reports.view")
+
+
+def test_bind_params_converts_to_signature_types():
+    assert bind_params(_list_endpoint, {"fecha": "2026-05-05", "limit": "20"}) == {
+        "fecha": date(2026, 5, 5),
+        "limit": 20,
+    }
+    with pytest.raises(ValueError):
+        bind_params(_list_endpoint, {"user": "otro"})
+    with pytest.raises(ValueError):
+        bind_params(_list_endpoint, {"limit": "muchos"})
+
+
+def test_load_shared_runs_each_loader_once_per_batch():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return ["rec1"]
+
+    async def scenario():
+        with shared_loads():
+            results = await asyncio.gather(*(load_shared("hoy", loader) for _ in range(3)))
+        outside = await load_shared("hoy", loader)
+        return results, outside
+
+    results, outside = asyncio.run(scenario())
+
+    assert results == [["rec1"]] * 3 and outside == ["rec1"]
+    assert len(calls) == 2  # una en el batch, otra fuera
+
+
+def test_sub_requests_get_their_own_path_query_and_etag():
+    item = BatchSubRequest(id="hoy", path="/reservations", params={"fecha": "2026-05-05"})
+
+    result = asyncio.run(
+        run_sub_request(_list_endpoint, _batch_request(), USER, item, "/api/mobile/reservations")
+    )
+
+    assert result.status == 200 and result.etag == '"v1"'
+    assert result.body == {
+        "fecha": "2026-05-05", "limit": 100, "query": "fecha=2026-05-05", "path": "/api/mobile/reservations",
+    }
+
+
+def test_sub_request_errors_and_304_stay_per_item():
+    cached = BatchSubRequest(path="/reservations", if_none_match='"v1"')
+    forbidden = BatchSubRequest(path="/dashboard/stats")
+
+    not_modified = asyncio.run(run_sub_request(_list_endpoint, _batch_request(), USER, cached, "/r"))
+    denied = asyncio.run(run_sub_request(_forbidden_endpoint, _batch_request(), USER, forbidden, "/s"))
+
+    assert (not_modified.status, not_modified.body, not_modified.etag) == (304, None, '"v1"')
+    assert denied.status == 403 and denied.body == {"detail": "Permission denied: reports.view"}
@@ -0,0 +1,80 @@
+"""
+Unit tests for the mobile reservation write endpoints going through the write journal.
+"""
+
+import pytest
+
+from src.api.mobile import mobile_api
+from src.api.mobile.mobile_api import UpdateStatusRequest
+from src.api.mobile.models import UpdateReservationRequest
+from src.application.services.auth_service import TokenData
+from src.infrastructure.write_journal import SQLiteJournalStore, WriteJournal, is_provisional
+
+USER = TokenData(user_id="recUser1", usuario="ana", nombre="Ana", rol="tecnico")
+
+
+class DownAirtable:
+    """Airtable caído: toda llamada falla."""
+
+    async def _fail(self, *args, **kwargs):
+        raise ConnectionError("Airtable unavailable")
+
+    create_record = update_record = get_record = list_records = _fail
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    store = SQLiteJournalStore(str(tmp_path / "journal.sqlite3"))
+    journal = WriteJournal(store=store, airtable=DownAirtable(), inline_timeout_seconds=0.05)
+    monkeypatch.setattr(WriteJournal, "_read_model_name", staticmethod(lambda table: None))
+    monkeypatch.setattr(mobile_api, "get_write_journal", lambda: journal)
+    monkeypatch.setattr(mobile_api, "check_permission", lambda user, permission: None)
+    broadcasts = []
+
+    async def broadcast(data, event_type):
+        broadcasts.append((event_type, data))
+
+    monkeypatch.setattr(mobile_api.manager, "broadcast_reservation_update", broadcast)
+    yield journal
+    store._conn.close()
+
+
+async def _provisional_reservation(journal):
+    created = await journal.create(
+        mobile_api.RESERVATIONS_TABLE_NAME,
+        {
+            "Nombre del Cliente": "Cliente",
+            "Teléfono": "+34600000000",
+            "Fecha de Reserva": "2026-05-05",
+            "Hora": "13:00",
+            "Cantidad de Personas": 2,
+            "Estado": "Pendiente",
+        },
+    )
+    assert is_provisional(created["id"])
+    return created["id"]
+
+
+async def test_status_update_of_a_provisional_reservation_is_journaled(journal):
+    reservation_id = await _provisional_reservation(journal)
+
+    result = await mobile_api.update_reservation_status(
+        reservation_id, UpdateStatusRequest(status="Confirmada"), USER
+    )
+
+    assert result["pending_sync"] is True
+    record = await journal.get_record(mobile_api.RESERVATIONS_TABLE_NAME, reservation_id)
+    assert record["fields"]["Estado"] == "Confirmada"
+
+
+async def test_edit_during_an_outage_returns_the_merged_reservation(journal):
+    reservation_id = await _provisional_reservation(journal)
+
+    response = await mobile_api.update_reservation(
+        reservation_id, UpdateReservationRequest(pax=4), USER
+    )
+
+    assert response.id == reservation_id
+    assert response.pax == 4
+    assert response.nombre == "Cliente"
+    assert len(await journal.list_entries("pending")) == 2
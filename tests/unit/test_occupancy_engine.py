@@ -0,0 +1,130 @@
+"""
+Unit tests for the table × 15-minute occupancy engine.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from src.infrastructure.analytics import occupancy
+from src.infrastructure.analytics import DurationModel, OccupancyEngine, TableInfo, open_slots
+from src.infrastructure.read_model import ReadModel, SQLiteReadModelStore
+
+# 2026-05-05 es martes: comidas 13:00-17:00 (16 franjas), sin cena
+TUESDAY = date(2026, 5, 5)
+NEXT_DAY = date(2026, 5, 6)
+
+
+def _mesa(i, capacidad=4):
+    return {"id": f"recMesa{i}", "fields": {"Nombre de Mesa": f"Mesa {i}", "Zona": "Interior", "Capacidad": capacidad}}
+
+
+def _reserva(i, hora="13:00", mesa="recMesa1", pax=2, estado="Confirmada", fecha="2026-05-05"):
+    return {
+        "id": f"rec{i}",
+        "fields": {
+            "Fecha de Reserva": fecha,
+            "Hora": hora,
+            "Mesa": [mesa] if mesa else [],
+            "Cantidad de Personas": pax,
+            "Estado de Reserva": estado,
+        },
+    }
+
+
+TABLES = [TableInfo("recMesa1", "Mesa 1", "Interior", 4), TableInfo("recMesa2", "Mesa 2", "Terraza", 4)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def live_engine(store):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    read_model._running = True
+    store.upsert("mesas", [_mesa(1), _mesa(2)])
+    store.upsert("reservas", [_reserva(1), _reserva(2, hora="14:00", mesa="recMesa2", pax=4)])
+    store.mark_synced("mesas", cursor="c", full=True)
+    store.mark_synced("reservas", cursor="c", full=True)
+    engine = OccupancyEngine(read_model=read_model, durations=DurationModel())
+    assert engine.ensure_loaded()
+    return engine
+
+
+def test_open_slots_follow_business_hours():
+    assert open_slots(TUESDAY).sum() == 16
+    assert open_slots(date(2026, 5, 4)).sum() == 0  # lunes cerrado
+
+
+def test_utilization_counts_table_and_seat_slots():
+    # 90 min (6 franjas) para 2 pax; 105 min (7 franjas) para 4 pax
+    engine = OccupancyEngine.from_records(
+        [_reserva(1), _reserva(2, hora="14:00", mesa="recMesa2", pax=4), _reserva(3, estado="Cancelada")],
+        TABLES,
+    )
+
+    utilization = engine.utilization(TUESDAY, NEXT_DAY)
+
+    assert utilization["total_tables"] == 2
+    assert utilization["seat_capacity"] == 8
+    assert utilization["table_utilization"] == round(13 / 32 * 100, 2)
+    assert utilization["seat_utilization"] == round((6 * 2 + 7 * 4) / (8 * 16) * 100, 2)
+    assert [t["utilizacion"] for t in utilization["by_table"]] == [37.5, 43.75]
+    assert utilization["daily"] == {"2026-05-05": utilization["table_utilization"]}
+
+
+def test_peak_slots_and_heatmap():
+    engine = OccupancyEngine.from_records(
+        [_reserva(1), _reserva(2, hora="14:00", mesa="recMesa2", pax=4), _reserva(3, hora="14:00", mesa=None)],
+        TABLES,
+    )
+
+    peaks = engine.peak_slots(TUESDAY, NEXT_DAY, limit=3)
+    assert peaks[0] == {
+        "fecha": "2026-05-05", "franja": "14:00", "mesas_ocupadas": 3, "comensales": 8, "ocupacion": 100.0,
+    }
+
+    heatmap = engine.heatmap(TUESDAY, NEXT_DAY)
+    row = heatmap["days"][0]["ocupacion"]
+    assert heatmap["slots"][0] == "13:00"
+    assert row[0] == 50.0
+    assert row[heatmap["slots"].index("14:00")] == 100.0
+
+
+def test_grids_follow_read_model_changes(live_engine, store):
+    before = live_engine.utilization(TUESDAY, NEXT_DAY)["table_utilization"]
+
+    store.upsert("reservas", [_reserva(2, estado="Cancelada", mesa="recMesa2", pax=4)])
+    assert live_engine.utilization(TUESDAY, NEXT_DAY)["table_utilization"] == round(6 / 32 * 100, 2)
+
+    store.upsert("reservas", [_reserva(4, hora="15:00", mesa="recMesa2")])
+    store.delete("reservas", ["rec1"])
+    after = live_engine.utilization(TUESDAY, NEXT_DAY)
+
+    assert after["table_utilization"] == round(6 / 32 * 100, 2)
+    assert after["by_table"][0]["utilizacion"] == 0.0
+    assert before > after["table_utilization"]
+    assert live_engine.get_stats()["days_built"] == 1
+
+
+def test_durations_are_learned_from_seated_to_completed(live_engine, store, monkeypatch):
+    clock = iter(range(0, 10 ** 6, 60 * 60))  # cada cambio, una hora después
+    monkeypatch.setattr(occupancy, "time", SimpleNamespace(time=lambda: next(clock)))
+
+    for i in range(5):
+        store.upsert("reservas", [_reserva(10 + i, estado="Sentada", pax=2)])
+        store.upsert("reservas", [_reserva(10 + i, estado="Completada", pax=2)])
+
+    assert live_engine.durations.minutes(2) == 60
+    assert live_engine.durations.minutes(4) == 105
+
+
+def test_mesas_change_rebuilds_catalog(live_engine, store):
+    store.upsert("mesas", [_mesa(3, capacidad=6)])
+
+    assert live_engine.utilization(TUESDAY, NEXT_DAY)["seat_capacity"] == 14
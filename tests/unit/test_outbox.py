@@ -0,0 +1,198 @@
+"""
+Unit tests for the outbound message outbox (SQLite store + worker pool).
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.outbox import OutboxMessage, OutboxService, SQLiteOutboxStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteOutboxStore(str(tmp_path / "outbox.sqlite3"))
+    yield s
+    s._conn.close()
+
+
+def _service(store, **kwargs):
+    kwargs.setdefault("workers", 2)
+    kwargs.setdefault("poll_interval_seconds", 0.05)
+    kwargs.setdefault("base_backoff_seconds", 0.01)
+    kwargs.setdefault("max_backoff_seconds", 0.01)
+    kwargs.setdefault("rate_limits", {"whatsapp": 1000.0, "sms": 1000.0, "push": 1000.0})
+    return OutboxService(store=store, **kwargs)
+
+
+async def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+class TestSQLiteOutboxStore:
+    async def test_dedupe_key_rejects_duplicates(self, store):
+        first = OutboxMessage(channel="whatsapp", payload={"to": "+34600"}, dedupe_key="k1")
+        second = OutboxMessage(channel="whatsapp", payload={"to": "+34600"}, dedupe_key="k1")
+
+        assert await store.enqueue(first) is True
+        assert await store.enqueue(second) is False
+        assert (await store.stats())["queued"] == 1
+
+    async def test_claimed_message_is_invisible_until_timeout(self, store):
+        await store.enqueue(OutboxMessage(channel="sms", payload={"to": "+34600"}))
+
+        claimed = await store.claim("w1", 10, visibility_timeout=0.1)
+        assert len(claimed) == 1
+        assert await store.claim("w2", 10, visibility_timeout=0.1) == []
+
+        await asyncio.sleep(0.15)
+        reclaimed = await store.claim("w2", 10, visibility_timeout=0.1)
+        assert [m.id for m in reclaimed] == [claimed[0].id]
+
+    async def test_retry_waits_for_next_attempt(self, store):
+        await store.enqueue(OutboxMessage(channel="sms", payload={"to": "+34600"}))
+        msg = (await store.claim("w1", 10, 60))[0]
+
+        msg.attempts = 1
+        msg.next_attempt_at = time.time() + 60
+        await store.retry(msg)
+
+        assert await store.claim("w1", 10, 60) == []
+        assert (await store.stats())["queued"] == 1
+
+
+class TestOutboxService:
+    async def test_delivers_enqueued_messages(self, store):
+        delivered = []
+
+        async def handler(payload):
+            delivered.append(payload["to"])
+
+        service = _service(store)
+        service.register_handler("whatsapp", handler)
+        await service.start()
+        try:
+            await service.enqueue_whatsapp(to="+34600000001", body="hola")
+            await service.enqueue_whatsapp(to="+34600000002", body="hola")
+            assert await _wait_for(lambda: _async(len(delivered) == 2))
+        finally:
+            await service.stop()
+
+        stats = await service.get_stats()
+        assert stats["channels"]["whatsapp"]["sent"] == 2
+        assert stats["stores"][0]["queued"] == 0
+
+    async def test_failing_message_goes_to_dead_letter(self, store):
+        attempts = []
+
+        async def handler(payload):
+            attempts.append(payload)
+            raise RuntimeError("Twilio 500")
+
+        service = _service(store, max_attempts=3)
+        service.register_handler("sms", handler)
+        await service.start()
+        try:
+            await service.enqueue_sms(to="+34600000001", body="hola")
+
+            async def dead():
+                return len(await service.list_dead_letters()) == 1
+
+            assert await _wait_for(dead)
+        finally:
+            await service.stop()
+
+        assert len(attempts) == 3
+        dead_letter = (await service.list_dead_letters())[0]
+        assert dead_letter["attempts"] == 3
+        assert "Twilio 500" in dead_letter["last_error"]
+
+    async def test_transient_failure_is_retried(self, store):
+        calls = []
+
+        async def handler(payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise RuntimeError("timeout")
+
+        service = _service(store)
+        service.register_handler("push", handler)
+        await service.start()
+        try:
+            await service.enqueue_push(device_token="tok", title="t", body="b")
+            assert await _wait_for(lambda: _async(len(calls) == 2))
+        finally:
+            await service.stop()
+
+        stats = await service.get_stats()
+        assert stats["channels"]["push"]["retried"] == 1
+        assert stats["channels"]["push"]["sent"] == 1
+
+    async def test_unknown_channel_is_dead_lettered(self, store):
+        service = _service(store)
+        service.register_handler("whatsapp", lambda payload: _async(None))
+        await service.start()
+        try:
+            await service.enqueue("fax", {"to": "+34600"})
+
+            async def dead():
+                return len(await service.list_dead_letters()) == 1
+
+            assert await _wait_for(dead)
+        finally:
+            await service.stop()
+
+    async def test_slow_sends_never_outlive_the_claim(self, store):
+        sent = []
+
+        async def handler(payload):
+            await asyncio.sleep(0.15)
+            sent.append(payload["to"])
+
+        service = _service(
+            store, workers=2, handler_timeout_seconds=0.2, visibility_timeout_seconds=0.3
+        )
+        service.register_handler("whatsapp", handler)
+        for i in range(4):
+            await service.enqueue_whatsapp(to=f"+3460000000{i}", body="hola")
+
+        await service.start()
+        try:
+            assert await _wait_for(lambda: _async(len(sent) == 4))
+            await asyncio.sleep(0.4)
+        finally:
+            await service.stop()
+
+        # Cada lote se corta antes de que caduque su claim: nada se envía dos veces
+        assert sorted(sent) == [f"+3460000000{i}" for i in range(4)]
+        assert (await service.get_stats())["channels"]["whatsapp"]["released"] >= 1
+
+    async def test_rate_limit_paces_channel(self, store):
+        sent_at = []
+
+        async def handler(payload):
+            sent_at.append(time.monotonic())
+
+        service = _service(store, workers=4, rate_limits={"whatsapp": 20.0})
+        service.register_handler("whatsapp", handler)
+        for i in range(5):
+            await service.enqueue_whatsapp(to=f"+3460000000{i}", body="hola")
+
+        await service.start()
+        try:
+            assert await _wait_for(lambda: _async(len(sent_at) == 5))
+        finally:
+            await service.stop()
+
+        # 5 mensajes a 20/s => al menos 4 intervalos de 50ms
+        assert sent_at[-1] - sent_at[0] >= 0.18
+
+
+async def _async(value):
+    return value
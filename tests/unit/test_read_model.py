@@ -0,0 +1,136 @@
+"""
+Unit tests for the local SQLite read model (Airtable mirror).
+"""
+
+import time
+
+import pytest
+
+from src.infrastructure.read_model import ReadModel, SQLiteReadModelStore
+
+
+def _reserva(i, fecha="2026-05-01", estado="Confirmada", telefono="+34600000000"):
+    return {
+        "id": f"rec{i}",
+        "createdTime": "2026-01-01T00:00:00.000Z",
+        "fields": {
+            "Nombre del Cliente": f"Cliente {i}",
+            "Fecha de Reserva": fecha,
+            "Estado de Reserva": estado,
+            "Teléfono": telefono,
+            "Mesa": [f"recMesa{i % 3}"],
+        },
+    }
+
+
+class FakeAirtable:
+    def __init__(self, records):
+        self.records = {r["id"]: r for r in records}
+        self.calls = []
+
+    async def list_records(self, base_id, table_name, filterByFormula=None, **kwargs):
+        self.calls.append(filterByFormula)
+        if filterByFormula and filterByFormula.startswith("OR(RECORD_ID()"):
+            return {"records": [r for rid, r in self.records.items() if f"'{rid}'" in filterByFormula]}
+        return {"records": list(self.records.values())}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def read_model(store):
+    model = ReadModel(store=store, airtable=FakeAirtable([]), max_staleness_seconds=60)
+    model._running = True  # sin jobs de polling: las pruebas llaman a refresh()
+    return model
+
+
+def test_store_filters_by_indexed_columns(store):
+    store.upsert("reservas", [
+        _reserva(1),
+        _reserva(2, estado="Cancelada"),
+        _reserva(3, fecha="2026-05-02T20:00:00.000Z", telefono="+34611111111"),
+    ])
+
+    assert [r["id"] for r in store.select("reservas", where={"fecha": "2026-05-01"})] == ["rec1", "rec2"]
+    assert [r["id"] for r in store.select(
+        "reservas", where={"fecha": "2026-05-01"}, exclude={"estado": "Cancelada"}
+    )] == ["rec1"]
+    # Los date-time se indexan por día
+    assert store.select("reservas", where={"telefono": "+34611111111"})[0]["fields"]["Fecha de Reserva"].startswith("2026-05-02")
+    assert [r["id"] for r in store.select("reservas", order_by="-fecha", limit=1)] == ["rec3"]
+    assert len(store.select("reservas", between={"fecha": ("2026-05-02", "2026-05-31")})) == 1
+    assert store.get("reservas", "rec2")["fields"]["Estado de Reserva"] == "Cancelada"
+
+    with pytest.raises(ValueError):
+        store.select("reservas", where={"Notas": "x"})
+
+
+def test_mesas_priority_sorts_numerically(store):
+    store.upsert("mesas", [
+        {"id": f"recM{p}", "fields": {"ID Mesa": f"M{p}", "Prioridad": p}} for p in (10, 2, 1)
+    ])
+    assert [r["fields"]["Prioridad"] for r in store.select("mesas", order_by="prioridad")] == [1, 2, 10]
+
+
+async def test_refresh_full_then_incremental_and_reconcile_deletes(read_model):
+    airtable = FakeAirtable([_reserva(1), _reserva(2)])
+    read_model._airtable = airtable
+
+    first = await read_model.refresh("reservas")
+    assert first["full"] is True
+    assert airtable.calls == [None]
+
+    second = await read_model.refresh("reservas")
+    assert second["full"] is False
+    assert airtable.calls[1].startswith("IS_AFTER(LAST_MODIFIED_TIME(), '")
+
+    # La reconciliación completa elimina lo borrado en Airtable
+    del airtable.records["rec2"]
+    third = await read_model.refresh("reservas", full=True)
+    assert third["removed"] == 1
+    assert [r["id"] for r in read_model.read("reservas")] == ["rec1"]
+
+
+async def test_read_returns_none_when_beyond_staleness_bound(read_model, store):
+    # Nunca sincronizada: el llamador debe ir a Airtable
+    assert read_model.read("reservas") is None
+
+    await read_model.refresh("reservas")
+    assert read_model.read("reservas") == []
+    assert read_model.is_fresh("reservas")
+
+    store._conn.execute(
+        "UPDATE read_model_meta SET last_synced_at = ? WHERE table_name = 'reservas'",
+        (time.time() - 61,),
+    )
+    assert read_model.read("reservas") is None
+    stats = await read_model.get_stats()
+    assert stats["tables"]["reservas"]["fresh"] is False
+    assert stats["tables"]["reservas"]["staleness_seconds"] >= 61
+    assert stats["tables"]["reservas"]["fallbacks"] == 2
+
+
+async def test_refresh_records_upserts_found_and_drops_missing(read_model, store):
+    store.upsert("waitlist", [
+        {"id": "recA", "fields": {"Estado": "Esperando"}},
+        {"id": "recGone", "fields": {"Estado": "Esperando"}},
+    ])
+    read_model._airtable = FakeAirtable([{"id": "recA", "fields": {"Estado": "Notificado"}}])
+
+    result = await read_model.refresh_records("waitlist", ["recA", "recGone", "bad') OR TRUE()"])
+
+    assert result == {"table": "waitlist", "upserted": 1, "removed": 1}
+    assert store.get("waitlist", "recA")["fields"]["Estado"] == "Notificado"
+    assert store.get("waitlist", "recGone") is None
+    assert "bad" not in read_model.airtable.calls[0]
+
+
+async def test_apply_write_makes_own_writes_visible(read_model):
+    await read_model.refresh("clientes")
+    read_model.apply_write("clientes", {"id": "recC1", "fields": {"Teléfono": "+34600111222"}})
+    assert read_model.read("clientes", where={"telefono": "+34600111222"})[0]["id"] == "recC1"
@@ -0,0 +1,179 @@
+"""
+Unit tests for the read model change log behind /mobile/sync.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.api.mobile.pagination import InvalidCursorError, decode_sync_token, encode_sync_token
+from src.infrastructure.read_model import ChangeLogExpired, ReadModel, SQLiteReadModelStore
+
+
+def _reserva(i, estado="Confirmada"):
+    return {"id": f"rec{i}", "fields": {"Fecha de Reserva": "2026-05-05", "Estado de Reserva": estado}}
+
+
+def _espera(i, estado="Esperando"):
+    return {
+        "id": f"recW{i}",
+        "fields": {
+            "Nombre del Cliente": f"Cliente {i}",
+            "Teléfono": "+34600000000",
+            "Fecha Solicitada": "2026-05-05",
+            "Número de Personas": 2,
+            "Estado": estado,
+        },
+    }
+
+
+def _mesa(i):
+    return {"id": f"recMesa{i}", "fields": {"ID Mesa": f"T{i}", "Nombre de Mesa": f"Mesa {i}"}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_a_change_committed_mid_read_is_not_skipped(store, tmp_path, monkeypatch):
+    store.upsert("reservas", [_reserva(1)])
+    epoch, position = store.change_position()
+    other = SQLiteReadModelStore(str(tmp_path / "read_model.sqlite3"))
+    read_position = store.changelog.position
+
+    def position_after_other_worker_writes(conn):
+        # Otro worker confirma un cambio entre la consulta de cambios y la posición
+        if not other.changes_since(epoch, position, ["reservas"])[0]:
+            other.upsert("reservas", [_reserva(2)])
+        return read_position(conn)
+
+    monkeypatch.setattr(store.changelog, "position", position_after_other_worker_writes)
+    changes, new_position, _ = store.changes_since(epoch, position, ["reservas"])
+    assert changes == []
+    monkeypatch.undo()
+
+    changes, _, _ = store.changes_since(epoch, new_position, ["reservas"])
+    assert [change["record"]["id"] for change in changes] == ["rec2"]
+    other.close()
+
+
+def test_changes_since_token_are_compacted_per_record(store):
+    store.upsert("reservas", [_reserva(1), _reserva(2)])
+    store.upsert("mesas", [_mesa(1)])
+    epoch, position = store.change_position()
+
+    store.upsert("reservas", [_reserva(1, estado="Sentada")])
+    store.upsert("reservas", [_reserva(1, estado="Completada")])
+    store.upsert("reservas", [_reserva(3)])
+
+    changes, new_position, has_more = store.changes_since(epoch, position, ["reservas", "mesas"])
+
+    assert [(c["table"], c["record"]["id"], c["deleted"]) for c in changes] == [
+        ("reservas", "rec1", False),
+        ("reservas", "rec3", False),
+    ]
+    assert changes[0]["record"]["fields"]["Estado de Reserva"] == "Completada"
+    assert not has_more
+    assert store.changes_since(epoch, new_position, ["reservas"])[0] == []
+
+
+def test_deletes_leave_tombstones_with_last_version(store):
+    store.upsert("mesas", [_mesa(1), _mesa(2)])
+    epoch, position = store.change_position()
+
+    store.delete("mesas", ["recMesa2", "recMissing"])
+    changes, _, _ = store.changes_since(epoch, position, ["mesas"])
+
+    assert len(changes) == 1
+    assert changes[0]["deleted"] is True
+    assert changes[0]["record"]["fields"]["ID Mesa"] == "T2"
+
+
+def test_no_token_returns_everything_in_pages(store):
+    store.upsert("reservas", [_reserva(i) for i in range(5)])
+    store.upsert("waitlist", [{"id": "recW1", "fields": {"Estado": "Esperando"}}])
+
+    first, position, has_more = store.changes_since(None, 0, ["reservas"], limit=3)
+    assert len(first) == 3 and has_more
+
+    epoch = store.change_position()[0]
+    rest, _, has_more = store.changes_since(epoch, position, ["reservas"], limit=3)
+    assert len(rest) == 2 and not has_more
+    assert {c["record"]["id"] for c in first + rest} == {f"rec{i}" for i in range(5)}
+
+
+def test_pruned_tombstones_and_foreign_epochs_expire_tokens(store):
+    store.upsert("reservas", [_reserva(1), _reserva(2)])
+    epoch, old_position = store.change_position()
+    store.delete("reservas", ["rec1"])
+    _, position = store.change_position()
+
+    assert store.prune_changes(retention_seconds=-1) == 1
+
+    with pytest.raises(ChangeLogExpired):
+        store.changes_since(epoch, old_position, ["reservas"])
+    with pytest.raises(ChangeLogExpired):
+        store.changes_since("otra-replica", position, ["reservas"])
+    assert store.changes_since(epoch, position, ["reservas"])[0] == []
+
+
+def test_existing_replica_is_seeded_on_upgrade(tmp_path):
+    path = str(tmp_path / "read_model.sqlite3")
+    store = SQLiteReadModelStore(path)
+    store.upsert("reservas", [_reserva(1), _reserva(2)])
+    store.close()
+    # Réplica creada antes de existir el registro de cambios
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TABLE rm_changes; DROP TABLE rm_changes_meta;")
+    conn.close()
+
+    store = SQLiteReadModelStore(path)
+    changes, _, _ = store.changes_since(None, 0, ["reservas"])
+    store.close()
+
+    assert {c["record"]["id"] for c in changes} == {"rec1", "rec2"}
+
+
+def test_read_model_changes_require_a_synced_replica(store):
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    store.upsert("reservas", [_reserva(1)])
+    assert read_model.changes(None, ["reservas"]) is None
+
+    read_model._running = True
+    store.mark_synced("reservas", cursor="c", full=True)
+    delta = read_model.changes(None, ["reservas"])
+
+    assert [c["record"]["id"] for c in delta["changes"]] == ["rec1"]
+    token = encode_sync_token(delta["epoch"], delta["position"])
+    assert decode_sync_token(token) == (delta["epoch"], delta["position"])
+    with pytest.raises(InvalidCursorError):
+        decode_sync_token("basura")
+
+
+async def test_sync_endpoint_returns_waitlist_changes_and_tombstones(store, monkeypatch):
+    from src.api.mobile import mobile_api
+    from src.application.services.auth_service import TokenData
+
+    read_model = ReadModel(store=store, max_staleness_seconds=60)
+    read_model._running = True
+    monkeypatch.setattr(mobile_api, "get_read_model", lambda: read_model)
+    user = TokenData(user_id="recUser1", usuario="ana", nombre="Ana", rol="tecnico")
+    store.upsert("reservas", [_reserva(1)])
+    store.upsert("mesas", [_mesa(1)])
+    store.upsert("waitlist", [_espera(1), _espera(2)])
+    for name in ("reservas", "mesas", "waitlist"):
+        store.mark_synced(name, cursor="c", full=True)
+
+    full = await mobile_api.sync_changes(since=None, limit=500, user=user)
+    assert [entry.id for entry in full["waitlist"]] == ["recW1", "recW2"]
+    assert [table["id"] for table in full["tables"]] == ["T1"]
+
+    store.upsert("waitlist", [_espera(1, estado="Notificado")])
+    store.delete("waitlist", ["recW2"])
+    delta = await mobile_api.sync_changes(since=full["token"], limit=500, user=user)
+
+    assert [(entry.id, entry.estado) for entry in delta["waitlist"]] == [("recW1", "notified")]
+    assert delta["deleted"]["waitlist"] == ["recW2"]
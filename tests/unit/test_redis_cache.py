@@ -356,6 +356,10 @@ class TestRedisCacheGracefulDegradation:
         """Disabled cache should return False for delete."""
         assert not disabled_cache.delete("key")
 
+    def test_disabled_cache_set_if_absent_returns_none(self, disabled_cache):
+        """Disabled cache should signal unavailability (None) for set_if_absent."""
+        assert disabled_cache.set_if_absent("key", 1) is None
+
     def test_disabled_cache_health_check(self, disabled_cache):
         """Disabled cache should return disabled health."""
         health = disabled_cache.health_check()
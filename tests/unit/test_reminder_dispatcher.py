@@ -0,0 +1,136 @@
+"""
+Unit tests for the 24h reminder pipeline (ReminderDispatcher) and the
+batched Airtable write-back.
+"""
+
+import asyncio
+import time
+from datetime import date, time as dtime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.entities.booking import Booking
+from src.infrastructure.repositories.booking_repo import AirtableBookingRepository
+from src.infrastructure.services.reminder_dispatcher import ReminderDispatcher
+from src.infrastructure.services.scheduler_service import SchedulerService
+
+
+def _bookings(n):
+    return [
+        Booking(id=f"rec{i}", nombre=f"Cliente {i}", telefono=f"+3460000{i:04d}",
+                fecha=date(2026, 5, 10), hora=dtime(21, 0), pax=2)
+        for i in range(n)
+    ]
+
+
+class FakeTwilio:
+    def __init__(self, fail_ids=(), delay=0.0):
+        self.fail_phones = {f"+3460000{int(i[3:]):04d}" for i in fail_ids}
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_whatsapp_template_async(self, to_number, template_sid, variables, http_client=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return None if to_number in self.fail_phones else "SM123"
+
+
+class TestReminderDispatcher:
+    """Tests for concurrent dispatch and reporting"""
+
+    async def test_sends_concurrently_and_reports(self):
+        twilio = FakeTwilio(fail_ids={"rec3"}, delay=0.02)
+        repo = MagicMock()
+        repo.mark_reminders_sent.side_effect = lambda ids: list(ids)
+        dispatcher = ReminderDispatcher(twilio, repo, concurrency=4, rate_per_second=1000)
+
+        report = await dispatcher.dispatch(_bookings(12))
+
+        assert twilio.max_in_flight == 4
+        assert sorted(report.failed_ids) == ["rec3"]
+        assert len(report.sent_ids) == 11
+        repo.mark_reminders_sent.assert_called_once()
+        stats = report.to_dict()
+        assert stats["sent"] == 11 and stats["failed"] == 1 and stats["unmarked"] == 0
+        assert stats["throughput_per_second"] > 0
+
+    async def test_rate_pacing(self):
+        """rate_per_second spaces sends regardless of concurrency"""
+        dispatcher = ReminderDispatcher(FakeTwilio(), MagicMock(mark_reminders_sent=list),
+                                        concurrency=10, rate_per_second=50)
+        start = time.perf_counter()
+        await dispatcher.dispatch(_bookings(6))
+        # 6 envíos a 50/s => al menos 5 intervalos de 20ms
+        assert time.perf_counter() - start >= 0.09
+
+    async def test_unmarked_ids_reported(self):
+        repo = MagicMock()
+        repo.mark_reminders_sent.return_value = ["rec0"]
+        dispatcher = ReminderDispatcher(FakeTwilio(), repo, concurrency=2, rate_per_second=1000)
+
+        report = await dispatcher.dispatch(_bookings(2))
+
+        assert report.unmarked_ids == ["rec1"]
+
+
+class TestMarkRemindersSent:
+    """Tests for batched Airtable write-back"""
+
+    @patch("src.infrastructure.repositories.booking_repo.Api")
+    def test_batches_of_ten(self, mock_api):
+        table = mock_api.return_value.table.return_value
+        repo = AirtableBookingRepository()
+        ids = [f"rec{i}" for i in range(23)]
+
+        updated = repo.mark_reminders_sent(ids)
+
+        assert updated == ids
+        sizes = [len(call.args[0]) for call in table.batch_update.call_args_list]
+        assert sizes == [10, 10, 3]
+        assert table.batch_update.call_args_list[0].args[0][0] == {
+            "id": "rec0", "fields": {"Recordatorio Enviado": True}
+        }
+
+    @patch("src.infrastructure.repositories.booking_repo.Api")
+    def test_failed_batch_is_excluded(self, mock_api):
+        table = mock_api.return_value.table.return_value
+        table.batch_update.side_effect = [None, Exception("422")]
+        repo = AirtableBookingRepository()
+
+        updated = repo.mark_reminders_sent([f"rec{i}" for i in range(15)])
+
+        assert updated == [f"rec{i}" for i in range(10)]
+
+
+class TestReminderPlanning:
+    """Tests for re-planning the 24h reminder jobs on every pass"""
+
+    async def test_cancelled_or_moved_bookings_do_not_keep_old_jobs(self):
+        scheduler = SchedulerService()
+        tomorrow = date.today() + timedelta(days=1)
+        bookings = [
+            Booking(id=f"rec{i}", nombre=f"Cliente {i}", telefono=f"+3460000{i:04d}",
+                    fecha=tomorrow, hora=dtime(21, 0), pax=2)
+            for i in range(2)
+        ]
+        scheduler.booking_repository = MagicMock(list_by_date=MagicMock(return_value=bookings))
+
+        await scheduler._plan_24h_reminders()
+        assert set(scheduler.jobs._jobs) == {"reminders@" + f"{date.today()}T21:00"}
+
+        # rec0 se cancela y rec1 pasa a las 22:00
+        bookings[1].hora = dtime(22, 0)
+        scheduler.booking_repository.list_by_date.return_value = [bookings[1]]
+        await scheduler._plan_24h_reminders()
+
+        jobs = scheduler.jobs._jobs
+        assert set(jobs) == {"reminders@" + f"{date.today()}T22:00"}
+        assert [b.id for b in jobs["reminders@" + f"{date.today()}T22:00"].func.args[0]] == ["rec1"]
+
+        scheduler.booking_repository.list_by_date.return_value = []
+        await scheduler._plan_24h_reminders()
+        assert scheduler.jobs.get_stats()["pending_jobs"] == 0
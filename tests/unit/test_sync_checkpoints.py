@@ -0,0 +1,132 @@
+"""
+Unit tests for sync checkpoints (cursor + content hash change detection).
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services.sync_checkpoints import SyncCheckpointStore, content_hash
+from src.services.sync_engine import BulkWriteResult
+from src.services.sync_service import SupabaseAirtableSync, SyncDirection
+
+
+def _airtable_record(i, nombre="Ana"):
+    return {
+        "id": f"rec{i}",
+        "fields": {"ID": f"r{i}", "Nombre": nombre, "Capacidad": 4, "Modificado": f"2026-01-0{i}"},
+    }
+
+
+class FakeEngine:
+    supabase_chunk_size = 500
+
+    def __init__(self):
+        self.supabase_writes = []
+
+    async def upsert_supabase(self, table, rows, primary_key):
+        self.supabase_writes.append(rows)
+        result = BulkWriteResult(direction="airtable_to_supabase", total=len(rows))
+        result.inserted = len(rows)
+        result.written_keys = [str(r[primary_key]) for r in rows]
+        return result
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYNC_CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite3"))
+    with patch("src.services.sync_service.create_client", return_value=MagicMock()):
+        service = SupabaseAirtableSync()
+    service.engine = FakeEngine()
+    yield service
+    service.checkpoints.close()
+
+
+def test_content_hash_ignores_volatile_fields_and_key_order():
+    a = {"id": "r1", "name": "Mesa 1", "updated_at": "2026-01-01"}
+    b = {"updated_at": "2026-02-02", "name": "Mesa 1", "id": "r1"}
+    assert content_hash(a, ["updated_at"]) == content_hash(b, ["updated_at"])
+    assert content_hash(a) != content_hash(b)
+
+
+async def test_store_persists_cursor_and_hashes(tmp_path):
+    path = str(tmp_path / "cp.sqlite3")
+    store = SyncCheckpointStore(path)
+    await store.set_cursor("tables", "airtable_to_supabase", "2026-01-01T00:00:00.000Z")
+    await store.save_hashes("tables", "airtable_to_supabase", {"r1": "h1", "r2": "h2"})
+    store.close()
+
+    reopened = SyncCheckpointStore(path)
+    assert await reopened.get_cursor("tables", "airtable_to_supabase") == "2026-01-01T00:00:00.000Z"
+    assert await reopened.get_hashes("tables", "airtable_to_supabase", ["r1", "r3"]) == {"r1": "h1"}
+    status = await reopened.get_status()
+    assert status[0]["tracked_records"] == 2
+    reopened.close()
+
+
+async def test_incremental_run_uses_cursor_and_skips_unchanged(sync):
+    config = next(c for c in sync.sync_configs if c.table_name == "tables")
+    calls = []
+    records = [_airtable_record(1), _airtable_record(2), _airtable_record(3)]
+
+    async def fake_pages(table_id, full_sync, modified_since=None):
+        calls.append(modified_since)
+        yield records
+
+    sync._iter_airtable_pages = fake_pages
+
+    first = await sync.sync_table(config)
+    assert calls[0] is None
+    assert first["inserted"] == 3
+
+    # Mismo contenido sincronizado (solo cambia un campo no mapeado): no se escribe nada
+    records[0]["fields"]["Modificado"] = "2026-03-01"
+    second = await sync.sync_table(config)
+    assert calls[1] is not None and calls[1].endswith("Z")
+    assert second["incremental"] is True
+    assert second["unchanged"] == 3
+    assert sync.engine.supabase_writes[1] == []
+
+    # Solo el registro modificado se reescribe
+    records[1]["fields"]["Nombre"] = "Mesa VIP"
+    third = await sync.sync_table(config)
+    assert third["unchanged"] == 2
+    assert [r["id"] for r in sync.engine.supabase_writes[2]] == ["r2"]
+
+
+async def test_full_sync_ignores_checkpoint(sync):
+    config = next(c for c in sync.sync_configs if c.table_name == "tables")
+    calls = []
+
+    async def fake_pages(table_id, full_sync, modified_since=None):
+        calls.append(modified_since)
+        yield [_airtable_record(1)]
+
+    sync._iter_airtable_pages = fake_pages
+
+    await sync.sync_table(config)
+    result = await sync.sync_table(config, full_sync=True)
+
+    assert calls == [None, None]
+    assert result["inserted"] == 1
+
+
+async def test_cursor_not_advanced_when_writes_fail(sync):
+    config = next(c for c in sync.sync_configs if c.table_name == "tables")
+
+    async def fake_pages(table_id, full_sync, modified_since=None):
+        yield [_airtable_record(1)]
+
+    async def failing_upsert(table, rows, primary_key):
+        result = BulkWriteResult(direction="airtable_to_supabase", total=len(rows))
+        result.errors = len(rows)
+        return result
+
+    sync._iter_airtable_pages = fake_pages
+    sync.engine.upsert_supabase = failing_upsert
+
+    await sync.sync_table(config)
+
+    direction = SyncDirection.AIRTABLE_TO_SUPABASE.value
+    assert await sync.checkpoints.get_cursor("tables", direction) is None
+    assert await sync.checkpoints.get_hashes("tables", direction, ["r1"]) == {}
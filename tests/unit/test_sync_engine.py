@@ -0,0 +1,224 @@
+"""
+Unit tests for the bulk Supabase/Airtable sync engine.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.services.sync_engine import BulkSyncEngine, prefetched
+
+AIRTABLE_URL = "https://api.airtable.com/v0/appTest"
+
+
+class FakeQuery:
+    def __init__(self, table):
+        self.table = table
+        self.op = None
+
+    def select(self, column):
+        self.op = ("select", column)
+        return self
+
+    def in_(self, column, values):
+        self.op = ("in", column, list(values))
+        return self
+
+    def upsert(self, rows, on_conflict="", returning=None):
+        self.op = ("upsert", on_conflict, rows)
+        return self
+
+    def execute(self):
+        self.table.calls.append(self.op[0])
+        if self.op[0] == "in":
+            _, column, values = self.op
+            return SimpleNamespace(data=[{column: v} for v in values if v in self.table.rows])
+        if self.op[0] == "upsert":
+            _, key, rows = self.op
+            for row in rows:
+                self.table.rows[row[key]] = row
+        return SimpleNamespace(data=[])
+
+
+class FakeSupabase:
+    def __init__(self, existing=()):
+        self.rows = {key: {"id": key} for key in existing}
+        self.calls = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+def _engine(supabase=None, **kwargs):
+    kwargs.setdefault("airtable_rate_per_second", 0)
+    return BulkSyncEngine(supabase or FakeSupabase(), AIRTABLE_URL, "key", **kwargs)
+
+
+async def test_supabase_upsert_is_one_request_per_chunk():
+    supabase = FakeSupabase(existing=["r1", "r2"])
+    engine = _engine(supabase, supabase_chunk_size=500)
+    rows = [{"id": f"r{i}", "pax": i} for i in range(1, 1201)] + [{"id": None}]
+
+    result = await engine.upsert_supabase("reservations", rows, "id")
+
+    assert supabase.calls == ["upsert"] * 3
+    assert result.requests == 3
+    assert result.upserted == 1200 and result.inserted == result.updated == 0
+    assert result.skipped == 1
+    assert len(supabase.rows) == 1200
+    assert result.to_dict()["records_per_second"] > 0
+
+
+async def test_supabase_upsert_detailed_counts_split_inserts_updates():
+    supabase = FakeSupabase(existing=["r1", "r2"])
+    engine = _engine(supabase, supabase_chunk_size=500)
+    rows = [{"id": f"r{i}", "pax": i} for i in range(1, 1201)] + [{"id": None}]
+
+    result = await engine.upsert_supabase("reservations", rows, "id", detailed_counts=True)
+
+    assert supabase.calls.count("upsert") == 3
+    assert result.updated == 2
+    assert result.inserted == 1198
+    assert result.skipped == 1
+    assert len(supabase.rows) == 1200
+    assert result.to_dict()["records_per_second"] > 0
+
+
+async def test_airtable_upsert_uses_prefetched_map_and_batches_of_ten():
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        if request.method == "GET":
+            page = request.url.params.get("offset")
+            if page is None:
+                return httpx.Response(200, json={
+                    "records": [{"id": f"rec{i}", "fields": {"ID": f"r{i}"}} for i in range(5)],
+                    "offset": "p2",
+                })
+            return httpx.Response(200, json={
+                "records": [{"id": f"rec{i}", "fields": {"ID": f"r{i}"}} for i in range(5, 15)],
+            })
+
+        body = json.loads(request.content)
+        assert len(body["records"]) <= 10
+        if "performUpsert" in body:
+            assert body["performUpsert"] == {"fieldsToMergeOn": ["ID"]}
+            created = [f"new{r['fields']['ID']}" for r in body["records"]]
+            return httpx.Response(200, json={
+                "records": [{"id": c, "fields": r["fields"]} for c, r in zip(created, body["records"])],
+                "createdRecords": created,
+                "updatedRecords": [],
+            })
+        assert all("id" in r for r in body["records"])
+        return httpx.Response(200, json={"records": body["records"]})
+
+    engine = _engine()
+    rows = [{"ID": f"r{i}", "Nombre": "x"} for i in range(25)]
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await engine.upsert_airtable(client, "tblReservations", rows, "ID")
+
+    gets = [r for r in requests if r.method == "GET"]
+    patches = [r for r in requests if r.method == "PATCH"]
+    # 2 páginas de prefetch (sin búsqueda por fila) + 2 lotes update + 1 lote upsert
+    assert len(gets) == 2
+    assert gets[0].url.params.get("fields[]") == "ID"
+    assert len(patches) == 3
+    assert result.updated == 15
+    assert result.inserted == 10
+    assert result.errors == 0
+
+
+async def test_airtable_batch_failure_is_isolated():
+    def handler(request: httpx.Request):
+        if request.method == "GET":
+            return httpx.Response(200, json={"records": []})
+        body = json.loads(request.content)
+        if body["records"][0]["fields"]["ID"] == "r0":
+            return httpx.Response(422, json={"error": "INVALID_VALUE"})
+        return httpx.Response(200, json={"records": [], "createdRecords": ["a"] * len(body["records"]), "updatedRecords": []})
+
+    engine = _engine()
+    rows = [{"ID": f"r{i}"} for i in range(20)]
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await engine.upsert_airtable(client, "tbl", rows, "ID")
+
+    assert result.errors == 10
+    assert result.inserted == 10
+    assert result.error_samples
+
+
+async def test_airtable_429_is_retried():
+    calls = {"n": 0}
+
+    def handler(request: httpx.Request):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"records": [{"id": "rec1", "fields": {"ID": "r1"}}]})
+
+    engine = _engine()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        id_map = await engine.prefetch_airtable_id_map(client, "tbl", "ID")
+
+    assert id_map == {"r1": "rec1"}
+    assert calls["n"] == 2
+
+
+async def test_prefetched_overlaps_fetch_with_processing_within_window():
+    produced = []
+
+    async def pages():
+        for i in range(6):
+            await asyncio.sleep(0.01)
+            produced.append(i)
+            yield i
+
+    consumed = []
+    leads = []
+    async for page in prefetched(pages(), window=2):
+        await asyncio.sleep(0.03)
+        # El productor sigue leyendo mientras se procesa: la página actual,
+        # `window` en cola y una más esperando hueco
+        leads.append(len(produced) - len(consumed))
+        consumed.append(page)
+
+    assert consumed == list(range(6))
+    assert max(leads) >= 2
+    assert max(leads) <= 2 + 2
+
+
+async def test_prefetched_propagates_producer_errors():
+    async def pages():
+        yield 1
+        raise RuntimeError("Airtable 500")
+
+    seen = []
+    with pytest.raises(RuntimeError, match="Airtable 500"):
+        async for page in prefetched(pages()):
+            seen.append(page)
+    assert seen == [1]
+
+
+async def test_iter_airtable_pages_has_no_record_cap():
+    pages_total = 120  # 12.000 registros: por encima del antiguo límite de 10.000
+
+    def handler(request: httpx.Request):
+        page = int(request.url.params.get("offset", "0"))
+        body = {"records": [{"id": f"rec{page}-{i}", "fields": {}} for i in range(100)]}
+        if page + 1 < pages_total:
+            body["offset"] = str(page + 1)
+        return httpx.Response(200, json=body)
+
+    engine = _engine()
+    total = 0
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        async for page in prefetched(engine.iter_airtable_pages(client, "tbl")):
+            total += len(page)
+
+    assert total == 12_000
@@ -0,0 +1,224 @@
+"""
+Unit tests for parallel multi-table sync, per-table isolation, webhook
+debouncing and webhook-targeted record sync in SupabaseAirtableSync.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from src.services.sync_engine import BulkSyncEngine
+from src.services.sync_service import SupabaseAirtableSync
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYNC_CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite3"))
+    with patch("src.services.sync_service.create_client", return_value=MagicMock()):
+        service = SupabaseAirtableSync()
+    yield service
+    service.checkpoints.close()
+
+
+def _config(sync, name):
+    return next(c for c in sync.sync_configs if c.table_name == name)
+
+
+async def test_sync_all_runs_tables_concurrently_and_isolates_errors(sync):
+    async def fake_sync_table(config, full_sync=False):
+        await asyncio.sleep(0.1)
+        if config.table_name == "users":
+            raise RuntimeError("Airtable 503")
+        return {"status": "success", "inserted": 1}
+
+    sync.sync_table = fake_sync_table
+
+    start = time.perf_counter()
+    results = await sync.sync_all()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.25  # 3 tablas x 0.1 s en paralelo
+    assert results["reservations"]["status"] == "success"
+    assert results["tables"]["status"] == "success"
+    assert results["users"] == {"status": "error", "error": "Airtable 503"}
+
+    progress = {p["table"]: p for p in sync.get_progress()}
+    assert progress["users"]["state"] == "error"
+    assert progress["users"]["last_error"] == "Airtable 503"
+    assert progress["tables"]["state"] == "success"
+    assert progress["tables"]["duration_seconds"] >= 0.1
+    assert len(sync.get_sync_history()) == 3
+
+
+async def test_same_table_never_runs_twice_at_once(sync):
+    running = 0
+    max_running = 0
+
+    async def fake_sync_table(config, full_sync=False):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return {"status": "success"}
+
+    sync.sync_table = fake_sync_table
+    config = _config(sync, "tables")
+
+    await asyncio.gather(sync.run_table(config), sync.run_table(config, trigger="webhook"))
+
+    assert max_running == 1
+
+
+async def test_webhook_burst_is_debounced_into_one_run(sync):
+    runs = []
+
+    async def fake_sync_records(config, record_ids):
+        runs.append((config.table_name, record_ids))
+        return {"status": "success"}
+
+    sync.sync_records = fake_sync_records
+    sync.webhook_debounce_seconds = 0.05
+    sync.webhook_max_wait_seconds = 1.0
+    config = _config(sync, "reservations")
+
+    for i in range(5):
+        sync.request_incremental_sync(config, [f"rec{i}"])
+        await asyncio.sleep(0.01)
+
+    progress = {p["table"]: p for p in sync.get_progress()}
+    assert progress["reservations"]["pending_webhook_events"] == 5
+
+    await asyncio.sleep(0.15)
+
+    assert runs == [("reservations", ["rec0", "rec1", "rec2", "rec3", "rec4"])]
+    assert sync.get_sync_history()[-1]["trigger"] == "webhook"
+
+
+async def test_webhook_debounce_respects_max_wait(sync):
+    runs = []
+
+    async def fake_sync_records(config, record_ids):
+        runs.append(time.monotonic())
+        return {"status": "success"}
+
+    sync.sync_records = fake_sync_records
+    sync.webhook_debounce_seconds = 0.05
+    sync.webhook_max_wait_seconds = 0.1
+    config = _config(sync, "tables")
+
+    start = time.monotonic()
+    # Eventos continuos: sin tope nunca habría 50 ms de silencio
+    while time.monotonic() - start < 0.2:
+        sync.request_incremental_sync(config, ["rec1"])
+        await asyncio.sleep(0.02)
+    await asyncio.sleep(0.1)
+
+    assert runs
+    assert runs[0] - start < 0.15
+
+
+async def test_webhook_without_record_ids_falls_back_to_incremental_sync(sync):
+    runs = []
+
+    async def fake_sync_table(config, full_sync=False):
+        runs.append((config.table_name, full_sync))
+        return {"status": "success"}
+
+    sync.sync_table = fake_sync_table
+    sync.webhook_debounce_seconds = 0.01
+    sync.request_incremental_sync(_config(sync, "tables"), [])
+    await asyncio.sleep(0.05)
+
+    assert runs == [("tables", False)]
+
+
+class FakeSupabaseQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.op = None
+
+    def select(self, column):
+        return self
+
+    def in_(self, column, values):
+        self.op = ("in", list(values))
+        return self
+
+    def upsert(self, rows, on_conflict="", returning=None):
+        self.op = ("upsert", rows)
+        return self
+
+    def execute(self):
+        if self.op[0] == "upsert":
+            for row in self.op[1]:
+                self.rows[row["id"]] = row
+            return MagicMock(data=[])
+        return MagicMock(data=[{"id": v} for v in self.op[1] if v in self.rows])
+
+
+class FakeCache:
+    def __init__(self):
+        self.deleted = []
+        self.patterns = []
+
+    def delete(self, key):
+        self.deleted.append(key)
+        return True
+
+    def delete_pattern(self, pattern):
+        self.patterns.append(pattern)
+        return 0
+
+
+async def test_sync_records_fetches_only_referenced_ids_and_invalidates_cache(sync):
+    supabase_rows = {}
+    supabase = MagicMock()
+    supabase.table.side_effect = lambda name: FakeSupabaseQuery(supabase_rows)
+    sync.engine = BulkSyncEngine(supabase, "https://api.airtable.com/v0/appTest", "key",
+                                 airtable_rate_per_second=0)
+    sync._cache = FakeCache()
+    invalidated = []
+    sync.add_change_listener("tables", invalidated.append)
+
+    formulas = []
+
+    def handler(request: httpx.Request):
+        formula = request.url.params["filterByFormula"]
+        formulas.append(formula)
+        # rec_missing no existe ya en Airtable
+        records = [
+            {"id": rid, "fields": {"ID": f"t-{rid}", "Nombre": rid, "Capacidad": 2}}
+            for rid in (f"rec{i}" for i in range(120))
+            if f"RECORD_ID()='{rid}'" in formula
+        ]
+        return httpx.Response(200, json={"records": records})
+
+    record_ids = [f"rec{i}" for i in range(120)] + ["recMissing", "rec1') , TRUE()"]
+    real_client = httpx.AsyncClient
+    with patch(
+        "src.services.sync_service.httpx.AsyncClient",
+        lambda **kw: real_client(transport=httpx.MockTransport(handler)),
+    ):
+        result = await sync.sync_records(_config(sync, "tables"), record_ids)
+
+    # 121 IDs válidos en lotes de 50: 3 peticiones, nunca la tabla entera
+    assert len(formulas) == 3
+    assert all(f.startswith("OR(RECORD_ID()=") for f in formulas)
+    assert result["found"] == 120
+    assert result["missing"] == 1
+    assert result["invalid_ids"] == 1
+    assert result["upserted"] == 120
+    assert len(supabase_rows) == 120
+
+    assert "airtable:Mesas:rec7" in sync._cache.deleted
+    assert "airtable:Mesas:recMissing" in sync._cache.deleted
+    assert len(sync._cache.deleted) == 121
+    assert set(sync._cache.patterns) == {"airtable:Mesas:all", "airtable:Mesas:list:*"}
+    assert len(invalidated) == 1 and len(invalidated[0]) == 121
+
+    # Cursor incremental intacto: el webhook no sustituye a la sync periódica
+    assert await sync.checkpoints.get_cursor("tables", "airtable_to_supabase") is None
@@ -211,3 +211,41 @@ class TestTwilioServiceEdgeCases:
         # Verify the full message was passed (Twilio handles segmentation)
         call_args = mock_client.return_value.messages.create.call_args
         assert len(call_args[1]["body"]) == 2000
+
+
+class TestTwilioServiceSendTemplateAsync:
+    """Tests for send_whatsapp_template_async (REST via httpx)"""
+
+    @patch.dict(
+        os.environ,
+        {"TWILIO_ACCOUNT_SID": "test_sid", "TWILIO_AUTH_TOKEN": "test_token"},
+    )
+    @patch("src.infrastructure.external.twilio_service.Client")
+    async def test_retries_on_429(self, mock_client):
+        """429 responses are retried honoring Retry-After"""
+        import httpx
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(201, json={"sid": "SMasync"})
+
+        service = TwilioService()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            sid = await service.send_whatsapp_template_async(
+                "+34600123456", "HX123", {"1": "Ana"}, http_client=client
+            )
+
+        assert sid == "SMasync"
+        assert len(calls) == 2
+        body = calls[-1].content.decode()
+        assert "ContentSid=HX123" in body
+        assert "whatsapp%3A%2B34600123456" in body
+
+    @patch.dict(os.environ, {}, clear=True)
+    async def test_without_credentials_returns_none(self):
+        service = TwilioService()
+        assert await service.send_whatsapp_template_async("+34600123456", "HX1", {}) is None
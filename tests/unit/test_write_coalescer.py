@@ -0,0 +1,115 @@
+"""
+Unit tests for the Airtable update coalescer (merged updates + 10-record batch PATCH).
+"""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.airtable import WriteCoalescer
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+class FakeAirtable:
+    """
+    Registra cada batch PATCH recibido; `fail` simula un error del lote y
+    `invalid` los registros que Airtable rechaza (422 para todo el lote).
+    """
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+        self.invalid = set()
+
+    async def batch_update_records(self, base_id, table_name, records):
+        self.batches.append((table_name, records))
+        if self.fail:
+            raise ConnectionError("Airtable unavailable")
+        if any(r["id"] in self.invalid for r in records):
+            raise HTTPError(422)
+        return [{"id": r["id"], "fields": dict(r["fields"])} for r in records]
+
+
+@pytest.fixture
+def airtable():
+    return FakeAirtable()
+
+
+@pytest.fixture
+def coalescer(airtable):
+    return WriteCoalescer(airtable=airtable, window_seconds=0.02)
+
+
+async def test_updates_to_the_same_record_are_merged(coalescer, airtable):
+    first, second = await asyncio.gather(
+        coalescer.update("MESAS", "rec1", {"Estado": "Ocupada"}),
+        coalescer.update("MESAS", "rec1", {"Disponible": False}),
+    )
+
+    assert len(airtable.batches) == 1
+    assert airtable.batches[0][1] == [
+        {"id": "rec1", "fields": {"Estado": "Ocupada", "Disponible": False}}
+    ]
+    assert first == second
+    assert coalescer.get_stats()["merged"] == 1
+
+
+async def test_burst_is_sent_in_batches_of_ten(coalescer, airtable):
+    results = await asyncio.gather(
+        *(coalescer.update("Lista de Espera", f"rec{i}", {"Estado": "Expirado"}) for i in range(23))
+    )
+
+    assert [len(records) for _, records in airtable.batches] == [10, 10, 3]
+    assert [r["id"] for r in results] == [f"rec{i}" for i in range(23)]
+
+
+async def test_tables_are_batched_separately(coalescer, airtable):
+    await asyncio.gather(
+        coalescer.update("MESAS", "rec1", {"Estado": "Libre"}),
+        coalescer.update("Lista de Espera", "rec2", {"Estado": "Expirado"}),
+    )
+
+    assert sorted(table for table, _ in airtable.batches) == ["Lista de Espera", "MESAS"]
+
+
+async def test_batch_failure_is_raised_to_every_caller(coalescer, airtable):
+    airtable.fail = True
+
+    results = await asyncio.gather(
+        coalescer.update("MESAS", "rec1", {"Estado": "Libre"}),
+        coalescer.update("MESAS", "rec2", {"Estado": "Libre"}),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert coalescer.get_stats()["failed_batches"] == 1
+
+
+async def test_invalid_record_only_fails_its_own_update(coalescer, airtable):
+    airtable.invalid = {"rec2"}
+
+    results = await asyncio.gather(
+        *(coalescer.update("MESAS", f"rec{i}", {"Estado": "Libre"}) for i in range(1, 4)),
+        return_exceptions=True,
+    )
+
+    assert [r["id"] for r in (results[0], results[2])] == ["rec1", "rec3"]
+    assert isinstance(results[1], HTTPError)
+    assert [len(records) for _, records in airtable.batches] == [3, 1, 1, 1]
+    stats = coalescer.get_stats()
+    assert (stats["split_batches"], stats["failed_batches"], stats["records_sent"]) == (1, 1, 2)
+
+
+async def test_flush_sends_pending_updates_immediately(airtable):
+    coalescer = WriteCoalescer(airtable=airtable, window_seconds=60)
+    pending = asyncio.ensure_future(coalescer.update("MESAS", "rec1", {"Estado": "Libre"}))
+    await asyncio.sleep(0)
+
+    await coalescer.flush()
+
+    assert (await pending)["id"] == "rec1"
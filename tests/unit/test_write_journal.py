@@ -0,0 +1,245 @@
+"""
+Unit tests for the Airtable write journal (SQLite store + inline/replay apply).
+"""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.write_journal import (
+    JournalEntry,
+    SQLiteJournalStore,
+    WriteJournal,
+    is_provisional,
+)
+
+
+class FakeAirtable:
+    """
+    Cliente Airtable en memoria; `down` simula una caída, `delay` lentitud y
+    `land_after` un create cuyo thread sigue y llega a Airtable aunque el
+    llamador deje de esperarlo.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.down = False
+        self.delay = 0.0
+        self.land_after = 0.0
+        self.creates = 0
+        self.formulas = []
+        self._next = 1
+
+    async def _call(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("Airtable unavailable")
+
+    async def create_record(self, base_id, table_name, fields):
+        if self.land_after:
+            # Como el thread de pyairtable: cancelar la espera no cancela la petición
+            delay, self.land_after = self.land_after, 0.0
+            return await asyncio.shield(asyncio.ensure_future(self._create_later(delay, fields)))
+        await self._call()
+        return self._create(fields)
+
+    async def _create_later(self, delay, fields):
+        await asyncio.sleep(delay)
+        return self._create(fields)
+
+    def _create(self, fields):
+        record_id = f"rec{self._next}"
+        self._next += 1
+        self.creates += 1
+        self.records[record_id] = {"id": record_id, "fields": dict(fields)}
+        return self.records[record_id]
+
+    async def update_record(self, base_id, table_name, record_id, fields):
+        await self._call()
+        self.records[record_id]["fields"].update(fields)
+        return self.records[record_id]
+
+    async def get_record(self, base_id, table_name, record_id):
+        await self._call()
+        record = self.records.get(record_id)
+        return {"id": record["id"], "fields": dict(record["fields"])} if record else None
+
+    async def list_records(self, base_id, table_name, filterByFormula=None, **kwargs):
+        await self._call()
+        self.formulas.append(filterByFormula)
+        phone = filterByFormula.split("'")[1]
+        return {
+            "records": [r for r in self.records.values() if r["fields"].get("Teléfono") == phone]
+        }
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteJournalStore(str(tmp_path / "journal.sqlite3"))
+    yield s
+    s._conn.close()
+
+
+@pytest.fixture
+def airtable():
+    return FakeAirtable()
+
+
+def _journal(store, airtable, in_flight_seconds=None):
+    return WriteJournal(
+        store=store,
+        airtable=airtable,
+        inline_timeout_seconds=0.05,
+        base_backoff_seconds=0.01,
+        max_backoff_seconds=0.01,
+        in_flight_seconds=in_flight_seconds,
+    )
+
+
+@pytest.fixture
+def journal(store, airtable, monkeypatch):
+    monkeypatch.setattr(WriteJournal, "_read_model_name", staticmethod(lambda table: None))
+    return _journal(store, airtable)
+
+
+@pytest.fixture
+def other_worker(tmp_path, airtable, journal):
+    """Segundo proceso con su propia conexión al mismo fichero del diario."""
+    s = SQLiteJournalStore(str(tmp_path / "journal.sqlite3"))
+    yield _journal(s, airtable)
+    s._conn.close()
+
+
+async def test_create_applies_inline_when_airtable_is_up(journal, airtable, store):
+    record = await journal.create("Reservas", {"Teléfono": "+34600"})
+
+    assert record["id"] == "rec1"
+    assert "pending_sync" not in record
+    stats = await store.stats()
+    assert stats["pending"] == 0 and stats["applied_retained"] == 1
+
+
+async def test_outage_returns_provisional_ids_and_replays_in_order(journal, airtable, store):
+    airtable.down = True
+
+    created = await journal.create("Reservas", {"Teléfono": "+34600", "Estado": "Pre-reserva"})
+    assert is_provisional(created["id"]) and created["pending_sync"] is True
+
+    updated = await journal.update("Reservas", created["id"], {"Estado": "Confirmada"})
+    assert updated["pending_sync"] is True
+    assert (await store.stats())["pending"] == 2
+
+    # Mientras Airtable sigue caído el replay no avanza
+    assert await journal.replay_once() is False
+
+    airtable.down = False
+    assert await journal.replay_once() is True
+
+    real_id = await journal.resolve(created["id"])
+    assert real_id == "rec1"
+    assert airtable.records["rec1"]["fields"]["Estado"] == "Confirmada"
+    assert (await store.stats())["pending"] == 0
+
+
+async def test_slow_airtable_does_not_block_the_caller(journal, airtable):
+    airtable.delay = 0.2
+
+    record = await journal.create("Reservas", {"Teléfono": "+34600"})
+
+    assert is_provisional(record["id"])
+
+
+async def test_timed_out_create_is_matched_instead_of_duplicated(journal, airtable, store):
+    # El create llegó a Airtable, pero la respuesta no volvió a tiempo
+    airtable.records["rec9"] = {"id": "rec9", "fields": {"Teléfono": "+34600"}}
+    entry = await store.append(
+        JournalEntry(
+            op="create",
+            table="Reservas",
+            record_id="tmpabc",
+            fields={"Teléfono": "+34600", "Fecha de Reserva": "2026-05-05"},
+            match_fields=["Teléfono", "Fecha de Reserva"],
+        )
+    )
+    entry.attempts = 1
+    await store.record_attempt(entry)
+
+    await journal.replay_once()
+
+    assert airtable.creates == 0
+    assert await store.resolve(entry.record_id) == "rec9"
+    assert airtable.formulas == [
+        "AND({Teléfono} = '+34600', IS_SAME({Fecha de Reserva}, '2026-05-05', 'day'))"
+    ]
+
+
+async def test_create_landing_after_the_inline_timeout_is_not_repeated(store, airtable, monkeypatch):
+    monkeypatch.setattr(WriteJournal, "_read_model_name", staticmethod(lambda table: None))
+    journal = _journal(store, airtable, in_flight_seconds=0.3)
+    fields = {"Teléfono": "+34600", "Fecha de Reserva": "2026-05-05"}
+    airtable.land_after = 0.2
+
+    created = await journal.create("Reservas", fields, match_fields=list(fields))
+    assert is_provisional(created["id"])
+
+    # Mientras la petición abandonada puede llegar, el replay no la toca
+    assert not await journal.replay_once()
+    await asyncio.sleep(0.35)
+    assert airtable.creates == 1
+
+    assert await journal.replay_once()
+    assert airtable.creates == 1
+    assert await store.resolve(created["id"]) == "rec1"
+
+
+async def test_two_workers_never_replay_the_same_entry(journal, other_worker, airtable, store):
+    airtable.down = True
+    await journal.create("Reservas", {"Teléfono": "+34600"})
+    airtable.down = False
+    airtable.delay = 0.05
+
+    await asyncio.gather(journal.replay_once(), other_worker.replay_once())
+
+    assert airtable.creates == 1
+    assert (await store.stats())["pending"] == 0
+
+
+async def test_inline_writes_only_wait_for_unclaimed_entries_ahead(journal, other_worker, store):
+    ahead = await store.append(
+        JournalEntry(op="update", table="Reservas", record_id="recX", fields={"Estado": "Sentada"})
+    )
+
+    # Otro worker la está aplicando: una escritura de otro registro no espera
+    assert await store.claim(ahead, other_worker.owner, 60)
+    applied = await journal.create("Reservas", {"Teléfono": "+34600"})
+    assert not is_provisional(applied["id"])
+
+    # Sin claim (pendiente de replay): lo posterior se difiere para respetar el orden
+    await store.release(ahead, other_worker.owner)
+    deferred = await journal.create("Reservas", {"Teléfono": "+34601"})
+    assert is_provisional(deferred["id"])
+
+
+async def test_update_with_stale_expected_values_is_a_conflict(journal, airtable, store):
+    airtable.records["rec1"] = {"id": "rec1", "fields": {"Estado": "Sentada"}}
+
+    result = await journal.cancel(
+        "Reservas", "rec1", {"Estado": "Cancelada"}, current_estado="Confirmada"
+    )
+
+    assert result is None
+    assert airtable.records["rec1"]["fields"]["Estado"] == "Sentada"
+    conflicts = await journal.list_entries("conflict")
+    assert conflicts[0]["record_id"] == "rec1"
+
+
+async def test_get_record_overlays_pending_writes(journal, airtable):
+    airtable.down = True
+    created = await journal.create("Reservas", {"Teléfono": "+34600", "Estado": "Pre-reserva"})
+    await journal.update("Reservas", created["id"], {"Estado": "Confirmada"})
+
+    record = await journal.get_record("Reservas", created["id"])
+
+    assert record["fields"] == {"Teléfono": "+34600", "Estado": "Confirmada"}
+    assert record["pending_sync"] is True